@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class EmdcbackendConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'emdcbackend'
+
+    def ready(self):
+        from .auth.role_cache import connect_signals
+        connect_signals()
+
+        from . import table_versions
+        table_versions.connect_signals()
+
+        from . import metrics
+        metrics.connect_signals()
@@ -0,0 +1,54 @@
+# backend/emdcbackend/emdcbackend/auth/cached_sessions.py
+"""
+Cached, user-indexed session engine (cached_db semantics).
+
+Reads are served from the SESSION_CACHE_ALIAS cache and only fall through to
+the UserSession table on a miss; the table is written on every save, so it
+stays the source of truth. Which cache is used is decided in settings:
+an in-process LRU (LocMemCache) by default, or Redis when REDIS_URL is set.
+
+In-process caches are not shared between worker processes, so a session that
+is revoked in one worker could still be cached in another. Settings therefore
+only select this engine when the cache is shared or a single worker runs
+(CACHE_SHARED). If it is enabled anyway, SESSION_CACHE_MAX_AGE caps how long
+an entry lives in the cache to bound that window.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+from .sessions import SessionStore as UserSessionStore
+
+
+class SessionStore(UserSessionStore, CachedDBStore):
+
+    def _cache_timeout(self, expiry_age):
+        max_age = getattr(settings, "SESSION_CACHE_MAX_AGE", None)
+        return min(expiry_age, max_age) if max_age else expiry_age
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            # Treat cache errors (e.g. Redis unavailable) as a miss
+            data = None
+
+        if data is None:
+            s = self._get_session_from_db()
+            if s:
+                data = self.decode(s.session_data)
+                self._cache_set(data, self.get_expiry_age(expiry=s.expire_date))
+            else:
+                data = {}
+        return data
+
+    def save(self, must_create=False):
+        # Skip CachedDBStore.save so the cache timeout can be capped
+        UserSessionStore.save(self, must_create)
+        self._cache_set(self._session, self.get_expiry_age())
+
+    def _cache_set(self, data, expiry_age):
+        try:
+            self._cache.set(self.cache_key, data, self._cache_timeout(expiry_age))
+        except Exception:
+            # The database row was written; a cold cache only costs a query
+            pass
@@ -0,0 +1,213 @@
+# backend/emdcbackend/emdcbackend/auth/outbox.py
+"""
+Transactional email outbox.
+
+Request handlers call queue_email() instead of talking to the email API. The
+OutboundEmail row is written in the caller's transaction, so an email exists
+only if the user/coach/judge it belongs to was committed, and nothing blocks
+on HTTP while the transaction is open.
+
+Delivery happens in send_pending_emails(), which:
+  - claims a batch of due rows (SELECT ... FOR UPDATE SKIP LOCKED on Postgres),
+  - hands each message to the configured transport,
+  - records sent/failed status, and reschedules failures with exponential
+    backoff until EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+
+It is driven by the `send_outbox_emails` management command and, unless
+EMAIL_OUTBOX_AUTOSEND is off, by a background thread woken on commit.
+
+Transports are selected with EMAIL_OUTBOX_TRANSPORT:
+  emdcbackend.auth.outbox.ResendTransport  (default, Resend SDK)
+  emdcbackend.auth.outbox.LocmemTransport  (stub for tests/local dev)
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .. import background
+from .utils import send_email_via_resend
+
+
+# -----------------------
+# Transports
+# -----------------------
+
+class ResendTransport:
+    def send(self, email):
+        result = send_email_via_resend(
+            to_email=email.to_email,
+            subject=email.subject,
+            html_content=email.html_content,
+            text_content=email.text_content or None,
+        )
+        if isinstance(result, dict):
+            return str(result.get("id") or "")
+        return ""
+
+
+class LocmemTransport:
+    """Keeps sent messages in LocmemTransport.outbox instead of sending them."""
+    outbox = []
+
+    def send(self, email):
+        LocmemTransport.outbox.append({
+            "to": email.to_email,
+            "subject": email.subject,
+            "html": email.html_content,
+            "text": email.text_content,
+        })
+        return f"locmem-{len(LocmemTransport.outbox)}"
+
+
+def get_transport():
+    path = getattr(settings, "EMAIL_OUTBOX_TRANSPORT", "emdcbackend.auth.outbox.ResendTransport")
+    return import_string(path)()
+
+
+# -----------------------
+# Queueing
+# -----------------------
+
+def queue_email(to_email, subject, html_content, text_content=None):
+    """Queue an email for delivery once the current transaction commits."""
+    from ..models import OutboundEmail
+
+    email = OutboundEmail.objects.create(
+        to_email=to_email.strip(),
+        subject=subject.strip(),
+        html_content=html_content,
+        text_content=text_content or "",
+    )
+    if getattr(settings, "EMAIL_OUTBOX_AUTOSEND", True):
+        transaction.on_commit(wake_sender)
+    return email
+
+
+def queue_emails(messages, batch_size=500):
+    """
+    Queue many emails with bulk INSERTs; `messages` are dicts with
+    queue_email's arguments.
+    """
+    from ..models import OutboundEmail
+
+    emails = OutboundEmail.objects.bulk_create(
+        [
+            OutboundEmail(
+                to_email=message["to_email"].strip(),
+                subject=message["subject"].strip(),
+                html_content=message["html_content"],
+                text_content=message.get("text_content") or "",
+            )
+            for message in messages
+        ],
+        batch_size=batch_size,
+    )
+    if emails and getattr(settings, "EMAIL_OUTBOX_AUTOSEND", True):
+        transaction.on_commit(wake_sender)
+    return emails
+
+
+# -----------------------
+# Delivery
+# -----------------------
+
+def _backoff(attempts):
+    base = getattr(settings, "EMAIL_OUTBOX_BACKOFF_SECONDS", 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def _claim_batch(batch_size, now):
+    from ..models import OutboundEmail
+
+    stale = now - timedelta(seconds=getattr(settings, "EMAIL_OUTBOX_SENDING_TIMEOUT", 600))
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        # Rows left in "sending" by a crashed sender are retried after a timeout
+        crashed = OutboundEmail.objects.filter(status=OutboundEmail.STATUS_SENDING, next_attempt_at__lte=stale)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+            crashed = crashed.select_for_update(skip_locked=True)
+        ids = list(due.order_by("next_attempt_at").values_list("id", flat=True)[:batch_size])
+        if len(ids) < batch_size:
+            ids += list(crashed.values_list("id", flat=True)[:batch_size - len(ids)])
+        OutboundEmail.objects.filter(id__in=ids).update(status=OutboundEmail.STATUS_SENDING, next_attempt_at=now)
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by("id"))
+
+
+def send_pending_emails(batch_size=50):
+    """
+    Deliver one batch of due emails.
+    Returns a (sent, failed) tuple of counts for this batch.
+    """
+    from ..models import OutboundEmail
+
+    max_attempts = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+    transport = get_transport()
+    sent = failed = 0
+    for email in _claim_batch(batch_size, timezone.now()):
+        email.attempts += 1
+        try:
+            email.provider_id = transport.send(email) or ""
+        except Exception as e:
+            email.last_error = str(e)[:2000]
+            if email.attempts >= max_attempts:
+                email.status = OutboundEmail.STATUS_FAILED
+                print(f"[ERROR] Giving up on email to {email.to_email} after {email.attempts} attempts: {e}")
+            else:
+                email.status = OutboundEmail.STATUS_PENDING
+                email.next_attempt_at = timezone.now() + _backoff(email.attempts)
+            failed += 1
+        else:
+            email.status = OutboundEmail.STATUS_SENT
+            email.sent_at = timezone.now()
+            email.last_error = ""
+            sent += 1
+        email.save(update_fields=["attempts", "status", "next_attempt_at", "last_error", "provider_id", "sent_at"])
+    return sent, failed
+
+
+def drain_outbox(batch_size=50):
+    """Send batches until nothing is due. Returns total (sent, failed)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_pending_emails(batch_size=batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
+
+
+_sender_lock = threading.Lock()
+_sender_thread = None
+_wake_again = threading.Event()
+
+
+def _run_sender():
+    global _sender_thread
+    try:
+        while True:
+            _wake_again.clear()
+            try:
+                drain_outbox()
+            except Exception as e:
+                print(f"[ERROR] Email outbox sender failed: {e}")
+            with _sender_lock:
+                # Exit under the lock so a wake_sender() call cannot be lost
+                if not _wake_again.is_set():
+                    _sender_thread = None
+                    return
+    finally:
+        connection.close()
+
+
+def wake_sender():
+    """Start the background sender thread, or ask the running one to go again."""
+    global _sender_thread
+    with _sender_lock:
+        _wake_again.set()
+        if _sender_thread is None:
+            _sender_thread = background.start(_run_sender, name="email-outbox")
@@ -2,7 +2,7 @@ from django.conf import settings
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from django.contrib.auth.tokens import default_token_generator
-from .utils import send_email_via_resend
+from .outbox import queue_email, queue_emails
 
 def build_set_password_url(user) -> str:
     """
@@ -18,11 +18,8 @@ def build_set_password_url(user) -> str:
     frontend_base = frontend_base.rstrip("/")
     return f"{frontend_base}/set-password/?uid={uid}&token={token}&email={user.username}"
 
-def send_set_password_email(user, *, subject=None):
-    """
-    Sends a set/reset password email to the user's email (username).
-    Uses Resend SDK to send emails with professional HTML formatting.
-    """
+def set_password_message(user, *, subject=None):
+    """The set/reset password email for a user, as queue_email arguments."""
     subject = subject or "Set your EMDC account password"
     link = build_set_password_url(user)
     
@@ -83,9 +80,21 @@ EMDC Contest Management System
 </div>
 """
     
-    send_email_via_resend(
-        to_email=user.username,
-        subject=subject,
-        html_content=html_content,
-        text_content=text_content
-    )
+    return {
+        "to_email": user.username,
+        "subject": subject,
+        "html_content": html_content,
+        "text_content": text_content,
+    }
+
+def send_set_password_email(user, *, subject=None):
+    """
+    Queues a set/reset password email to the user's email (username).
+    Delivered by the email outbox (see outbox.py) after the caller's
+    transaction commits.
+    """
+    queue_email(**set_password_message(user, subject=subject))
+
+def send_set_password_emails(users, *, subject=None):
+    """send_set_password_email for many users, queued with bulk INSERTs."""
+    return queue_emails([set_password_message(user, subject=subject) for user in users])
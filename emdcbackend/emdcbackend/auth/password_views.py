@@ -14,7 +14,7 @@ from rest_framework import status
 import os
 
 from .password_utils import build_set_password_url
-from .utils import send_email_via_resend
+from .outbox import queue_email
 
 
 # 1) Admin-only re-sends a set-password email (auth required)
@@ -111,9 +111,9 @@ EMDC Contest Management System
 </div>
 """
     
-    # Use Resend SDK to send email
+    # Queue for the email outbox; delivery happens after the response
     try:
-        send_email_via_resend(
+        queue_email(
             to_email=user.username,
             subject=subject,
             html_content=html_content,
@@ -233,9 +233,9 @@ EMDC Contest Management System
 </div>
 """
     
-    # Use Resend SDK to send email
+    # Queue for the email outbox; delivery happens after the response
     try:
-        send_email_via_resend(
+        queue_email(
             to_email=user.username,
             subject=subject,
             html_content=html_content,
@@ -0,0 +1,128 @@
+# backend/emdcbackend/emdcbackend/auth/role_cache.py
+"""
+Per-user cache of the role mapping and role profile used by login and
+role-gated endpoints.
+
+Two kinds of entries are kept in the default cache:
+  role:map:<user id>              -> {"role": <int>, "relatedid": <int>}
+  role:profile:<role>:<relatedid> -> serialized Admin/Organizer/Judge/Coach
+
+Entries are dropped whenever a User, MapUserToRole or profile row is saved
+or deleted (see connect_signals, wired up in apps.py), so every write path
+invalidates the cache, not only the views that edit accounts.
+
+That only reaches other workers when the cache is shared, and these lookups
+decide what a user may do, so the cache is used only when ROLE_CACHE_ENABLED
+is on (by default with Redis or a single worker, see settings.CACHE_SHARED);
+otherwise every lookup reads the database.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+MAP_KEY = "role:map:{}"
+PROFILE_KEY = "role:profile:{}:{}"
+
+
+def _timeout():
+    return getattr(settings, "ROLE_CACHE_TIMEOUT", 60)
+
+
+def _cached(key, load):
+    """cache.get(key), filled by load() on a miss; load() alone when the cache is disabled."""
+    if not getattr(settings, "ROLE_CACHE_ENABLED", True):
+        return load()
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        if value is not None:
+            cache.set(key, value, _timeout())
+    return value
+
+
+def _delete(keys):
+    cache.delete_many(keys)
+    # Drop again after commit so a read that raced the transaction cannot
+    # leave the pre-commit value behind
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_cached_role_mapping(user_id):
+    """Return {"role", "relatedid"} for the user, or None if unmapped."""
+    from ..models import MapUserToRole
+
+    def load():
+        row = MapUserToRole.objects.filter(uuid=user_id).values("role", "relatedid").first()
+        return None if row is None else {"role": int(row["role"]), "relatedid": row["relatedid"]}
+
+    return _cached(MAP_KEY.format(user_id), load)
+
+
+def get_cached_role_profile(role, relatedid):
+    """Return the serialized profile for a role mapping."""
+    from ..models import Admin, Coach, Judge, Organizer
+    from ..serializers import AdminSerializer, CoachSerializer, JudgeSerializer, OrganizerSerializer
+
+    def load():
+        model, serializer_class = {
+            1: (Admin, AdminSerializer),
+            2: (Organizer, OrganizerSerializer),
+            3: (Judge, JudgeSerializer),
+            4: (Coach, CoachSerializer),
+        }[role]
+        return dict(serializer_class(instance=model.objects.get(id=relatedid)).data)
+
+    return _cached(PROFILE_KEY.format(role, relatedid), load)
+
+
+def invalidate_user_role(user_id):
+    _delete([MAP_KEY.format(user_id)])
+
+
+def invalidate_role_profile(role, relatedid):
+    _delete([PROFILE_KEY.format(role, relatedid)])
+
+
+def invalidate_role_profiles(role, relatedids):
+    """For bulk .update() calls, which do not send post_save."""
+    keys = [PROFILE_KEY.format(role, relatedid) for relatedid in relatedids]
+    if keys:
+        _delete(keys)
+
+
+# -----------------------
+# Signal receivers
+# -----------------------
+
+def _user_changed(sender, instance, created=True, **kwargs):
+    # Only new or deleted users matter; ordinary saves (e.g. last_login on
+    # every login) do not change the role mapping
+    if created:
+        invalidate_user_role(instance.pk)
+
+
+def _mapping_changed(sender, instance, **kwargs):
+    invalidate_user_role(instance.uuid)
+
+
+def _profile_changed(role):
+    def receiver(sender, instance, **kwargs):
+        invalidate_role_profile(role, instance.pk)
+    return receiver
+
+
+def connect_signals():
+    from django.contrib.auth.models import User
+    from ..models import Admin, Coach, Judge, MapUserToRole, Organizer
+
+    for name, signal in (("save", post_save), ("delete", post_delete)):
+        signal.connect(_user_changed, sender=User, dispatch_uid=f"role_cache_user_{name}")
+        signal.connect(_mapping_changed, sender=MapUserToRole, dispatch_uid=f"role_cache_map_{name}")
+        for role, model in ((1, Admin), (2, Organizer), (3, Judge), (4, Coach)):
+            signal.connect(
+                _profile_changed(role),
+                sender=model,
+                weak=False,
+                dispatch_uid=f"role_cache_profile_{role}_{name}",
+            )
@@ -0,0 +1,78 @@
+# backend/emdcbackend/emdcbackend/auth/sessions.py
+"""
+Session engine that records the authenticated user id on every session row.
+
+Configured through SESSION_ENGINE in settings. Sessions are stored in the
+UserSession table instead of django_session, so invalidating every session
+for one user is a single indexed DELETE instead of decoding the whole table.
+"""
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX as CACHE_KEY_PREFIX
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.core.cache import caches
+from django.utils import timezone
+
+
+class SessionStore(DBSessionStore):
+
+    @classmethod
+    def get_model_class(cls):
+        from ..models import UserSession
+        return UserSession
+
+    def create_model_instance(self, data):
+        obj = super().create_model_instance(data)
+        try:
+            obj.user_id = int(data.get(SESSION_KEY))
+        except (TypeError, ValueError):
+            obj.user_id = None
+        return obj
+
+
+def delete_user_sessions(user_id: int) -> int:
+    """
+    Proactively invalidate all active sessions for the given user id.
+    This ensures any existing session cookies become unusable immediately.
+    Returns the number of sessions removed.
+    """
+    model = SessionStore.get_model_class()
+    sessions = model.objects.filter(user_id=user_id)
+    session_keys = list(sessions.values_list("session_key", flat=True))
+    deleted, _ = sessions.delete()
+    # Evict after the DELETE so a concurrent read cannot re-cache the row
+    _evict_cached_sessions(session_keys)
+    return deleted
+
+
+def _evict_cached_sessions(session_keys) -> None:
+    """Drop sessions from the session cache used by the cached engine."""
+    if not session_keys or not getattr(settings, "SESSION_CACHE_ALIAS", None):
+        return
+    try:
+        caches[settings.SESSION_CACHE_ALIAS].delete_many(
+            [CACHE_KEY_PREFIX + key for key in session_keys]
+        )
+    except Exception:
+        # Entries still expire on their own after SESSION_CACHE_MAX_AGE
+        pass
+
+
+def purge_expired_sessions(batch_size: int = 1000) -> int:
+    """
+    Delete expired sessions in batches so the table stays small without
+    holding a long lock. Returns the number of sessions removed.
+    """
+    model = SessionStore.get_model_class()
+    now = timezone.now()
+    total = 0
+    while True:
+        keys = list(
+            model.objects.filter(expire_date__lt=now)
+            .values_list("session_key", flat=True)[:batch_size]
+        )
+        if not keys:
+            break
+        deleted, _ = model.objects.filter(session_key__in=keys).delete()
+        total += deleted
+    return total
@@ -0,0 +1,85 @@
+# backend/emdcbackend/emdcbackend/auth/shared_password_cache.py
+"""
+Short-lived, in-process memo of successful shared-password checks.
+
+Every Organizer/Judge login verifies the candidate against the single
+RoleSharedPassword hash, which is a full PBKDF2 run. When a contest opens and
+many judges log in with the same password, that KDF dominates request time.
+
+Entries are keyed by (role, stored hash, HMAC of the candidate under a secret
+generated when the process starts), so:
+  - the plaintext password is never kept in memory beyond the request,
+  - a new shared password (new hash, new salt) never matches an old entry,
+    in this process or any other,
+  - set_shared_password also clears the role's entries right away.
+
+Only successful checks are remembered; wrong passwords always pay for the KDF.
+Size and lifetime are bounded by SHARED_PASSWORD_CACHE_MAX_ENTRIES and
+SHARED_PASSWORD_CACHE_TTL.
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+
+_SECRET = os.urandom(32)
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, "SHARED_PASSWORD_CACHE_TTL", 300)
+
+
+def _max_entries():
+    return getattr(settings, "SHARED_PASSWORD_CACHE_MAX_ENTRIES", 256)
+
+
+def _key(role, password_hash, candidate):
+    digest = hmac.new(_SECRET, candidate.encode("utf-8"), hashlib.sha256).hexdigest()
+    return (int(role), password_hash, digest)
+
+
+def check_shared_password(role, candidate, password_hash):
+    """
+    Return True if candidate matches the role's stored shared password hash,
+    skipping the KDF when the same check succeeded recently.
+    """
+    ttl = _ttl()
+    if not ttl or not candidate:
+        return check_password(candidate, password_hash)
+
+    key = _key(role, password_hash, candidate)
+    now = time.monotonic()
+    with _lock:
+        expires = _entries.get(key)
+        if expires is not None:
+            if expires > now:
+                _entries.move_to_end(key)
+                return True
+            del _entries[key]
+
+    if not check_password(candidate, password_hash):
+        return False
+
+    with _lock:
+        _entries[key] = now + ttl
+        _entries.move_to_end(key)
+        while len(_entries) > _max_entries():
+            _entries.popitem(last=False)
+    return True
+
+
+def invalidate_shared_password(role=None):
+    """Forget remembered checks for one role, or for every role."""
+    with _lock:
+        if role is None:
+            _entries.clear()
+            return
+        for key in [k for k in _entries if k[0] == int(role)]:
+            del _entries[key]
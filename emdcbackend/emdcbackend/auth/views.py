@@ -22,13 +22,14 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.contrib.auth import authenticate, login as dj_login, logout as dj_logout
-from django.contrib.auth.hashers import check_password
 from ..models import MapUserToRole, RoleSharedPassword
 
 from .serializers import UserSerializer
 
 # --- Added utility for sending set-password emails ---
 from .password_utils import send_set_password_email
+from .role_cache import get_cached_role_mapping
+from .shared_password_cache import check_shared_password
 
 # If you use role lookups elsewhere, keep your import the same:
 from ..views.Maps.MapUserToRole import get_role
@@ -67,13 +68,13 @@ def login_view(request):
     # If shared password exists, ONLY use it (ignore individual passwords completely)
     try:
         fallback_user = User.objects.get(username=username)
-        role_map = MapUserToRole.objects.filter(uuid=fallback_user.id).first()
-        if role_map and role_map.role in [2, 3]:  # Organizer or Judge
-            role_value = int(role_map.role)
+        role_map = get_cached_role_mapping(fallback_user.id)
+        if role_map and role_map["role"] in [2, 3]:  # Organizer or Judge
+            role_value = role_map["role"]
             try:
                 shared = RoleSharedPassword.objects.get(role=role_value)
                 shared_password_checked = True
-                password_matches = check_password(password, shared.password_hash)
+                password_matches = check_shared_password(role_value, password, shared.password_hash)
                 if password_matches:
                     user = fallback_user
                 else:
@@ -278,7 +279,9 @@ def create_user(user_data, send_email: bool = True, enforce_unusable_password: b
             user.save()
             if send_email:
                 try:
-                    send_set_password_email(user)
+                    # Savepoint: a failed outbox INSERT must not break this transaction
+                    with transaction.atomic():
+                        send_set_password_email(user)
                 except Exception as e:
                     # Do not fail creation if email fails (useful in dev)
                     print(f"[WARN] Failed to send set-password email: {e}")
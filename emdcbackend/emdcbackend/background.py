@@ -0,0 +1,62 @@
+# backend/emdcbackend/emdcbackend/background.py
+"""
+Background threads of a web worker that must be let finish before it exits.
+
+Work that runs after the response has been sent (tabulation after a score
+sheet is submitted, the email outbox sender, the contest deleter) is started
+with start(). The threads are daemons, so they never keep a process alive on
+their own, but they are tracked here: gunicorn's worker_exit hook calls
+drain(), which waits for them (up to the graceful timeout) before the worker
+process exits on shutdown or max_requests recycling.
+
+Loops that can run for long (the contest deleter) check stopping() between
+units of work and hand the rest back to the queue, so drain() does not have
+to wait for them to finish everything.
+
+Each thread closes its database connections when it finishes.
+"""
+import threading
+import time
+
+from django.db import connections
+
+_lock = threading.Lock()
+_threads = set()
+_stopping = threading.Event()
+
+
+def _run(target, args):
+    try:
+        target(*args)
+    finally:
+        connections.close_all()
+        with _lock:
+            _threads.discard(threading.current_thread())
+
+
+def start(target, *args, name=None):
+    """Run target(*args) in a tracked daemon thread; returns the thread."""
+    thread = threading.Thread(target=_run, args=(target, args), name=name, daemon=True)
+    with _lock:
+        _threads.add(thread)
+    thread.start()
+    return thread
+
+
+def running():
+    with _lock:
+        return list(_threads)
+
+
+def stopping():
+    """True once drain() was called: the worker is about to exit."""
+    return _stopping.is_set()
+
+
+def drain(timeout):
+    """Wait up to `timeout` seconds for every tracked thread; returns those still running."""
+    _stopping.set()
+    deadline = time.monotonic() + timeout
+    for thread in running():
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return [thread for thread in running() if thread.is_alive()]
@@ -0,0 +1,257 @@
+# backend/emdcbackend/emdcbackend/broadcast.py
+"""
+Push feeds for live dashboards (server-sent events).
+
+A Feed publishes per-key snapshots, e.g. the standings of one contest.
+Writers call feed.notify(key) inside their transaction; once it commits,
+every worker process that has viewers for that key recomputes the snapshot
+ONCE, diffs it against the previous one and pushes only the changed rows
+to all of its viewers. Viewers never query the database themselves.
+
+Snapshots are dicts of row id -> row dict. Subscribers receive:
+  ("snapshot", {"rows": [...]})                     when they subscribe
+  ("delta", {"changed": [...], "removed": [...]})   after each change
+
+How notifications reach other processes is chosen with
+LIVE_BROADCAST_BACKEND:
+  "local"     in-process only (single worker, tests)
+  "postgres"  NOTIFY on commit + one LISTEN connection per worker process
+  "auto"      postgres when the default database is Postgres (default)
+"""
+import asyncio
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections, transaction
+
+CHANNEL = "emdc_live"
+
+_feeds = {}
+
+
+# -----------------------
+# Subscriptions
+# -----------------------
+
+class Subscription:
+    """Events for one viewer, consumed by a sync (WSGI) generator."""
+
+    def __init__(self, feed, key):
+        self.feed = feed
+        self.key = key
+        self.queue = queue.SimpleQueue()
+
+    def deliver(self, event):
+        self.queue.put(event)
+
+    def get(self, timeout):
+        """Next event, or None after `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """Events for one viewer, consumed by an async (ASGI) generator."""
+
+    def __init__(self, feed, key, loop):
+        super().__init__(feed, key)
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def deliver(self, event):
+        # Called from request or listener threads
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            pass  # event loop already closed; the viewer is gone
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# -----------------------
+# Feeds
+# -----------------------
+
+class Feed:
+    """
+    compute(key) returns the current snapshot for `key` as {row_id: row}.
+    Rows must be JSON-serializable dicts.
+    """
+
+    def __init__(self, name, compute):
+        self.name = name
+        self.compute = compute
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._snapshots = {}
+        _feeds[name] = self
+
+    def notify(self, key):
+        """Tell viewers of `key` to refresh once the current transaction commits."""
+        get_broadcaster().publish(f"{self.name}:{key}")
+
+    def subscribe(self, key, loop=None):
+        """Register a viewer; its first event is the current snapshot."""
+        get_broadcaster().start()
+        sub = AsyncSubscription(self, key, loop) if loop is not None else Subscription(self, key)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                snapshot = self._snapshots[key] = self.compute(key)
+            self._subscribers.setdefault(key, []).append(sub)
+            sub.deliver(("snapshot", {"rows": list(snapshot.values())}))
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.key, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                # Nobody is watching: stop tracking so the snapshot cannot go stale
+                self._subscribers.pop(sub.key, None)
+                self._snapshots.pop(sub.key, None)
+
+    def current(self, key):
+        """The snapshot for `key`: the tracked one if this process has viewers, else a fresh one."""
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+        return snapshot if snapshot is not None else self.compute(key)
+
+    def has_subscribers(self, key):
+        return bool(self._subscribers.get(key))
+
+    def refresh(self, key):
+        """Recompute `key` once and push the changes to this process's viewers."""
+        if not self.has_subscribers(key):
+            return
+        with self._lock:
+            subs = list(self._subscribers.get(key, ()))
+            if not subs:
+                return
+            previous = self._snapshots.get(key, {})
+            current = self._snapshots[key] = self.compute(key)
+            changed = [row for row_id, row in current.items() if previous.get(row_id) != row]
+            removed = [row_id for row_id in previous if row_id not in current]
+            # Delivered under the lock so concurrent refreshes arrive in order
+            if changed or removed:
+                for sub in subs:
+                    sub.deliver(("delta", {"changed": changed, "removed": removed}))
+
+    def refresh_all(self):
+        for key in list(self._subscribers):
+            self.refresh(key)
+
+
+def dispatch(message):
+    """Handle a "<feed>:<key>" notification in this process."""
+    name, _, raw_key = message.partition(":")
+    feed = _feeds.get(name)
+    if feed is None:
+        return
+    key = int(raw_key) if raw_key.isdigit() else raw_key
+    try:
+        feed.refresh(key)
+    except Exception as e:
+        print(f"[ERROR] Live feed {name} refresh for {key} failed: {e}")
+
+
+# -----------------------
+# Backends
+# -----------------------
+
+class LocalBroadcaster:
+    """Delivers notifications to viewers in this process only."""
+
+    def start(self):
+        pass
+
+    def publish(self, message):
+        transaction.on_commit(lambda: dispatch(message))
+
+
+class PostgresBroadcaster:
+    """
+    Publishes with pg_notify() in the writer's transaction, so notifications
+    are sent on commit and dropped on rollback (and duplicates within one
+    transaction are merged by Postgres). Each process that has viewers holds
+    one LISTEN connection on a background thread.
+    """
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def publish(self, message):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, message])
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name="live-listener", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5):
+        """Close the LISTEN connection and wait for the listener thread to exit."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join(timeout)
+            self._stopping.clear()
+
+    def _conninfo(self):
+        # The backend's own parameters, so OPTIONS (sslmode, ...) apply here too;
+        # the "pool" option is dropped there
+        return connections[self.alias].get_connection_params()
+
+    def _listen(self):
+        import psycopg
+
+        failures = 0
+        try:
+            while not self._stopping.is_set():
+                try:
+                    with psycopg.connect(**self._conninfo(), autocommit=True) as conn:
+                        conn.execute(f"LISTEN {CHANNEL}")
+                        failures = 0
+                        # Anything published while we were (re)connecting was missed
+                        for feed in list(_feeds.values()):
+                            feed.refresh_all()
+                        while not self._stopping.is_set():
+                            for notify in conn.notifies(timeout=1.0):
+                                close_old_connections()
+                                dispatch(notify.payload)
+                except Exception as e:
+                    print(f"[WARN] Live listener connection failed: {e}")
+                    failures += 1
+                    self._stopping.wait(min(2 ** failures, 30))
+        finally:
+            # Django connection used by refresh() on this thread
+            connection.close()
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                backend = getattr(settings, "LIVE_BROADCAST_BACKEND", "auto")
+                if backend == "auto":
+                    backend = "postgres" if connection.vendor == "postgresql" else "local"
+                _broadcaster = PostgresBroadcaster() if backend == "postgres" else LocalBroadcaster()
+    return _broadcaster
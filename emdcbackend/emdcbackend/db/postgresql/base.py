@@ -0,0 +1,107 @@
+# backend/emdcbackend/emdcbackend/db/postgresql/base.py
+"""
+PostgreSQL backend with an optional psycopg 3 connection pool.
+
+Django 4.2 only offers persistent connections (CONN_MAX_AGE); native pooling
+arrived in Django 5.1. This backend backports the same configuration: set
+OPTIONS["pool"] to True or to a dict of psycopg_pool.ConnectionPool
+arguments (min_size, max_size, timeout, max_idle, max_lifetime, ...).
+Without OPTIONS["pool"] it behaves exactly like the stock backend.
+
+Each process keeps one pool per database alias. Django "closes" a pooled
+connection at the end of every request (CONN_MAX_AGE must be 0), which just
+returns it to the pool, so short requests skip connection setup.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool_stats():
+    """Return {alias: psycopg_pool stats} for every pool opened in this process."""
+    return {alias: pool.get_stats() for (alias, _), pool in list(_pools.items())}
+
+
+def close_pools():
+    """Close every pool in this process (e.g. before forking workers)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        if not base.is_psycopg3:
+            raise ImproperlyConfigured("OPTIONS['pool'] requires psycopg 3.")
+
+        # Keyed by NAME too, so the test runner's switch to the test database
+        # gets its own pool
+        key = (self.alias, self.settings_dict["NAME"])
+        with _pools_lock:
+            if key not in _pools:
+                if self.settings_dict.get("CONN_MAX_AGE", 0) != 0:
+                    raise ImproperlyConfigured("Pooling doesn't support persistent connections (CONN_MAX_AGE).")
+                try:
+                    from psycopg_pool import ConnectionPool
+                except ImportError as e:
+                    raise ImproperlyConfigured("OPTIONS['pool'] requires the psycopg-pool package.") from e
+
+                options = {} if pool_options is True else dict(pool_options)
+                _pools[key] = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    open=False,
+                    check=ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+                    name=f"emdc-{self.alias}",
+                    **options,
+                )
+            return _pools[key]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        # Same isolation-level handling as the stock backend, but the
+        # connection comes from the pool instead of Database.connect()
+        options = self.settings_dict["OPTIONS"]
+        set_isolation_level = "isolation_level" in options
+        if set_isolation_level:
+            try:
+                self.isolation_level = base.IsolationLevel(options["isolation_level"])
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {options['isolation_level']} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+        else:
+            self.isolation_level = base.IsolationLevel.READ_COMMITTED
+
+        pool.open()
+        connection = pool.getconn()
+        if set_isolation_level:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+                self.connection = None
+            return
+        return super()._close()
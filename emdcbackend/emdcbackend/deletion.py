@@ -0,0 +1,295 @@
+# backend/emdcbackend/emdcbackend/deletion.py
+"""
+Background, chunked contest deletion.
+
+DELETE /api/contest/delete/<id>/ only calls start_deletion(): in one short
+transaction it sets Contest.is_deleting, which hides the contest from
+Contest.objects (and so from every endpoint), removes the contest's judge
+and organizer mappings, so lookups of a judge's or organizer's contest
+never land on the hidden one (they are small and no later step reads them),
+and queues a ContestDeletion job. The rows tied to the contest are then removed by run_pending_deletions()
+in chunks of CONTEST_DELETE_CHUNK_SIZE rows, each in its own short
+transaction, so a large contest never holds locks long enough to stall
+scoring in other contests. The job records its current step and the rows
+removed so far; GET /api/contest/deletionStatus/<id>/ reports them.
+
+The steps, and what they delete, are those of the former synchronous
+delete_contest:
+  1. score sheets of the contest's teams (mappings and sheets)
+  2. judge and team memberships of the contest's clusters
+  3. teams and clusters no other contest uses
+  4. the contest's team and cluster mappings (and judge and organizer
+     mappings left by jobs queued before start_deletion removed them)
+  5. the contest itself (with its advancement snapshot)
+Every step looks up what is left, so a job interrupted by a crash or a
+failure picks up where it stopped when it runs again.
+
+Jobs are run by a background thread woken on commit (unless
+CONTEST_DELETE_AUTORUN is off) and by the `run_contest_deletions`
+management command, like the email outbox. A worker that is shutting down
+or recycled (background.stopping()) stops between chunks and puts its job
+back to "pending"; every worker calls resume_deletions() when it starts
+(gunicorn.conf.py), which wakes the deleter for pending jobs. Jobs left
+"running" by a worker that died are claimed again after
+CONTEST_DELETE_STALE_SECONDS; resume_deletions() also wakes the deleter
+again by then.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import background
+
+
+class DeletionInterrupted(Exception):
+    """The worker is exiting; the job goes back to the queue."""
+
+
+def _chunk_size():
+    return getattr(settings, "CONTEST_DELETE_CHUNK_SIZE", 500)
+
+
+# -----------------------
+# Queueing
+# -----------------------
+
+def start_deletion(contest, user_id=None):
+    """
+    Hide `contest`, drop its judge and organizer mappings and queue its
+    deletion; returns the ContestDeletion.
+    A failed job is queued again, a pending or running one returned as is.
+    """
+    from .models import Contest, ContestDeletion, MapContestToJudge, MapContestToOrganizer
+
+    with transaction.atomic():
+        Contest.all_objects.filter(id=contest.id).update(is_deleting=True)
+        job, created = ContestDeletion.objects.select_for_update().get_or_create(
+            contestid=contest.id, defaults={"contest_name": contest.name, "requested_by": user_id},
+        )
+        if not created and job.status in (ContestDeletion.STATUS_FAILED, ContestDeletion.STATUS_DONE):
+            job.status = ContestDeletion.STATUS_PENDING
+            job.last_error = ""
+            job.finished_at = None
+            job.requested_by = user_id
+            job.save(update_fields=["status", "last_error", "finished_at", "requested_by", "updated_at"])
+        removed = {
+            step: model.objects.filter(contestid=contest.id).delete()[0]
+            for step, model in (("contest judges", MapContestToJudge), ("contest organizers", MapContestToOrganizer))
+        }
+        if any(removed.values()):
+            for step, count in removed.items():
+                job.deleted[step] = job.deleted.get(step, 0) + count
+            job.save(update_fields=["deleted", "updated_at"])
+        if getattr(settings, "CONTEST_DELETE_AUTORUN", True):
+            transaction.on_commit(wake_deleter)
+    print(f"[INFO] Contest {contest.id} ({contest.name}) queued for deletion by user {user_id}")
+    return job
+
+
+def deletion_summary(contest_id):
+    """
+    What deleting the contest removes, in the shape the former synchronous
+    delete_contest returned under "deleted". Read before start_deletion().
+    """
+    from .models import (
+        JudgeClusters, MapContestToCluster, MapContestToJudge, MapContestToTeam, MapScoresheetToTeamJudge, Teams,
+    )
+
+    team_ids = MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+    cluster_ids = MapContestToCluster.objects.filter(contestid=contest_id).values("clusterid")
+    return {
+        "contest_id": contest_id,
+        "clusters_deleted": JudgeClusters.objects.filter(id__in=cluster_ids).exclude(
+            id__in=MapContestToCluster.objects.exclude(contestid=contest_id).values("clusterid")
+        ).count(),
+        "teams_deleted": Teams.objects.filter(id__in=team_ids).exclude(
+            id__in=MapContestToTeam.objects.exclude(contestid=contest_id).values("teamid")
+        ).count(),
+        "judges_removed": MapContestToJudge.objects.filter(contestid=contest_id).count(),
+        "scoresheets_deleted": MapScoresheetToTeamJudge.objects.filter(teamid__in=team_ids)
+        .values("scoresheetid").distinct().count(),
+    }
+
+
+# -----------------------
+# Deleting
+# -----------------------
+
+def _delete_chunks(job, step, queryset, delete_chunk=None):
+    """
+    Delete the rows of `queryset` CONTEST_DELETE_CHUNK_SIZE at a time, one
+    transaction per chunk, counting them on the job under `step`.
+    delete_chunk(ids) replaces the plain DELETE of a chunk and returns the
+    number of rows it removed.
+    """
+    size = _chunk_size()
+    job.step = step
+    job.save(update_fields=["step", "updated_at"])
+    while True:
+        if background.stopping():
+            raise DeletionInterrupted
+        with transaction.atomic():
+            ids = list(queryset.order_by("id").values_list("id", flat=True)[:size])
+            if not ids:
+                return
+            if delete_chunk is None:
+                removed = queryset.model._base_manager.filter(id__in=ids).delete()[0]
+            else:
+                removed = delete_chunk(ids)
+            job.deleted[step] = job.deleted.get(step, 0) + removed
+            job.save(update_fields=["deleted", "updated_at"])
+
+
+def _delete_sheet_chunk(mapping_ids):
+    from .models import MapScoresheetToTeamJudge, Scoresheet
+
+    mappings = MapScoresheetToTeamJudge.objects.filter(id__in=mapping_ids)
+    sheet_ids = list(mappings.values_list("scoresheetid", flat=True))
+    removed = mappings.delete()[0]
+    Scoresheet.objects.filter(id__in=sheet_ids).delete()
+    return removed
+
+
+def delete_contest_rows(job):
+    """Remove everything tied to job.contestid, step by step (see the module docstring)."""
+    from .models import (
+        AdvancementSnapshot, Contest, JudgeClusters, MapClusterToTeam, MapContestToCluster, MapContestToJudge,
+        MapContestToOrganizer, MapContestToTeam, MapJudgeToCluster, MapScoresheetToTeamJudge, Teams,
+    )
+
+    contest_id = job.contestid
+    team_ids = MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+    cluster_ids = MapContestToCluster.objects.filter(contestid=contest_id).values("clusterid")
+
+    _delete_chunks(
+        job, "score sheets", MapScoresheetToTeamJudge.objects.filter(teamid__in=team_ids), _delete_sheet_chunk,
+    )
+    _delete_chunks(job, "judge cluster assignments", MapJudgeToCluster.objects.filter(clusterid__in=cluster_ids))
+    _delete_chunks(job, "cluster teams", MapClusterToTeam.objects.filter(clusterid__in=cluster_ids))
+    _delete_chunks(job, "teams", Teams.objects.filter(id__in=team_ids).exclude(
+        id__in=MapContestToTeam.objects.exclude(contestid=contest_id).values("teamid")
+    ))
+    _delete_chunks(job, "clusters", JudgeClusters.objects.filter(id__in=cluster_ids).exclude(
+        id__in=MapContestToCluster.objects.exclude(contestid=contest_id).values("clusterid")
+    ))
+    for step, model in (
+        ("contest judges", MapContestToJudge),
+        ("contest teams", MapContestToTeam),
+        ("contest organizers", MapContestToOrganizer),
+        ("contest clusters", MapContestToCluster),
+    ):
+        _delete_chunks(job, step, model.objects.filter(contestid=contest_id))
+
+    job.step = "contest"
+    with transaction.atomic():
+        AdvancementSnapshot.objects.filter(contestid=contest_id).delete()
+        job.deleted["contest"] = Contest.all_objects.filter(id=contest_id).delete()[0]
+        job.save(update_fields=["step", "deleted", "updated_at"])
+
+
+def _claim_job(now):
+    from .models import ContestDeletion
+
+    stale = now - timedelta(seconds=getattr(settings, "CONTEST_DELETE_STALE_SECONDS", 600))
+    with transaction.atomic():
+        jobs = ContestDeletion.objects.filter(status=ContestDeletion.STATUS_PENDING) | ContestDeletion.objects.filter(
+            status=ContestDeletion.STATUS_RUNNING, updated_at__lte=stale,
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        job = jobs.order_by("id").first()
+        if job is not None:
+            job.status = ContestDeletion.STATUS_RUNNING
+            job.save(update_fields=["status", "updated_at"])
+    return job
+
+
+def run_pending_deletions():
+    """Run queued deletion jobs one after another until none is left. Returns (done, failed)."""
+    from .models import ContestDeletion
+
+    done = failed = 0
+    while (job := _claim_job(timezone.now())) is not None:
+        started = timezone.now()
+        try:
+            delete_contest_rows(job)
+        except DeletionInterrupted:
+            job.status = ContestDeletion.STATUS_PENDING
+            job.save(update_fields=["status", "updated_at"])
+            print(f"[INFO] Deleting contest {job.contestid} paused at {job.step}: worker exiting")
+            break
+        except Exception as e:
+            job.status = ContestDeletion.STATUS_FAILED
+            job.last_error = str(e)[:2000]
+            failed += 1
+            print(f"[ERROR] Deleting contest {job.contestid} failed at {job.step}: {e}")
+        else:
+            job.status = ContestDeletion.STATUS_DONE
+            job.step = ""
+            done += 1
+            print(f"[INFO] Deleted contest {job.contestid} in {(timezone.now() - started).total_seconds():.1f}s: "
+                  f"{job.deleted}")
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "step", "last_error", "finished_at", "updated_at"])
+    return done, failed
+
+
+_deleter_lock = threading.Lock()
+_deleter_thread = None
+_wake_again = threading.Event()
+
+
+def _run_deleter():
+    global _deleter_thread
+    try:
+        while True:
+            _wake_again.clear()
+            try:
+                run_pending_deletions()
+            except Exception as e:
+                print(f"[ERROR] Contest deleter failed: {e}")
+            with _deleter_lock:
+                # Exit under the lock so a wake_deleter() call cannot be lost
+                if not _wake_again.is_set() or background.stopping():
+                    _deleter_thread = None
+                    return
+    finally:
+        connection.close()
+
+
+def wake_deleter():
+    """Start the background deleter thread, or ask the running one to go again."""
+    global _deleter_thread
+    if background.stopping():
+        # Pending jobs are picked up by the next worker (resume_deletions)
+        return
+    with _deleter_lock:
+        _wake_again.set()
+        if _deleter_thread is None:
+            _deleter_thread = background.start(_run_deleter, name="contest-deleter")
+
+
+def resume_deletions():
+    """
+    Wake the deleter for queued jobs, and again once the oldest job left
+    "running" by another worker becomes stale. Called when a worker starts.
+    """
+    from .models import ContestDeletion
+
+    if not getattr(settings, "CONTEST_DELETE_AUTORUN", True):
+        return
+    if ContestDeletion.objects.filter(status=ContestDeletion.STATUS_PENDING).exists():
+        wake_deleter()
+    oldest = (
+        ContestDeletion.objects.filter(status=ContestDeletion.STATUS_RUNNING)
+        .order_by("updated_at").values_list("updated_at", flat=True).first()
+    )
+    if oldest is not None:
+        stale_at = oldest + timedelta(seconds=getattr(settings, "CONTEST_DELETE_STALE_SECONDS", 600))
+        # Not tracked by background: it only wakes the deleter and must not hold up drain()
+        timer = threading.Timer(max((stale_at - timezone.now()).total_seconds(), 0) + 1, wake_deleter)
+        timer.daemon = True
+        timer.start()
@@ -0,0 +1,149 @@
+# backend/emdcbackend/emdcbackend/integrity.py
+"""
+Integrity sweep: rows that point at rows that no longer exist.
+
+The mapping tables keep plain integer ids instead of foreign keys, so a
+contest, team, judge, score sheet or user removed by an older code path (or
+by hand) can leave rows behind that reference nothing. Each Check below
+finds one kind of orphan with an anti-join (WHERE NOT EXISTS ...), so it is
+counted in one query and deleted in batches of ids, each batch in its own
+short transaction. Orphans are never loaded into Python except for their
+ids.
+
+ORPHAN_CHECKS run in order, and a row removed by an early check can orphan
+rows that a later one finds. For example, a score sheet mapping whose team
+is gone is removed before the check for sheets without a mapping runs. A
+dry run counts each check on its own, so it can report fewer rows than a
+real sweep would remove.
+
+MapVoteToAward.awardid and MapAwardToContest.awardid are not checked:
+nothing in the API writes them, so no table is known to be their target.
+
+Used by the cleanup_orphaned_mappings and cleanup_orphaned_judge_mappings
+management commands.
+"""
+from collections import namedtuple
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import (
+    Admin, Ballot, Coach, Contest, Judge, JudgeClusters, MapAwardToContest, MapBallotToVote, MapClusterToTeam,
+    MapCoachToTeam, MapContestToCluster, MapContestToJudge, MapContestToOrganizer, MapContestToTeam,
+    MapJudgeToCluster, MapScoresheetToTeamJudge, MapTeamToVote, MapUserToRole, MapVoteToAward, Organizer,
+    Scoresheet, SpecialAward, Teams, Votes,
+)
+
+# label: shown in reports; orphans(): queryset of the orphaned rows
+Check = namedtuple("Check", ["label", "model", "orphans"])
+
+
+def _missing(model, field, target, **filters):
+    """Rows of `model` (matching `filters`) whose `field` is not the id of any `target` row."""
+    target_name = target.model.__name__
+    return Check(
+        f"{model.__name__}.{field} -> {target_name}",
+        model,
+        lambda: model.objects.filter(**filters).filter(~Exists(target.filter(id=OuterRef(field)))),
+    )
+
+
+def _unmapped_sheets():
+    return Check(
+        "Scoresheet without a MapScoresheetToTeamJudge",
+        Scoresheet,
+        lambda: Scoresheet.objects.filter(
+            ~Exists(MapScoresheetToTeamJudge.objects.filter(scoresheetid=OuterRef("id")))
+        ),
+    )
+
+
+def _contests():
+    # Contests being deleted in the background still own their rows
+    return Contest.all_objects.all()
+
+
+def _role_profiles():
+    role = MapUserToRole.RoleEnum
+    return [
+        _missing(MapUserToRole, "relatedid", model.objects.all(), role=value)
+        for value, model in ((role.ADMIN, Admin), (role.ORGANIZER, Organizer), (role.JUDGE, Judge), (role.COACH, Coach))
+    ]
+
+
+ORPHAN_CHECKS = [
+    # Rows of contests that are gone
+    _missing(MapContestToJudge, "contestid", _contests()),
+    _missing(MapContestToTeam, "contestid", _contests()),
+    _missing(MapContestToOrganizer, "contestid", _contests()),
+    _missing(MapContestToCluster, "contestid", _contests()),
+    _missing(MapAwardToContest, "contestid", _contests()),
+    _missing(Ballot, "contestid", _contests()),
+    # Mappings to judges, teams, clusters, coaches and organizers that are gone
+    _missing(MapContestToJudge, "judgeid", Judge.objects.all()),
+    _missing(MapContestToTeam, "teamid", Teams.objects.all()),
+    _missing(MapContestToOrganizer, "organizerid", Organizer.objects.all()),
+    _missing(MapContestToCluster, "clusterid", JudgeClusters.objects.all()),
+    _missing(MapJudgeToCluster, "judgeid", Judge.objects.all()),
+    _missing(MapJudgeToCluster, "clusterid", JudgeClusters.objects.all()),
+    _missing(MapClusterToTeam, "clusterid", JudgeClusters.objects.all()),
+    _missing(MapClusterToTeam, "teamid", Teams.objects.all()),
+    _missing(MapCoachToTeam, "teamid", Teams.objects.all()),
+    _missing(MapCoachToTeam, "coachid", Coach.objects.all()),
+    # Awards and votes
+    _missing(SpecialAward, "teamid", Teams.objects.all()),
+    _missing(MapTeamToVote, "teamid", Teams.objects.all()),
+    _missing(MapTeamToVote, "voteid", Votes.objects.all()),
+    _missing(MapBallotToVote, "ballotid", Ballot.objects.all()),
+    _missing(MapBallotToVote, "voteid", Votes.objects.all()),
+    _missing(MapVoteToAward, "voteid", Votes.objects.all()),
+    # Score sheets
+    _missing(MapScoresheetToTeamJudge, "scoresheetid", Scoresheet.objects.all()),
+    _missing(MapScoresheetToTeamJudge, "teamid", Teams.objects.all()),
+    _missing(MapScoresheetToTeamJudge, "judgeid", Judge.objects.all()),
+    _unmapped_sheets(),
+    # Accounts
+    _missing(MapUserToRole, "uuid", User.objects.all()),
+    *_role_profiles(),
+]
+
+
+def contest_judges_without_clusters():
+    """MapContestToJudge rows whose judge is in none of the contest's clusters."""
+    return Check(
+        "MapContestToJudge without a cluster in the contest",
+        MapContestToJudge,
+        lambda: MapContestToJudge.objects.filter(~Exists(MapJudgeToCluster.objects.filter(
+            judgeid=OuterRef("judgeid"),
+            clusterid__in=MapContestToCluster.objects.filter(contestid=OuterRef(OuterRef("contestid"))).values("clusterid"),
+        ))),
+    )
+
+
+def delete_in_batches(queryset, batch_size):
+    """Delete the rows of `queryset` `batch_size` ids at a time, one transaction per batch; returns the count."""
+    removed = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return removed
+            removed += queryset.model._base_manager.filter(id__in=ids).delete()[0]
+
+
+def sweep(checks, *, dry_run=False, batch_size=500, on_check=None):
+    """
+    Count (dry_run) or delete the orphans of every check, in order. Returns
+    [(check, rows), ...]; on_check(check, rows) is called after each one.
+    """
+    results = []
+    for check in checks:
+        if dry_run:
+            rows = check.orphans().count()
+        else:
+            rows = delete_in_batches(check.orphans(), batch_size)
+        results.append((check, rows))
+        if on_check is not None:
+            on_check(check, rows)
+    return results
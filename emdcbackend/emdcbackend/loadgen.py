@@ -0,0 +1,531 @@
+# backend/emdcbackend/emdcbackend/loadgen.py
+"""
+Synthetic contest-day load, for sizing workers and checking performance work
+before an event. Driven by the `load_test` management command.
+
+seed_contest() creates a throwaway contest shaped like a real one:
+preliminary clusters with their teams and judges, empty score sheets,
+championship and redesign clusters, and organizers. Judges and organizers
+log in with the shared role passwords. run_load() then drives it through
+the API the way the frontend does:
+  - each judge logs in, loads the dashboard, autosaves every assigned sheet
+    a few times, submits it and reloads the sheet list
+  - organizers log in and poll judging progress and standings, tabulating
+    every few polls, until the judges are done
+  - finally an organizer tabulates, loads the results and advances the
+    first team of each cluster to the championship round
+Judges run `concurrency` at a time; organizers poll in threads of their own.
+
+replay() sends the requests of a request log instead (see read_request_log),
+split over `concurrency` organizer sessions of the seeded contest.
+
+Requests go through Django's test Client in this process (InProcessTransport)
+or over HTTP to a running server (HTTPTransport, stdlib only). Each one is
+timed and recorded in a LoadStats under its URL name, the route label of the
+Prometheus metrics (metrics.py). A status of 400 or more, or a request that
+raised, counts as an error.
+
+remove_seed() deletes everything seed_contest() created.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.cookies import SimpleCookie
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+
+from .models import (
+    Contest, ContestDeletion, Judge, JudgeClusters, MapClusterToTeam, MapContestToCluster, MapContestToJudge,
+    MapContestToOrganizer, MapContestToTeam, MapJudgeToCluster, MapUserToRole, Organizer, RoleSharedPassword,
+    Teams,
+)
+
+# Sheet types every seeded judge scores (flags of Judge / MapJudgeToCluster)
+JUDGE_FLAGS = ("presentation", "journal", "mdo")
+
+
+# -----------------------
+# Statistics
+# -----------------------
+
+def percentile(values, q):
+    """Nearest-rank percentile `q` (0-100) of the sorted list `values`."""
+    if not values:
+        return 0.0
+    return values[max(1, math.ceil(q / 100 * len(values))) - 1]
+
+
+class LoadStats:
+    """Latency and errors per route, safe to record from many threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}  # route -> [seconds, ...]
+        self._errors = {}  # route -> count
+        self.first_errors = {}  # route -> description of its first error
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, route, seconds, error=None):
+        with self._lock:
+            self._latencies.setdefault(route, []).append(seconds)
+            if error is not None:
+                self._errors[route] = self._errors.get(route, 0) + 1
+                self.first_errors.setdefault(route, error)
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def rows(self):
+        """One report row per route, slowest p95 first, then a "TOTAL" row; latencies in ms."""
+        with self._lock:
+            series = {route: sorted(values) for route, values in self._latencies.items()}
+            errors = dict(self._errors)
+        elapsed = self.elapsed or 1e-9
+
+        def row(route, values, error_count):
+            return {
+                "route": route,
+                "requests": len(values),
+                "errors": error_count,
+                "error_rate": error_count / len(values) if values else 0.0,
+                "throughput": len(values) / elapsed,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000 if values else 0.0,
+            }
+
+        rows = sorted(
+            (row(route, values, errors.get(route, 0)) for route, values in series.items()),
+            key=lambda r: r["p95_ms"], reverse=True,
+        )
+        rows.append(row("TOTAL", sorted(v for values in series.values() for v in values), sum(errors.values())))
+        return rows
+
+
+# -----------------------
+# Transports
+# -----------------------
+
+def _json(body):
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+class InProcessTransport:
+    """Django's test Client; one per virtual user, as it keeps the session cookie."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None):
+        body = json.dumps(data) if data is not None else ""
+        response = self.client.generic(method, path, body, content_type="application/json", secure=True)
+        return response.status_code, _json(b"".join(response) if response.streaming else response.content)
+
+
+class HTTPTransport:
+    """
+    HTTP to a running server with urllib; one per virtual user. Cookies are
+    kept by hand so Secure session and CSRF cookies work against http://
+    local instances too.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cookies = {}
+
+    def _store_cookies(self, headers):
+        for header in headers.get_all("Set-Cookie") or ():
+            for name, morsel in SimpleCookie(header).items():
+                if morsel.value and morsel["max-age"] != "0":
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+
+    def request(self, method, path, data=None):
+        headers = {"Content-Type": "application/json", "Referer": self.base_url + "/"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        if settings.CSRF_COOKIE_NAME in self.cookies:
+            headers["X-CSRFToken"] = self.cookies[settings.CSRF_COOKIE_NAME]
+        body = json.dumps(data).encode() if data is not None else None
+        req = urlrequest.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as response:
+                self._store_cookies(response.headers)
+                return response.status, _json(response.read())
+        except urlerror.HTTPError as e:
+            self._store_cookies(e.headers)
+            return e.code, _json(e.read())
+
+
+class VirtualUser:
+    """One browser session: sends requests through its transport and records them in `stats`."""
+
+    def __init__(self, transport, stats):
+        self.transport = transport
+        self.stats = stats
+
+    def call(self, route, method, *args, data=None, path=None):
+        """Request URL `route` (reversed with `args`, or `path`); returns the JSON body, or None on errors."""
+        path = path or reverse(route, args=args)
+        start = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, data)
+        except Exception as e:
+            self.stats.record(route, time.perf_counter() - start, f"{method} {path}: {e}")
+            return None
+        if status >= 400:
+            self.stats.record(route, time.perf_counter() - start, f"{method} {path}: {status} {body}"[:300])
+            return None
+        self.stats.record(route, time.perf_counter() - start)
+        return body
+
+    def login(self, username, password):
+        return self.call("login", "POST", data={"username": username, "password": password}) is not None
+
+
+def _route(path):
+    try:
+        return resolve(path.split("?", 1)[0]).view_name
+    except Resolver404:
+        return "unmatched"
+
+
+# -----------------------
+# Seeding
+# -----------------------
+
+class Seed:
+    """What seed_contest() created."""
+
+    def __init__(self, tag, password):
+        self.tag = tag
+        self.password = password
+        self.contest_id = None
+        self.judges = []  # [(username, judge_id), ...]
+        self.organizers = []  # [username, ...]
+        self.sheets_by_judge = {}  # judge_id -> [(sheet_id, sheet_type), ...]
+        self.advancers = []  # first team of each preliminary cluster
+        self.team_ids = []
+        self.user_ids = []
+        self.organizer_ids = []
+        self.shared_password_roles = []  # roles whose shared password the seed set
+
+
+def shared_password_matches(password):
+    """False if a shared judge or organizer password is set and `password` is not it."""
+    return all(
+        check_password(password, shared.password_hash)
+        for shared in RoleSharedPassword.objects.filter(
+            role__in=(MapUserToRole.RoleEnum.ORGANIZER, MapUserToRole.RoleEnum.JUDGE)
+        )
+    )
+
+
+def seed_contest(*, judges, teams, clusters, organizers, password):
+    """
+    Create a load test contest; judges and teams are spread round-robin over
+    `clusters` preliminary clusters. Shared role passwords that are not set
+    yet are set to `password`. Returns a Seed.
+    """
+    from .views.advance import PRELIMINARY_SHEET_FLAGS
+    from .views.scoresheets import cluster_sheet_assignments, provision_sheets
+
+    role = MapUserToRole.RoleEnum
+    seed = Seed(uuid.uuid4().hex[:8], password)
+    with transaction.atomic():
+        for role_value in (role.ORGANIZER, role.JUDGE):
+            if not RoleSharedPassword.objects.filter(role=role_value).exists():
+                RoleSharedPassword.objects.create(role=role_value, password_hash=make_password(password))
+                seed.shared_password_roles.append(role_value)
+
+        contest = Contest.objects.create(name=f"Load test {seed.tag}", date=date.today(), is_open=True, is_tabulated=False)
+        seed.contest_id = contest.id
+        preliminary = JudgeClusters.objects.bulk_create(
+            [JudgeClusters(cluster_name=f"Cluster {n + 1}", cluster_type="preliminary") for n in range(clusters)]
+        )
+        rounds = JudgeClusters.objects.bulk_create([
+            JudgeClusters(cluster_name="Championship", cluster_type="championship", is_active=False),
+            JudgeClusters(cluster_name="Redesign", cluster_type="redesign", is_active=False),
+        ])
+        MapContestToCluster.objects.bulk_create(
+            [MapContestToCluster(contestid=contest.id, clusterid=cluster.id) for cluster in preliminary + rounds]
+        )
+
+        team_list = Teams.objects.bulk_create([Teams(team_name=f"Team {n + 1}", school_name="Load Test") for n in range(teams)])
+        seed.team_ids = [team.id for team in team_list]
+        memberships = [(preliminary[n % clusters].id, team.id) for n, team in enumerate(team_list)]
+        MapContestToTeam.objects.bulk_create([MapContestToTeam(contestid=contest.id, teamid=team.id) for team in team_list])
+        MapClusterToTeam.objects.bulk_create(
+            [MapClusterToTeam(clusterid=cluster_id, teamid=team_id) for cluster_id, team_id in memberships]
+        )
+        seed.advancers = [team.id for team in team_list[:clusters]]
+
+        flags = {flag: True for flag in JUDGE_FLAGS}
+        judge_list = Judge.objects.bulk_create([
+            Judge(first_name="Load", last_name=f"Judge {n + 1}", phone_number="0", contestid=contest.id, **flags)
+            for n in range(judges)
+        ])
+        MapContestToJudge.objects.bulk_create([MapContestToJudge(contestid=contest.id, judgeid=j.id) for j in judge_list])
+        MapJudgeToCluster.objects.bulk_create([
+            MapJudgeToCluster(judgeid=judge.id, clusterid=preliminary[n % clusters].id, contestid=contest.id, **flags)
+            for n, judge in enumerate(judge_list)
+        ])
+        for sheet in provision_sheets(cluster_sheet_assignments(memberships, PRELIMINARY_SHEET_FLAGS)):
+            seed.sheets_by_judge.setdefault(sheet["judge_id"], []).append((sheet["scoresheet_id"], sheet["sheetType"]))
+
+        organizer_list = Organizer.objects.bulk_create(
+            [Organizer(first_name="Load", last_name=f"Organizer {n + 1}") for n in range(organizers)]
+        )
+        seed.organizer_ids = [organizer.id for organizer in organizer_list]
+        MapContestToOrganizer.objects.bulk_create(
+            [MapContestToOrganizer(contestid=contest.id, organizerid=organizer.id) for organizer in organizer_list]
+        )
+
+        # Judges and organizers log in with the shared password only
+        unusable = make_password(None)
+        accounts = [(f"loadtest-{seed.tag}-judge-{n + 1}@example.invalid", role.JUDGE, j.id)
+                    for n, j in enumerate(judge_list)]
+        accounts += [(f"loadtest-{seed.tag}-organizer-{n + 1}@example.invalid", role.ORGANIZER, o.id)
+                     for n, o in enumerate(organizer_list)]
+        users = User.objects.bulk_create([User(username=username, password=unusable) for username, _, _ in accounts])
+        seed.user_ids = [user.id for user in users]
+        MapUserToRole.objects.bulk_create([
+            MapUserToRole(uuid=user.id, role=role_value, relatedid=related_id)
+            for user, (_, role_value, related_id) in zip(users, accounts)
+        ])
+        seed.judges = [(username, related_id) for username, role_value, related_id in accounts if role_value == role.JUDGE]
+        seed.organizers = [username for username, role_value, _ in accounts if role_value == role.ORGANIZER]
+    return seed
+
+
+def remove_seed(seed):
+    """Delete the contest, accounts and shared passwords seed_contest() created."""
+    from .auth.sessions import delete_user_sessions
+    from .deletion import delete_contest_rows
+
+    job = ContestDeletion.objects.create(
+        contestid=seed.contest_id, contest_name=f"Load test {seed.tag}", status=ContestDeletion.STATUS_RUNNING,
+    )
+    delete_contest_rows(job)
+    job.status = ContestDeletion.STATUS_DONE
+    job.step = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "step", "finished_at", "updated_at"])
+
+    with transaction.atomic():
+        judge_ids = [judge_id for _, judge_id in seed.judges]
+        Judge.objects.filter(id__in=judge_ids).delete()
+        Organizer.objects.filter(id__in=seed.organizer_ids).delete()
+        MapUserToRole.objects.filter(uuid__in=seed.user_ids).delete()
+        User.objects.filter(id__in=seed.user_ids).delete()
+        RoleSharedPassword.objects.filter(role__in=seed.shared_password_roles).delete()
+    for user_id in seed.user_ids:
+        delete_user_sessions(user_id)
+
+
+# -----------------------
+# Scenarios
+# -----------------------
+
+def _sheet_fields(rng):
+    return {f"field{n}": rng.randint(0, 10) for n in range(1, 9)}
+
+
+def judge_session(user, seed, judge, *, autosaves, think, rng):
+    """Log in, load the dashboard, then autosave and submit each of the judge's sheets."""
+    username, judge_id = judge
+    if not user.login(username, seed.password):
+        return
+    user.call("all_clusters_by_judge", "GET", judge_id)
+    user.call("teams_by_judge", "GET", judge_id)
+    user.call("score_sheets_by_judge", "GET", judge_id)
+    for sheet_id, _ in seed.sheets_by_judge.get(judge_id, ()):
+        for _ in range(autosaves):
+            time.sleep(rng.uniform(0, think))
+            user.call("update_scores", "POST", data={"id": sheet_id, "isSubmitted": False, **_sheet_fields(rng)})
+        time.sleep(rng.uniform(0, think))
+        user.call("update_scores", "POST", data={"id": sheet_id, "isSubmitted": True, **_sheet_fields(rng)})
+        user.call("score_sheets_by_judge", "GET", judge_id)
+    user.call("logout", "POST")
+
+
+def organizer_session(user, seed, username, *, done, poll_interval, tabulate_every):
+    """Poll progress and standings (tabulating every `tabulate_every` polls) until `done` is set."""
+    if not user.login(username, seed.password):
+        return
+    contest = {"contestid": seed.contest_id}
+    polls = 0
+    while not done.is_set():
+        user.call("progress_snapshot", "GET", seed.contest_id)
+        user.call("preliminary_results", "PUT", data=contest)
+        polls += 1
+        if tabulate_every and polls % tabulate_every == 0:
+            user.call("tabulate_scores", "PUT", data=contest)
+        done.wait(poll_interval)
+    user.call("logout", "POST")
+
+
+def finish_contest(user, seed):
+    """Tabulate, load the results and advance to the championship, as an organizer."""
+    if not user.login(seed.organizers[0], seed.password):
+        return
+    contest = {"contestid": seed.contest_id}
+    user.call("tabulate_scores", "PUT", data=contest)
+    user.call("preliminary_results", "PUT", data=contest)
+    user.call("advance_to_championship", "POST", data={**contest, "championship_team_ids": seed.advancers})
+
+
+def _closing_connections(fn):
+    """Run fn in a worker thread, closing the thread's database connections afterwards."""
+    def run(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return run
+
+
+def _run_all(tasks, concurrency):
+    """Call every task, `concurrency` at a time; in this thread when concurrency is 1."""
+    if concurrency <= 1:
+        for task in tasks:
+            task()
+        return
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadgen") as pool:
+        for future in [pool.submit(_closing_connections(task)) for task in tasks]:
+            future.result()
+
+
+def run_load(seed, transport_factory, *, concurrency=10, organizers=1, autosaves=2, think=0.0, poll_interval=2.0,
+             tabulate_every=5, random_seed=0):
+    """Run the contest-day scenario against `seed`; returns the LoadStats."""
+    stats = LoadStats()
+    done = threading.Event()
+    pollers = [
+        threading.Thread(
+            target=_closing_connections(organizer_session),
+            args=(VirtualUser(transport_factory(), stats), seed, username),
+            kwargs={"done": done, "poll_interval": poll_interval, "tabulate_every": tabulate_every},
+            name=f"loadgen-organizer-{n}", daemon=True,
+        )
+        for n, username in enumerate(seed.organizers[:organizers])
+    ]
+    for poller in pollers:
+        poller.start()
+
+    def judge_task(judge):
+        return lambda: judge_session(
+            VirtualUser(transport_factory(), stats), seed, judge,
+            autosaves=autosaves, think=think, rng=random.Random(random_seed * 100003 + judge[1]),
+        )
+
+    try:
+        _run_all([judge_task(judge) for judge in seed.judges], concurrency)
+    finally:
+        done.set()
+        for poller in pollers:
+            poller.join()
+    finish_contest(VirtualUser(transport_factory(), stats), seed)
+    stats.stop()
+    return stats
+
+
+# -----------------------
+# Replay
+# -----------------------
+
+def read_request_log(lines):
+    """
+    Parse a request log: one JSON object per line with "method", "path",
+    optional "body" and optional "offset" (seconds since the log started).
+    Anonymized logs use placeholders for ids: {contest}, {judge}, {team} and
+    {sheet} are replaced with ids of the seeded contest (a body string that
+    is just a placeholder becomes a number).
+    """
+    entries = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            entries.append({
+                "method": entry["method"].upper(),
+                "path": entry["path"],
+                "body": entry.get("body"),
+                "offset": float(entry.get("offset") or 0),
+            })
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"line {number}: {e}")
+    return entries
+
+
+def _fill(text, seed, rng):
+    sheets = [sheet_id for sheet_list in seed.sheets_by_judge.values() for sheet_id, _ in sheet_list]
+    replacements = {
+        "{contest}": lambda: seed.contest_id,
+        "{judge}": lambda: rng.choice(seed.judges)[1],
+        "{team}": lambda: rng.choice(seed.team_ids),
+        "{sheet}": lambda: rng.choice(sheets),
+    }
+    for placeholder, value in replacements.items():
+        # A whole JSON string '"{team}"' becomes a number
+        for pattern in (f'"{placeholder}"', placeholder):
+            while pattern in text:
+                text = text.replace(pattern, str(value()), 1)
+    return text
+
+
+def replay(entries, seed, transport_factory, *, concurrency=10, speed=1.0, random_seed=0):
+    """
+    Send `entries` (read_request_log), entry i from organizer session i %
+    concurrency. With speed > 0 each entry waits until offset / speed seconds
+    after the start; with 0 they are sent as fast as the sessions allow.
+    """
+    stats = LoadStats()
+    rng = random.Random(random_seed)
+    entries = [
+        {
+            **entry,
+            "path": _fill(entry["path"], seed, rng),
+            "body": None if entry["body"] is None else json.loads(_fill(json.dumps(entry["body"]), seed, rng)),
+        }
+        for entry in entries
+    ]
+    start = time.monotonic()
+
+    def session(n):
+        user = VirtualUser(transport_factory(), stats)
+        if not user.login(seed.organizers[n % len(seed.organizers)], seed.password):
+            return
+        for entry in entries[n::concurrency]:
+            if speed > 0:
+                time.sleep(max(0.0, start + entry["offset"] / speed - time.monotonic()))
+            user.call(_route(entry["path"]), entry["method"], data=entry["body"], path=entry["path"])
+
+    _run_all([lambda n=n: session(n) for n in range(concurrency)], concurrency)
+    stats.stop()
+    return stats
@@ -0,0 +1,111 @@
+"""
+Django management command to compare JSON encode time and memory of DRF's
+stdlib JSONRenderer against the orjson-backed FastJSONRenderer.
+
+Payloads are built in memory (no database access) with the real model
+serializers, shaped like the heaviest responses:
+  - teams:       TeamSerializer list (get_all_teams)
+  - scoresheets: ScoresheetSerializer list with mapping info
+                 (get_scoresheet_details_for_contest / score_sheets_by_judge)
+
+Usage:
+    python manage.py benchmark_json
+    python manage.py benchmark_json --teams 400 --sheets-per-team 15 --repeat 50
+"""
+
+import random
+import string
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from rest_framework.renderers import JSONRenderer
+
+from emdcbackend import renderers
+from emdcbackend.models import Scoresheet, Teams
+from emdcbackend.serializers import ScoresheetSerializer, TeamSerializer
+
+
+def _fake_instance(model, pk, rng):
+    """Unsaved model instance with every concrete field filled in."""
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            values[field.attname] = pk
+        elif isinstance(field, models.BooleanField):
+            values[field.attname] = rng.random() < 0.5
+        elif isinstance(field, models.FloatField):
+            values[field.attname] = round(rng.uniform(0, 100), 2)
+        elif isinstance(field, models.IntegerField):
+            values[field.attname] = rng.randint(1, 7)
+        elif isinstance(field, (models.CharField, models.TextField)):
+            length = min(field.max_length or 40, 40)
+            values[field.attname] = ''.join(rng.choices(string.ascii_letters + ' ', k=length))
+    return model(**values)
+
+
+def build_payloads(teams, sheets_per_team, seed=0):
+    rng = random.Random(seed)
+    team_list = [_fake_instance(Teams, i, rng) for i in range(1, teams + 1)]
+    sheets = []
+    for team in team_list:
+        for n in range(sheets_per_team):
+            sheet = _fake_instance(Scoresheet, team.id * 100 + n, rng)
+            sheets.append({
+                "mapping": {
+                    "teamid": team.id,
+                    "judgeid": rng.randint(1, 50),
+                    "scoresheetid": sheet.id,
+                    "sheetType": sheet.sheetType,
+                },
+                "scoresheet": ScoresheetSerializer(sheet).data,
+                "total": round(rng.uniform(0, 500), 2),
+            })
+    return {
+        "teams": {"Teams": TeamSerializer(team_list, many=True).data},
+        "scoresheets": {"ScoreSheets": sheets},
+    }
+
+
+def measure(render, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = render(data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    render(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(output)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark DRF JSON rendering: stdlib vs orjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=200, help='Number of teams (default: 200)')
+        parser.add_argument('--sheets-per-team', type=int, default=12, help='Score sheets per team (default: 12)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per renderer, best is reported (default: 20)')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson is not installed; FastJSONRenderer falls back to the stdlib renderer.')
+
+        payloads = build_payloads(options['teams'], options['sheets_per_team'])
+        contenders = [
+            ('stdlib', JSONRenderer().render),
+            ('orjson', renderers.FastJSONRenderer().render),
+        ]
+
+        self.stdout.write(f"{'payload':<12} {'renderer':<8} {'size':>10} {'encode ms':>10} {'peak KiB':>10}")
+        for name, data in payloads.items():
+            results = {}
+            for label, render in contenders:
+                seconds, peak, size = measure(render, data, options['repeat'])
+                results[label] = seconds
+                self.stdout.write(f"{name:<12} {label:<8} {size:>10} {seconds * 1000:>10.2f} {peak / 1024:>10.1f}")
+            speedup = results['stdlib'] / results['orjson'] if results['orjson'] else float('inf')
+            self.stdout.write(self.style.SUCCESS(f"{name}: orjson is {speedup:.1f}x faster"))
@@ -1,65 +1,67 @@
-from django.core.management.base import BaseCommand
-from emdcbackend.models import (
-    Contest, MapContestToJudge, MapContestToTeam, 
-    MapContestToOrganizer, MapContestToCluster
-)
+"""
+Django management command to remove rows that point at missing rows.
+
+Runs every check of emdcbackend/integrity.py: mappings whose contest,
+judge, team, cluster, coach, organizer, ballot, vote or score sheet is
+gone, score sheets no mapping points at, and MapUserToRole rows whose
+user or profile is gone. Each check is one anti-join; orphans are deleted
+in batches of --batch-size ids, one transaction per batch.
+
+Usage:
+    python manage.py cleanup_orphaned_mappings
+    python manage.py cleanup_orphaned_mappings --dry-run  # Counts only
+    python manage.py cleanup_orphaned_mappings --batch-size 200 -v 2
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from emdcbackend.integrity import ORPHAN_CHECKS, sweep
+
 
 class Command(BaseCommand):
-    help = 'Clean up orphaned contest mappings (mappings pointing to non-existent contests)'
+    help = 'Clean up orphaned mappings, score sheets and role mappings (rows pointing to non-existent rows)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count orphans per table without deleting anything',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Orphans deleted per transaction (default: 500)',
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write('Starting cleanup of orphaned contest mappings...')
-        
-        # Get all existing contest IDs
-        existing_contest_ids = set(Contest.objects.values_list('id', flat=True))
-        self.stdout.write(f'Found {len(existing_contest_ids)} existing contests: {sorted(existing_contest_ids)}')
-        
-        # Clean up MapContestToJudge
-        judge_mappings = MapContestToJudge.objects.all()
-        orphaned_judge_mappings = judge_mappings.exclude(contestid__in=existing_contest_ids)
-        judge_count = orphaned_judge_mappings.count()
-        if judge_count > 0:
-            self.stdout.write(f'Removing {judge_count} orphaned judge mappings...')
-            for mapping in orphaned_judge_mappings:
-                self.stdout.write(f'  - Judge {mapping.judgeid} -> Contest {mapping.contestid}')
-            orphaned_judge_mappings.delete()
-        
-        # Clean up MapContestToTeam
-        team_mappings = MapContestToTeam.objects.all()
-        orphaned_team_mappings = team_mappings.exclude(contestid__in=existing_contest_ids)
-        team_count = orphaned_team_mappings.count()
-        if team_count > 0:
-            self.stdout.write(f'Removing {team_count} orphaned team mappings...')
-            for mapping in orphaned_team_mappings:
-                self.stdout.write(f'  - Team {mapping.teamid} -> Contest {mapping.contestid}')
-            orphaned_team_mappings.delete()
-        
-        # Clean up MapContestToOrganizer
-        organizer_mappings = MapContestToOrganizer.objects.all()
-        orphaned_organizer_mappings = organizer_mappings.exclude(contestid__in=existing_contest_ids)
-        organizer_count = orphaned_organizer_mappings.count()
-        if organizer_count > 0:
-            self.stdout.write(f'Removing {organizer_count} orphaned organizer mappings...')
-            for mapping in orphaned_organizer_mappings:
-                self.stdout.write(f'  - Organizer {mapping.organizerid} -> Contest {mapping.contestid}')
-            orphaned_organizer_mappings.delete()
-        
-        # Clean up MapContestToCluster
-        cluster_mappings = MapContestToCluster.objects.all()
-        orphaned_cluster_mappings = cluster_mappings.exclude(contestid__in=existing_contest_ids)
-        cluster_count = orphaned_cluster_mappings.count()
-        if cluster_count > 0:
-            self.stdout.write(f'Removing {cluster_count} orphaned cluster mappings...')
-            for mapping in orphaned_cluster_mappings:
-                self.stdout.write(f'  - Cluster {mapping.clusterid} -> Contest {mapping.contestid}')
-            orphaned_cluster_mappings.delete()
-        
-        total_removed = judge_count + team_count + organizer_count + cluster_count
-        
-        if total_removed == 0:
+        dry_run = options['dry_run']
+        verbosity = options['verbosity']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+        self.stdout.write(f'Starting cleanup of orphaned rows ({len(ORPHAN_CHECKS)} checks)...')
+
+        def report(check, rows):
+            if rows or verbosity > 1:
+                self.stdout.write(f'  {check.label}: {rows}')
+            if rows and dry_run and verbosity > 1:
+                sample = list(check.orphans().order_by('id').values_list('id', flat=True)[:10])
+                self.stdout.write(f'    ids: {sample}{" ..." if rows > len(sample) else ""}')
+
+        started = time.monotonic()
+        results = sweep(ORPHAN_CHECKS, dry_run=dry_run, batch_size=options['batch_size'], on_check=report)
+        total = sum(rows for _, rows in results)
+        elapsed = time.monotonic() - started
+
+        if total == 0:
             self.stdout.write(self.style.SUCCESS('No orphaned mappings found!'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f'DRY RUN: Would remove {total} orphaned rows'))
         else:
-            self.stdout.write(self.style.SUCCESS(f'Successfully removed {total_removed} orphaned mappings'))
-        
-        self.stdout.write('Cleanup completed!')
+            self.stdout.write(self.style.SUCCESS(f'Successfully removed {total} orphaned mappings'))
 
+        self.stdout.write(f'Cleanup completed in {elapsed:.2f}s!')
@@ -0,0 +1,66 @@
+"""
+Django management command to export a contest's results.
+
+Writes the same CSV/XLSX files as GET /api/export/results/<contest_id>/
+(see views/export.py), streaming rows from the database as it goes. CSV
+holds one report; XLSX holds the requested report, or all of them.
+
+Usage:
+    python manage.py export_results 3 > preliminary.csv
+    python manage.py export_results 3 --report sheets --output sheets.csv
+    python manage.py export_results 3 --format xlsx --output results.xlsx
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from emdcbackend.models import Contest
+from emdcbackend.views.export import FORMATS, REPORTS, export
+
+
+class Command(BaseCommand):
+    help = 'Export contest standings and score sheets as CSV or XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('contestid', type=int)
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='File format (default: csv)',
+        )
+        parser.add_argument(
+            '--report',
+            choices=list(REPORTS),
+            help='Report to export (default: preliminary for CSV, all of them for XLSX)',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write (default: standard output, CSV only)',
+        )
+
+    def handle(self, *args, **options):
+        contest_id, fmt = options['contestid'], options['format']
+        if not Contest.objects.filter(id=contest_id).exists():
+            raise CommandError(f'Contest {contest_id} does not exist')
+        if options['report']:
+            reports = [options['report']]
+        else:
+            reports = ['preliminary'] if fmt == 'csv' else list(REPORTS)
+
+        if not options['output']:
+            if fmt != 'csv':
+                raise CommandError('--output is required for XLSX')
+            for chunk in export(contest_id, fmt, reports):
+                self.stdout.write(chunk.decode(), ending='')
+            return
+
+        size = 0
+        try:
+            with open(options['output'], 'wb') as f:
+                for chunk in export(contest_id, fmt, reports):
+                    f.write(chunk)
+                    size += len(chunk)
+        except OSError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {', '.join(reports)} of contest {contest_id} to {options['output']} ({size} bytes)"
+        ))
@@ -0,0 +1,50 @@
+"""
+Django management command to apply a judge roster to a contest.
+
+Reads one row per judge and cluster (email, first_name, last_name,
+phone_number, role, cluster and the sheet flags presentation, journal,
+mdo, runpenalties, otherpenalties, redesign, championship) from a CSV or
+JSON file. The listed judges' assignments and score sheets are brought in
+line with the roster in one transaction; see views/bulk_import.py.
+
+Usage:
+    python manage.py import_judges 3 judges.csv
+    python manage.py import_judges 3 judges.csv --dry-run
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from emdcbackend.views.bulk_import import RosterImportError, format_of, import_judges, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Apply a judge roster (judge x cluster x sheet flags) to a contest from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('contestid', type=int)
+        parser.add_argument('path', help='CSV or JSON file (by extension)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the changes without applying them',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            raise CommandError(str(e))
+        try:
+            summary = import_judges(
+                options['contestid'], parse_rows(content, format_of(options['path'])), dry_run=options['dry_run']
+            )
+        except RosterImportError as e:
+            raise CommandError(f'Nothing imported:\n{e.describe()}')
+
+        verb = 'Would apply' if summary['dry_run'] else 'Applied'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} judge roster: {summary['judges_created']} new judges; assignments "
+            f"{summary['assignments_created']} created, {summary['assignments_updated']} updated, "
+            f"{summary['assignments_removed']} removed; sheets {summary['sheets_created']} created, "
+            f"{summary['sheets_removed']} removed"
+        ))
@@ -0,0 +1,48 @@
+"""
+Django management command to import a contest's teams and coaches in bulk.
+
+Reads one row per team (team_name, school_name, coach_email,
+coach_first_name, coach_last_name, cluster) from a CSV or JSON file and
+creates everything with bulk INSERTs; see views/bulk_import.py. Nothing is
+written unless every row is valid.
+
+Usage:
+    python manage.py import_teams 3 teams.csv
+    python manage.py import_teams 3 teams.json --dry-run
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from emdcbackend.views.bulk_import import RosterImportError, format_of, import_teams, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Import teams and coaches for a contest from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('contestid', type=int)
+        parser.add_argument('path', help='CSV or JSON file (by extension)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the rows without importing them',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            raise CommandError(str(e))
+        try:
+            summary = import_teams(
+                options['contestid'], parse_rows(content, format_of(options['path'])), dry_run=options['dry_run']
+            )
+        except RosterImportError as e:
+            raise CommandError(f'Nothing imported:\n{e.describe()}')
+
+        verb = 'Would import' if summary['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['teams_created']} teams ({summary['coaches_created']} new coaches, "
+            f"{summary['coaches_reused']} existing, {summary['emails_queued']} set-password emails, "
+            f"{summary['sheets_created']} score sheets)"
+        ))
@@ -0,0 +1,145 @@
+"""
+Django management command to drive a synthetic contest-day workload and
+report latency percentiles, throughput and error rate per route.
+
+Seeds a throwaway contest (judges, teams, clusters, score sheets and
+organizers) in the configured database, runs the judge and organizer
+scenarios of emdcbackend/loadgen.py against it, prints the report and
+deletes the contest again. Without --url requests go through Django's test
+client in this process; with --url they go over HTTP to a running server
+that uses the same database.
+
+--replay sends the requests of a request log (JSON lines of "method",
+"path", optional "body" and "offset") instead of the scenarios; ids in
+anonymized logs can be written as {contest}, {judge}, {team} and {sheet}.
+
+It writes to the database, so it refuses to run with DEBUG off unless
+--force is given. Shared judge/organizer passwords that are not set yet are
+set to --password for the run; if they are set, --password must match them.
+
+Usage:
+    python manage.py load_test
+    python manage.py load_test --judges 40 --teams 120 --concurrency 20 --think 1
+    python manage.py load_test --url http://127.0.0.1:8000 --password <shared password>
+    python manage.py load_test --replay requests.jsonl --speed 2 --json results.json
+"""
+
+import json
+import secrets
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from emdcbackend.loadgen import (
+    HTTPTransport, InProcessTransport, read_request_log, remove_seed, replay, run_load, seed_contest,
+    shared_password_matches,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run a synthetic contest-day load test and report p50/p95/p99 latency, throughput and errors per route'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+        parser.add_argument('--judges', type=int, default=20, help='Judges (default: 20)')
+        parser.add_argument('--teams', type=int, default=60, help='Teams (default: 60)')
+        parser.add_argument('--clusters', type=int, default=5, help='Preliminary clusters (default: 5)')
+        parser.add_argument('--organizers', type=int, default=2, help='Organizers polling standings (default: 2)')
+        parser.add_argument('--concurrency', type=int, default=10, help='Judges (or replay sessions) at once (default: 10)')
+        parser.add_argument('--autosaves', type=int, default=2, help='Autosaves per sheet before submitting (default: 2)')
+        parser.add_argument('--think', type=float, default=0.0, help='Max seconds a judge pauses between saves (default: 0)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between organizer polls (default: 2)')
+        parser.add_argument('--tabulate-every', type=int, default=5, help='Organizer polls per tabulation, 0 for none (default: 5)')
+        parser.add_argument('--password', help='Shared judge/organizer password (default: random, if none is set)')
+        parser.add_argument('--replay', help='Replay this request log instead of the scenarios')
+        parser.add_argument('--speed', type=float, default=1.0, help='Replay speed; 0 sends as fast as possible (default: 1)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for scores and replay ids (default: 0)')
+        parser.add_argument('--json', dest='json_path', help='Also write the report to this JSON file')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded contest and accounts')
+        parser.add_argument('--force', action='store_true', help='Run even with DEBUG off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('load_test seeds and deletes data in the configured database; pass --force to run with DEBUG off.')
+        for name in ('judges', 'teams', 'clusters', 'concurrency'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1')
+        if options['organizers'] < 1 and options['replay']:
+            raise CommandError('--replay needs at least one organizer')
+
+        entries = None
+        if options['replay']:
+            try:
+                with open(options['replay'], encoding='utf-8') as log:
+                    entries = read_request_log(log)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['replay']}: {e}")
+
+        password = options['password'] or secrets.token_urlsafe(16)
+        if not shared_password_matches(password):
+            raise CommandError('Shared judge/organizer passwords are set; pass the current one with --password.')
+
+        # The final tabulation and advancement log in as an organizer
+        seed = seed_contest(
+            judges=options['judges'], teams=options['teams'], clusters=options['clusters'],
+            organizers=max(options['organizers'], 1), password=password,
+        )
+        sheets = sum(len(sheet_list) for sheet_list in seed.sheets_by_judge.values())
+        self.stdout.write(
+            f"Seeded contest {seed.contest_id}: {options['judges']} judges, {options['teams']} teams, "
+            f"{options['clusters']} clusters, {sheets} score sheets"
+        )
+
+        if options['url']:
+            transport_factory = lambda: HTTPTransport(options['url'])  # noqa: E731
+            target = options['url']
+        else:
+            transport_factory = InProcessTransport
+            target = 'in-process'
+        try:
+            # Like the test runner, let the test client's host through
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                if entries is not None:
+                    self.stdout.write(f'Replaying {len(entries)} requests ({target})...')
+                    stats = replay(
+                        entries, seed, transport_factory,
+                        concurrency=options['concurrency'], speed=options['speed'], random_seed=options['seed'],
+                    )
+                else:
+                    self.stdout.write(f"Running {options['concurrency']} judges at a time ({target})...")
+                    stats = run_load(
+                        seed, transport_factory,
+                        concurrency=options['concurrency'], organizers=options['organizers'],
+                        autosaves=options['autosaves'], think=options['think'],
+                        poll_interval=options['poll_interval'], tabulate_every=options['tabulate_every'],
+                        random_seed=options['seed'],
+                    )
+        finally:
+            if options['keep']:
+                self.stdout.write(f'Kept contest {seed.contest_id}; judges and organizers log in with {password}')
+            else:
+                remove_seed(seed)
+
+        self.report(stats)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as out:
+                json.dump({'target': target, 'elapsed_seconds': stats.elapsed, 'routes': stats.rows()}, out, indent=2)
+
+    def report(self, stats):
+        rows = stats.rows()
+        self.stdout.write(
+            f"\n{'route':<36} {'reqs':>7} {'err %':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['route']:<36} {row['requests']:>7} {row['error_rate'] * 100:>6.1f} {row['throughput']:>8.1f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+            )
+        for route, error in sorted(stats.first_errors.items()):
+            self.stdout.write(self.style.WARNING(f'  {route}: {error}'))
+
+        total = rows[-1]
+        message = (f"{total['requests']} requests in {stats.elapsed:.1f}s: {total['throughput']:.1f} req/s, "
+                   f"{total['error_rate']:.1%} errors")
+        self.stdout.write(self.style.WARNING(message) if total['errors'] else self.style.SUCCESS(message))
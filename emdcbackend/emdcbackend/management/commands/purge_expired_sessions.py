@@ -0,0 +1,29 @@
+"""
+Django management command to delete expired sessions in batches.
+
+Keeps the user-indexed session table small. Intended to run from cron
+(e.g. hourly during contest season).
+
+Usage:
+    python manage.py purge_expired_sessions
+    python manage.py purge_expired_sessions --batch-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+from emdcbackend.auth.sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of sessions deleted per query (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        removed = purge_expired_sessions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired sessions'))
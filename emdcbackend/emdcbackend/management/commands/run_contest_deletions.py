@@ -0,0 +1,43 @@
+"""
+Django management command to run queued background contest deletions.
+
+Deletes the data of every contest queued by DELETE /api/contest/delete/,
+in short chunked transactions; see emdcbackend/deletion.py. Web workers
+start deleting right after commit unless CONTEST_DELETE_AUTORUN is off;
+run this from cron or with --loop to pick up jobs they did not finish.
+
+Usage:
+    python manage.py run_contest_deletions
+    python manage.py run_contest_deletions --loop --interval 30
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from emdcbackend.deletion import run_pending_deletions
+
+
+class Command(BaseCommand):
+    help = 'Run queued background contest deletions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for queued deletions',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30,
+            help='Seconds between polls with --loop (default: 30)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done, failed = run_pending_deletions()
+            if done or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Deleted {done} contests, {failed} failed'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
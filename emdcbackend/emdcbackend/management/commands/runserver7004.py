@@ -1,3 +1,12 @@
+"""
+Development server on 127.0.0.1:7004.
+
+Not for production: use gunicorn (see gunicorn.conf.py and the Dockerfile).
+
+Usage:
+    python manage.py runserver7004
+"""
+
 from django.core.management.commands.runserver import Command as RunserverCommand
 
 class Command(RunserverCommand):
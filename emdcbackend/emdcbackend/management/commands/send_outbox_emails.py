@@ -0,0 +1,50 @@
+"""
+Django management command to deliver queued emails from the outbox.
+
+Sends every due OutboundEmail in batches, retrying failures with backoff.
+Run once from cron, or with --loop as a long-running worker next to the web
+server (web workers also send right after commit unless
+EMAIL_OUTBOX_AUTOSEND is off; the worker picks up retries).
+
+Usage:
+    python manage.py send_outbox_emails
+    python manage.py send_outbox_emails --loop --interval 10
+    python manage.py send_outbox_emails --batch-size 100
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from emdcbackend.auth.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of emails claimed per batch (default: 50)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for due emails',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='Seconds between polls with --loop (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(batch_size=options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails, {failed} failed'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,397 @@
+# backend/emdcbackend/emdcbackend/metrics.py
+"""
+Per-request SQL/latency statistics and Prometheus metrics.
+
+RequestMetricsMiddleware (middleware.py) starts a RequestStats for every
+request. An execute wrapper installed on every database connection (from
+EmdcbackendConfig.ready) adds each query's time and SQL to the stats of the
+request that ran it; the stats live in a context variable, so queries that
+async views run through sync_to_async are counted too.
+
+When the response is ready the middleware records one observation per
+request in the histograms below, which views/metrics.py serves in the
+Prometheus text format.
+
+Each process counts in memory. With METRICS_MULTIPROC_DIR set (gunicorn.conf.py
+sets it) every process also writes its counts to <dir>/<pid>.json, every
+METRICS_FLUSH_SECONDS after a change and when the worker exits, and a scrape
+adds up the files of all processes, so whichever worker answers reports the
+totals of the whole server. When gunicorn reaps a worker (child_exit)
+mark_process_dead() folds its file into archive.json, so recycled workers
+do not reset the counters. The connection pool gauges are those of the worker serving the scrape.
+
+The request profiler (profiling.py) also asks for a trace of every
+statement with its duration.
+
+"Duplicate" queries are executions of an SQL statement the request already
+ran, parameters aside: a loop issuing one query per row shows up as N-1
+duplicates of the same statement.
+"""
+import collections
+import contextvars
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows, where gunicorn does not run
+    fcntl = None
+
+_current = contextvars.ContextVar("emdc_request_stats", default=None)
+
+
+# -----------------------
+# Per-request statistics
+# -----------------------
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = collections.Counter()
+        # [(sql, seconds), ...] when a trace was requested
+        self.trace = None
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+    def top_repeated(self, limit):
+        """[(count, sql), ...] of statements run more than once, most repeated first."""
+        return [(count, sql) for sql, count in self.statements.most_common(limit) if count > 1]
+
+
+def current_request():
+    """The RequestStats collecting queries in this context, if any."""
+    return _current.get()
+
+
+def start_request():
+    """Collect query stats for the current request (context); returns the stats and a reset token."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_queries(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - start
+        stats.db_seconds += seconds
+        stats.queries += 1
+        stats.statements[sql] += 1
+        if stats.trace is not None:
+            stats.trace.append((sql, seconds))
+
+
+def _install(sender, connection, **kwargs):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+def connect_signals():
+    connection_created.connect(_install, dispatch_uid="emdcbackend.metrics")
+    for connection in connections.all(initialized_only=True):
+        _install(None, connection)
+
+
+# -----------------------
+# Prometheus metrics
+# -----------------------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(total, value):
+        return value if total is None else total + value
+
+    def samples(self, values=None):
+        """Exposition lines of `values` (labels -> value; default: this process's)."""
+        if values is None:
+            values = self.snapshot()
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._lock = threading.Lock()
+        # labels -> [count per bucket (not cumulative)..., sum]
+        self._values = {}
+
+    def observe(self, value, labels=()):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: list(series) for labels, series in self._values.items()}
+
+    @staticmethod
+    def merge(total, series):
+        return list(series) if total is None else [a + b for a, b in zip(total, series)]
+
+    def samples(self, values=None):
+        """Exposition lines of `values` (labels -> series; default: this process's)."""
+        if values is None:
+            values = self.snapshot()
+        for labels, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', _number(bound))])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+REQUESTS = Counter(
+    "emdc_http_requests_total", "Requests handled, by route, method and status code.",
+    ("route", "method", "status"),
+)
+REQUEST_SECONDS = Histogram(
+    "emdc_http_request_duration_seconds", "Wall time until the response is returned.",
+    ("route", "method"), (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_SECONDS = Histogram(
+    "emdc_http_request_db_seconds", "Time spent in database queries per request.",
+    ("route",), (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+QUERIES = Histogram(
+    "emdc_http_request_queries", "Database queries per request.",
+    ("route",), (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+DUPLICATE_QUERIES = Counter(
+    "emdc_http_duplicate_queries_total", "Queries repeating an SQL statement already run by the same request.",
+    ("route",),
+)
+RESPONSE_BYTES = Histogram(
+    "emdc_http_response_size_bytes", "Response body size (after compression); streaming responses are not counted.",
+    ("route",), (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+REGISTRY = (REQUESTS, REQUEST_SECONDS, DB_SECONDS, QUERIES, DUPLICATE_QUERIES, RESPONSE_BYTES)
+
+
+def observe_request(route, method, status_code, seconds, stats, size=None):
+    REQUESTS.inc((route, method, str(status_code)))
+    REQUEST_SECONDS.observe(seconds, (route, method))
+    DB_SECONDS.observe(stats.db_seconds, (route,))
+    QUERIES.observe(stats.queries, (route,))
+    if stats.duplicates:
+        DUPLICATE_QUERIES.inc((route,), stats.duplicates)
+    if size is not None:
+        RESPONSE_BYTES.observe(size, (route,))
+    if multiproc_dir():
+        _changed.set()
+        _start_flusher()
+
+
+# -----------------------
+# Sharing between worker processes
+# -----------------------
+
+ARCHIVE = "archive.json"
+
+_flush_lock = threading.Lock()
+_changed = threading.Event()
+# pid of the process whose flusher thread is running (threads do not survive fork)
+_flusher_pid = None
+
+
+def multiproc_dir():
+    return getattr(settings, "METRICS_MULTIPROC_DIR", None)
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _snapshot():
+    """{metric name: [[labels, value], ...]} of this process."""
+    return {metric.name: [[list(labels), value] for labels, value in metric.snapshot().items()] for metric in REGISTRY}
+
+
+def _add(totals, data):
+    """Add a snapshot (or archive) to totals: {metric name: {labels: value}}."""
+    for metric in REGISTRY:
+        series = totals.setdefault(metric.name, {})
+        for labels, value in data.get(metric.name, ()):
+            labels = tuple(labels)
+            series[labels] = metric.merge(series.get(labels), value)
+    return totals
+
+
+def _to_json(totals):
+    return {name: [[list(labels), value] for labels, value in series.items()] for name, series in totals.items()}
+
+
+class _DirLock:
+    """flock on <dir>/.lock: shared while reading the files, exclusive while archiving one."""
+
+    def __init__(self, directory, exclusive=False):
+        self.path = os.path.join(directory, ".lock")
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+def flush():
+    """Write this process's counts to METRICS_MULTIPROC_DIR (no-op without it)."""
+    directory = multiproc_dir()
+    if not directory:
+        return
+    with _flush_lock:
+        _changed.clear()
+        _write(os.path.join(directory, f"{os.getpid()}.json"), _snapshot())
+
+
+def _run_flusher():
+    while True:
+        _changed.wait()
+        time.sleep(getattr(settings, "METRICS_FLUSH_SECONDS", 1.0))
+        try:
+            flush()
+        except OSError as e:
+            print(f"[ERROR] Writing request metrics failed: {e}")
+
+
+def _start_flusher():
+    """Flush this process's counts every METRICS_FLUSH_SECONDS from a daemon thread."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flush_lock:
+        if _flusher_pid != os.getpid():
+            _flusher_pid = os.getpid()
+            threading.Thread(target=_run_flusher, name="metrics-flusher", daemon=True).start()
+
+
+def mark_process_dead(pid, directory=None):
+    """Fold the counts of exited process `pid` into the archive (gunicorn child_exit)."""
+    directory = directory or multiproc_dir()
+    if not directory:
+        return
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    with _DirLock(directory, exclusive=True):
+        archive = os.path.join(directory, ARCHIVE)
+        totals = _add(_add({}, _read(archive)), _read(path))
+        _write(archive, _to_json(totals))
+        os.remove(path)
+
+
+def _collect():
+    """{metric name: {labels: value}} of every process, or of this one without a shared directory."""
+    directory = multiproc_dir()
+    if not directory:
+        return {metric.name: metric.snapshot() for metric in REGISTRY}
+    flush()
+    totals = {}
+    with _DirLock(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                _add(totals, _read(os.path.join(directory, name)))
+    return totals
+
+
+def _pool_samples():
+    from .db.postgresql.base import get_pool_stats
+
+    gauges = {}
+    for alias, stats in sorted(get_pool_stats().items()):
+        for key, value in stats.items():
+            gauges.setdefault(f"emdc_db_pool_{key}", []).append((alias, value))
+    for name, values in sorted(gauges.items()):
+        yield f"# TYPE {name} gauge"
+        for alias, value in values:
+            yield f"{name}{_labels(('alias',), (alias,))} {_number(value)}"
+
+
+def render():
+    """All metrics (of every worker, see above) in the Prometheus text exposition format."""
+    totals = _collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples(totals.get(metric.name, {})))
+    lines.extend(_pool_samples())
+    return "\n".join(lines) + "\n"
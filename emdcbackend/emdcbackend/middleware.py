@@ -0,0 +1,216 @@
+# backend/emdcbackend/emdcbackend/middleware.py
+"""
+Request metrics, profiling and response compression.
+
+RequestMetricsMiddleware records the route, wall time, database time, query
+count, duplicate queries and response size of every request in the
+Prometheus metrics of metrics.py (served by views/metrics.py). Requests
+slower than SLOW_REQUEST_SECONDS are also logged with their most repeated
+SQL statements. It should be the first middleware so the timing covers the
+whole stack and the size is the size sent.
+
+ProfilerMiddleware runs single requests under cProfile when an admin asks
+for it (see profiling.py). It must come after AuthenticationMiddleware.
+
+CompressionMiddleware compresses response bodies of at least
+COMPRESSION_MIN_SIZE bytes with Brotli when the client accepts "br" and the
+brotli package is installed, otherwise with gzip. Small bodies are sent as is
+because compressing them costs more CPU than it saves on the wire. Like
+GZipMiddleware, gzip output gets up to max_random_bytes of random padding in
+its header (Django's mitigation of the BREACH attack).
+
+Streaming responses with a text or JSON body (CSV exports) are gzipped as
+they stream, the way GZipMiddleware does. Server-sent events are never
+compressed: the compressor would hold back events until the stream ends.
+
+Like django.middleware.gzip.GZipMiddleware it must come before any
+middleware that reads or changes the response body.
+"""
+import re
+import time
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from . import metrics, profiling
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# -----------------------
+# Metrics
+# -----------------------
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+def _log_slow_request(request, route, seconds, stats, size):
+    print(
+        f"[WARN] Slow request {request.method} {request.path} ({route}): {seconds:.3f}s, "
+        f"{stats.queries} queries ({stats.duplicates} duplicates) in {stats.db_seconds:.3f}s, "
+        f"{'streamed' if size is None else f'{size} bytes'}"
+    )
+    for count, sql in stats.top_repeated(getattr(settings, "SLOW_REQUEST_TOP_QUERIES", 5)):
+        print(f"    {count}x {sql[:500]}")
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, seconds, stats):
+        route = _route(request)
+        # Streams are timed until their headers are ready; their size is unknown
+        size = None if response.streaming else len(response.content)
+        metrics.observe_request(route, request.method, response.status_code, seconds, stats, size)
+        threshold = getattr(settings, "SLOW_REQUEST_SECONDS", 1.0)
+        if threshold and seconds >= threshold:
+            _log_slow_request(request, route, seconds, stats, size)
+
+
+# -----------------------
+# Profiling
+# -----------------------
+
+class ProfilerMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = profiling.requested_mode(request)
+        if mode is None or not profiling.is_allowed(request):
+            return self.get_response(request)
+        return profiling.profile_request(request, self.get_response, mode)
+
+    async def __acall__(self, request):
+        # cProfile cannot follow a request across the event loop and
+        # sync_to_async threads, so async requests are never profiled
+        return await self.get_response(request)
+
+
+# -----------------------
+# Compression
+# -----------------------
+
+_ACCEPTS_RE = {
+    "br": re.compile(r"\bbr\b"),
+    "gzip": re.compile(r"\bgzip\b"),
+}
+
+
+def _compress_br(content):
+    return brotli.compress(content, quality=getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5))
+
+
+# Streamed bodies worth gzipping; never text/event-stream
+_STREAM_COMPRESSIBLE_RE = re.compile(r"^(text/(?!event-stream)|application/json)")
+
+_MAX_RANDOM_BYTES = GZipMiddleware.max_random_bytes
+
+
+def _choose_encoding(accept_encoding):
+    if brotli is not None and _ACCEPTS_RE["br"].search(accept_encoding):
+        return "br", _compress_br
+    if _ACCEPTS_RE["gzip"].search(accept_encoding):
+        return "gzip", partial(compress_string, max_random_bytes=_MAX_RANDOM_BYTES)
+    return None, None
+
+
+def _gzip_stream(response):
+    if response.is_async:
+        # Keep a reference in case streaming_content is set again later
+        chunks = response.streaming_content
+
+        async def compressed():
+            async for chunk in chunks:
+                yield compress_string(chunk, max_random_bytes=_MAX_RANDOM_BYTES)
+
+        response.streaming_content = compressed()
+    else:
+        response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=_MAX_RANDOM_BYTES)
+    # The compressed size is not known until the stream ends
+    if response.has_header("Content-Length"):
+        del response["Content-Length"]
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if response.streaming:
+            if not _STREAM_COMPRESSIBLE_RE.match(response.get("Content-Type", "")):
+                return response
+        elif len(response.content) < getattr(settings, "COMPRESSION_MIN_SIZE", 1024):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if response.streaming:
+            if not _ACCEPTS_RE["gzip"].search(accept_encoding):
+                return response
+            _gzip_stream(response)
+            encoding = "gzip"
+        else:
+            encoding, compress = _choose_encoding(accept_encoding)
+            if encoding is None:
+                return response
+
+            compressed = compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The body is no longer byte-identical to the uncompressed one
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
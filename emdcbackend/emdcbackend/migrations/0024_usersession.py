@@ -0,0 +1,53 @@
+# Generated by Django 4.2.16 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+def copy_active_sessions(apps, schema_editor):
+    """Carry unexpired django_session rows over so nobody is logged out on deploy"""
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.utils import timezone
+
+    Session = apps.get_model('sessions', 'Session')
+    UserSession = apps.get_model('emdcbackend', 'UserSession')
+    store = SessionStore()
+
+    rows = []
+    for session in Session.objects.filter(expire_date__gt=timezone.now()).iterator():
+        try:
+            user_id = int(store.decode(session.session_data).get('_auth_user_id'))
+        except (TypeError, ValueError):
+            user_id = None
+        rows.append(UserSession(
+            session_key=session.session_key,
+            session_data=session.session_data,
+            expire_date=session.expire_date,
+            user_id=user_id,
+        ))
+    UserSession.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emdcbackend', '0023_add_db_indexes'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSession',
+            fields=[
+                ('session_key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='session key')),
+                ('session_data', models.TextField(verbose_name='session data')),
+                ('expire_date', models.DateTimeField(db_index=True, verbose_name='expire date')),
+                ('user_id', models.IntegerField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'session',
+                'verbose_name_plural': 'sessions',
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(copy_active_sessions, migrations.RunPython.noop),
+    ]
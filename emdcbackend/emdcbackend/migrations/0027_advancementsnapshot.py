@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-19 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emdcbackend', '0026_tableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdvancementSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contestid', models.IntegerField(unique=True)),
+                ('championship_team_ids', models.JSONField(default=list)),
+                ('preliminary_memberships', models.JSONField(default=list)),
+                ('is_advanced', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
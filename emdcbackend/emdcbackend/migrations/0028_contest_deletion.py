@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-19 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emdcbackend', '0027_advancementsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContestDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contestid', models.IntegerField(unique=True)),
+                ('contest_name', models.CharField(blank=True, default='', max_length=99)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('step', models.CharField(blank=True, default='', max_length=50)),
+                ('deleted', models.JSONField(default=dict)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('requested_by', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='is_deleting',
+            field=models.BooleanField(default=False),
+        ),
+    ]
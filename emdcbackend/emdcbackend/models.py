@@ -1,12 +1,27 @@
 from django.db import models
+from django.utils import timezone
+from django.contrib.sessions.base_session import AbstractBaseSession
 from django.core.exceptions import ValidationError as ModelValidationError
 
 
+class ContestManager(models.Manager):
+    """Hides contests that are being deleted in the background (see deletion.py)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleting=False)
+
+
 class Contest(models.Model):
     name = models.CharField(max_length=99)
     date = models.DateField()
     is_open = models.BooleanField()
     is_tabulated = models.BooleanField()
+    # Set when a background deletion starts; the contest disappears from
+    # Contest.objects at once, Contest.all_objects still sees it
+    is_deleting = models.BooleanField(default=False)
+
+    objects = ContestManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return f"{self.id} - {self.name}"
@@ -332,3 +347,135 @@ class RoleSharedPassword(models.Model):
 
     def __str__(self):
         return f"Shared Password for {self.get_role_display()}"
+
+
+# === Sessions indexed by user (see auth/sessions.py) ===
+class UserSession(AbstractBaseSession):
+    """
+    Replaces django_session. Stores the authenticated user id alongside the
+    session so all of a user's sessions can be deleted with one indexed query.
+    """
+    user_id = models.IntegerField(null=True, blank=True, db_index=True)
+
+    @classmethod
+    def get_session_store_class(cls):
+        from .auth.sessions import SessionStore
+        return SessionStore
+
+
+# === Transactional email outbox (see auth/outbox.py) ===
+class OutboundEmail(models.Model):
+    """
+    An email queued inside the request's transaction and delivered later by
+    the outbox sender, so slow email APIs never hold a transaction open.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    to_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+    text_content = models.TextField(blank=True, default="")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    provider_id = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+# === Per-table change counters (see table_versions.py) ===
+class TableVersion(models.Model):
+    """
+    A counter bumped after every committed write to an app table. List
+    endpoints derive their ETags from these, so a client revalidating an
+    unchanged list gets a 304 without the list being queried or serialized.
+    """
+    table = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+
+# === Championship advancement snapshots (see views/advance.py) ===
+class AdvancementSnapshot(models.Model):
+    """
+    What advance_to_championship did to a contest, so the advancement can be
+    undone and redone with a fixed number of queries.
+    """
+    contestid = models.IntegerField(unique=True)
+    championship_team_ids = models.JSONField(default=list)
+    # [[clusterid, teamid], ...] of the preliminary clusters when the contest advanced
+    preliminary_memberships = models.JSONField(default=list)
+    is_advanced = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Contest {self.contestid} ({'advanced' if self.is_advanced else 'undone'})"
+
+
+# === Background contest deletion (see deletion.py) ===
+class ContestDeletion(models.Model):
+    """
+    A contest being deleted in bounded chunks by the background deleter, with
+    the rows removed so far; kept after the contest is gone so its status can
+    still be read.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    contestid = models.IntegerField(unique=True)
+    contest_name = models.CharField(max_length=99, blank=True, default="")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Step in progress, e.g. "score sheets"
+    step = models.CharField(max_length=50, blank=True, default="")
+    # {"score sheets": 1200, "teams": 40, ...}
+    deleted = models.JSONField(default=dict)
+    last_error = models.TextField(blank=True, default="")
+    requested_by = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Contest {self.contestid} deletion ({self.status})"
+
+
+# === Request profiles without a shared cache (see profiling.py) ===
+class RequestProfile(models.Model):
+    """
+    A profile report stored in the database, so any worker can serve it when
+    the caches are per process.
+    """
+    profile_id = models.CharField(max_length=32, unique=True)
+    report = models.JSONField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Profile {self.profile_id}"
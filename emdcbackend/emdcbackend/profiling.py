@@ -0,0 +1,183 @@
+# backend/emdcbackend/emdcbackend/profiling.py
+"""
+On-demand profiling of single requests (admins only).
+
+An admin adds "X-Profile: 1" (or ?profile=1) to any request and
+ProfilerMiddleware runs it under cProfile while recording every SQL
+statement with its duration. The report is kept for PROFILER_TTL seconds
+and its id returned in the X-Profile-Id header:
+
+    curl -b cookies -H "X-Profile: 1" -X POST .../api/advance/advanceToChampionship/ ...
+    < X-Profile-Id: 3f2c...
+    curl -b cookies .../api/admin/profiles/3f2c.../
+
+"X-Profile: inline" (or ?profile=inline) returns the report in place of the
+response instead.
+
+Reports must be readable from every worker, so PROFILER_STORE keeps them in
+the default cache only when it is shared (Redis) and in the RequestProfile
+table otherwise; expired rows are removed when a new report is saved. The flag is ignored for everyone but admins, and when
+PROFILER_ENABLED is off.
+
+cProfile only sees the thread handling the request, so the /api/async/
+endpoints are not profiled; profile their sync twins instead.
+
+Only one request per process is profiled at a time: since Python 3.12 a
+second cProfile profiler cannot start while another is active, and gthread
+workers serve several requests at once. A request asking for a profile
+while another one is being profiled is served as usual, with an
+X-Profile-Skipped header instead of X-Profile-Id.
+"""
+import collections
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils import timezone
+
+from . import metrics
+
+CACHE_KEY = "profile:{}"
+
+# Held while a request of this process runs under cProfile
+_profiler_lock = threading.Lock()
+
+
+def requested_mode(request):
+    """"inline", another truthy flag value, or None when profiling was not asked for."""
+    value = request.headers.get("X-Profile") or request.GET.get("profile")
+    if value in (None, "", "0", "false"):
+        return None
+    return value
+
+
+def is_allowed(request):
+    from .auth.role_cache import get_cached_role_mapping
+    from .models import MapUserToRole
+
+    if not getattr(settings, "PROFILER_ENABLED", True) or not request.user.is_authenticated:
+        return False
+    role_map = get_cached_role_mapping(request.user.id)
+    return bool(role_map) and role_map["role"] == MapUserToRole.RoleEnum.ADMIN
+
+
+def _short_path(filename):
+    for prefix in sorted(filter(None, sys.path), key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+def top_functions(profiler, limit):
+    """The `limit` functions with the most cumulative time."""
+    rows = []
+    for (filename, line, name), (primitive, calls, own, cumulative, _) in pstats.Stats(profiler).stats.items():
+        rows.append({
+            "function": f"{name} ({_short_path(filename)}:{line})" if line else name,
+            "calls": calls,
+            "primitive_calls": primitive,
+            "own_seconds": round(own, 6),
+            "cumulative_seconds": round(cumulative, 6),
+        })
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:limit]
+
+
+def build_report(request, response, profiler, trace, seconds):
+    sql_limit = getattr(settings, "PROFILER_SQL_LIMIT", 500)
+    match = getattr(request, "resolver_match", None)
+    statements = collections.Counter(sql for sql, _ in trace)
+    return {
+        "id": uuid.uuid4().hex,
+        "method": request.method,
+        "path": request.get_full_path(),
+        "route": match.view_name if match else None,
+        "status": response.status_code,
+        "seconds": round(seconds, 6),
+        "queries": len(trace),
+        "duplicate_queries": len(trace) - len(statements),
+        "db_seconds": round(sum(secs for _, secs in trace), 6),
+        "functions": top_functions(profiler, getattr(settings, "PROFILER_TOP_FUNCTIONS", 40)),
+        "repeated_sql": [
+            {"count": count, "sql": sql} for sql, count in statements.most_common(10) if count > 1
+        ],
+        "sql": [{"sql": sql, "seconds": round(secs, 6)} for sql, secs in trace[:sql_limit]],
+        "sql_truncated": len(trace) > sql_limit,
+    }
+
+
+def _stored_in_cache():
+    return getattr(settings, "PROFILER_STORE", "cache") == "cache"
+
+
+def save_report(report):
+    ttl = getattr(settings, "PROFILER_TTL", 3600)
+    if _stored_in_cache():
+        cache.set(CACHE_KEY.format(report["id"]), report, ttl)
+        return
+    from .models import RequestProfile
+
+    now = timezone.now()
+    RequestProfile.objects.filter(expires_at__lte=now).delete()
+    RequestProfile.objects.create(
+        profile_id=report["id"], report=report, expires_at=now + timedelta(seconds=ttl),
+    )
+
+
+def load_report(profile_id):
+    if _stored_in_cache():
+        return cache.get(CACHE_KEY.format(profile_id))
+    from .models import RequestProfile
+
+    profile = RequestProfile.objects.filter(profile_id=profile_id, expires_at__gt=timezone.now()).first()
+    return profile.report if profile else None
+
+
+def _unprofiled(request, get_response, reason):
+    response = get_response(request)
+    response["X-Profile-Skipped"] = reason
+    return response
+
+
+def profile_request(request, get_response, mode):
+    """Run get_response(request) under cProfile and store (or return) the report."""
+    if not _profiler_lock.acquire(blocking=False):
+        return _unprofiled(request, get_response, "another request is being profiled")
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool (a debugger, coverage) owns the interpreter's hooks
+        _profiler_lock.release()
+        return _unprofiled(request, get_response, "another profiler is active")
+
+    stats, token = metrics.current_request(), None
+    if stats is None:
+        stats, token = metrics.start_request()
+    trace = stats.trace = []
+    start = time.perf_counter()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+        _profiler_lock.release()
+        if token is not None:
+            metrics.end_request(token)
+        stats.trace = None
+    seconds = time.perf_counter() - start
+
+    report = build_report(request, response, profiler, trace, seconds)
+    save_report(report)
+    print(f"[INFO] Profiled {request.method} {request.path} in {seconds:.3f}s: profile {report['id']}")
+    if mode == "inline":
+        response = JsonResponse(report)
+    response["X-Profile-Id"] = report["id"]
+    return response
@@ -5,6 +5,27 @@ from .models import Teams, Admin, MapClusterToTeam, MapScoresheetToTeamJudge, Ba
 
 
 
+class SparseFieldsMixin:
+    """
+    Lets a caller narrow the serializer to some of its fields:
+        TeamSerializer(teams, many=True, fields=["team_name", "team_rank"])
+        ScoresheetSerializer(sheet, exclude=["field9", "field18"])
+    "id" is always kept. Views read these from ?fields= / ?exclude=,
+    see views/fieldsets.py.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            keep = set(fields) | {"id"}
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+        for name in exclude or ():
+            if name != "id":
+                self.fields.pop(name, None)
+
+
 class JudgeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Judge
@@ -13,7 +34,7 @@ class JudgeSerializer(serializers.ModelSerializer):
 class ContestSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contest
-        fields = '__all__'
+        exclude = ['is_deleting']
 
 class OrganizerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -52,7 +73,7 @@ class JudgeClustersSerializer(serializers.ModelSerializer):
         model = JudgeClusters
         fields = '__all__'
         
-class ScoresheetSerializer(serializers.ModelSerializer):
+class ScoresheetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Scoresheet
         fields = '__all__'
@@ -67,7 +88,7 @@ class MapUserToRoleSerializer(serializers.ModelSerializer):
         model = MapUserToRole
         fields = '__all__'
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Teams
         fields = '__all__'
@@ -116,6 +116,24 @@ def _env_bool(name: str, default: bool) -> bool:
 # ---------------------------------------------------------------------
 SESSION_COOKIE_AGE = 10800  # 3 hours in seconds
 
+# True when every process sees the same caches: with Redis (REDIS_URL, see
+# CACHES below) or when a single worker process serves the site
+# (WEB_CONCURRENCY=1). Per-process caches cannot be invalidated from other
+# workers, so caches that gate access are only used when this holds.
+CACHE_SHARED = bool(os.getenv("REDIS_URL")) or os.getenv("WEB_CONCURRENCY") == "1"
+
+# Sessions carry an indexed user id so a user can be logged out everywhere
+# with one DELETE (see emdcbackend/auth/sessions.py). With a shared cache,
+# reads are served from the "sessions" cache and the database is only
+# written to. Otherwise a session revoked by one worker (logout,
+# delete_user_sessions) would stay cached in the others, so sessions are
+# read from the database. SESSION_CACHE_ENABLED overrides the choice.
+if _env_bool("SESSION_CACHE_ENABLED", default=CACHE_SHARED):
+    SESSION_ENGINE = "emdcbackend.auth.cached_sessions"
+else:
+    SESSION_ENGINE = "emdcbackend.auth.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+
 # With frontend on www.emdcresults.com and backend on api.emdcresults.com,
 # cookies are first-party again.
 SESSION_COOKIE_SAMESITE = "Lax"
@@ -185,20 +203,101 @@ INSTALLED_APPS = [
     "emdcbackend",
 ]
 
+# ---------------------------------------------------------------------
+# Django REST framework
+# ---------------------------------------------------------------------
+# orjson-backed JSON (emdcbackend/renderers.py); falls back to DRF's stdlib
+# JSON when orjson is missing or FAST_JSON_ENABLED=0
+FAST_JSON_ENABLED = _env_bool("FAST_JSON_ENABLED", True)
+
+# "Get all" endpoints (emdcbackend/views/pagination.py): default and largest
+# ?limit= page, and rows fetched per round trip when returning everything
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+LIST_CHUNK_SIZE = int(os.getenv("LIST_CHUNK_SIZE", "2000"))
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "emdcbackend.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "emdcbackend.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
 # ---------------------------------------------------------------------
 # Middleware
 # ---------------------------------------------------------------------
 MIDDLEWARE = [
+    "emdcbackend.middleware.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "emdcbackend.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "emdcbackend.middleware.ProfilerMiddleware",
 ]
 
+# Live dashboard streams (emdcbackend/broadcast.py, views/live.py).
+# "auto" fans out with Postgres LISTEN/NOTIFY when the database is Postgres,
+# so every worker process sees changes; "local" only reaches viewers
+# connected to the same process.
+LIVE_BROADCAST_BACKEND = os.getenv("LIVE_BROADCAST_BACKEND", "auto")
+LIVE_HEARTBEAT_SECONDS = int(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+LIVE_STREAM_MAX_SECONDS = int(os.getenv("LIVE_STREAM_MAX_SECONDS", "600"))
+# Streams on /api/live/ (WSGI) each hold a request thread; past this many per
+# process viewers get 503 and should use /api/async/live/ (ASGI). Defaults to
+# half of the gunicorn threads so the rest keep serving the API.
+LIVE_SYNC_STREAMS_PER_WORKER = int(os.getenv(
+    "LIVE_SYNC_STREAMS_PER_WORKER", str(max(1, int(os.getenv("GUNICORN_THREADS", "4")) // 2))
+))
+
+# Bodies smaller than this many bytes are sent uncompressed
+# (emdcbackend/middleware.py). Brotli is used when the client accepts it.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Request metrics (emdcbackend/metrics.py), scraped from /api/metrics/.
+# Requests at least SLOW_REQUEST_SECONDS long are logged with their
+# SLOW_REQUEST_TOP_QUERIES most repeated SQL statements (0 disables the log).
+# Prometheus authenticates with "Authorization: Bearer <METRICS_TOKEN>";
+# admins can also open the endpoint with their session.
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
+SLOW_REQUEST_TOP_QUERIES = int(os.getenv("SLOW_REQUEST_TOP_QUERIES", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Directory where worker processes share their counts, so a scrape of any
+# worker reports the whole server (set by gunicorn.conf.py; unset: per process)
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1.0"))
+
+# Admins can profile single requests with "X-Profile: 1" (emdcbackend/profiling.py);
+# reports are kept for PROFILER_TTL seconds, in the default cache when it is
+# shared (REDIS_URL, see CACHES below) and in the database otherwise, so any
+# worker can serve them.
+PROFILER_ENABLED = _env_bool("PROFILER_ENABLED", True)
+PROFILER_TOP_FUNCTIONS = int(os.getenv("PROFILER_TOP_FUNCTIONS", "40"))
+PROFILER_SQL_LIMIT = int(os.getenv("PROFILER_SQL_LIMIT", "500"))
+PROFILER_TTL = int(os.getenv("PROFILER_TTL", "3600"))
+
+# Largest roster accepted by one bulk import (views/bulk_import.py)
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+
+# Rows fetched per round trip by the streaming results export (views/export.py)
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+# Background contest deletion (emdcbackend/deletion.py): rows deleted per
+# short transaction, and whether web workers start deleting right after commit
+CONTEST_DELETE_CHUNK_SIZE = int(os.getenv("CONTEST_DELETE_CHUNK_SIZE", "500"))
+CONTEST_DELETE_AUTORUN = _env_bool("CONTEST_DELETE_AUTORUN", True)
+CONTEST_DELETE_STALE_SECONDS = int(os.getenv("CONTEST_DELETE_STALE_SECONDS", "600"))
+
 ROOT_URLCONF = "emdcbackend.urls"
 
 TEMPLATES = [
@@ -222,19 +321,88 @@ WSGI_APPLICATION = "emdcbackend.wsgi.application"
 # ---------------------------------------------------------------------
 # Database (Postgres via env)
 # ---------------------------------------------------------------------
+# Connections are reused across requests in one of two ways:
+#   - DB_POOL=1: a psycopg connection pool per worker process
+#     (emdcbackend/db/postgresql/base.py); sized with DB_POOL_* below.
+#   - otherwise: persistent connections kept for DB_CONN_MAX_AGE seconds.
+# Either way connections are health-checked before reuse.
+DB_POOL = _env_bool("DB_POOL", False)
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "emdcbackend.db.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        # Pooled connections go back to the pool at the end of each request
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+}
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        # Seconds a request waits for a free connection before failing
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+    }
+
+# ---------------------------------------------------------------------
+# Caches
+# ---------------------------------------------------------------------
+# REDIS_URL (e.g. redis://localhost:6379/0) shares the caches between
+# workers and hosts. Without it each process keeps an in-memory LRU.
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "emdc",
+    }
+    _session_cache = dict(_default_cache, KEY_PREFIX="emdc-sessions")
+    # Shared cache: entries can live as long as the session itself
+    SESSION_CACHE_MAX_AGE = None
+else:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "emdc-default",
     }
+    _session_cache = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "emdc-sessions",
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "5000"))},
+    }
+    # Per-process cache: bound how long a revoked session can linger in
+    # another worker's memory
+    SESSION_CACHE_MAX_AGE = int(os.getenv("SESSION_CACHE_MAX_AGE", "60"))
+
+CACHES = {
+    "default": _default_cache,
+    "sessions": _session_cache,
 }
 
-# Connection pooling - reuse connections for better performance
-CONN_MAX_AGE = 60
+# Seconds a user's role mapping/profile stays cached (auth/role_cache.py).
+# Writes invalidate it; the timeout bounds staleness in other processes
+# when the cache is enabled without being shared.
+ROLE_CACHE_TIMEOUT = int(os.getenv("ROLE_CACHE_TIMEOUT", "300" if REDIS_URL else "60"))
+# Role lookups authorize requests, so without a shared cache (CACHE_SHARED)
+# they read the database: other workers would not see a revoked role.
+ROLE_CACHE_ENABLED = _env_bool("ROLE_CACHE_ENABLED", default=CACHE_SHARED)
+
+# Where request profiles are stored (profiling.py): "cache" or "database"
+PROFILER_STORE = os.getenv("PROFILER_STORE", "cache" if REDIS_URL else "database")
+
+# In-process memo of successful shared-password logins
+# (auth/shared_password_cache.py). 0 disables it.
+SHARED_PASSWORD_CACHE_TTL = int(os.getenv("SHARED_PASSWORD_CACHE_TTL", "300"))
+SHARED_PASSWORD_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_PASSWORD_CACHE_MAX_ENTRIES", "256"))
 
 # ---------------------------------------------------------------------
 # ---------------------------------------------------------------------
@@ -324,6 +492,13 @@ DEFAULT_FROM_EMAIL = os.environ.get(
     "DEFAULT_FROM_EMAIL", "EMDC Contest <noreply@emdcresults.com>"
 )
 
+# Email outbox (auth/outbox.py). Set-password/reset mails are queued in the
+# OutboundEmail table and delivered after commit by a background sender.
+EMAIL_OUTBOX_TRANSPORT = os.getenv("EMAIL_OUTBOX_TRANSPORT", "emdcbackend.auth.outbox.ResendTransport")
+EMAIL_OUTBOX_AUTOSEND = _env_bool("EMAIL_OUTBOX_AUTOSEND", True)
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+
 DEFAULT_FROM_EMAIL = os.environ.get(
     "DEFAULT_FROM_EMAIL", "EMDC Contest <noreply@emdcresults.com>"
 )
\ No newline at end of file
@@ -0,0 +1,123 @@
+# backend/emdcbackend/emdcbackend/table_versions.py
+"""
+Per-table change counters used for conditional GETs.
+
+Every INSERT/UPDATE/DELETE that goes through Django's database connection
+is inspected by an execute wrapper (installed in EmdcbackendConfig.ready).
+When the statement writes one of this app's tables, the table is recorded on
+the connection and its TableVersion counter is bumped once the surrounding
+transaction commits; writes that are rolled back never change a version.
+
+views/conditional.py builds ETags from these counters, so a list endpoint
+can answer If-None-Match with 304 after a single small query instead of
+loading and serializing the whole list.
+
+Tables whose writes do not affect any API response (sessions, the email
+outbox, request profiles, the counters themselves) are not tracked.
+"""
+import re
+
+from django.apps import apps
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+
+_WRITE_RE = re.compile(r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+["`]?(\w+)', re.IGNORECASE)
+
+_UNTRACKED_MODELS = ("TableVersion", "UserSession", "OutboundEmail", "RequestProfile")
+
+_tracked_tables = None
+
+
+def tracked_tables():
+    """db_table names of every model in this app except the untracked ones."""
+    global _tracked_tables
+    if _tracked_tables is None:
+        app = apps.get_app_config("emdcbackend")
+        _tracked_tables = frozenset(
+            model._meta.db_table
+            for model in app.get_models(include_auto_created=True)
+            if model.__name__ not in _UNTRACKED_MODELS
+        )
+    return _tracked_tables
+
+
+def written_table(sql):
+    """The table an INSERT/UPDATE/DELETE statement writes, if it is tracked."""
+    match = _WRITE_RE.match(sql)
+    if match and match.group(1) in tracked_tables():
+        return match.group(1)
+    return None
+
+
+# -----------------------
+# Bumping
+# -----------------------
+
+def bump_versions(tables, using="default"):
+    """Increment the counters for `tables`, creating missing rows."""
+    from .models import TableVersion
+
+    with transaction.atomic(using=using):
+        for table in sorted(tables):
+            versions = TableVersion.objects.using(using).filter(table=table)
+            if versions.update(version=F("version") + 1):
+                continue
+            try:
+                with transaction.atomic(using=using):
+                    TableVersion.objects.using(using).create(table=table, version=1)
+            except IntegrityError:
+                # Another process created it first
+                versions.update(version=F("version") + 1)
+
+
+def _flush(connection):
+    tables = getattr(connection, "_changed_tables", None)
+    if not tables:
+        return
+    connection._changed_tables = set()
+    try:
+        bump_versions(tables, using=connection.alias)
+    except DatabaseError as e:
+        # e.g. data migrations that run before the TableVersion table exists
+        print(f"[WARN] Could not bump table versions for {sorted(tables)}: {e}")
+
+
+def track_writes(execute, sql, params, many, context):
+    result = execute(sql, params, many, context)
+    table = written_table(sql)
+    if table is not None:
+        connection = context["connection"]
+        if not hasattr(connection, "_changed_tables"):
+            connection._changed_tables = set()
+        connection._changed_tables.add(table)
+        # Runs right away in autocommit mode, otherwise after the outermost
+        # atomic block commits; the first callback to run does the work.
+        transaction.on_commit(lambda: _flush(connection), using=connection.alias)
+    return result
+
+
+def _install(sender, connection, **kwargs):
+    if track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_writes)
+
+
+def connect_signals():
+    connection_created.connect(_install, dispatch_uid="emdcbackend.table_versions")
+    # Connections opened before the app was ready (e.g. by the test runner)
+    for connection in connections.all(initialized_only=True):
+        _install(None, connection)
+
+
+# -----------------------
+# Reading
+# -----------------------
+
+def get_versions(tables, using="default"):
+    """[(table, version), ...] sorted by table; tables never written are 0."""
+    from .models import TableVersion
+
+    found = dict(
+        TableVersion.objects.using(using).filter(table__in=tables).values_list("table", "version")
+    )
+    return [(table, found.get(table, 0)) for table in sorted(set(tables))]
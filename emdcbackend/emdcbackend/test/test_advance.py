@@ -1,11 +1,16 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
 from datetime import date
 from ..models import (
-    Contest, Teams, Judge, JudgeClusters, MapContestToTeam, MapContestToOrganizer,
-    MapUserToRole, Organizer, MapClusterToTeam, MapContestToCluster
+    AdvancementSnapshot, Contest, Teams, Judge, JudgeClusters, MapContestToTeam, MapContestToOrganizer,
+    MapUserToRole, Organizer, MapClusterToTeam, MapContestToCluster, MapJudgeToCluster,
+    MapScoresheetToTeamJudge, Scoresheet, ScoresheetEnum
 )
 
 
@@ -153,3 +158,195 @@ class AdvanceAPITests(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+
+class AdvancePipelineTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=2, relatedid=self.organizer.id)
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=self.organizer.id)
+
+        self.preliminary = JudgeClusters.objects.create(cluster_name="Preliminary", cluster_type="preliminary")
+        self.championship = JudgeClusters.objects.create(
+            cluster_name="Championship", cluster_type="championship", is_active=False
+        )
+        self.redesign = JudgeClusters.objects.create(cluster_name="Redesign", cluster_type="redesign", is_active=False)
+        for cluster in (self.preliminary, self.championship, self.redesign):
+            MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=cluster.id)
+
+        self.championship_judge = self.make_judge("Champ", self.championship)
+        self.redesign_judge = self.make_judge("Redesign", self.redesign)
+        self.teams = []
+
+    def make_judge(self, name, cluster):
+        judge = Judge.objects.create(first_name=name, last_name="Judge", phone_number="555", contestid=self.contest.id)
+        MapJudgeToCluster.objects.create(judgeid=judge.id, clusterid=cluster.id, contestid=self.contest.id)
+        return judge
+
+    def add_teams(self, count):
+        for _ in range(count):
+            n = len(self.teams)
+            team = Teams.objects.create(
+                team_name=f"Team {n}", journal_score=90.0 - n, presentation_score=80.0, machinedesign_score=70.0,
+                penalties_score=1.0, redesign_score=5.0, total_score=239.0 - n, championship_score=3.0,
+            )
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+            MapClusterToTeam.objects.create(clusterid=self.preliminary.id, teamid=team.id)
+            self.teams.append(team)
+
+    def advance(self, team_ids):
+        return self.client.post(reverse("advance_to_championship"), {
+            "contestid": self.contest.id, "championship_team_ids": team_ids,
+        }, format="json")
+
+    def undo(self):
+        return self.client.post(reverse("undo_championship_advancement"), {"contestid": self.contest.id}, format="json")
+
+    def redo(self):
+        return self.client.post(reverse("redo_championship_advancement"), {"contestid": self.contest.id}, format="json")
+
+    def sheets(self, cluster, sheet_type):
+        judge_id = self.championship_judge.id if cluster == self.championship else self.redesign_judge.id
+        return MapScoresheetToTeamJudge.objects.filter(judgeid=judge_id, sheetType=sheet_type)
+
+    def test_advance_moves_teams_and_provisions_sheets(self):
+        self.add_teams(3)
+        winner, *others = self.teams
+        # A stale championship sheet from an earlier advancement
+        stale = Scoresheet.objects.create(sheetType=ScoresheetEnum.CHAMPIONSHIP, isSubmitted=False)
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=others[0].id, judgeid=self.championship_judge.id, scoresheetid=stale.id,
+            sheetType=ScoresheetEnum.CHAMPIONSHIP,
+        )
+
+        # Tabulation recomputes the scores from sheets; only check what advancing saved
+        with mock.patch("emdcbackend.views.advance.recompute_totals_and_ranks") as recompute:
+            response = self.advance([winner.id])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        recompute.assert_called_once_with(self.contest.id)
+        self.assertEqual(response.data["data"]["championship_teams_count"], 1)
+        self.assertEqual(response.data["data"]["redesign_teams_count"], 2)
+
+        winner.refresh_from_db()
+        self.assertTrue(winner.advanced_to_championship)
+        self.assertEqual(winner.preliminary_journal_score, 90.0)
+        self.assertEqual(winner.preliminary_total_score, 239.0)
+        self.assertEqual(winner.redesign_score, 5.0)
+        others[0].refresh_from_db()
+        self.assertFalse(others[0].advanced_to_championship)
+        self.assertEqual(others[0].preliminary_total_score, 238.0)
+        self.assertEqual(others[0].championship_score, 3.0)
+
+        self.assertEqual(
+            list(MapClusterToTeam.objects.filter(clusterid=self.championship.id).values_list("teamid", flat=True)),
+            [winner.id],
+        )
+        self.assertEqual(MapClusterToTeam.objects.filter(clusterid=self.redesign.id).count(), 2)
+        self.assertTrue(JudgeClusters.objects.get(id=self.championship.id).is_active)
+        self.assertTrue(Judge.objects.get(id=self.championship_judge.id).championship)
+        self.assertTrue(MapJudgeToCluster.objects.get(judgeid=self.redesign_judge.id).redesign)
+
+        self.assertEqual(
+            list(self.sheets(self.championship, ScoresheetEnum.CHAMPIONSHIP).values_list("teamid", flat=True)),
+            [winner.id],
+        )
+        self.assertEqual(self.sheets(self.redesign, ScoresheetEnum.REDESIGN).count(), 2)
+        self.assertFalse(Scoresheet.objects.filter(id=stale.id).exists())
+        for mapping in MapScoresheetToTeamJudge.objects.all():
+            self.assertTrue(Scoresheet.objects.filter(id=mapping.scoresheetid).exists())
+
+    def test_query_count_does_not_grow_with_contest_size(self):
+        counts = []
+        # The first run also sets the judges' flags
+        for size in (2, 2, 8):
+            self.add_teams(size - len(self.teams))
+            with mock.patch("emdcbackend.views.advance.recompute_totals_and_ranks"):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.advance([self.teams[0].id])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+        self.assertEqual(counts[1], counts[2])
+
+    def test_missing_cluster_changes_nothing(self):
+        self.add_teams(2)
+        MapContestToCluster.objects.filter(clusterid=self.redesign.id).delete()
+        response = self.advance([self.teams[0].id])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.teams[0].refresh_from_db()
+        self.assertFalse(self.teams[0].advanced_to_championship)
+        self.assertFalse(MapScoresheetToTeamJudge.objects.exists())
+
+    def test_undo_restores_preliminary_state(self):
+        self.add_teams(3)
+        winner = self.teams[0]
+        with mock.patch("emdcbackend.views.advance.recompute_totals_and_ranks"):
+            self.advance([winner.id])
+            # The redesign team is dropped from its preliminary cluster meanwhile
+            MapClusterToTeam.objects.filter(teamid=self.teams[1].id, clusterid=self.preliminary.id).delete()
+            Teams.objects.filter(id=winner.id).update(journal_score=10.0, championship_score=50.0)
+            response = self.undo()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["teams_reset"], 3)
+
+        winner.refresh_from_db()
+        self.assertFalse(winner.advanced_to_championship)
+        self.assertEqual(winner.journal_score, 90.0)
+        self.assertEqual(winner.total_score, 239.0)
+        self.assertEqual(winner.championship_score, 0.0)
+        self.assertEqual(
+            set(MapClusterToTeam.objects.filter(clusterid=self.preliminary.id).values_list("teamid", flat=True)),
+            {team.id for team in self.teams},
+        )
+        self.assertFalse(MapClusterToTeam.objects.filter(clusterid__in=[self.championship.id, self.redesign.id]).exists())
+        self.assertFalse(JudgeClusters.objects.get(id=self.championship.id).is_active)
+        self.assertFalse(MapScoresheetToTeamJudge.objects.exists())
+        self.assertFalse(Scoresheet.objects.exists())
+        self.assertFalse(Judge.objects.get(id=self.championship_judge.id).championship)
+        self.assertFalse(MapJudgeToCluster.objects.get(judgeid=self.redesign_judge.id).redesign)
+        self.assertFalse(AdvancementSnapshot.objects.get(contestid=self.contest.id).is_advanced)
+
+    def test_undo_recreates_missing_preliminary_sheets(self):
+        self.add_teams(2)
+        judge = self.make_judge("Prelim", self.preliminary)
+        Judge.objects.filter(id=judge.id).update(journal=True, runpenalties=True)
+        with mock.patch("emdcbackend.views.advance.recompute_totals_and_ranks"):
+            self.advance([self.teams[0].id])
+            self.undo()
+        self.assertEqual(
+            sorted(MapScoresheetToTeamJudge.objects.filter(judgeid=judge.id).values_list("teamid", "sheetType")),
+            sorted((team.id, sheet_type) for team in self.teams
+                   for sheet_type in (ScoresheetEnum.JOURNAL, ScoresheetEnum.RUNPENALTIES)),
+        )
+
+    def test_redo_advances_the_same_teams(self):
+        self.add_teams(3)
+        with mock.patch("emdcbackend.views.advance.recompute_totals_and_ranks"):
+            self.assertEqual(self.redo().status_code, status.HTTP_404_NOT_FOUND)
+            self.advance([self.teams[2].id])
+            self.assertEqual(self.redo().status_code, status.HTTP_400_BAD_REQUEST)
+            self.undo()
+            response = self.redo()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["championship_teams_count"], 1)
+        self.assertEqual(
+            list(MapClusterToTeam.objects.filter(clusterid=self.championship.id).values_list("teamid", flat=True)),
+            [self.teams[2].id],
+        )
+        self.assertTrue(AdvancementSnapshot.objects.get(contestid=self.contest.id).is_advanced)
+        self.assertEqual(self.sheets(self.redesign, ScoresheetEnum.REDESIGN).count(), 2)
+
+    def test_undo_and_redo_query_counts_do_not_grow_with_contest_size(self):
+        counts = []
+        for size in (2, 8):
+            self.add_teams(size - len(self.teams))
+            with mock.patch("emdcbackend.views.advance.recompute_totals_and_ranks"):
+                self.advance([self.teams[0].id])
+                with CaptureQueriesContext(connection) as undo_queries:
+                    self.assertEqual(self.undo().status_code, status.HTTP_200_OK)
+                with CaptureQueriesContext(connection) as redo_queries:
+                    self.assertEqual(self.redo().status_code, status.HTTP_200_OK)
+                self.undo()
+            counts.append((len(undo_queries), len(redo_queries)))
+        self.assertEqual(counts[0], counts[1])
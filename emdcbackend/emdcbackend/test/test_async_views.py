@@ -0,0 +1,113 @@
+"""
+Tests that the async read endpoints return the same data as their sync versions
+"""
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import (
+    Contest, Teams, Judge, JudgeClusters, MapContestToTeam, MapContestToOrganizer,
+    MapUserToRole, Organizer, MapClusterToTeam, MapJudgeToCluster,
+    Scoresheet, ScoresheetEnum, MapScoresheetToTeamJudge, MapContestToCluster
+)
+
+
+class AsyncReadEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=2, relatedid=self.organizer.id)
+
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=self.organizer.id)
+        self.cluster = JudgeClusters.objects.create(cluster_name="Test Cluster", cluster_type="preliminary")
+        MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=self.cluster.id)
+
+        self.teams = []
+        for name, total in (("Team A", 200.0), ("Team B", 250.0)):
+            team = Teams.objects.create(
+                team_name=name, journal_score=0.0, presentation_score=0.0, machinedesign_score=0.0,
+                penalties_score=0.0, redesign_score=0.0, total_score=total, championship_score=0.0,
+                advanced_to_championship=(name == "Team B"),
+            )
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+            MapClusterToTeam.objects.create(clusterid=self.cluster.id, teamid=team.id)
+            self.teams.append(team)
+
+        self.judge = Judge.objects.create(
+            first_name="Test", last_name="Judge", phone_number="1234567890", contestid=self.contest.id,
+            presentation=True, mdo=False, journal=False, runpenalties=False, otherpenalties=False,
+        )
+        MapJudgeToCluster.objects.create(judgeid=self.judge.id, clusterid=self.cluster.id, presentation=True)
+        sheet = Scoresheet.objects.create(
+            sheetType=ScoresheetEnum.PRESENTATION, isSubmitted=False,
+            field1=1.0, field2=2.0, field3=3.0, field4=4.0, field5=5.0, field6=6.0, field7=7.0, field8=8.0,
+        )
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=self.teams[0].id, judgeid=self.judge.id, scoresheetid=sheet.id, sheetType=ScoresheetEnum.PRESENTATION
+        )
+
+    def assertSameResponse(self, sync_response, async_response):
+        self.assertEqual(sync_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(sync_response.content), json.loads(async_response.content))
+
+    def test_contest_get_all(self):
+        self.assertSameResponse(
+            self.client.get(reverse('contest_get_all')),
+            self.client.get(reverse('contest_get_all_async')),
+        )
+
+    def test_judges_by_cluster(self):
+        self.assertSameResponse(
+            self.client.get(reverse('judges_by_cluster', args=[self.cluster.id])),
+            self.client.get(reverse('judges_by_cluster_async', args=[self.cluster.id])),
+        )
+
+    def test_teams_by_judge(self):
+        self.assertSameResponse(
+            self.client.get(reverse('teams_by_judge', args=[self.judge.id])),
+            self.client.get(reverse('teams_by_judge_async', args=[self.judge.id])),
+        )
+
+    def test_score_sheets_by_judge(self):
+        sync_response = self.client.get(reverse('score_sheets_by_judge', args=[self.judge.id]))
+        async_response = self.client.get(reverse('score_sheets_by_judge_async', args=[self.judge.id]))
+        self.assertSameResponse(sync_response, async_response)
+        self.assertEqual(async_response.json()["ScoreSheets"][0]["total"], 36.0)
+
+    def test_championship_results(self):
+        url = reverse('championship_results') + f"?contestid={self.contest.id}"
+        async_url = reverse('championship_results_async') + f"?contestid={self.contest.id}"
+        self.assertSameResponse(self.client.put(url), self.client.get(async_url))
+
+    def test_preliminary_results_is_read_only(self):
+        url = reverse('preliminary_results_async') + f"?contestid={self.contest.id}"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        teams = response.json()["data"][0]["teams"]
+        self.assertEqual([t["team_name"] for t in teams], ["Team B", "Team A"])
+        # Stored totals are returned as-is, not recomputed from scoresheets
+        self.assertEqual(teams[0]["total"], 250.0)
+        self.teams[1].refresh_from_db()
+        self.assertEqual(self.teams[1].total_score, 250.0)
+
+    def test_preliminary_results_requires_contestid(self):
+        response = self.client.get(reverse('preliminary_results_async'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(reverse('judges_by_cluster_async', args=[self.cluster.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        # contest_get_all is public in its sync version too
+        self.assertEqual(self.client.get(reverse('contest_get_all_async')).status_code, status.HTTP_200_OK)
+
+    def test_rejects_other_methods(self):
+        response = self.client.post(reverse('contest_get_all_async'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
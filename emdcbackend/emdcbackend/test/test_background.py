@@ -0,0 +1,38 @@
+"""
+Tests for the tracked background threads drained on worker exit
+"""
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .. import background
+
+
+class BackgroundThreadTests(SimpleTestCase):
+    def setUp(self):
+        # drain() marks the process as exiting
+        self.addCleanup(background._stopping.clear)
+
+    def test_drain_waits_for_running_threads(self):
+        release = threading.Event()
+        done = []
+        thread = background.start(lambda: (release.wait(5), done.append(True)), name="test-work")
+        self.assertIn(thread, background.running())
+
+        # Still busy: drain gives up after the timeout and reports it
+        self.assertEqual(background.drain(0.05), [thread])
+        release.set()
+        self.assertEqual(background.drain(5), [])
+        self.assertEqual(done, [True])
+        self.assertNotIn(thread, background.running())
+        self.assertTrue(background.stopping())
+
+    def test_failed_thread_is_forgotten(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with mock.patch("threading.excepthook"):
+            thread = background.start(fail)
+            thread.join(5)
+        self.assertNotIn(thread, background.running())
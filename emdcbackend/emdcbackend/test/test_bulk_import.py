@@ -0,0 +1,342 @@
+"""
+Tests for bulk team/coach imports
+"""
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import (
+    Coach, Contest, Judge, JudgeClusters, MapClusterToTeam, MapCoachToTeam, MapContestToCluster, MapContestToJudge,
+    MapContestToOrganizer, MapContestToTeam, MapJudgeToCluster, MapScoresheetToTeamJudge, MapUserToRole,
+    Organizer, OutboundEmail, Scoresheet, ScoresheetEnum, Teams,
+)
+from ..views.scoresheets import provision_sheets
+
+
+@override_settings(EMAIL_OUTBOX_AUTOSEND=False)
+class BulkTeamImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="organizer@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=organizer.id)
+        self.client.login(username="organizer@example.com", password="testpassword")
+
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=organizer.id)
+        self.all_teams = JudgeClusters.objects.create(cluster_name="All Teams", cluster_type="preliminary")
+        self.cluster = JudgeClusters.objects.create(cluster_name="Cluster A", cluster_type="preliminary")
+        self.championship = JudgeClusters.objects.create(cluster_name="Championship", cluster_type="championship")
+        for cluster in (self.all_teams, self.cluster, self.championship):
+            MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=cluster.id)
+
+        self.judge = Judge.objects.create(
+            first_name="Test", last_name="Judge", phone_number="555", contestid=self.contest.id,
+            presentation=True, journal=True,
+        )
+        MapJudgeToCluster.objects.create(judgeid=self.judge.id, clusterid=self.cluster.id, contestid=self.contest.id)
+
+    def row(self, n, email=None, cluster="Cluster A"):
+        return {
+            "team_name": f"Team {n}", "school_name": "Mankato East", "coach_email": email or f"coach{n}@example.com",
+            "coach_first_name": "Pat", "coach_last_name": f"Lee {n}", "cluster": cluster,
+        }
+
+    def post(self, data, **kwargs):
+        return self.client.post(reverse("bulk_import_teams"), {"contestid": self.contest.id, **data}, **kwargs)
+
+    def test_import_creates_teams_coaches_mappings_and_sheets(self):
+        existing = User.objects.create_user(username="Existing@example.com", password="testpassword")
+        coach = Coach.objects.create(first_name="Old", last_name="Coach")
+        MapUserToRole.objects.create(uuid=existing.id, role=MapUserToRole.RoleEnum.COACH, relatedid=coach.id)
+
+        rows = [
+            self.row(1, "shared@example.com"),
+            self.row(2, "shared@example.com", cluster=str(self.all_teams.id)),
+            self.row(3, "existing@example.com", cluster=""),
+        ]
+        response = self.post({"rows": rows}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data["teams_created"], 3)
+        self.assertEqual(response.data["coaches_created"], 1)
+        self.assertEqual(response.data["coaches_reused"], 1)
+        self.assertEqual(response.data["emails_queued"], 1)
+
+        teams = {team.team_name: team for team in Teams.objects.filter(id__in=response.data["team_ids"])}
+        self.assertEqual(teams["Team 1"].school_name, "Mankato East")
+        self.assertEqual(MapContestToTeam.objects.filter(contestid=self.contest.id).count(), 3)
+        self.assertEqual(
+            set(MapClusterToTeam.objects.values_list("clusterid", "teamid")),
+            {(self.cluster.id, teams["Team 1"].id), (self.all_teams.id, teams["Team 1"].id),
+             (self.all_teams.id, teams["Team 2"].id), (self.all_teams.id, teams["Team 3"].id)},
+        )
+
+        shared = User.objects.get(username="shared@example.com")
+        self.assertFalse(shared.has_usable_password())
+        mapping = MapUserToRole.objects.get(uuid=shared.id)
+        self.assertEqual(mapping.role, MapUserToRole.RoleEnum.COACH)
+        self.assertEqual(
+            set(MapCoachToTeam.objects.filter(coachid=mapping.relatedid).values_list("teamid", flat=True)),
+            {teams["Team 1"].id, teams["Team 2"].id},
+        )
+        self.assertEqual(MapCoachToTeam.objects.get(teamid=teams["Team 3"].id).coachid, coach.id)
+        self.assertEqual(list(OutboundEmail.objects.values_list("to_email", flat=True)), ["shared@example.com"])
+
+        # Only the team in the judge's cluster gets sheets, one per flag
+        self.assertEqual(
+            sorted(MapScoresheetToTeamJudge.objects.values_list("teamid", "judgeid", "sheetType")),
+            [(teams["Team 1"].id, self.judge.id, ScoresheetEnum.PRESENTATION),
+             (teams["Team 1"].id, self.judge.id, ScoresheetEnum.JOURNAL)],
+        )
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile(
+            "teams.csv",
+            b"Team,School,Coach Email,First Name,Last Name,Cluster\n"
+            b"Rocketeers,Mankato East,pat@example.com,Pat,Lee,cluster a\n",
+            content_type="text/csv",
+        )
+        response = self.post({"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        team = Teams.objects.get(team_name="Rocketeers")
+        self.assertTrue(MapClusterToTeam.objects.filter(clusterid=self.cluster.id, teamid=team.id).exists())
+        self.assertEqual(Coach.objects.get().last_name, "Lee")
+
+    def test_invalid_rows_import_nothing(self):
+        judge_user = User.objects.create_user(username="judge@example.com", password="testpassword")
+        MapUserToRole.objects.create(uuid=judge_user.id, role=MapUserToRole.RoleEnum.JUDGE, relatedid=self.judge.id)
+        rows = [
+            self.row(1),
+            self.row(1),
+            {**self.row(2), "coach_email": "not-an-email"},
+            self.row(3, "judge@example.com"),
+            self.row(4, cluster="Nope"),
+            self.row(5, cluster="Championship"),
+            {**self.row(6), "team_name": " "},
+        ]
+        response = self.post({"rows": rows}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [(error["row"], error["field"]) for error in response.data["errors"]],
+            [(2, "team_name"), (3, "coach_email"), (4, "coach_email"), (5, "cluster"), (6, "cluster"),
+             (7, "team_name")],
+        )
+        self.assertFalse(Teams.objects.exists())
+        self.assertFalse(Coach.objects.exists())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_dry_run_writes_nothing(self):
+        response = self.post({"rows": [self.row(1), self.row(2)], "dry_run": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["teams_created"], 2)
+        self.assertTrue(response.data["dry_run"])
+        self.assertFalse(Teams.objects.exists())
+        self.assertFalse(User.objects.filter(username="coach1@example.com").exists())
+
+    def test_requires_organizer_of_contest(self):
+        other_user = User.objects.create_user(username="other@example.com", password="testpassword")
+        other = Organizer.objects.create(first_name="Other", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=other_user.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=other.id)
+        self.client.login(username="other@example.com", password="testpassword")
+        response = self.post({"rows": [self.row(1)]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Teams.objects.exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        counts = []
+        # The first import also creates the table version counters
+        for first, size in ((0, 3), (50, 3), (100, 10)):
+            rows = [self.row(first + n) for n in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post({"rows": rows}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            counts.append(len(queries))
+        self.assertEqual(counts[1], counts[2])
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            f.write('[{"team": "Rocketeers", "email": "pat@example.com", "cluster": "Cluster A"}]')
+        self.addCleanup(os.remove, f.name)
+
+        out = StringIO()
+        call_command("import_teams", self.contest.id, f.name, "--dry-run", stdout=out)
+        self.assertIn("Would import 1 teams", out.getvalue())
+        self.assertFalse(Teams.objects.exists())
+
+        call_command("import_teams", self.contest.id, f.name, stdout=out)
+        self.assertEqual(Teams.objects.get().school_name, "MNSU")
+
+        with self.assertRaisesMessage(CommandError, "row 1: team_name"):
+            call_command("import_teams", self.contest.id, f.name, stdout=out)
+
+
+class BulkJudgeImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="organizer@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=organizer.id)
+        self.client.login(username="organizer@example.com", password="testpassword")
+
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=organizer.id)
+        self.cluster_a = JudgeClusters.objects.create(cluster_name="Cluster A", cluster_type="preliminary")
+        self.cluster_b = JudgeClusters.objects.create(cluster_name="Cluster B", cluster_type="preliminary")
+        self.championship = JudgeClusters.objects.create(cluster_name="Championship", cluster_type="championship")
+        self.teams = {}
+        for cluster in (self.cluster_a, self.cluster_b, self.championship):
+            MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=cluster.id)
+        for name, cluster in (("A1", self.cluster_a), ("A2", self.cluster_a), ("B1", self.cluster_b)):
+            team = self.teams[name] = Teams.objects.create(team_name=name)
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+            MapClusterToTeam.objects.create(clusterid=cluster.id, teamid=team.id)
+        MapClusterToTeam.objects.create(clusterid=self.championship.id, teamid=self.teams["A1"].id)
+
+        # An existing judge scoring presentation in cluster A
+        self.judge = Judge.objects.create(
+            first_name="Sam", last_name="Ortiz", phone_number="555", contestid=self.contest.id, presentation=True
+        )
+        judge_user = User.objects.create_user(username="sam@example.com", password="testpassword")
+        MapUserToRole.objects.create(uuid=judge_user.id, role=MapUserToRole.RoleEnum.JUDGE, relatedid=self.judge.id)
+        MapContestToJudge.objects.create(contestid=self.contest.id, judgeid=self.judge.id)
+        MapJudgeToCluster.objects.create(
+            judgeid=self.judge.id, clusterid=self.cluster_a.id, contestid=self.contest.id, presentation=True
+        )
+        provision_sheets([(self.teams[name].id, self.judge.id, ScoresheetEnum.PRESENTATION) for name in ("A1", "A2")])
+
+    def post(self, rows, **data):
+        return self.client.post(
+            reverse("bulk_import_judges"), {"contestid": self.contest.id, "rows": rows, **data}, format="json"
+        )
+
+    def sheets(self, judge_id):
+        return set(MapScoresheetToTeamJudge.objects.filter(judgeid=judge_id).values_list("teamid", "sheetType"))
+
+    def test_roster_is_diffed_against_assignments_and_sheets(self):
+        response = self.post([
+            # Sam moves from cluster A to B and scores the journal there
+            {"email": "Sam@example.com", "cluster": "Cluster B", "journal": "x"},
+            {"email": "lee@example.com", "first_name": "Lee", "last_name": "Park", "role": "lead",
+             "cluster": "Cluster A", "mdo": "yes", "runpenalties": "1"},
+            {"email": "lee@example.com", "cluster": str(self.championship.id)},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data, {
+            "judges_created": 1, "assignments_created": 3, "assignments_updated": 0, "assignments_removed": 1,
+            "assignments_unchanged": 0, "sheets_created": 6, "sheets_removed": 2, "dry_run": False,
+        })
+
+        self.assertEqual(self.sheets(self.judge.id), {(self.teams["B1"].id, ScoresheetEnum.JOURNAL)})
+        self.assertEqual(
+            list(MapJudgeToCluster.objects.filter(judgeid=self.judge.id).values_list("clusterid", flat=True)),
+            [self.cluster_b.id],
+        )
+        self.judge.refresh_from_db()
+        self.assertTrue(self.judge.journal)
+        self.assertFalse(self.judge.presentation)
+
+        lee = Judge.objects.get(first_name="Lee")
+        self.assertEqual(lee.role, Judge.JudgeRoleEnum.LEAD)
+        self.assertTrue(lee.championship and lee.mdo)
+        self.assertFalse(User.objects.get(username="lee@example.com").has_usable_password())
+        self.assertTrue(MapContestToJudge.objects.filter(contestid=self.contest.id, judgeid=lee.id).exists())
+        self.assertEqual(self.sheets(lee.id), {
+            (self.teams["A1"].id, ScoresheetEnum.MACHINEDESIGN), (self.teams["A2"].id, ScoresheetEnum.MACHINEDESIGN),
+            (self.teams["A1"].id, ScoresheetEnum.RUNPENALTIES), (self.teams["A2"].id, ScoresheetEnum.RUNPENALTIES),
+            (self.teams["A1"].id, ScoresheetEnum.CHAMPIONSHIP),
+        })
+        self.assertEqual(Scoresheet.objects.count(), MapScoresheetToTeamJudge.objects.count())
+
+    def test_unchanged_roster_writes_nothing(self):
+        rows = [{"email": "sam@example.com", "cluster": "Cluster A", "presentation": "true"}]
+        response = self.post(rows)
+        self.assertEqual(response.data["assignments_unchanged"], 1)
+        self.assertEqual(response.data["sheets_created"] + response.data["sheets_removed"], 0)
+
+        response = self.post([{**rows[0], "journal": "true"}])
+        self.assertEqual(response.data["assignments_updated"], 1)
+        self.assertEqual(response.data["sheets_created"], 2)
+
+    def test_submitted_sheets_and_unlisted_round_assignments_are_kept(self):
+        MapJudgeToCluster.objects.create(
+            judgeid=self.judge.id, clusterid=self.championship.id, contestid=self.contest.id, championship=True
+        )
+        submitted = MapScoresheetToTeamJudge.objects.get(teamid=self.teams["A1"].id, judgeid=self.judge.id)
+        Scoresheet.objects.filter(id=submitted.scoresheetid).update(isSubmitted=True)
+
+        response = self.post([{"email": "sam@example.com", "cluster": "Cluster B", "journal": "x"}])
+        self.assertEqual(response.data["assignments_removed"], 1)
+        self.assertEqual(response.data["assignments_unchanged"], 1)
+        self.assertEqual(response.data["sheets_removed"], 1)
+        self.assertTrue(MapScoresheetToTeamJudge.objects.filter(id=submitted.id).exists())
+        self.assertTrue(MapJudgeToCluster.objects.filter(judgeid=self.judge.id, clusterid=self.championship.id).exists())
+
+    def test_invalid_rows_apply_nothing(self):
+        response = self.post([
+            {"email": "sam@example.com", "cluster": "Cluster A", "championship": "x"},
+            {"email": "new@example.com", "cluster": "Cluster A"},
+            {"email": "organizer@example.com", "first_name": "O", "last_name": "P", "cluster": "Cluster A"},
+            {"email": "sam@example.com", "cluster": "Nope"},
+            {"email": "lee@example.com", "first_name": "Lee", "last_name": "Park", "cluster": "Cluster A",
+             "role": "boss"},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [(error["row"], error["field"]) for error in response.data["errors"]],
+            [(1, "cluster"), (2, "first_name"), (3, "judge_email"), (4, "cluster"), (5, "role")],
+        )
+
+        # Two preliminary clusters for one judge
+        response = self.post([
+            {"email": "sam@example.com", "cluster": "Cluster A", "presentation": "x"},
+            {"email": "sam@example.com", "cluster": "Cluster B", "journal": "x"},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["errors"][0]["field"], "cluster")
+        self.assertFalse(MapJudgeToCluster.objects.filter(clusterid=self.cluster_b.id).exists())
+        self.assertFalse(Judge.objects.exclude(id=self.judge.id).exists())
+
+    def test_dry_run_reports_without_applying(self):
+        response = self.post([{"email": "sam@example.com", "cluster": "Cluster B", "journal": "x"}], dry_run=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assignments_removed"], 1)
+        self.assertEqual(response.data["sheets_created"], 1)
+        self.assertEqual(
+            self.sheets(self.judge.id),
+            {(self.teams["A1"].id, ScoresheetEnum.PRESENTATION), (self.teams["A2"].id, ScoresheetEnum.PRESENTATION)},
+        )
+
+    def test_query_count_does_not_grow_with_roster(self):
+        counts = []
+        # The first import also creates the table version counters
+        for first, size in ((0, 2), (50, 2), (100, 4)):
+            rows = [
+                {"email": f"judge{first + n}@example.com", "first_name": "J", "last_name": str(n),
+                 "cluster": "Cluster A", "presentation": "x", "journal": "x"}
+                for n in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(rows)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            counts.append(len(queries))
+        self.assertEqual(counts[1], counts[2])
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("email,cluster,journal\nsam@example.com,Cluster B,x\n")
+        self.addCleanup(os.remove, f.name)
+
+        out = StringIO()
+        call_command("import_judges", self.contest.id, f.name, "--dry-run", stdout=out)
+        self.assertIn("Would apply judge roster", out.getvalue())
+        call_command("import_judges", self.contest.id, f.name, stdout=out)
+        self.assertEqual(self.sheets(self.judge.id), {(self.teams["B1"].id, ScoresheetEnum.JOURNAL)})
@@ -0,0 +1,178 @@
+"""
+Tests for cloning a contest
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import (
+    Coach, Contest, Judge, JudgeClusters, MapClusterToTeam, MapCoachToTeam, MapContestToCluster, MapContestToJudge,
+    MapContestToOrganizer, MapContestToTeam, MapJudgeToCluster, MapScoresheetToTeamJudge, MapUserToRole, Organizer,
+    ScoresheetEnum, Teams,
+)
+
+
+class CloneContestTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="organizer@example.com", password="testpassword")
+        self.organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(
+            uuid=self.user.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=self.organizer.id,
+        )
+        self.client.login(username="organizer@example.com", password="testpassword")
+
+        self.contest = Contest.objects.create(name="EMDC 2025", date=date(2025, 4, 19), is_open=True, is_tabulated=True)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=self.organizer.id)
+        self.all_teams = self.cluster("All Teams", "preliminary")
+        self.cluster_a = self.cluster("Cluster A", "preliminary")
+        self.championship = self.cluster("Championship", "championship")
+        self.cluster("Redesign", "redesign")
+
+        self.judge = Judge.objects.create(
+            first_name="Pre", last_name="Judge", phone_number="555", contestid=self.contest.id,
+            presentation=True, journal=True,
+        )
+        self.champion_judge = Judge.objects.create(
+            first_name="Champ", last_name="Judge", phone_number="555", contestid=self.contest.id, championship=True,
+        )
+        self.assign(self.judge, self.cluster_a, presentation=True, journal=True)
+        self.assign(self.champion_judge, self.championship, championship=True)
+        self.coach = Coach.objects.create(first_name="Pat", last_name="Lee")
+        self.teams = [self.team(n) for n in range(2)]
+        MapClusterToTeam.objects.create(clusterid=self.championship.id, teamid=self.teams[0].id)
+
+    def cluster(self, name, cluster_type):
+        cluster = JudgeClusters.objects.create(cluster_name=name, cluster_type=cluster_type)
+        MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=cluster.id)
+        return cluster
+
+    def assign(self, judge, cluster, **flags):
+        MapContestToJudge.objects.get_or_create(contestid=self.contest.id, judgeid=judge.id)
+        MapJudgeToCluster.objects.create(judgeid=judge.id, clusterid=cluster.id, contestid=self.contest.id, **flags)
+
+    def team(self, n):
+        team = Teams.objects.create(team_name=f"Team {n}", school_name="Mankato East", total_score=90.0 + n)
+        MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+        MapCoachToTeam.objects.create(teamid=team.id, coachid=self.coach.id)
+        for cluster in (self.all_teams, self.cluster_a):
+            MapClusterToTeam.objects.create(clusterid=cluster.id, teamid=team.id)
+        return team
+
+    def clone(self, **data):
+        return self.client.post(
+            reverse("clone_contest"), {"contestid": self.contest.id, "name": "EMDC 2026", "date": "2026-04-18", **data},
+            format="json",
+        )
+
+    def test_clone_setup(self):
+        response = self.clone()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        summary = response.json()
+        new_id = summary["contest"]["id"]
+        contest = Contest.objects.get(id=new_id)
+        self.assertEqual((contest.name, str(contest.date), contest.is_open), ("EMDC 2026", "2026-04-18", False))
+        self.assertEqual(summary["clusters_created"], 4)
+        self.assertEqual(summary["judge_assignments_created"], 2)
+        self.assertEqual(summary["teams_created"], 0)
+
+        cluster_ids = {int(source): copy for source, copy in summary["cluster_ids"].items()}
+        clusters = {
+            cluster.cluster_name: cluster
+            for cluster in JudgeClusters.objects.filter(id__in=MapContestToCluster.objects.filter(
+                contestid=new_id).values("clusterid"))
+        }
+        self.assertEqual(set(clusters), {"All Teams", "Cluster A", "Championship", "Redesign"})
+        self.assertEqual(clusters["Cluster A"].id, cluster_ids[self.cluster_a.id])
+        self.assertEqual(clusters["Championship"].cluster_type, "championship")
+        # Round clusters start inactive, as before advancing
+        self.assertTrue(clusters["Cluster A"].is_active)
+        self.assertFalse(clusters["Championship"].is_active)
+
+        self.assertEqual(
+            set(MapJudgeToCluster.objects.filter(contestid=new_id).values_list(
+                "judgeid", "clusterid", "presentation", "journal", "championship")),
+            {(self.judge.id, clusters["Cluster A"].id, True, True, False),
+             (self.champion_judge.id, clusters["Championship"].id, False, False, True)},
+        )
+        self.assertEqual(
+            set(MapContestToJudge.objects.filter(contestid=new_id).values_list("judgeid", flat=True)),
+            {self.judge.id, self.champion_judge.id},
+        )
+        self.assertTrue(MapContestToOrganizer.objects.filter(contestid=new_id, organizerid=self.organizer.id).exists())
+        self.assertFalse(MapContestToTeam.objects.filter(contestid=new_id).exists())
+
+        # The source contest is untouched
+        self.assertEqual(MapContestToCluster.objects.filter(contestid=self.contest.id).count(), 4)
+        self.assertEqual(MapJudgeToCluster.objects.filter(contestid=self.contest.id).count(), 2)
+
+    def test_clone_with_teams(self):
+        summary = self.clone(include_teams=True).json()
+        new_id = summary["contest"]["id"]
+        team_ids = {int(source): copy for source, copy in summary["team_ids"].items()}
+        cluster_ids = {int(source): copy for source, copy in summary["cluster_ids"].items()}
+        self.assertEqual(summary["teams_created"], 2)
+
+        copies = Teams.objects.filter(id__in=team_ids.values()).order_by("id")
+        self.assertEqual([team.team_name for team in copies], ["Team 0", "Team 1"])
+        self.assertEqual({team.total_score for team in copies}, {0.0})
+        self.assertEqual(
+            set(MapContestToTeam.objects.filter(contestid=new_id).values_list("teamid", flat=True)),
+            set(team_ids.values()),
+        )
+        self.assertEqual(MapCoachToTeam.objects.filter(teamid__in=team_ids.values(), coachid=self.coach.id).count(), 2)
+        # Preliminary memberships only; championship membership comes from advancing
+        self.assertEqual(
+            set(MapClusterToTeam.objects.filter(teamid__in=team_ids.values()).values_list("clusterid", "teamid")),
+            {(cluster_ids[cluster.id], team_ids[team.id])
+             for cluster in (self.all_teams, self.cluster_a) for team in self.teams},
+        )
+        # Presentation and journal sheets for the preliminary judge only
+        self.assertEqual(summary["sheets_created"], 4)
+        self.assertEqual(
+            set(MapScoresheetToTeamJudge.objects.filter(teamid__in=team_ids.values()).values_list(
+                "judgeid", "sheetType")),
+            {(self.judge.id, ScoresheetEnum.PRESENTATION), (self.judge.id, ScoresheetEnum.JOURNAL)},
+        )
+
+    def test_query_count_does_not_grow_with_contest(self):
+        self.clone(include_teams=True)  # warm-up: creates the table version counters
+
+        def queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.clone(include_teams=True).status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        small = queries()
+        for n in range(2, 4):
+            self.team(n)
+        self.assertEqual(queries(), small)
+
+    def test_defaults_to_source_name_and_date(self):
+        response = self.client.post(reverse("clone_contest"), {"contestid": self.contest.id}, format="json")
+        contest = Contest.objects.get(id=response.json()["contest"]["id"])
+        self.assertEqual((contest.name, contest.date), ("EMDC 2025 (copy)", self.contest.date))
+
+    def test_invalid_date_rolls_back(self):
+        response = self.clone(date="not a date")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", response.json()["errors"])
+        self.assertEqual(Contest.objects.count(), 1)
+
+    def test_other_organizer_forbidden(self):
+        other = User.objects.create_user(username="other@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Other", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=other.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=organizer.id)
+        self.client.login(username="other@example.com", password="testpassword")
+        self.assertEqual(self.clone().status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Contest.objects.count(), 1)
+
+    def test_missing_contest(self):
+        self.assertEqual(self.clone(contestid=self.contest.id + 100).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.client.post(reverse("clone_contest"), {}, format="json").status_code, status.HTTP_400_BAD_REQUEST,
+        )
@@ -1,9 +1,15 @@
+import io
+from contextlib import redirect_stdout
+from unittest import mock
+
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
+from django.db import connection, transaction
 from ..models import Coach, MapUserToRole, Admin
 from ..serializers import CoachSerializer
+from ..views.coach import create_user_and_coach
 
 
 class CoachAPITests(APITestCase):
@@ -76,3 +82,17 @@ class CoachAPITests(APITestCase):
             # If it fails, it's likely due to missing dependencies - that's okay for now
             self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_500_INTERNAL_SERVER_ERROR])
 
+    def test_failed_email_queueing_keeps_transaction_usable(self):
+        def broken_queue(user, subject=None):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT * FROM no_such_outbox_table")
+
+        data = {"username": "newcoach@example.com", "password": "unused-password", "first_name": "New", "last_name": "Coach"}
+        with mock.patch("emdcbackend.views.coach.send_set_password_email", broken_queue), \
+                redirect_stdout(io.StringIO()) as out:
+            with transaction.atomic():
+                user_response, coach_response = create_user_and_coach(data)
+                # Still usable: on Postgres the failed query would abort the transaction without the savepoint
+                self.assertTrue(Coach.objects.filter(id=coach_response["id"]).exists())
+        self.assertIn("Failed to queue set-password email", out.getvalue())
+        self.assertTrue(User.objects.filter(username="newcoach@example.com").exists())
@@ -0,0 +1,170 @@
+"""
+Tests for per-table change counters, version-based ETags (304 responses)
+and response compression
+"""
+import gzip
+import json
+from datetime import date
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import middleware
+from ..middleware import CompressionMiddleware
+from ..models import Contest, MapContestToTeam, TableVersion, Teams
+from ..table_versions import get_versions, written_table
+
+
+def make_team(name, **fields):
+    values = dict(
+        team_name=name, journal_score=0.0, presentation_score=0.0, machinedesign_score=0.0,
+        penalties_score=0.0, redesign_score=0.0, total_score=0.0, championship_score=0.0,
+    )
+    values.update(fields)
+    return Teams.objects.create(**values)
+
+
+class TableVersionTests(TestCase):
+    def test_written_table(self):
+        table = Teams._meta.db_table
+        self.assertEqual(written_table(f'INSERT INTO "{table}" ("team_name") VALUES (%s)'), table)
+        self.assertEqual(written_table(f'UPDATE "{table}" SET "total_score" = %s'), table)
+        self.assertEqual(written_table(f'DELETE FROM "{table}" WHERE "id" IN (%s)'), table)
+        self.assertIsNone(written_table(f'SELECT * FROM "{table}"'))
+        self.assertIsNone(written_table('UPDATE "auth_user" SET "last_login" = %s'))
+        self.assertIsNone(written_table(f'UPDATE "{TableVersion._meta.db_table}" SET "version" = 1'))
+
+    def test_committed_write_bumps_version(self):
+        table = Teams._meta.db_table
+        self.assertEqual(get_versions([table]), [(table, 0)])
+        with self.captureOnCommitCallbacks(execute=True):
+            make_team("Team A")
+            make_team("Team B")
+        # One bump per transaction, however many rows were written
+        self.assertEqual(get_versions([table]), [(table, 1)])
+
+    def test_rolled_back_write_does_not_bump_version(self):
+        table = Teams._meta.db_table
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    make_team("Team A")
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(get_versions([table]), [(table, 0)])
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        self.team = make_team("Team A", advanced_to_championship=True)
+        MapContestToTeam.objects.create(contestid=self.contest.id, teamid=self.team.id)
+
+    def test_unchanged_list_returns_304(self):
+        url = reverse("get_all_teams")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_write_changes_etag(self):
+        url = reverse("get_all_teams")
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            make_team("Team B")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()["teams"]), 2)
+
+    def test_etag_depends_on_query_and_user(self):
+        url = reverse("list_advancers")
+        etag = self.client.get(url, {"contestid": self.contest.id})["ETag"]
+        self.assertNotEqual(self.client.get(url, {"contestid": self.contest.id + 1})["ETag"], etag)
+
+        User.objects.create_user(username="other@example.com", password="testpassword")
+        self.client.login(username="other@example.com", password="testpassword")
+        response = self.client.get(url, {"contestid": self.contest.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_authentication_runs_before_etag_check(self):
+        url = reverse("get_all_teams")
+        etag = self.client.get(url)["ETag"]
+        self.client.logout()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_async_view_returns_304(self):
+        url = reverse("championship_results_async")
+        response = self.client.get(url, {"contestid": self.contest.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)["data"]), 1)
+
+        response = self.client.get(url, {"contestid": self.contest.id}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(TestCase):
+    body = json.dumps({"teams": [{"team_name": f"Team {i}", "total_score": 0.0} for i in range(200)]}).encode()
+
+    def process(self, response, accept_encoding):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def test_gzip(self):
+        response = self.process(HttpResponse(self.body), "gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    @skipUnless(middleware.brotli, "brotli is not installed")
+    def test_brotli_preferred(self):
+        response = self.process(HttpResponse(self.body), "gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(middleware.brotli.decompress(response.content), self.body)
+
+    def test_small_body_not_compressed(self):
+        response = self.process(HttpResponse(b'{"ok": true}'), "gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_gzip_is_padded(self):
+        response = self.process(HttpResponse(self.body), "gzip")
+        # Random bytes in the FNAME header field, as GZipMiddleware adds them
+        self.assertTrue(response.content[3] & gzip.FNAME)
+
+    def test_streaming_gzip(self):
+        response = self.process(StreamingHttpResponse(iter([self.body[:500], self.body[500:]]), content_type="text/csv"),
+                                "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        content = b"".join(response.streaming_content)
+        self.assertTrue(content[3] & gzip.FNAME)
+        self.assertEqual(gzip.decompress(content), self.body)
+
+    def test_event_stream_not_compressed(self):
+        response = self.process(StreamingHttpResponse(iter([self.body]), content_type="text/event-stream"), "gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), self.body)
+
+    def test_client_without_gzip(self):
+        response = self.process(HttpResponse(self.body), "identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
@@ -0,0 +1,227 @@
+"""
+Tests for background, chunked contest deletion
+"""
+import io
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..deletion import resume_deletions, run_pending_deletions
+from ..models import (
+    AdvancementSnapshot, Contest, ContestDeletion, Judge, JudgeClusters, MapClusterToTeam, MapContestToCluster,
+    MapContestToJudge, MapContestToOrganizer, MapContestToTeam, MapJudgeToCluster, MapScoresheetToTeamJudge,
+    Organizer, Scoresheet, ScoresheetEnum, Teams,
+)
+
+
+@override_settings(CONTEST_DELETE_AUTORUN=False, CONTEST_DELETE_CHUNK_SIZE=2)
+class ContestDeletionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+
+        self.contest = self.make_contest("Old Contest")
+        self.other = self.make_contest("Other Contest")
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=organizer.id)
+        self.cluster = self.make_cluster(self.contest, "Cluster A")
+        self.shared_cluster = self.make_cluster(self.contest, "Shared")
+        MapContestToCluster.objects.create(contestid=self.other.id, clusterid=self.shared_cluster.id)
+        self.judge = Judge.objects.create(first_name="Jo", last_name="Judge", phone_number="555", contestid=self.contest.id)
+        MapContestToJudge.objects.create(contestid=self.contest.id, judgeid=self.judge.id)
+        MapJudgeToCluster.objects.create(judgeid=self.judge.id, clusterid=self.cluster.id, contestid=self.contest.id)
+
+        self.teams = [self.make_team(self.contest, f"Team {n}") for n in range(3)]
+        self.shared_team = self.teams[0]
+        MapContestToTeam.objects.create(contestid=self.other.id, teamid=self.shared_team.id)
+        for team in self.teams:
+            MapClusterToTeam.objects.create(clusterid=self.cluster.id, teamid=team.id)
+            for sheet_type in (ScoresheetEnum.PRESENTATION, ScoresheetEnum.JOURNAL):
+                sheet = Scoresheet.objects.create(sheetType=sheet_type, isSubmitted=False)
+                MapScoresheetToTeamJudge.objects.create(
+                    teamid=team.id, judgeid=self.judge.id, scoresheetid=sheet.id, sheetType=sheet_type,
+                )
+        AdvancementSnapshot.objects.create(contestid=self.contest.id)
+
+        # Data of the other contest only
+        self.other_team = self.make_team(self.other, "Other Team")
+        self.other_sheet = Scoresheet.objects.create(sheetType=ScoresheetEnum.JOURNAL, isSubmitted=False)
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=self.other_team.id, judgeid=self.judge.id, scoresheetid=self.other_sheet.id,
+            sheetType=ScoresheetEnum.JOURNAL,
+        )
+
+    def make_contest(self, name):
+        return Contest.objects.create(name=name, date=date.today(), is_open=True, is_tabulated=False)
+
+    def make_cluster(self, contest, name):
+        cluster = JudgeClusters.objects.create(cluster_name=name, cluster_type="preliminary")
+        MapContestToCluster.objects.create(contestid=contest.id, clusterid=cluster.id)
+        return cluster
+
+    def make_team(self, contest, name):
+        team = Teams.objects.create(team_name=name)
+        MapContestToTeam.objects.create(contestid=contest.id, teamid=team.id)
+        return team
+
+    def delete(self):
+        with redirect_stdout(io.StringIO()):
+            return self.client.delete(reverse("delete_contest", args=[self.contest.id]))
+
+    def run_jobs(self):
+        with redirect_stdout(io.StringIO()):
+            return run_pending_deletions()
+
+    def deletion_status(self):
+        return self.client.get(reverse("contest_deletion_status", args=[self.contest.id]))
+
+    def test_delete_hides_contest_at_once(self):
+        response = self.delete()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["deletion"]["status"], ContestDeletion.STATUS_PENDING)
+        # Same counts as the former synchronous response
+        self.assertEqual(response.data["deleted"], {
+            "contest_id": self.contest.id, "clusters_deleted": 1, "teams_deleted": 2,
+            "judges_removed": 1, "scoresheets_deleted": 6,
+        })
+
+        self.assertEqual(
+            self.client.get(reverse("contest_by_id", args=[self.contest.id])).status_code, status.HTTP_404_NOT_FOUND,
+        )
+        names = [contest["name"] for contest in self.client.get(reverse("contest_get_all")).data["Contests"]]
+        self.assertEqual(names, ["Other Contest"])
+        self.assertNotIn("is_deleting", self.client.get(reverse("contest_by_id", args=[self.other.id])).data["Contest"])
+        # Nothing is deleted until the job runs
+        self.assertTrue(Contest.all_objects.filter(id=self.contest.id, is_deleting=True).exists())
+        self.assertEqual(MapScoresheetToTeamJudge.objects.count(), 7)
+        self.assertEqual(self.deletion_status().data["deletion"]["status"], ContestDeletion.STATUS_PENDING)
+
+    def test_contest_lookups_skip_hidden_contest(self):
+        MapContestToJudge.objects.create(contestid=self.other.id, judgeid=self.judge.id)
+        self.delete()
+        # Removed with the request; the rest waits for the job
+        self.assertFalse(MapContestToJudge.objects.filter(contestid=self.contest.id).exists())
+        self.assertFalse(MapContestToOrganizer.objects.filter(contestid=self.contest.id).exists())
+        self.assertTrue(MapContestToTeam.objects.filter(contestid=self.contest.id).exists())
+
+        response = self.client.get(reverse("get_contest_id_by_judge_id", args=[self.judge.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["Contest"]["id"], self.other.id)
+        response = self.client.get(reverse("get_contest_id_by_team_id", args=[self.shared_team.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["Contest"]["id"], self.other.id)
+        response = self.client.get(reverse("get_contest_id_by_team_id", args=[self.teams[1].id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_job_deletes_contest_data_in_chunks(self):
+        self.delete()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.run_jobs(), (1, 0))
+        sheet_deletes = [q for q in ctx.captured_queries
+                         if q["sql"].startswith(f'DELETE FROM "{MapScoresheetToTeamJudge._meta.db_table}"')]
+        # 6 sheets, 2 per chunk
+        self.assertEqual(len(sheet_deletes), 3)
+
+        self.assertFalse(Contest.all_objects.filter(id=self.contest.id).exists())
+        self.assertFalse(AdvancementSnapshot.objects.filter(contestid=self.contest.id).exists())
+        self.assertEqual(list(Scoresheet.objects.values_list("id", flat=True)), [self.other_sheet.id])
+        self.assertFalse(MapJudgeToCluster.objects.exists())
+        self.assertFalse(MapClusterToTeam.objects.exists())
+        for model in (MapContestToJudge, MapContestToTeam, MapContestToOrganizer, MapContestToCluster):
+            self.assertFalse(model.objects.filter(contestid=self.contest.id).exists())
+        # Teams and clusters another contest uses are kept
+        self.assertEqual(set(Teams.objects.values_list("id", flat=True)), {self.shared_team.id, self.other_team.id})
+        self.assertEqual(list(JudgeClusters.objects.values_list("id", flat=True)), [self.shared_cluster.id])
+        self.assertTrue(MapContestToTeam.objects.filter(contestid=self.other.id, teamid=self.shared_team.id).exists())
+
+        deletion = self.deletion_status().data["deletion"]
+        self.assertEqual(deletion["status"], ContestDeletion.STATUS_DONE)
+        self.assertIsNotNone(deletion["finished_at"])
+        self.assertEqual(deletion["deleted"], {
+            "score sheets": 6, "judge cluster assignments": 1, "cluster teams": 3, "teams": 2, "clusters": 1,
+            "contest judges": 1, "contest teams": 3, "contest organizers": 1, "contest clusters": 2, "contest": 1,
+        })
+
+    def test_failed_job_resumes(self):
+        self.delete()
+        with mock.patch("emdcbackend.deletion._delete_sheet_chunk", side_effect=[2, RuntimeError("boom")]):
+            self.assertEqual(self.run_jobs(), (0, 1))
+        deletion = self.deletion_status().data["deletion"]
+        self.assertEqual((deletion["status"], deletion["step"], deletion["error"]), ("failed", "score sheets", "boom"))
+        self.assertEqual(deletion["deleted"], {"contest judges": 1, "contest organizers": 1, "score sheets": 2})
+        # Still hidden
+        self.assertFalse(Contest.objects.filter(id=self.contest.id).exists())
+
+        self.assertEqual(self.delete().data["deletion"]["status"], ContestDeletion.STATUS_PENDING)
+        self.assertEqual(self.run_jobs(), (1, 0))
+        self.assertFalse(Contest.all_objects.filter(id=self.contest.id).exists())
+        self.assertEqual(Scoresheet.objects.count(), 1)
+
+    def test_exiting_worker_hands_job_back(self):
+        self.delete()
+        # The worker starts exiting after the first chunk
+        with mock.patch("emdcbackend.deletion.background.stopping", side_effect=[False, True]):
+            self.assertEqual(self.run_jobs(), (0, 0))
+        deletion = self.deletion_status().data["deletion"]
+        self.assertEqual((deletion["status"], deletion["step"]), ("pending", "score sheets"))
+        self.assertEqual(deletion["deleted"], {"contest judges": 1, "contest organizers": 1, "score sheets": 2})
+
+        self.assertEqual(self.run_jobs(), (1, 0))
+        self.assertFalse(Contest.all_objects.filter(id=self.contest.id).exists())
+        self.assertEqual(self.deletion_status().data["deletion"]["deleted"]["score sheets"], 6)
+
+    def test_worker_start_resumes_jobs(self):
+        with override_settings(CONTEST_DELETE_AUTORUN=True), \
+                mock.patch("emdcbackend.deletion.wake_deleter") as wake, \
+                mock.patch("emdcbackend.deletion.threading.Timer") as timer:
+            resume_deletions()
+            wake.assert_not_called()
+            timer.assert_not_called()
+
+            self.delete()
+            resume_deletions()
+            wake.assert_called_once()
+            timer.assert_not_called()
+
+            # Left running by a worker that died: wake again once it is stale
+            ContestDeletion.objects.update(status=ContestDeletion.STATUS_RUNNING)
+            resume_deletions()
+            delay, callback = timer.call_args[0]
+            self.assertAlmostEqual(delay, 601, delta=5)
+            self.assertIs(callback, wake)
+            timer.return_value.start.assert_called_once()
+
+    def test_stale_running_job_is_claimed_again(self):
+        self.delete()
+        ContestDeletion.objects.update(status=ContestDeletion.STATUS_RUNNING)
+        self.assertEqual(self.run_jobs(), (0, 0))
+        ContestDeletion.objects.update(updated_at=ContestDeletion.objects.get().updated_at - timedelta(hours=1))
+        self.assertEqual(self.run_jobs(), (1, 0))
+
+    def test_deleter_woken_after_commit(self):
+        with override_settings(CONTEST_DELETE_AUTORUN=True), \
+                mock.patch("emdcbackend.deletion.wake_deleter") as wake, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.delete()
+        wake.assert_called_once()
+
+    def test_unknown_contest(self):
+        response = self.client.delete(reverse("delete_contest", args=[self.contest.id + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.deletion_status().status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_command(self):
+        self.delete()
+        out = io.StringIO()
+        with redirect_stdout(io.StringIO()):
+            call_command("run_contest_deletions", stdout=out)
+        self.assertIn("Deleted 1 contests, 0 failed", out.getvalue())
@@ -0,0 +1,77 @@
+"""
+Tests for the pooled PostgreSQL backend configuration and pool stats endpoint
+"""
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..db.postgresql.base import DatabaseWrapper, close_pools, get_pool_stats
+from ..models import Admin, Coach, MapUserToRole
+
+
+def make_wrapper(alias="pooltest", **overrides):
+    settings_dict = {
+        "ENGINE": "emdcbackend.db.postgresql",
+        "NAME": "emdc",
+        "USER": "emdc",
+        "PASSWORD": "secret",
+        "HOST": "localhost",
+        "PORT": "5432",
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "AUTOCOMMIT": True,
+        "ATOMIC_REQUESTS": False,
+        "TIME_ZONE": None,
+        "OPTIONS": {"pool": {"min_size": 1, "max_size": 4}},
+    }
+    settings_dict.update(overrides)
+    return DatabaseWrapper(settings_dict, alias=alias)
+
+
+class PooledBackendTests(SimpleTestCase):
+    """The pool is created lazily and never connects until first use"""
+
+    def tearDown(self):
+        close_pools()
+
+    def test_pool_is_created_from_options(self):
+        pool = make_wrapper().pool
+        self.assertEqual(pool.min_size, 1)
+        self.assertEqual(pool.max_size, 4)
+        self.assertIs(make_wrapper().pool, pool)
+        self.assertIn("pooltest", get_pool_stats())
+
+    def test_pool_option_is_not_passed_to_connect(self):
+        self.assertNotIn("pool", make_wrapper().get_connection_params())
+
+    def test_no_pool_without_option(self):
+        self.assertIsNone(make_wrapper(OPTIONS={}).pool)
+
+    def test_pool_rejects_persistent_connections(self):
+        with self.assertRaises(ImproperlyConfigured):
+            make_wrapper(alias="persistent", CONN_MAX_AGE=60).pool
+
+
+class DbPoolStatsEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="admin@example.com", password="testpassword")
+        admin = Admin.objects.create(first_name="Admin", last_name="User")
+        MapUserToRole.objects.create(uuid=self.user.id, role=1, relatedid=admin.id)
+
+    def test_admin_can_view_stats(self):
+        self.client.login(username="admin@example.com", password="testpassword")
+        response = self.client.get(reverse('db_pool_stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('pooled', response.data)
+        self.assertIn('pools', response.data)
+
+    def test_non_admin_is_rejected(self):
+        coach_user = User.objects.create_user(username="coach@example.com", password="testpassword")
+        coach = Coach.objects.create(first_name="Test", last_name="Coach")
+        MapUserToRole.objects.create(uuid=coach_user.id, role=4, relatedid=coach.id)
+        self.client.login(username="coach@example.com", password="testpassword")
+        response = self.client.get(reverse('db_pool_stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
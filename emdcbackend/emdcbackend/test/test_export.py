@@ -0,0 +1,224 @@
+"""
+Tests for the streaming CSV/XLSX results export
+"""
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import (
+    Admin, Contest, Judge, JudgeClusters, MapClusterToTeam, MapContestToCluster, MapContestToOrganizer,
+    MapContestToTeam, MapJudgeToCluster, MapScoresheetToTeamJudge, MapUserToRole, Organizer, Scoresheet,
+    ScoresheetEnum, Teams,
+)
+from ..xlsx import XLSX_CONTENT_TYPE, sheet_names, write_xlsx
+
+NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def read_csv(content):
+    return list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+
+
+def read_xlsx(content):
+    """{sheet name: [[cell text, ...], ...]} of a workbook written by write_xlsx."""
+    archive = zipfile.ZipFile(io.BytesIO(content))
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    sheets = {}
+    for n, sheet in enumerate(workbook.iterfind("x:sheets/x:sheet", NS), 1):
+        root = ElementTree.fromstring(archive.read(f"xl/worksheets/sheet{n}.xml"))
+        sheets[sheet.get("name")] = [
+            ["".join(cell.itertext()) for cell in row.iterfind("x:c", NS)]
+            for row in root.iterfind("x:sheetData/x:row", NS)
+        ]
+    return sheets
+
+
+class XlsxWriterTests(SimpleTestCase):
+    def test_cells_and_sheet_names(self):
+        rows = iter([["a<b & \"c\"\x01", 1, 2.5, True, None], ["", float("nan"), 0, False, "x"]])
+        content = b"".join(write_xlsx([("Results/2025: [final]", ["Text", "Int", "Float", "Bool", "Blank"], rows)]))
+        sheets = read_xlsx(content)
+        self.assertEqual(list(sheets), ["Results 2025   final"])
+        self.assertEqual(sheets["Results 2025   final"], [
+            ["Text", "Int", "Float", "Bool", "Blank"],
+            ['a<b & "c"', "1", "2.5", "1", ""],
+            ["", "nan", "0", "0", "x"],
+        ])
+
+    def test_sheet_names_are_unique_and_short(self):
+        self.assertEqual(sheet_names(["Sheet", "sheet", "x" * 40]), ["Sheet", "sheet (2)", "x" * 31])
+
+
+class ExportResultsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="organizer@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=organizer.id)
+        self.client.login(username="organizer@example.com", password="testpassword")
+
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=True)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=organizer.id)
+        all_teams = JudgeClusters.objects.create(cluster_name="All Teams", cluster_type="preliminary")
+        self.cluster = JudgeClusters.objects.create(cluster_name="Cluster A", cluster_type="preliminary")
+        championship = JudgeClusters.objects.create(cluster_name="Championship", cluster_type="championship")
+        redesign = JudgeClusters.objects.create(cluster_name="Redesign", cluster_type="redesign")
+        for cluster in (all_teams, self.cluster, championship, redesign):
+            MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=cluster.id)
+
+        self.champion = self.team(
+            "Champions", preliminary_total_score=250.0, total_score=270.0, advanced_to_championship=True,
+            championship_presentation_score=95.0, championship_machinedesign_score=90.0,
+            championship_penalties_score=5.0, championship_run_penalties_score=5.0,
+        )
+        self.runner_up = self.team("Runners-up", preliminary_total_score=200.0, redesign_score=40.0)
+        self.disqualified = self.team("Disqualified", preliminary_total_score=300.0, organizer_disqualified=True)
+        for team in (self.champion, self.runner_up, self.disqualified):
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+            MapClusterToTeam.objects.create(clusterid=all_teams.id, teamid=team.id)
+            MapClusterToTeam.objects.create(clusterid=self.cluster.id, teamid=team.id)
+        MapClusterToTeam.objects.create(clusterid=championship.id, teamid=self.champion.id)
+        MapClusterToTeam.objects.create(clusterid=redesign.id, teamid=self.runner_up.id)
+        MapClusterToTeam.objects.create(clusterid=redesign.id, teamid=self.disqualified.id)
+
+        self.judge = Judge.objects.create(
+            first_name="Jo", last_name="Judge", phone_number="555", contestid=self.contest.id, journal=True,
+        )
+        MapJudgeToCluster.objects.create(judgeid=self.judge.id, clusterid=self.cluster.id, contestid=self.contest.id)
+        self.sheet = self.score_sheet(self.judge, self.runner_up, field1=8.5, field9='Nice, "clean" build')
+        # A judge no longer in any of the contest's clusters
+        former = Judge.objects.create(first_name="Former", last_name="Judge", phone_number="555", contestid=self.contest.id)
+        self.score_sheet(former, self.runner_up, field1=1.0)
+
+    def team(self, name, **scores):
+        return Teams.objects.create(
+            team_name=name, school_name="Mankato East", preliminary_presentation_score=100.0,
+            preliminary_journal_score=90.0, preliminary_machinedesign_score=80.0, **scores,
+        )
+
+    def score_sheet(self, judge, team, **fields):
+        sheet = Scoresheet.objects.create(sheetType=ScoresheetEnum.JOURNAL, isSubmitted=False, **fields)
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=team.id, judgeid=judge.id, scoresheetid=sheet.id, sheetType=ScoresheetEnum.JOURNAL,
+        )
+        return sheet
+
+    def export(self, **params):
+        response = self.client.get(reverse("export_results", args=[self.contest.id]), params)
+        if response.streaming:
+            response.content_bytes = b"".join(response.streaming_content)
+        return response
+
+    def test_preliminary_csv(self):
+        response = self.export()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn(f'filename="contest-{self.contest.id}-preliminary.csv"', response["Content-Disposition"])
+        header, *rows = read_csv(response.content_bytes)
+        self.assertEqual(header[:4], ["Rank", "Cluster", "Team ID", "Team"])
+        self.assertEqual(
+            [(row[0], row[1], row[3], row[8], row[9]) for row in rows],
+            [
+                ("1", "Cluster A", "Champions", "20.0", "250.0"),
+                ("2", "Cluster A", "Runners-up", "70.0", "200.0"),
+                # Disqualified teams are listed last, without a rank
+                ("", "Cluster A", "Disqualified", "-30.0", "300.0"),
+            ],
+        )
+
+    def test_championship_and_redesign_csv(self):
+        header, *rows = read_csv(self.export(report="championship").content_bytes)
+        self.assertEqual(len(header), 11)
+        self.assertEqual(rows, [["1", str(self.champion.id), "Champions", "Mankato East", "90.0", "95.0", "90.0",
+                                 "0.0", "5.0", "5.0", "270.0"]])
+
+        _, *rows = read_csv(self.export(report="redesign").content_bytes)
+        self.assertEqual([(row[0], row[2], row[4]) for row in rows], [("1", "Runners-up", "40.0"), ("", "Disqualified", "0.0")])
+
+    def test_sheets_csv(self):
+        header, *rows = read_csv(self.export(report="sheets").content_bytes)
+        self.assertEqual(len(header), 49)
+        # Only judges still assigned to the contest's clusters
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row[:7], [str(self.sheet.id), str(self.runner_up.id), "Runners-up", str(self.judge.id),
+                                   "Jo Judge", "Journal", "False"])
+        self.assertEqual(row[7], "8.5")
+        self.assertEqual(row[15], 'Nice, "clean" build')
+        self.assertEqual(row[16], "")
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_small_chunks(self):
+        for n in range(3):
+            self.score_sheet(self.judge, self.champion, field1=float(n))
+        _, *rows = read_csv(self.export(report="sheets").content_bytes)
+        self.assertEqual([row[2] for row in rows], ["Champions"] * 3 + ["Runners-up"])
+        _, *rows = read_csv(self.export().content_bytes)
+        self.assertEqual(len(rows), 3)
+
+    def test_xlsx_workbook(self):
+        response = self.export(format="xlsx")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        self.assertIn(f'filename="contest-{self.contest.id}-results.xlsx"', response["Content-Disposition"])
+        sheets = read_xlsx(response.content_bytes)
+        self.assertEqual(list(sheets), ["Preliminary", "Championship", "Redesign", "Score Sheets"])
+        self.assertEqual([row[3] for row in sheets["Preliminary"][1:]], ["Champions", "Runners-up", "Disqualified"])
+        self.assertEqual(sheets["Championship"][1][2], "Champions")
+        self.assertEqual(sheets["Score Sheets"][1][15], 'Nice, "clean" build')
+
+        sheets = read_xlsx(self.export(format="xlsx", report="redesign").content_bytes)
+        self.assertEqual(list(sheets), ["Redesign"])
+
+    def test_admin_can_export(self):
+        admin_user = User.objects.create_user(username="admin@example.com", password="testpassword")
+        admin = Admin.objects.create(first_name="Test", last_name="Admin")
+        MapUserToRole.objects.create(uuid=admin_user.id, role=MapUserToRole.RoleEnum.ADMIN, relatedid=admin.id)
+        self.client.login(username="admin@example.com", password="testpassword")
+        self.assertEqual(self.export().status_code, status.HTTP_200_OK)
+
+    def test_other_organizer_forbidden(self):
+        other = User.objects.create_user(username="other@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Other", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=other.id, role=MapUserToRole.RoleEnum.ORGANIZER, relatedid=organizer.id)
+        self.client.login(username="other@example.com", password="testpassword")
+        self.assertEqual(self.export().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bad_requests(self):
+        response = self.export(report="everything")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(b"report must be one of", response.content)
+        response = self.client.get(reverse("export_results", args=[self.contest.id + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.logout()
+        self.assertIn(self.export().status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("export_results", self.contest.id, "--report", "championship", stdout=out)
+        _, *rows = read_csv(out.getvalue().encode())
+        self.assertEqual([row[2] for row in rows], ["Champions"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.xlsx")
+            out = io.StringIO()
+            call_command("export_results", self.contest.id, "--format", "xlsx", "--output", path, stdout=out)
+            self.assertIn("Wrote preliminary, championship, redesign, sheets", out.getvalue())
+            with open(path, "rb") as f:
+                self.assertEqual(len(read_xlsx(f.read())), 4)
+
+        with self.assertRaises(CommandError):
+            call_command("export_results", self.contest.id, "--format", "xlsx")
+        with self.assertRaises(CommandError):
+            call_command("export_results", self.contest.id + 100)
@@ -0,0 +1,86 @@
+"""
+Tests for ?fields= / ?exclude= sparse fieldsets on team and scoresheet endpoints
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Judge, MapScoresheetToTeamJudge, Scoresheet, ScoresheetEnum, Teams
+from ..serializers import ScoresheetSerializer, TeamSerializer
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.team = Teams.objects.create(
+            team_name="Team A", journal_score=10.0, presentation_score=20.0, machinedesign_score=30.0,
+            penalties_score=0.0, redesign_score=0.0, total_score=60.0, championship_score=0.0, team_rank=1,
+        )
+        self.judge = Judge.objects.create(
+            first_name="Test", last_name="Judge", phone_number="1234567890", contestid=1,
+            presentation=True, mdo=False, journal=False, runpenalties=False, otherpenalties=False,
+        )
+        self.sheet = Scoresheet.objects.create(
+            sheetType=ScoresheetEnum.PRESENTATION, isSubmitted=False,
+            field1=1.0, field2=2.0, field3=3.0, field4=4.0, field5=5.0, field6=6.0, field7=7.0, field8=8.0,
+            field9="Nice work",
+        )
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=self.team.id, judgeid=self.judge.id, scoresheetid=self.sheet.id,
+            sheetType=ScoresheetEnum.PRESENTATION,
+        )
+
+    def test_serializer_fields_and_exclude(self):
+        data = TeamSerializer(self.team, fields=["team_name", "team_rank"]).data
+        self.assertEqual(set(data), {"id", "team_name", "team_rank"})
+
+        data = ScoresheetSerializer(self.sheet, exclude=["field9", "id"]).data
+        self.assertNotIn("field9", data)
+        self.assertIn("id", data)
+        self.assertIn("field1", data)
+
+    def test_list_fetches_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("get_all_teams"), {"fields": "team_name,team_rank"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["teams"], [{"id": self.team.id, "team_name": "Team A", "team_rank": 1}])
+
+        team_queries = [q["sql"] for q in queries.captured_queries
+                        if q["sql"].startswith("SELECT") and Teams._meta.db_table in q["sql"]]
+        self.assertTrue(team_queries)
+        self.assertNotIn("journal_score", team_queries[-1])
+
+    def test_exclude(self):
+        response = self.client.get(reverse("team_by_id", args=[self.team.id]), {"exclude": "journal_score"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("journal_score", response.data["Team"])
+        self.assertEqual(response.data["Team"]["total_score"], 60.0)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("get_all_teams"), {"fields": "team_name,bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("bogus", response.data["detail"])
+
+        response = self.client.get(reverse("scores_by_id", args=[self.sheet.id]), {"exclude": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse("teams_by_judge_async", args=[self.judge.id]), {"fields": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sheets_by_judge_keep_total(self):
+        for name in ("score_sheets_by_judge", "score_sheets_by_judge_async"):
+            response = self.client.get(reverse(name, args=[self.judge.id]), {"fields": "isSubmitted"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            entry = json.loads(response.content)["ScoreSheets"][0]
+            self.assertEqual(entry["scoresheet"], {"id": self.sheet.id, "isSubmitted": False})
+            self.assertEqual(entry["total"], 36.0)
+
+    def test_no_parameters_returns_every_field(self):
+        response = self.client.get(reverse("scores_by_id", args=[self.sheet.id]))
+        self.assertEqual(response.data["ScoreSheet"], ScoresheetSerializer(self.sheet).data)
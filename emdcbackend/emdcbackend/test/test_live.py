@@ -0,0 +1,326 @@
+"""
+Tests for the live standings and judging-progress feeds and their
+server-sent event streams
+"""
+import json
+from datetime import date
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import broadcast
+from ..broadcast import LocalBroadcaster, PostgresBroadcaster
+from ..models import (
+    Contest, Judge, MapContestToOrganizer, MapContestToTeam, MapScoresheetToTeamJudge, MapUserToRole, Organizer,
+    Scoresheet, ScoresheetEnum, Teams,
+)
+from ..views import live
+from ..views.live import progress_feed, standings_feed
+
+
+def make_team(name, total):
+    return Teams.objects.create(
+        team_name=name, journal_score=0.0, presentation_score=0.0, machinedesign_score=0.0,
+        penalties_score=0.0, redesign_score=0.0, total_score=total, championship_score=0.0,
+    )
+
+
+def parse_events(chunks):
+    events = []
+    for block in b"".join(chunks).decode().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if line.startswith(("event", "data")))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class StandingsFeedTests(APITestCase):
+    def setUp(self):
+        patcher = mock.patch.object(broadcast, "_broadcaster", LocalBroadcaster())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.async_client.force_login(self.user)
+        self.organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=2, relatedid=self.organizer.id)
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=self.organizer.id)
+        self.teams = [make_team("Team A", 100.0), make_team("Team B", 90.0)]
+        for team in self.teams:
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+
+    def subscribe(self):
+        sub = standings_feed.subscribe(self.contest.id)
+        self.addCleanup(standings_feed.unsubscribe, sub)
+        return sub
+
+    def test_snapshot_then_delta_of_changed_rows(self):
+        sub = self.subscribe()
+        event, data = sub.get(timeout=1)
+        self.assertEqual(event, "snapshot")
+        self.assertEqual({row["team_name"] for row in data["rows"]}, {"Team A", "Team B"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Teams.objects.filter(id=self.teams[1].id).update(total_score=120.0)
+            standings_feed.notify(self.contest.id)
+
+        event, data = sub.get(timeout=1)
+        self.assertEqual(event, "delta")
+        self.assertEqual([(row["id"], row["total_score"]) for row in data["changed"]], [(self.teams[1].id, 120.0)])
+        self.assertEqual(data["removed"], [])
+
+    def test_no_event_when_nothing_changed(self):
+        sub = self.subscribe()
+        sub.get(timeout=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            standings_feed.notify(self.contest.id)
+        self.assertIsNone(sub.get(timeout=0.05))
+
+    def test_rolled_back_change_is_not_pushed(self):
+        sub = self.subscribe()
+        sub.get(timeout=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    standings_feed.notify(self.contest.id)
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertIsNone(sub.get(timeout=0.05))
+
+    def test_viewers_share_one_computation(self):
+        subs = [self.subscribe() for _ in range(3)]
+        with mock.patch.object(standings_feed, "compute", wraps=standings_feed.compute) as compute:
+            with self.captureOnCommitCallbacks(execute=True):
+                Teams.objects.filter(id=self.teams[0].id).update(total_score=50.0)
+                standings_feed.notify(self.contest.id)
+        self.assertEqual(compute.call_count, 1)
+        for sub in subs:
+            sub.get(timeout=1)
+            self.assertEqual(sub.get(timeout=1)[0], "delta")
+
+    def test_set_advancers_pushes_update(self):
+        sub = self.subscribe()
+        sub.get(timeout=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                reverse("set_advancers"), {"contestid": self.contest.id, "team_ids": [self.teams[0].id]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event, data = sub.get(timeout=1)
+        self.assertEqual(event, "delta")
+        self.assertEqual([row["advanced_to_championship"] for row in data["changed"]], [True])
+
+    @override_settings(LIVE_STREAM_MAX_SECONDS=0)
+    def test_sync_stream(self):
+        response = self.client.get(reverse("standings_stream", args=[self.contest.id]), HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = parse_events(response.streaming_content)
+        self.assertEqual([event for event, _ in events], ["snapshot"])
+        self.assertEqual(len(events[0][1]["rows"]), 2)
+        # The viewer is gone once the stream ends
+        self.assertFalse(standings_feed.has_subscribers(self.contest.id))
+
+    @override_settings(LIVE_STREAM_MAX_SECONDS=0, LIVE_SYNC_STREAMS_PER_WORKER=1)
+    def test_sync_streams_per_worker_are_capped(self):
+        url = reverse("standings_stream", args=[self.contest.id])
+        first = self.client.get(url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        refused = self.client.get(url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(refused.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(refused["Retry-After"], "15")
+        self.assertTrue(refused.content.startswith(b"event: error\n"))
+
+        # Closing the open stream, even unread, frees its slot. Closing fires
+        # request_finished; keep it from closing the test's connection, as the
+        # test client does.
+        request_finished.disconnect(close_old_connections)
+        try:
+            first.close()
+        finally:
+            request_finished.connect(close_old_connections)
+        response = self.client.get(url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event for event, _ in parse_events(response.streaming_content)], ["snapshot"])
+        self.assertEqual(live._sync_streams, 0)
+
+    def test_stream_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("standings_stream", args=[self.contest.id]), HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(LIVE_STREAM_MAX_SECONDS=0)
+    async def test_async_stream(self):
+        response = await self.async_client.get(reverse("standings_stream_async", args=[self.contest.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        chunks = [chunk async for chunk in response.streaming_content]
+        events = parse_events(chunks)
+        self.assertEqual([event for event, _ in events], ["snapshot"])
+
+
+SHEET_FIELDS = {f"field{i}": 0 for i in range(1, 18) if i != 9}
+
+
+class ProgressFeedTests(APITestCase):
+    def setUp(self):
+        patcher = mock.patch.object(broadcast, "_broadcaster", LocalBroadcaster())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        self.judge = Judge.objects.create(first_name="Jane", last_name="Judge", phone_number="555", contestid=self.contest.id)
+        self.idle_judge = Judge.objects.create(first_name="Idle", last_name="Judge", phone_number="555", contestid=self.contest.id)
+        self.teams = [make_team("Team A", 0.0), make_team("Team B", 0.0)]
+        self.sheets = {}
+        for team in self.teams:
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+            for sheet_type in (ScoresheetEnum.PRESENTATION, ScoresheetEnum.RUNPENALTIES):
+                sheet = Scoresheet.objects.create(sheetType=sheet_type, isSubmitted=False, **SHEET_FIELDS)
+                MapScoresheetToTeamJudge.objects.create(
+                    teamid=team.id, judgeid=self.judge.id, scoresheetid=sheet.id, sheetType=sheet_type
+                )
+                self.sheets[team.id, sheet_type] = sheet
+
+    def subscribe(self):
+        sub = progress_feed.subscribe(self.contest.id)
+        self.addCleanup(progress_feed.unsubscribe, sub)
+        return sub
+
+    def counts(self, rows):
+        return {row["id"]: (row["submitted"], row["total"]) for row in rows}
+
+    def test_snapshot_counts(self):
+        Scoresheet.objects.filter(id=self.sheets[self.teams[0].id, ScoresheetEnum.PRESENTATION].id).update(isSubmitted=True)
+        response = self.client.get(reverse("progress_snapshot", args=[self.contest.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.json()["rows"]
+        team_a, team_b = self.teams
+        self.assertEqual(self.counts(rows), {
+            f"judge:{self.judge.id}": (1, 4),
+            f"judge:{self.idle_judge.id}": (0, 0),
+            f"team:{team_a.id}": (1, 2),
+            f"team:{team_b.id}": (0, 2),
+            f"cell:{self.judge.id}:{team_a.id}": (1, 2),
+            f"cell:{self.judge.id}:{team_b.id}": (0, 2),
+            "contest": (1, 4),
+        })
+        self.assertFalse(next(row for row in rows if row["id"] == "contest")["complete"])
+
+    def test_missing_scoresheet_counts_as_not_submitted(self):
+        Scoresheet.objects.filter(id=self.sheets[self.teams[0].id, ScoresheetEnum.PRESENTATION].id).delete()
+        Scoresheet.objects.update(isSubmitted=True)
+        rows = self.counts(progress_feed.current(self.contest.id).values())
+        self.assertEqual(rows["contest"], (3, 4))
+
+    def test_update_scores_pushes_changed_rows(self):
+        sub = self.subscribe()
+        self.assertEqual(sub.get(timeout=1)[0], "snapshot")
+        team_a = self.teams[0]
+        sheet = self.sheets[team_a.id, ScoresheetEnum.PRESENTATION]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("update_scores"), {"id": sheet.id, "isSubmitted": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        event, data = sub.get(timeout=1)
+        self.assertEqual(event, "delta")
+        self.assertEqual(self.counts(data["changed"]), {
+            f"judge:{self.judge.id}": (1, 4),
+            f"team:{team_a.id}": (1, 2),
+            f"cell:{self.judge.id}:{team_a.id}": (1, 2),
+            "contest": (1, 4),
+        })
+
+    def test_saving_without_submitting_pushes_nothing(self):
+        sub = self.subscribe()
+        sub.get(timeout=1)
+        sheet = self.sheets[self.teams[0].id, ScoresheetEnum.PRESENTATION]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("update_scores"), {"id": sheet.id, "field1": 5}, format="json")
+        self.assertIsNone(sub.get(timeout=0.05))
+
+    def test_submit_all_penalties_pushes_update(self):
+        sub = self.subscribe()
+        sub.get(timeout=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("submit_all_penalty_sheets_for_judge"), {"judge_id": self.judge.id}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event, data = sub.get(timeout=1)
+        self.assertEqual(event, "delta")
+        self.assertEqual(self.counts(data["changed"])["contest"], (2, 4))
+
+    def test_contest_complete(self):
+        Scoresheet.objects.update(isSubmitted=True)
+        contest = progress_feed.current(self.contest.id)["contest"]
+        self.assertEqual((contest["submitted"], contest["total"], contest["complete"]), (4, 4, True))
+
+    @override_settings(LIVE_STREAM_MAX_SECONDS=0)
+    def test_sync_stream(self):
+        response = self.client.get(reverse("progress_stream", args=[self.contest.id]), HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = parse_events(response.streaming_content)
+        self.assertEqual([event for event, _ in events], ["snapshot"])
+        self.assertEqual(len(events[0][1]["rows"]), 7)
+
+
+class PostgresConninfoTests(SimpleTestCase):
+    def test_conninfo_keeps_database_options(self):
+        from ..db.postgresql.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper({
+            "NAME": "emdc", "USER": "emdc", "PASSWORD": "secret", "HOST": "db.example.com", "PORT": "5432",
+            "OPTIONS": {"sslmode": "require", "application_name": "emdc", "pool": {"max_size": 4}},
+            "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "AUTOCOMMIT": True, "TIME_ZONE": None,
+        })
+        with mock.patch.object(broadcast, "connections", {"default": wrapper}):
+            conninfo = PostgresBroadcaster()._conninfo()
+        self.assertEqual(
+            {key: conninfo[key] for key in ("dbname", "user", "password", "host", "port", "sslmode", "application_name")},
+            {"dbname": "emdc", "user": "emdc", "password": "secret", "host": "db.example.com", "port": "5432",
+             "sslmode": "require", "application_name": "emdc"},
+        )
+        self.assertNotIn("pool", conninfo)
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY needs Postgres")
+class PostgresBroadcastTests(TransactionTestCase):
+    def test_notify_reaches_listener_after_commit(self):
+        broadcaster = PostgresBroadcaster()
+        patcher = mock.patch.object(broadcast, "_broadcaster", broadcaster)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(broadcaster.stop)
+
+        contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        team = make_team("Team A", 100.0)
+        MapContestToTeam.objects.create(contestid=contest.id, teamid=team.id)
+
+        sub = standings_feed.subscribe(contest.id)
+        self.addCleanup(standings_feed.unsubscribe, sub)
+        self.assertEqual(sub.get(timeout=5)[0], "snapshot")
+
+        with transaction.atomic():
+            Teams.objects.filter(id=team.id).update(total_score=150.0)
+            standings_feed.notify(contest.id)
+
+        # The listener may also refresh once when it connects; wait for the change
+        for _ in range(3):
+            event = sub.get(timeout=10)
+            self.assertIsNotNone(event)
+            if event[0] == "delta" and event[1]["changed"][0]["total_score"] == 150.0:
+                break
+        else:
+            self.fail("standings delta was not pushed")
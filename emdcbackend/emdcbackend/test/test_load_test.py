@@ -0,0 +1,147 @@
+"""
+Tests for the synthetic load generator (load_test command)
+"""
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from unittest import skipUnless
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase
+
+from ..loadgen import LoadStats, percentile, read_request_log
+from ..models import (
+    Contest, ContestDeletion, Judge, MapScoresheetToTeamJudge, MapUserToRole, Organizer, RoleSharedPassword,
+    Scoresheet, Teams,
+)
+
+SMALL = ['--force', '--judges', '2', '--teams', '4', '--clusters', '2', '--concurrency', '1', '--autosaves', '1']
+
+
+def load_test(*args):
+    out = io.StringIO()
+    with redirect_stdout(io.StringIO()):
+        call_command('load_test', *args, stdout=out)
+    return out.getvalue()
+
+
+def write_log(lines):
+    handle, path = tempfile.mkstemp(suffix='.jsonl')
+    with os.fdopen(handle, 'w') as log:
+        log.write('\n'.join(json.dumps(line) for line in lines))
+    return path
+
+
+class LoadStatsTests(TestCase):
+    def test_percentiles(self):
+        values = [n / 1000 for n in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 0.05)
+        self.assertEqual(percentile(values, 99), 0.099)
+        self.assertEqual(percentile([0.2], 95), 0.2)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_rows(self):
+        stats = LoadStats()
+        for n in range(1, 11):
+            stats.record('fast', n / 1000)
+        stats.record('slow', 1.0, error='PUT /x: 500')
+        stats.stop()
+        rows = {row['route']: row for row in stats.rows()}
+        self.assertEqual(list(rows), ['slow', 'fast', 'TOTAL'])
+        self.assertEqual((rows['fast']['requests'], rows['fast']['errors'], rows['fast']['p50_ms']), (10, 0, 5.0))
+        self.assertEqual((rows['TOTAL']['requests'], rows['TOTAL']['errors']), (11, 1))
+        self.assertAlmostEqual(rows['TOTAL']['error_rate'], 1 / 11)
+        self.assertEqual(stats.first_errors, {'slow': 'PUT /x: 500'})
+
+    def test_read_request_log(self):
+        entries = read_request_log(['{"method": "get", "path": "/api/contest/getAll/"}', '',
+                                    '{"method": "PUT", "path": "/x/", "body": {"a": 1}, "offset": 2.5}'])
+        self.assertEqual(entries, [
+            {'method': 'GET', 'path': '/api/contest/getAll/', 'body': None, 'offset': 0.0},
+            {'method': 'PUT', 'path': '/x/', 'body': {'a': 1}, 'offset': 2.5},
+        ])
+        with self.assertRaisesMessage(ValueError, 'line 1'):
+            read_request_log(['{"path": "/x/"}'])
+
+
+class LoadTestCommandTests(TestCase):
+    def assertNothingLeft(self):
+        self.assertFalse(Contest.all_objects.exists())
+        for model in (Teams, Judge, Organizer, Scoresheet, MapScoresheetToTeamJudge, MapUserToRole, User,
+                      RoleSharedPassword):
+            self.assertFalse(model.objects.exists(), model.__name__)
+
+    def test_contest_day_scenario(self):
+        output = load_test(*SMALL, '--organizers', '0')
+        # 2 judges x 2 teams x 3 sheet types
+        self.assertIn('12 score sheets', output)
+        for route in ('login', 'score_sheets_by_judge', 'update_scores', 'tabulate_scores',
+                      'preliminary_results', 'advance_to_championship', 'TOTAL'):
+            self.assertIn(route, output)
+        self.assertIn('0.0% errors', output)
+        self.assertNothingLeft()
+        self.assertEqual(ContestDeletion.objects.get().status, ContestDeletion.STATUS_DONE)
+
+    def test_keep_and_json_report(self):
+        path = write_log([])
+        load_test(*SMALL, '--organizers', '0', '--autosaves', '0', '--keep', '--json', path)
+        with open(path) as report:
+            routes = {row['route']: row for row in json.load(report)['routes']}
+        os.remove(path)
+        # Submits only
+        self.assertEqual(routes['update_scores']['requests'], 12)
+        self.assertEqual(routes['TOTAL']['errors'], 0)
+        self.assertEqual(Scoresheet.objects.filter(isSubmitted=True).count(), 12)
+        self.assertTrue(Teams.objects.filter(advanced_to_championship=True).exists())
+
+    def test_replay_fills_placeholders(self):
+        path = write_log([
+            {'method': 'GET', 'path': '/api/contest/get/{contest}/'},
+            {'method': 'PUT', 'path': '/api/tabulation/preliminaryResults/', 'body': {'contestid': '{contest}'}},
+            {'method': 'GET', 'path': '/api/team/get/{team}/'},
+            {'method': 'GET', 'path': '/api/no/such/route/'},
+        ])
+        output = load_test(*SMALL, '--replay', path, '--speed', '0')
+        os.remove(path)
+        self.assertIn('Replaying 4 requests', output)
+        for route in ('contest_by_id', 'preliminary_results', 'team_by_id', 'unmatched'):
+            self.assertIn(route, output)
+        self.assertIn('5 requests', output)  # and the login
+        self.assertIn('20.0% errors', output)
+        self.assertNothingLeft()
+
+    def test_guards(self):
+        with self.assertRaisesMessage(CommandError, '--force'):
+            load_test('--judges', '1')
+        RoleSharedPassword.objects.create(role=MapUserToRole.RoleEnum.JUDGE, password_hash=make_password('secret'))
+        with self.assertRaisesMessage(CommandError, '--password'):
+            load_test(*SMALL)
+        self.assertFalse(Contest.all_objects.exists())
+
+        load_test(*SMALL, '--organizers', '0', '--password', 'secret')
+        # A shared password the run did not set is kept
+        self.assertTrue(RoleSharedPassword.objects.filter(role=MapUserToRole.RoleEnum.JUDGE).exists())
+
+
+@skipUnless(connection.vendor == "postgresql", "the live server thread shares SQLite's in-memory test database")
+class LoadTestHTTPTests(LiveServerTestCase):
+    def test_replay_over_http(self):
+        path = write_log([
+            {'method': 'GET', 'path': '/api/live/progress/{contest}/snapshot/'},
+            # Unsafe methods need the session's CSRF token
+            {'method': 'PUT', 'path': '/api/tabulation/tabulateScores/', 'body': {'contestid': '{contest}'}},
+            {'method': 'POST', 'path': '/api/scoreSheet/edit/updateScores/',
+             'body': {'id': '{sheet}', 'isSubmitted': False, 'field1': 3}},
+        ])
+        output = load_test(*SMALL, '--url', self.live_server_url, '--replay', path, '--speed', '0')
+        os.remove(path)
+        for route in ('login', 'progress_snapshot', 'tabulate_scores', 'update_scores'):
+            self.assertIn(route, output)
+        self.assertIn('4 requests', output)
+        self.assertIn('0.0% errors', output)
@@ -1,13 +1,18 @@
 """
 Tests for Django management commands
 """
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.management import call_command
 from io import StringIO
 from datetime import date
 from ..models import (
     Contest, MapContestToJudge, MapContestToTeam,
-    MapContestToOrganizer, MapContestToCluster, Judge, Teams, Organizer, JudgeClusters
+    MapContestToOrganizer, MapContestToCluster, Judge, Teams, Organizer, JudgeClusters,
+    MapJudgeToCluster, MapScoresheetToTeamJudge, MapUserToRole, Scoresheet, ScoresheetEnum,
+    Ballot, Votes, MapBallotToVote, MapTeamToVote
 )
 
 
@@ -104,3 +109,117 @@ class CleanupOrphanedMappingsCommandTests(TestCase):
         self.assertIn('Successfully removed', output)
         self.assertFalse(MapContestToJudge.objects.filter(id=valid_mapping.id).exists())
 
+
+class IntegritySweepTests(TestCase):
+    """Test the orphan checks beyond contest mappings"""
+
+    def setUp(self):
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        self.judge = Judge.objects.create(first_name="Test", last_name="Judge", phone_number="1", contestid=self.contest.id)
+        self.team = Teams.objects.create(team_name="Test Team")
+        self.user = User.objects.create_user(username="judge@example.com", password="testpassword")
+        self.role = MapUserToRole.objects.create(
+            uuid=self.user.id, role=MapUserToRole.RoleEnum.JUDGE, relatedid=self.judge.id,
+        )
+        self.sheet = self.make_sheet(self.team.id, self.judge.id)
+
+    def make_sheet(self, team_id, judge_id):
+        sheet = Scoresheet.objects.create(sheetType=ScoresheetEnum.JOURNAL, isSubmitted=False)
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=team_id, judgeid=judge_id, scoresheetid=sheet.id, sheetType=ScoresheetEnum.JOURNAL,
+        )
+        return sheet
+
+    def cleanup(self, *args):
+        out = StringIO()
+        call_command('cleanup_orphaned_mappings', *args, stdout=out)
+        return out.getvalue()
+
+    def make_orphans(self):
+        # A mapping to a sheet that is gone, and a sheet nothing maps to
+        MapScoresheetToTeamJudge.objects.create(
+            teamid=self.team.id, judgeid=self.judge.id, scoresheetid=99999, sheetType=ScoresheetEnum.JOURNAL,
+        )
+        Scoresheet.objects.create(sheetType=ScoresheetEnum.JOURNAL, isSubmitted=False)
+        # A sheet whose team is gone goes with its mapping
+        self.make_sheet(99999, self.judge.id)
+        # Role mappings to a missing profile and a missing user
+        MapUserToRole.objects.create(uuid=self.user.id, role=MapUserToRole.RoleEnum.COACH, relatedid=99999)
+        MapUserToRole.objects.create(uuid=99999, role=MapUserToRole.RoleEnum.JUDGE, relatedid=self.judge.id)
+        # Votes
+        ballot = Ballot.objects.create(contestid=self.contest.id)
+        vote = Votes.objects.create(votedteamid=self.team.id)
+        MapBallotToVote.objects.create(ballotid=ballot.id, voteid=vote.id)
+        MapBallotToVote.objects.create(ballotid=99999, voteid=vote.id)
+        MapTeamToVote.objects.create(teamid=self.team.id, voteid=99999)
+
+    def test_sweep_removes_every_kind_of_orphan(self):
+        self.make_orphans()
+        output = self.cleanup()
+
+        self.assertIn('MapScoresheetToTeamJudge.scoresheetid -> Scoresheet: 1', output)
+        self.assertIn('MapScoresheetToTeamJudge.teamid -> Teams: 1', output)
+        self.assertIn('Scoresheet without a MapScoresheetToTeamJudge: 2', output)
+        self.assertIn('MapUserToRole.relatedid -> Coach: 1', output)
+        self.assertIn('MapUserToRole.uuid -> User: 1', output)
+        self.assertIn('MapBallotToVote.ballotid -> Ballot: 1', output)
+        self.assertIn('MapTeamToVote.voteid -> Votes: 1', output)
+        self.assertIn('Successfully removed 8 orphaned mappings', output)
+
+        self.assertEqual(list(Scoresheet.objects.values_list('id', flat=True)), [self.sheet.id])
+        self.assertEqual(list(MapScoresheetToTeamJudge.objects.values_list('scoresheetid', flat=True)), [self.sheet.id])
+        self.assertEqual(list(MapUserToRole.objects.values_list('id', flat=True)), [self.role.id])
+        self.assertEqual(MapBallotToVote.objects.count(), 1)
+        self.assertFalse(MapTeamToVote.objects.exists())
+        self.assertIn('No orphaned mappings found', self.cleanup())
+
+    def test_dry_run_only_counts(self):
+        self.make_orphans()
+        output = self.cleanup('--dry-run', '--verbosity', '2')
+        self.assertIn('DRY RUN: Would remove', output)
+        self.assertIn('MapContestToTeam.teamid -> Teams: 0', output)
+        self.assertIn('MapTeamToVote.voteid -> Votes: 1', output)
+        self.assertEqual(MapTeamToVote.objects.count(), 1)
+        self.assertEqual(Scoresheet.objects.count(), 3)
+
+    def test_deletes_in_batches(self):
+        for _ in range(5):
+            Scoresheet.objects.create(sheetType=ScoresheetEnum.JOURNAL, isSubmitted=False)
+        with CaptureQueriesContext(connection) as ctx:
+            output = self.cleanup('--batch-size', '2')
+        self.assertIn('Successfully removed 5 orphaned mappings', output)
+        deletes = [q for q in ctx.captured_queries
+                   if q['sql'].startswith(f'DELETE FROM "{Scoresheet._meta.db_table}"')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(list(Scoresheet.objects.values_list('id', flat=True)), [self.sheet.id])
+
+
+class CleanupOrphanedJudgeMappingsCommandTests(TestCase):
+    """Test the cleanup_orphaned_judge_mappings management command"""
+
+    def setUp(self):
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        self.other = Contest.objects.create(name="Other Contest", date=date.today(), is_open=True, is_tabulated=False)
+        self.cluster = JudgeClusters.objects.create(cluster_name="Test Cluster")
+        MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=self.cluster.id)
+        self.judge = Judge.objects.create(first_name="Test", last_name="Judge", phone_number="1", contestid=self.contest.id)
+        MapJudgeToCluster.objects.create(judgeid=self.judge.id, clusterid=self.cluster.id, contestid=self.contest.id)
+        self.kept = MapContestToJudge.objects.create(contestid=self.contest.id, judgeid=self.judge.id)
+        # In a cluster, but not one of the other contest's
+        self.orphan = MapContestToJudge.objects.create(contestid=self.other.id, judgeid=self.judge.id)
+
+    def cleanup(self, *args):
+        out = StringIO()
+        call_command('cleanup_orphaned_judge_mappings', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run(self):
+        output = self.cleanup('--dry-run')
+        self.assertIn(f'Mapping ID: {self.orphan.id}', output)
+        self.assertIn('DRY RUN: Would delete 1 orphaned mappings', output)
+        self.assertEqual(MapContestToJudge.objects.count(), 2)
+
+    def test_removes_judges_outside_contest_clusters(self):
+        self.assertIn('Successfully deleted 1 orphaned MapContestToJudge entries', self.cleanup())
+        self.assertEqual(list(MapContestToJudge.objects.values_list('id', flat=True)), [self.kept.id])
+        self.assertIn('No orphaned mappings found', self.cleanup())
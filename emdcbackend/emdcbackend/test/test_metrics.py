@@ -0,0 +1,176 @@
+"""
+Tests for per-request SQL/latency metrics, the slow request log and the
+Prometheus endpoint
+"""
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import metrics
+from ..models import Admin, Contest, MapUserToRole, Teams
+
+
+def series(histogram, labels):
+    """(count, sum) observed so far for `labels`."""
+    values = histogram._values.get(labels)
+    if values is None:
+        return 0, 0
+    return sum(values[:-1]), values[-1]
+
+
+class RequestStatsTests(TestCase):
+    def test_queries_and_duplicates_recorded_for_current_request(self):
+        stats, token = metrics.start_request()
+        try:
+            for _ in range(3):
+                list(Teams.objects.filter(team_name="A"))
+            Contest.objects.count()
+        finally:
+            metrics.end_request(token)
+
+        self.assertEqual(stats.queries, 4)
+        self.assertEqual(stats.duplicates, 2)
+        [(count, sql)] = stats.top_repeated(5)
+        self.assertEqual(count, 3)
+        self.assertIn(Teams._meta.db_table, sql)
+
+    def test_nothing_recorded_outside_requests(self):
+        stats, token = metrics.start_request()
+        metrics.end_request(token)
+        Contest.objects.count()
+        self.assertEqual(stats.queries, 0)
+
+    def test_histogram_exposition(self):
+        histogram = metrics.Histogram("test_seconds", "Test.", ("route",), (0.1, 1))
+        histogram.observe(0.05, ("a",))
+        histogram.observe(0.5, ("a",))
+        histogram.observe(5, ("a",))
+        self.assertEqual(list(histogram.samples()), [
+            'test_seconds_bucket{route="a",le="0.1"} 1',
+            'test_seconds_bucket{route="a",le="1"} 2',
+            'test_seconds_bucket{route="a",le="+Inf"} 3',
+            'test_seconds_sum{route="a"} 5.55',
+            'test_seconds_count{route="a"} 3',
+        ])
+
+
+def record_in_child():
+    metrics.REQUESTS.inc(("worker_test", "GET", "200"), 2)
+    metrics.REQUEST_SECONDS.observe(0.02, ("worker_test", "GET"))
+    metrics.flush()
+
+
+class MultiprocessMetricsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        settings = override_settings(METRICS_MULTIPROC_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_scrape_adds_up_every_worker(self):
+        # os.fork, not multiprocessing: parallel test runs are daemonic processes
+        pid = os.fork()
+        if pid == 0:
+            try:
+                record_in_child()
+                os._exit(0)
+            finally:
+                os._exit(1)
+        _, exit_status = os.waitpid(pid, 0)
+        self.assertEqual(exit_status, 0)
+
+        before = metrics.REQUESTS.snapshot().get(("worker_test", "GET", "200"), 0)
+        metrics.REQUESTS.inc(("worker_test", "GET", "200"), 3)
+        metrics.REQUEST_SECONDS.observe(0.2, ("worker_test", "GET"))
+        expected = [
+            f'emdc_http_requests_total{{route="worker_test",method="GET",status="200"}} {before + 5}',
+            'emdc_http_request_duration_seconds_count{route="worker_test",method="GET"} 2',
+        ]
+        body = metrics.render()
+        for line in expected:
+            self.assertIn(line, body)
+
+        # The exited worker's counts survive in the archive
+        metrics.mark_process_dead(pid)
+        self.assertEqual(set(os.listdir(self.directory)), {".lock", "archive.json", f"{os.getpid()}.json"})
+        body = metrics.render()
+        for line in expected:
+            self.assertIn(line, body)
+
+
+class RequestMetricsMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.async_client.force_login(self.user)
+
+    def test_request_is_recorded_under_its_route(self):
+        queries_before = series(metrics.QUERIES, ("get_all_teams",))
+        seconds_before = series(metrics.REQUEST_SECONDS, ("get_all_teams", "GET"))
+
+        response = self.client.get(reverse("get_all_teams"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        count, total = series(metrics.QUERIES, ("get_all_teams",))
+        self.assertEqual(count, queries_before[0] + 1)
+        self.assertGreater(total, queries_before[1])
+        self.assertEqual(series(metrics.REQUEST_SECONDS, ("get_all_teams", "GET"))[0], seconds_before[0] + 1)
+        self.assertGreater(series(metrics.RESPONSE_BYTES, ("get_all_teams",))[0], 0)
+
+    async def test_async_view_queries_are_counted(self):
+        before = series(metrics.QUERIES, ("championship_results_async",))
+        response = await self.async_client.get(reverse("championship_results_async"), {"contestid": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        count, total = series(metrics.QUERIES, ("championship_results_async",))
+        self.assertEqual(count, before[0] + 1)
+        self.assertGreater(total, before[1])
+
+    @override_settings(SLOW_REQUEST_SECONDS=1e-9)
+    def test_slow_request_logged(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.client.get(reverse("get_all_teams"))
+        self.assertIn("[WARN] Slow request GET /api/team/getAllTeams/ (get_all_teams)", output.getvalue())
+
+    @override_settings(SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_log_disabled(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.client.get(reverse("get_all_teams"))
+        self.assertNotIn("Slow request", output.getvalue())
+
+
+@override_settings(METRICS_TOKEN="scrape-secret")
+class MetricsEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+
+    def test_token(self):
+        self.client.get(reverse("metrics"))
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE emdc_http_request_duration_seconds histogram", body)
+        self.assertIn('emdc_http_requests_total{route="metrics",method="GET",status="403"}', body)
+
+    def test_wrong_token_or_non_admin_forbidden(self):
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_session(self):
+        admin = Admin.objects.create(first_name="Test", last_name="Admin")
+        MapUserToRole.objects.create(uuid=self.user.id, role=MapUserToRole.RoleEnum.ADMIN, relatedid=admin.id)
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_200_OK)
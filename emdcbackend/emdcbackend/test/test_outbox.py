@@ -0,0 +1,134 @@
+"""
+Tests for the transactional email outbox
+"""
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..auth import outbox
+from ..auth.outbox import LocmemTransport, queue_email, send_pending_emails
+from ..auth.password_utils import send_set_password_email
+from ..models import (
+    Contest, JudgeClusters, MapContestToCluster, MapContestToOrganizer, MapUserToRole, Organizer, OutboundEmail
+)
+
+
+class FailingTransport:
+    def send(self, email):
+        raise ConnectionError("email API unavailable")
+
+
+@override_settings(
+    EMAIL_OUTBOX_TRANSPORT="emdcbackend.auth.outbox.LocmemTransport",
+    EMAIL_OUTBOX_AUTOSEND=False,
+)
+class OutboxTests(TestCase):
+    """Test queueing and delivery of outbox emails"""
+
+    def setUp(self):
+        LocmemTransport.outbox.clear()
+        self.user = User.objects.create_user(username="newuser@example.com", password="testpassword")
+
+    def test_set_password_email_is_queued_not_sent(self):
+        send_set_password_email(self.user)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to_email, "newuser@example.com")
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(LocmemTransport.outbox, [])
+
+    def test_send_pending_emails_marks_sent(self):
+        queue_email("a@example.com", "Subject A", "<p>A</p>")
+        queue_email("b@example.com", "Subject B", "<p>B</p>")
+
+        self.assertEqual(send_pending_emails(), (2, 0))
+
+        self.assertEqual([m["to"] for m in LocmemTransport.outbox], ["a@example.com", "b@example.com"])
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+        self.assertEqual(send_pending_emails(), (0, 0))
+
+    @override_settings(
+        EMAIL_OUTBOX_TRANSPORT="emdcbackend.test.test_outbox.FailingTransport",
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+        EMAIL_OUTBOX_BACKOFF_SECONDS=30,
+    )
+    def test_failures_are_retried_with_backoff_then_marked_failed(self):
+        email = queue_email("a@example.com", "Subject", "<p>Body</p>")
+
+        self.assertEqual(send_pending_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("unavailable", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=20))
+
+        # Not due yet
+        self.assertEqual(send_pending_emails(), (0, 0))
+
+        OutboundEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        send_pending_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    def test_stale_sending_rows_are_reclaimed(self):
+        email = queue_email("a@example.com", "Subject", "<p>Body</p>")
+        OutboundEmail.objects.filter(id=email.id).update(
+            status=OutboundEmail.STATUS_SENDING,
+            next_attempt_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(send_pending_emails(), (1, 0))
+
+    @override_settings(EMAIL_OUTBOX_AUTOSEND=True)
+    def test_sender_is_woken_on_commit(self):
+        with mock.patch.object(outbox, "wake_sender") as wake:
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_email("a@example.com", "Subject", "<p>Body</p>")
+                wake.assert_not_called()
+        wake.assert_called_once()
+
+    def test_send_outbox_emails_command(self):
+        queue_email("a@example.com", "Subject", "<p>Body</p>")
+        out = StringIO()
+        call_command('send_outbox_emails', stdout=out)
+        self.assertIn('Sent 1 emails, 0 failed', out.getvalue())
+
+
+@override_settings(EMAIL_OUTBOX_AUTOSEND=False)
+class OutboxOnboardingTests(APITestCase):
+    """Creating a team queues the new coach's email instead of sending it"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="organizer@example.com", password="testpassword")
+        organizer = Organizer.objects.create(first_name="Test", last_name="Organizer")
+        MapUserToRole.objects.create(uuid=self.user.id, role=2, relatedid=organizer.id)
+        self.client.login(username="organizer@example.com", password="testpassword")
+
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        MapContestToOrganizer.objects.create(contestid=self.contest.id, organizerid=organizer.id)
+        self.cluster = JudgeClusters.objects.create(cluster_name="All Teams")
+        MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=self.cluster.id)
+
+    def test_create_team_queues_coach_email(self):
+        with mock.patch("emdcbackend.auth.outbox.send_email_via_resend") as send:
+            response = self.client.post(reverse('create_team'), {
+                'team_name': 'New Team',
+                'username': 'coach@example.com',
+                'password': 'testpassword123',
+                'first_name': 'Coach',
+                'last_name': 'Name',
+                'contestid': self.contest.id,
+                'clusterid': self.cluster.id,
+            }, format='json')
+
+        self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_201_CREATED])
+        send.assert_not_called()
+        email = OutboundEmail.objects.get(to_email="coach@example.com")
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
@@ -0,0 +1,145 @@
+"""
+Tests for cursor pagination, contest scoping and filters on the "get all" endpoints
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import (
+    Ballot, Coach, Contest, Judge, JudgeClusters, MapBallotToVote, MapCoachToTeam,
+    MapContestToCluster, MapContestToJudge, MapContestToTeam, SpecialAward, Teams, Votes
+)
+
+
+def make_team(name):
+    return Teams.objects.create(
+        team_name=name, journal_score=0.0, presentation_score=0.0, machinedesign_score=0.0,
+        penalties_score=0.0, redesign_score=0.0, total_score=0.0, championship_score=0.0,
+    )
+
+
+class ListPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser@example.com", password="testpassword")
+        self.client.login(username="testuser@example.com", password="testpassword")
+        self.contest = Contest.objects.create(name="Contest 1", date=date.today(), is_open=True, is_tabulated=False)
+        self.other = Contest.objects.create(name="Contest 2", date=date.today(), is_open=True, is_tabulated=False)
+
+        self.teams = []
+        for i in range(5):
+            team = make_team(f"Team {i}")
+            MapContestToTeam.objects.create(contestid=self.contest.id, teamid=team.id)
+            self.teams.append(team)
+        other_team = make_team("Other Team")
+        MapContestToTeam.objects.create(contestid=self.other.id, teamid=other_team.id)
+
+    def test_unpaginated_compatibility_mode(self):
+        response = self.client.get(reverse("get_all_teams"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ["teams"])
+        self.assertEqual(len(response.data["teams"]), 6)
+
+    def test_cursor_pages_cover_every_row_once(self):
+        url = reverse("get_all_teams")
+        response = self.client.get(url, {"limit": 2})
+        seen = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["teams"]), 2)
+            seen += [team["id"] for team in response.data["teams"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(seen, sorted(Teams.objects.values_list("id", flat=True)))
+
+    @override_settings(LIST_MAX_PAGE_SIZE=3)
+    def test_limit_is_capped(self):
+        response = self.client.get(reverse("get_all_teams"), {"limit": 100})
+        self.assertEqual(len(response.data["teams"]), 3)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_contest_scope_and_search(self):
+        url = reverse("get_all_teams")
+        response = self.client.get(url, {"contestid": self.contest.id})
+        self.assertEqual({t["id"] for t in response.data["teams"]}, {t.id for t in self.teams})
+
+        response = self.client.get(url, {"contestid": self.other.id, "search": "other"})
+        self.assertEqual([t["team_name"] for t in response.data["teams"]], ["Other Team"])
+
+    def test_bad_parameters(self):
+        response = self.client.get(reverse("get_all_teams"), {"contestid": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("contestid", response.data["detail"])
+
+        response = self.client.get(reverse("get_all_teams"), {"advanced": "maybe"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse("get_all_teams"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_judges_by_contest(self):
+        judges = []
+        for contest in (self.contest, self.other):
+            judge = Judge.objects.create(
+                first_name="Judge", last_name=contest.name, phone_number="1234567890", contestid=contest.id,
+                presentation=True, mdo=False, journal=False, runpenalties=False, otherpenalties=False,
+            )
+            MapContestToJudge.objects.create(contestid=contest.id, judgeid=judge.id)
+            judges.append(judge)
+        url = reverse("get_all_judges")
+        response = self.client.get(url, {"contestid": self.other.id})
+        self.assertEqual([j["last_name"] for j in response.data["Judges"]], ["Contest 2"])
+        etag = response["ETag"]
+
+        # A judge assigned to a second contest keeps the contestid it was created in
+        with self.captureOnCommitCallbacks(execute=True):
+            MapContestToJudge.objects.create(contestid=self.other.id, judgeid=judges[0].id)
+        response = self.client.get(url, {"contestid": self.other.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(j["last_name"] for j in response.data["Judges"]), ["Contest 1", "Contest 2"])
+
+    def test_coaches_and_awards_by_contest(self):
+        coach = Coach.objects.create(first_name="Coach", last_name="One")
+        Coach.objects.create(first_name="Coach", last_name="Two")
+        MapCoachToTeam.objects.create(coachid=coach.id, teamid=self.teams[0].id)
+        SpecialAward.objects.create(teamid=self.teams[0].id, award_name="Spirit", isJudge=True)
+        SpecialAward.objects.create(teamid=self.teams[1].id, award_name="Design", isJudge=False)
+
+        response = self.client.get(reverse("coach_get_all"), {"contestid": self.contest.id})
+        self.assertEqual([c["id"] for c in response.data["Coaches"]], [coach.id])
+
+        response = self.client.get(reverse("get_all_awards"), {"contestid": self.contest.id, "isJudge": "true"})
+        self.assertEqual([a["award_name"] for a in response.data["awards"]], ["Spirit"])
+        response = self.client.get(reverse("get_all_awards"), {"contestid": self.other.id})
+        self.assertEqual(response.data["awards"], [])
+
+    def test_clusters_ballots_and_votes_by_contest(self):
+        cluster = JudgeClusters.objects.create(cluster_name="Cluster A", cluster_type="preliminary")
+        JudgeClusters.objects.create(cluster_name="Cluster B", cluster_type="championship")
+        MapContestToCluster.objects.create(contestid=self.contest.id, clusterid=cluster.id)
+        ballot = Ballot.objects.create(contestid=self.contest.id)
+        Ballot.objects.create(contestid=self.other.id, isSubmitted=True)
+        vote = Votes.objects.create(votedteamid=self.teams[0].id)
+        Votes.objects.create(votedteamid=self.teams[1].id)
+        MapBallotToVote.objects.create(ballotid=ballot.id, voteid=vote.id)
+
+        response = self.client.get(reverse("clusters_get_all"), {"contestid": self.contest.id})
+        self.assertEqual([c["id"] for c in response.data["Clusters"]], [cluster.id])
+        response = self.client.get(reverse("clusters_get_all"), {"cluster_type": "championship"})
+        self.assertEqual([c["cluster_name"] for c in response.data["Clusters"]], ["Cluster B"])
+
+        response = self.client.get(reverse("get_all_ballots"), {"isSubmitted": "false"})
+        self.assertEqual([b["id"] for b in response.data["ballots"]], [ballot.id])
+
+        response = self.client.get(reverse("get_all_votes"), {"contestid": self.contest.id})
+        self.assertEqual([v["id"] for v in response.data["votes"]], [vote.id])
+
+    def test_people_lists_paginate(self):
+        for name in ("admins_get_all", "get_all_organizers"):
+            response = self.client.get(reverse(name), {"limit": 1})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("next", response.data)
@@ -0,0 +1,155 @@
+"""
+Tests for on-demand request profiling
+"""
+import cProfile
+import io
+import threading
+from contextlib import redirect_stdout
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import profiling
+from ..models import Admin, MapUserToRole, RequestProfile, Teams
+
+
+class ProfilerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="admin@example.com", password="testpassword")
+        admin = Admin.objects.create(first_name="Test", last_name="Admin")
+        MapUserToRole.objects.create(uuid=self.user.id, role=MapUserToRole.RoleEnum.ADMIN, relatedid=admin.id)
+        self.client.login(username="admin@example.com", password="testpassword")
+        Teams.objects.create(
+            team_name="Team A", journal_score=0.0, presentation_score=0.0, machinedesign_score=0.0,
+            penalties_score=0.0, redesign_score=0.0, total_score=0.0, championship_score=0.0,
+        )
+
+    def get(self, *args, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return self.client.get(*args, **kwargs)
+
+    def test_profile_stored_and_fetched(self):
+        response = self.get(reverse("get_all_teams"), HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The response itself is unchanged
+        self.assertEqual(len(response.json()["teams"]), 1)
+        profile_id = response["X-Profile-Id"]
+
+        response = self.client.get(reverse("request_profile", args=[profile_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.json()
+        self.assertEqual(report["route"], "get_all_teams")
+        self.assertEqual(report["status"], 200)
+        self.assertTrue(any("get_all_teams" in row["function"] for row in report["functions"]))
+        self.assertEqual(len(report["sql"]), report["queries"])
+        self.assertTrue(any(Teams._meta.db_table in row["sql"] for row in report["sql"]))
+
+    @override_settings(PROFILER_STORE="database")
+    def test_database_store(self):
+        profile_id = self.get(reverse("get_all_teams"), HTTP_X_PROFILE="1")["X-Profile-Id"]
+        # Another worker: nothing in its cache
+        cache.clear()
+        response = self.client.get(reverse("request_profile", args=[profile_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["route"], "get_all_teams")
+
+        # Expired reports are not served and are removed by the next save
+        RequestProfile.objects.update(expires_at=timezone.now())
+        response = self.client.get(reverse("request_profile", args=[profile_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.get(reverse("get_all_teams"), HTTP_X_PROFILE="1")
+        self.assertEqual(RequestProfile.objects.count(), 1)
+
+    @override_settings(PROFILER_STORE="cache")
+    def test_cache_store(self):
+        profile_id = self.get(reverse("get_all_teams"), HTTP_X_PROFILE="1")["X-Profile-Id"]
+        self.assertFalse(RequestProfile.objects.exists())
+        response = self.client.get(reverse("request_profile", args=[profile_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_inline_report(self):
+        response = self.get(reverse("get_all_teams"), {"profile": "inline"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.json()
+        self.assertEqual(report["id"], response["X-Profile-Id"])
+        self.assertIn("functions", report)
+
+    @override_settings(PROFILER_SQL_LIMIT=1)
+    def test_sql_trace_truncated(self):
+        report = self.get(reverse("get_all_teams"), {"profile": "inline"}).json()
+        self.assertEqual(len(report["sql"]), 1)
+        self.assertEqual(report["sql_truncated"], report["queries"] > 1)
+
+    def test_ignored_for_non_admins(self):
+        User.objects.create_user(username="user@example.com", password="testpassword")
+        self.client.login(username="user@example.com", password="testpassword")
+        response = self.get(reverse("get_all_teams"), HTTP_X_PROFILE="inline")
+        self.assertFalse(response.has_header("X-Profile-Id"))
+        self.assertIn("teams", response.json())
+
+    @override_settings(PROFILER_ENABLED=False)
+    def test_disabled(self):
+        response = self.get(reverse("get_all_teams"), HTTP_X_PROFILE="1")
+        self.assertFalse(response.has_header("X-Profile-Id"))
+
+    def test_unknown_profile(self):
+        response = self.client.get(reverse("request_profile", args=["missing"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(PROFILER_STORE="cache")
+class ProfilerConcurrencyTests(SimpleTestCase):
+    def profile(self, view):
+        return profiling.profile_request(RequestFactory().get("/api/team/getAll/"), view, "1")
+
+    def test_one_profiled_request_at_a_time(self):
+        inside, release = threading.Event(), threading.Event()
+
+        def slow_view(request):
+            inside.set()
+            release.wait(5)
+            return HttpResponse("slow")
+
+        def fast_view(request):
+            return HttpResponse("fast")
+
+        responses = {}
+        first = threading.Thread(target=lambda: responses.setdefault("slow", self.profile(slow_view)))
+        second = threading.Thread(target=lambda: responses.setdefault("fast", self.profile(fast_view)))
+        with redirect_stdout(io.StringIO()):
+            first.start()
+            self.assertTrue(inside.wait(5))
+            second.start()
+            second.join(5)
+            release.set()
+            first.join(5)
+
+        # The overlapping request is served, just not profiled
+        self.assertEqual(responses["fast"].content, b"fast")
+        self.assertFalse(responses["fast"].has_header("X-Profile-Id"))
+        self.assertEqual(responses["fast"]["X-Profile-Skipped"], "another request is being profiled")
+        self.assertEqual(responses["slow"].content, b"slow")
+        self.assertTrue(responses["slow"].has_header("X-Profile-Id"))
+
+        # The lock is free again
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(self.profile(lambda r: HttpResponse("next")).has_header("X-Profile-Id"))
+
+    def test_another_profiler_active(self):
+        # What Python 3.12+ raises when a second profiler starts
+        class BusyProfile(cProfile.Profile):
+            def enable(self, *args, **kwargs):
+                raise ValueError("Another profiling tool is already active")
+
+        with mock.patch.object(profiling.cProfile, "Profile", BusyProfile):
+            response = self.profile(lambda r: HttpResponse("ok"))
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(response["X-Profile-Skipped"], "another profiler is active")
+        self.assertFalse(profiling._profiler_lock.locked())
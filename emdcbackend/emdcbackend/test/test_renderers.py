@@ -0,0 +1,85 @@
+"""
+Tests for the orjson-backed DRF renderer and parser
+"""
+import datetime
+import json
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from .. import renderers
+from ..renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def assertSameAsDRF(self, data):
+        fast = FastJSONRenderer().render(data)
+        drf = JSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(drf))
+        return fast
+
+    def test_matches_drf_for_common_types(self):
+        self.assertSameAsDRF({
+            "Teams": [{"id": 1, "team_name": "Team A", "total_score": 98.5, "advanced": True, "rank": None}],
+            "decimal": Decimal("1.50"),
+            "date": datetime.date(2025, 3, 1),
+            "when": datetime.datetime(2025, 3, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "ids": (1, 2, 3),
+            1: "int key",
+        })
+
+    def test_utc_datetimes_use_z_suffix_like_drf(self):
+        when = timezone.now()
+        self.assertEqual(
+            FastJSONRenderer().render({"when": when}).decode(),
+            JSONRenderer().render({"when": when}).decode(),
+        )
+
+    def test_line_separators_are_escaped(self):
+        output = FastJSONRenderer().render({"text": "a\u2028b\u2029c"})
+        self.assertIn(b"\\u2028", output)
+        self.assertIn(b"\\u2029", output)
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertSameAsDRF({"decimal": Decimal("2.5")})
+
+    @override_settings(FAST_JSON_ENABLED=False)
+    def test_can_be_disabled(self):
+        with mock.patch.object(renderers.orjson, "dumps") as dumps:
+            FastJSONRenderer().render({"a": 1})
+        dumps.assert_not_called()
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def test_parses_utf8_body(self):
+        data = FastJSONParser().parse(BytesIO('{"team_name": "Équipe", "ids": [1, 2]}'.encode()))
+        self.assertEqual(data, {"team_name": "Équipe", "ids": [1, 2]})
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"team_name": '))
+
+    def test_non_utf8_body_uses_drf_parser(self):
+        body = BytesIO('{"name": "é"}'.encode('latin-1'))
+        data = FastJSONParser().parse(body, parser_context={"encoding": "latin-1"})
+        self.assertEqual(data, {"name": "é"})
+
+
+class BenchmarkJSONCommandTests(SimpleTestCase):
+
+    def test_benchmark_runs(self):
+        out = StringIO()
+        call_command('benchmark_json', teams=3, sheets_per_team=2, repeat=1, stdout=out)
+        self.assertIn('orjson is', out.getvalue())
@@ -0,0 +1,110 @@
+"""
+Tests for the per-user role/profile cache used by login and get_role
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..auth.role_cache import get_cached_role_mapping
+from ..models import Admin, Coach, Contest, Judge, MapUserToRole, Organizer
+from ..views.Maps.MapUserToRole import create_user_role_map, get_role
+
+
+@override_settings(ROLE_CACHE_ENABLED=True)
+class RoleCacheTests(TestCase):
+    """Test caching and invalidation of role lookups"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="judge@example.com", password="testpassword")
+        self.contest = Contest.objects.create(name="Test Contest", date=date.today(), is_open=True, is_tabulated=False)
+        self.judge = Judge.objects.create(
+            first_name="Test", last_name="Judge", phone_number="1234567890", contestid=self.contest.id
+        )
+        MapUserToRole.objects.create(uuid=self.user.id, role=3, relatedid=self.judge.id)
+
+    def test_get_role_is_served_from_cache(self):
+        first = get_role(self.user.id)
+        with self.assertNumQueries(0):
+            second = get_role(self.user.id)
+        self.assertEqual(first, second)
+        self.assertEqual(second["user_type"], 3)
+        self.assertEqual(second["user"]["first_name"], "Test")
+
+    def test_profile_save_invalidates_cache(self):
+        get_role(self.user.id)
+        self.judge.first_name = "Renamed"
+        self.judge.save()
+        self.assertEqual(get_role(self.user.id)["user"]["first_name"], "Renamed")
+
+    def test_create_user_role_map_invalidates_cache(self):
+        get_role(self.user.id)
+        organizer = Organizer.objects.create(first_name="New", last_name="Organizer")
+        create_user_role_map({"uuid": self.user.id, "role": 2, "relatedid": organizer.id})
+        role = get_role(self.user.id)
+        self.assertEqual(role["user_type"], 2)
+        self.assertEqual(role["user"]["id"], organizer.id)
+
+    def test_deleted_mapping_is_not_served(self):
+        get_role(self.user.id)
+        MapUserToRole.objects.filter(uuid=self.user.id).delete()
+        self.assertIsNone(get_cached_role_mapping(self.user.id))
+
+    @override_settings(ROLE_CACHE_ENABLED=False)
+    def test_disabled_without_shared_cache(self):
+        get_role(self.user.id)
+        # Another worker revoking the role could not clear this process's cache
+        with self.assertNumQueries(2):
+            get_role(self.user.id)
+        MapUserToRole.objects.filter(uuid=self.user.id).update(role=2)
+        self.assertEqual(get_cached_role_mapping(self.user.id)["role"], 2)
+
+    def test_last_login_update_keeps_cache(self):
+        get_role(self.user.id)
+        self.client.login(username="judge@example.com", password="testpassword")
+        with self.assertNumQueries(0):
+            get_role(self.user.id)
+
+
+@override_settings(ROLE_CACHE_ENABLED=True)
+class RoleCacheEndpointTests(APITestCase):
+    """Test that editing profiles through the API refreshes cached roles"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_user(username="admin@example.com", password="testpassword")
+        admin = Admin.objects.create(first_name="Admin", last_name="User")
+        MapUserToRole.objects.create(uuid=self.admin_user.id, role=1, relatedid=admin.id)
+        self.client.login(username="admin@example.com", password="testpassword")
+
+        self.coach_user = User.objects.create_user(username="coach@example.com", password="testpassword")
+        self.coach = Coach.objects.create(first_name="Test", last_name="Coach")
+        MapUserToRole.objects.create(uuid=self.coach_user.id, role=4, relatedid=self.coach.id)
+
+    def test_login_returns_updated_profile_after_edit(self):
+        get_role(self.coach_user.id)
+        response = self.client.post(reverse('edit_coach'), {
+            "id": self.coach.id,
+            "first_name": "Updated",
+            "last_name": "Coach",
+            "school_name": "MNSU",
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse('login'), {
+            "username": "coach@example.com",
+            "password": "testpassword",
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["role"]["user"]["first_name"], "Updated")
+
+    def test_delete_coach_clears_cached_role(self):
+        get_role(self.coach_user.id)
+        response = self.client.delete(reverse('delete_coach', args=[self.coach.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(get_cached_role_mapping(self.coach_user.id))
@@ -0,0 +1,140 @@
+"""
+Tests for the user-indexed session engine and session invalidation
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from ..auth import cached_sessions
+from ..auth.sessions import SessionStore, delete_user_sessions, purge_expired_sessions
+from ..models import Admin, Coach, MapUserToRole, UserSession
+
+
+class UserSessionStoreTests(TestCase):
+    """Test that sessions record the logged-in user id"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="sessionuser@example.com", password="testpassword")
+        self.other = User.objects.create_user(username="otheruser@example.com", password="testpassword")
+
+    def test_login_records_user_id(self):
+        self.client.login(username="sessionuser@example.com", password="testpassword")
+        session = UserSession.objects.get(session_key=self.client.session.session_key)
+        self.assertEqual(session.user_id, self.user.id)
+
+    def test_anonymous_session_has_no_user_id(self):
+        store = SessionStore()
+        store["cart"] = "value"
+        store.save()
+        self.assertIsNone(UserSession.objects.get(session_key=store.session_key).user_id)
+
+    def test_delete_user_sessions_only_removes_that_user(self):
+        first = APIClient()
+        second = APIClient()
+        other = APIClient()
+        first.login(username="sessionuser@example.com", password="testpassword")
+        second.login(username="sessionuser@example.com", password="testpassword")
+        other.login(username="otheruser@example.com", password="testpassword")
+
+        removed = delete_user_sessions(self.user.id)
+
+        self.assertEqual(removed, 2)
+        self.assertFalse(UserSession.objects.filter(user_id=self.user.id).exists())
+        self.assertTrue(UserSession.objects.filter(user_id=self.other.id).exists())
+
+    def test_purge_expired_sessions(self):
+        self.client.login(username="sessionuser@example.com", password="testpassword")
+        UserSession.objects.create(
+            session_key="expiredsessionkey",
+            session_data="",
+            expire_date=timezone.now() - timedelta(days=1),
+        )
+
+        removed = purge_expired_sessions(batch_size=1)
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(UserSession.objects.filter(session_key="expiredsessionkey").exists())
+        self.assertTrue(UserSession.objects.filter(user_id=self.user.id).exists())
+
+    def test_purge_expired_sessions_command(self):
+        UserSession.objects.create(
+            session_key="expiredsessionkey",
+            session_data="",
+            expire_date=timezone.now() - timedelta(days=1),
+        )
+        out = StringIO()
+        call_command('purge_expired_sessions', stdout=out)
+        self.assertIn('Removed 1 expired sessions', out.getvalue())
+
+
+@override_settings(SESSION_ENGINE="emdcbackend.auth.cached_sessions", SESSION_CACHE_MAX_AGE=60)
+class CachedSessionStoreTests(TestCase):
+    """Test that session reads are served from the cache"""
+
+    def setUp(self):
+        caches["sessions"].clear()
+        self.user = User.objects.create_user(username="cacheduser@example.com", password="testpassword")
+        self.client.login(username="cacheduser@example.com", password="testpassword")
+        self.session_key = self.client.session.session_key
+
+    def test_login_writes_user_id_to_database(self):
+        session = UserSession.objects.get(session_key=self.session_key)
+        self.assertEqual(session.user_id, self.user.id)
+
+    def test_load_is_served_from_cache(self):
+        with self.assertNumQueries(0):
+            data = cached_sessions.SessionStore(self.session_key).load()
+        self.assertEqual(str(data["_auth_user_id"]), str(self.user.id))
+
+    def test_cache_miss_falls_back_to_database(self):
+        caches["sessions"].clear()
+        with self.assertNumQueries(1):
+            data = cached_sessions.SessionStore(self.session_key).load()
+        self.assertEqual(str(data["_auth_user_id"]), str(self.user.id))
+        with self.assertNumQueries(0):
+            cached_sessions.SessionStore(self.session_key).load()
+
+    def test_delete_user_sessions_evicts_cache(self):
+        delete_user_sessions(self.user.id)
+        self.assertEqual(cached_sessions.SessionStore(self.session_key).load(), {})
+
+    def test_authenticated_request_after_invalidation_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('test_token')).status_code, status.HTTP_200_OK)
+        delete_user_sessions(self.user.id)
+        self.assertIn(
+            self.client.get(reverse('test_token')).status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
+        )
+
+
+class SessionInvalidationOnDeleteTests(APITestCase):
+    """Deleting an account must log that user out everywhere"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username="admin@example.com", password="testpassword")
+        admin = Admin.objects.create(first_name="Admin", last_name="User")
+        MapUserToRole.objects.create(uuid=self.admin_user.id, role=1, relatedid=admin.id)
+        self.client.login(username="admin@example.com", password="testpassword")
+
+        self.coach_user = User.objects.create_user(username="coach@example.com", password="testpassword")
+        self.coach = Coach.objects.create(first_name="Test", last_name="Coach")
+        MapUserToRole.objects.create(uuid=self.coach_user.id, role=4, relatedid=self.coach.id)
+
+    def test_delete_coach_removes_sessions(self):
+        coach_client = APIClient()
+        coach_client.login(username="coach@example.com", password="testpassword")
+        self.assertTrue(UserSession.objects.filter(user_id=self.coach_user.id).exists())
+
+        response = self.client.delete(reverse('delete_coach', args=[self.coach.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(UserSession.objects.filter(user_id=self.coach_user.id).exists())
+        self.assertTrue(UserSession.objects.filter(user_id=self.admin_user.id).exists())
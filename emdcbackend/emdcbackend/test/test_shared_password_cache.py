@@ -0,0 +1,82 @@
+"""
+Tests for memoized shared-password verification at login
+"""
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..auth import shared_password_cache
+from ..auth.shared_password_cache import check_shared_password, invalidate_shared_password
+from ..models import Admin, Judge, MapUserToRole, RoleSharedPassword
+
+
+class SharedPasswordCacheTests(TestCase):
+    """Test the verification cache directly"""
+
+    def setUp(self):
+        invalidate_shared_password()
+        self.password_hash = make_password("SharedJudgePass123!")
+
+    def test_repeat_check_skips_hasher(self):
+        self.assertTrue(check_shared_password(3, "SharedJudgePass123!", self.password_hash))
+        with mock.patch.object(shared_password_cache, "check_password") as hasher:
+            self.assertTrue(check_shared_password(3, "SharedJudgePass123!", self.password_hash))
+        hasher.assert_not_called()
+
+    def test_wrong_password_is_not_cached(self):
+        self.assertFalse(check_shared_password(3, "WrongPass123!", self.password_hash))
+        self.assertFalse(check_shared_password(3, "WrongPass123!", self.password_hash))
+
+    def test_new_hash_does_not_match_old_entry(self):
+        check_shared_password(3, "SharedJudgePass123!", self.password_hash)
+        new_hash = make_password("OtherJudgePass123!")
+        self.assertFalse(check_shared_password(3, "SharedJudgePass123!", new_hash))
+
+    def test_invalidate_role(self):
+        check_shared_password(3, "SharedJudgePass123!", self.password_hash)
+        invalidate_shared_password(3)
+        with mock.patch.object(shared_password_cache, "check_password", return_value=False) as hasher:
+            self.assertFalse(check_shared_password(3, "SharedJudgePass123!", self.password_hash))
+        hasher.assert_called_once()
+
+    @override_settings(SHARED_PASSWORD_CACHE_MAX_ENTRIES=1)
+    def test_cache_is_bounded(self):
+        other_hash = make_password("SharedOrgPass123!")
+        check_shared_password(3, "SharedJudgePass123!", self.password_hash)
+        check_shared_password(2, "SharedOrgPass123!", other_hash)
+        self.assertEqual(len(shared_password_cache._entries), 1)
+
+
+class SharedPasswordLoginTests(APITestCase):
+    """Test that changing the shared password takes effect immediately"""
+
+    def setUp(self):
+        invalidate_shared_password()
+        self.admin_user = User.objects.create_user(username="admin@example.com", password="testpassword")
+        admin = Admin.objects.create(first_name="Admin", last_name="User")
+        MapUserToRole.objects.create(uuid=self.admin_user.id, role=1, relatedid=admin.id)
+
+        self.judge_user = User.objects.create_user(username="judge@example.com", password="unused")
+        judge = Judge.objects.create(first_name="Test", last_name="Judge", phone_number="1234567890", contestid=1)
+        MapUserToRole.objects.create(uuid=self.judge_user.id, role=3, relatedid=judge.id)
+        RoleSharedPassword.objects.create(role=3, password_hash=make_password("SharedJudgePass123!"))
+
+    def login_judge(self, password):
+        return self.client.post(reverse('login'), {"username": "judge@example.com", "password": password})
+
+    def test_old_password_rejected_after_change(self):
+        self.assertEqual(self.login_judge("SharedJudgePass123!").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login_judge("SharedJudgePass123!").status_code, status.HTTP_200_OK)
+
+        self.client.login(username="admin@example.com", password="testpassword")
+        response = self.client.post(reverse('set_shared_password'), {"role": 3, "password": "NewJudgePass123!"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.logout()
+
+        self.assertEqual(self.login_judge("SharedJudgePass123!").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login_judge("NewJudgePass123!").status_code, status.HTTP_200_OK)
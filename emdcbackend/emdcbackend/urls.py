@@ -12,19 +12,23 @@ from .auth.password_views import (
 from .views.Maps.MapClusterToContest import all_clusters_by_contest_id
 from .views.Maps.MapClusterToTeam import (
     create_cluster_team_mapping, delete_cluster_team_mapping_by_id,
-    teams_by_cluster_id, cluster_by_team_id, get_teams_by_cluster_rank, teams_by_judge_id)
+    teams_by_cluster_id, cluster_by_team_id, get_teams_by_cluster_rank, teams_by_judge_id, teams_by_judge_id_async)
 from .views.Maps.MapScoreSheet import create_score_sheet_mapping, score_sheet_by_judge_team, \
-    delete_score_sheet_mapping_by_id, score_sheets_by_judge, score_sheets_by_judge_and_cluster, submit_all_penalty_sheets_for_judge, all_sheets_submitted_for_contests, all_submitted_for_team
+    delete_score_sheet_mapping_by_id, score_sheets_by_judge, score_sheets_by_judge_async, score_sheets_by_judge_and_cluster, submit_all_penalty_sheets_for_judge, all_sheets_submitted_for_contests, all_submitted_for_team
 from .views.judge import create_judge, judge_by_id, edit_judge, delete_judge, are_all_score_sheets_submitted, judge_disqualify_team, get_all_judges
 from .views.organizer import create_organizer, organizer_by_id, edit_organizer, delete_organizer, \
     organizer_disqualify_team, get_all_organizers
 
 from .views.coach import create_coach, coach_by_id, edit_coach, delete_coach, coach_get_all
-from .views.contest import contest_by_id, contest_get_all, create_contest, edit_contest, delete_contest
+from .views.contest import contest_by_id, contest_get_all, contest_get_all_async, create_contest, edit_contest, delete_contest, \
+    contest_deletion_status
 from .views.team import (
     create_team, team_by_id, edit_team, delete_team_by_id, get_teams_by_team_rank,
     create_team_after_judge, is_team_disqualified, get_all_teams
 )
+from .views.bulk_import import bulk_import_teams, bulk_import_judges
+from .views.export import export_results
+from .views.clone import clone_contest_view
 from .views.Maps.MapCoachToTeam import (
     create_coach_team_mapping, coach_by_team_id, delete_coach_team_mapping_by_id,
     teams_by_coach_id, coaches_by_teams
@@ -41,11 +45,16 @@ from .views.scoresheets import (
     create_score_sheet, edit_score_sheet, scores_by_id, delete_score_sheet,
     edit_score_sheet_field, update_scores, get_scoresheet_details_by_team, get_scoresheet_details_for_contest,  multi_team_general_penalties, multi_team_run_penalties
 )
-from .views.admin import create_admin, admins_get_all, admin_by_id, delete_admin, edit_admin
+from .views.admin import create_admin, admins_get_all, admin_by_id, delete_admin, edit_admin, db_pool_stats, request_profile
+from .views.metrics import metrics
+from .views.live import standings_stream, standings_stream_async, progress_stream, progress_stream_async, progress_snapshot
 from .views.Maps.MapUserToRole import create_user_role_mapping, delete_user_role_mapping, get_user_by_role
-from .views.Maps.MapClusterToJudge import create_cluster_judge_mapping, delete_cluster_judge_mapping_by_id, cluster_by_judge_id, judges_by_cluster_id, all_clusters_by_judge_id
-from .views.tabulation import tabulate_scores, preliminary_results, championship_results, redesign_results, set_advancers, list_advancers
-from .views.advance import advance_to_championship, undo_championship_advancement
+from .views.Maps.MapClusterToJudge import create_cluster_judge_mapping, delete_cluster_judge_mapping_by_id, cluster_by_judge_id, judges_by_cluster_id, judges_by_cluster_id_async, all_clusters_by_judge_id
+from .views.tabulation import (
+    tabulate_scores, preliminary_results, championship_results, redesign_results, set_advancers, list_advancers,
+    preliminary_results_async, championship_results_async
+)
+from .views.advance import advance_to_championship, undo_championship_advancement, redo_championship_advancement
 from .views.Maps.MapAwardToTeam import create_award_team_mapping, get_award_id_by_team_id, delete_award_team_mapping_by_id, update_award_team_mapping, get_all_awards, get_awards_by_role
 from .views.Maps.MapBallotToVote import create_map_ballot_to_vote
 from .views.Maps.MapTeamToVote import create_map_team_to_vote
@@ -66,6 +75,9 @@ urlpatterns = [
     path('api/admin/create/', create_admin, name='create_admin'),
     path('api/admin/edit/', edit_admin, name='edit_admin'),
     path('api/admin/delete/<int:admin_id>/', delete_admin, name='delete_admin'),
+    path('api/admin/dbPoolStats/', db_pool_stats, name='db_pool_stats'),
+    path('api/admin/profiles/<str:profile_id>/', request_profile, name='request_profile'),
+    path('api/metrics/', metrics, name='metrics'),
 
     # Authentication
     path('api/login/', login_view, name='login'),
@@ -92,6 +104,7 @@ urlpatterns = [
     path('api/judge/get/<int:judge_id>/', judge_by_id, name='judge_by_id'),
     path('api/judge/getAll/', get_all_judges, name='get_all_judges'),
     path('api/judge/create/', create_judge, name='create_judge'),
+    path('api/judge/bulkImport/', bulk_import_judges, name='bulk_import_judges'),
     path('api/judge/edit/', edit_judge, name='edit_judge'),
     path('api/judge/delete/<int:judge_id>/', delete_judge, name='delete_judge'),
     path('api/judge/allScoreSheetsSubmitted/', are_all_score_sheets_submitted, name='are_all_score_sheets_submitted'),
@@ -116,6 +129,7 @@ urlpatterns = [
     path('api/team/get/<int:team_id>/', team_by_id, name='team_by_id'),
     path('api/team/create/', create_team, name='create_team'),
     path('api/team/createAfterJudge/', create_team_after_judge, name='create_team_after_judge'),
+    path('api/team/bulkImport/', bulk_import_teams, name='bulk_import_teams'),
     path('api/team/edit/', edit_team, name='edit_team'),
     path('api/team/delete/<int:team_id>/', delete_team_by_id, name='delete_team_by_id'),
     path('api/team/rankedteams/', get_teams_by_team_rank, name='get_teams_by_team_rank'),
@@ -195,6 +209,8 @@ urlpatterns = [
     path('api/contest/create/', create_contest, name='create_contest'),
     path('api/contest/edit/', edit_contest, name='edit_contest'),
     path('api/contest/delete/<int:contest_id>/', delete_contest, name='delete_contest'),
+    path('api/contest/deletionStatus/<int:contest_id>/', contest_deletion_status, name='contest_deletion_status'),
+    path('api/contest/clone/', clone_contest_view, name='clone_contest'),
 
     # ScoreSheets
     path('api/scoreSheet/get/<int:scores_id>/', scores_by_id, name='scores_by_id'),
@@ -219,6 +235,10 @@ urlpatterns = [
     path('api/tabulation/listAdvancers/', list_advancers, name='list_advancers'),
     path('api/advance/advanceToChampionship/', advance_to_championship, name='advance_to_championship'),
     path('api/advance/undoChampionshipAdvancement/', undo_championship_advancement, name='undo_championship_advancement'),
+    path('api/advance/redoChampionshipAdvancement/', redo_championship_advancement, name='redo_championship_advancement'),
+
+    # Streaming CSV/XLSX results export (see views/export.py)
+    path('api/export/results/<int:contest_id>/', export_results, name='export_results'),
 
     # Special Awards
     path('api/mapping/awardToTeam/getAllAwards/', get_all_awards, name='get_all_awards'),
@@ -242,4 +262,20 @@ urlpatterns = [
     path('api/map/voteToAward/create/', create_map_vote_to_award, name='create_map_vote_to_award'),
     path('api/map/teamToVote/create/', create_map_team_to_vote, name='create_map_team_to_vote'),
     path('api/map/awardToContest/create/', create_map_award_to_contest, name='create_map_award_to_contest'),
+
+    # Live server-sent event streams (see views/live.py)
+    path('api/live/standings/<int:contest_id>/', standings_stream, name='standings_stream'),
+    path('api/async/live/standings/<int:contest_id>/', standings_stream_async, name='standings_stream_async'),
+    path('api/live/progress/<int:contest_id>/', progress_stream, name='progress_stream'),
+    path('api/live/progress/<int:contest_id>/snapshot/', progress_snapshot, name='progress_snapshot'),
+    path('api/async/live/progress/<int:contest_id>/', progress_stream_async, name='progress_stream_async'),
+
+    # Async read endpoints (same responses as their sync versions; served
+    # without a thread per request when running under ASGI)
+    path('api/async/contest/getAll/', contest_get_all_async, name='contest_get_all_async'),
+    path('api/async/tabulation/preliminaryResults/', preliminary_results_async, name='preliminary_results_async'),
+    path('api/async/tabulation/championshipResults/', championship_results_async, name='championship_results_async'),
+    path('api/async/mapping/clusterToJudge/getAllJudgesByCluster/<int:cluster_id>/', judges_by_cluster_id_async, name='judges_by_cluster_async'),
+    path('api/async/mapping/clusterToTeam/getTeamsByJudge/<int:judge_id>/', teams_by_judge_id_async, name='teams_by_judge_async'),
+    path('api/async/mapping/scoreSheet/getSheetsByJudge/<int:judge_id>/', score_sheets_by_judge_async, name='score_sheets_by_judge_async'),
 ]
@@ -10,8 +10,15 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from ...models import SpecialAward
+from ...models import MapContestToTeam, SpecialAward
 from ...serializers import SpecialAwardSerializer
+from ..conditional import versioned_etag
+from ..pagination import boolean, exact, list_response, parse_int
+
+
+def _awards_in_contest(queryset, param, value):
+    team_ids = MapContestToTeam.objects.filter(contestid=parse_int(param, value)).values("teamid")
+    return queryset.filter(teamid__in=team_ids)
 # FILE OVERVIEW: This file contains all views associated with the special awards URLs
 
 # POST request to create a new award team map
@@ -81,11 +88,16 @@ def update_award_team_mapping(request, team_id, award_name):
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
+@versioned_etag(SpecialAward, MapContestToTeam)
 def get_all_awards(request):
+    # Query: ?contestid=<int>&teamid=<int>&isJudge=<bool>&limit=<int>&cursor=<str>
+    # (all optional, see views/pagination.py)
     try:
-        award = SpecialAward.objects.all()
-        serializer = SpecialAwardSerializer(award, many=True)
-        return Response({"awards": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(request, SpecialAward.objects.all(), SpecialAwardSerializer, "awards", {
+            "contestid": _awards_in_contest,
+            "teamid": exact("teamid"),
+            "isJudge": boolean("isJudge"),
+        })
 
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,3 +1,5 @@
+import asyncio
+
 from rest_framework import status
 from rest_framework.decorators import (
     api_view,
@@ -13,6 +15,8 @@ from django.shortcuts import get_object_or_404
 from ...models import JudgeClusters, Judge, MapJudgeToCluster, MapContestToCluster, MapScoresheetToTeamJudge, Scoresheet, MapClusterToTeam
 from django.db import transaction
 from ...serializers import JudgeClustersSerializer, JudgeSerializer, ClusterToJudgeSerializer
+from django.http import JsonResponse
+from ..async_api import alist, async_api_view
 
 
 @api_view(["POST"])
@@ -59,6 +63,34 @@ def judges_by_cluster_id(request, cluster_id):
     return Response({"Judges": judge_data}, status=status.HTTP_200_OK)
 
 
+@async_api_view(["GET"])
+async def judges_by_cluster_id_async(request, cluster_id):
+    """Async version of judges_by_cluster_id for the ASGI app (same response)."""
+    mappings = MapJudgeToCluster.objects.filter(clusterid=cluster_id)
+    assignments, judges = await asyncio.gather(
+        alist(mappings),
+        alist(Judge.objects.filter(id__in=mappings.values('judgeid'))),
+    )
+
+    judge_data = JudgeSerializer(judges, many=True).data
+    assignment_map = {assignment.judgeid: assignment for assignment in assignments}
+
+    for entry in judge_data:
+        assignment = assignment_map.get(entry["id"])
+        if assignment:
+            entry["cluster_sheet_flags"] = {
+                "presentation": assignment.presentation,
+                "journal": assignment.journal,
+                "mdo": assignment.mdo,
+                "runpenalties": assignment.runpenalties,
+                "otherpenalties": assignment.otherpenalties,
+                "redesign": assignment.redesign,
+                "championship": assignment.championship,
+            }
+
+    return JsonResponse({"Judges": judge_data})
+
+
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -11,6 +11,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from ...models import JudgeClusters, Teams, MapClusterToTeam, MapJudgeToCluster
 from ...serializers import TeamSerializer, ClusterToTeamSerializer, JudgeClustersSerializer
+from django.http import JsonResponse
+from ..async_api import alist, async_api_view
+from ..fieldsets import narrow_queryset, requested_fields
 from rest_framework.exceptions import ValidationError
 
 
@@ -31,11 +34,13 @@ def create_cluster_team_mapping(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def teams_by_cluster_id(request, cluster_id):
+    # Query: ?fields=<names> / ?exclude=<names> (optional, see views/fieldsets.py)
+    fieldset = requested_fields(request, TeamSerializer)
     try:
         mappings = MapClusterToTeam.objects.filter(clusterid=cluster_id)
         team_ids = mappings.values_list("teamid", flat=True)
-        teams = Teams.objects.filter(id__in=team_ids)
-        serialized_teams = TeamSerializer(teams, many=True).data
+        teams = narrow_queryset(Teams.objects.filter(id__in=team_ids), TeamSerializer, fieldset)
+        serialized_teams = TeamSerializer(teams, many=True, **fieldset).data
 
         for team in serialized_teams:
             mapping = mappings.filter(teamid=team["id"]).first()
@@ -91,12 +96,13 @@ def delete_cluster_team_mapping_by_id(request, map_id):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_teams_by_cluster_rank(request):
+    fieldset = requested_fields(request, TeamSerializer)
     mappings = MapClusterToTeam.objects.filter(clusterid=request.data["clusterid"])
     teams = Teams.objects.filter(
         id__in=mappings.values_list('teamid', flat=True),
         cluster_rank__isnull=False
     ).order_by('cluster_rank')
-    serializer = TeamSerializer(teams, many=True)
+    serializer = TeamSerializer(narrow_queryset(teams, TeamSerializer, fieldset), many=True, **fieldset)
     return Response({"Teams": serializer.data}, status=status.HTTP_200_OK)
 
 
@@ -104,6 +110,8 @@ def get_teams_by_cluster_rank(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def teams_by_judge_id(request, judge_id):
+    # Query: ?fields=<names> / ?exclude=<names> (optional, see views/fieldsets.py)
+    fieldset = requested_fields(request, TeamSerializer)
     try:
         # Get all clusters assigned to this judge
         judge_cluster_mappings = MapJudgeToCluster.objects.filter(judgeid=judge_id)
@@ -117,14 +125,24 @@ def teams_by_judge_id(request, judge_id):
         team_ids = team_mappings.values_list('teamid', flat=True).distinct()
 
         # Get the actual team objects
-        teams = Teams.objects.filter(id__in=team_ids)
-        serializer = TeamSerializer(teams, many=True)
+        teams = narrow_queryset(Teams.objects.filter(id__in=team_ids), TeamSerializer, fieldset)
+        serializer = TeamSerializer(teams, many=True, **fieldset)
 
         return Response({"Teams": serializer.data}, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@async_api_view(["GET"])
+async def teams_by_judge_id_async(request, judge_id):
+    """Async version of teams_by_judge_id for the ASGI app (same response)."""
+    fieldset = requested_fields(request, TeamSerializer)
+    cluster_ids = MapJudgeToCluster.objects.filter(judgeid=judge_id).values('clusterid')
+    team_ids = MapClusterToTeam.objects.filter(clusterid__in=cluster_ids).values('teamid')
+    teams = await alist(narrow_queryset(Teams.objects.filter(id__in=team_ids), TeamSerializer, fieldset))
+    return JsonResponse({"Teams": TeamSerializer(teams, many=True, **fieldset).data})
+
+
 def create_team_to_cluster_map(map_data):
     serializer = ClusterToTeamSerializer(data=map_data)
     if serializer.is_valid():
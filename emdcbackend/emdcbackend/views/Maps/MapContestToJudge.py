@@ -51,7 +51,8 @@ def get_all_judges_by_contest_id(request, contest_id):
 def get_contest_id_by_judge_id(request, judge_id):
   try:
     # Get all contests for this judge (since judge can be in multiple contests)
-    current_maps = MapContestToJudge.objects.filter(judgeid=judge_id)
+    # Contests being deleted in the background are skipped
+    current_maps = MapContestToJudge.objects.filter(judgeid=judge_id, contestid__in=Contest.objects.values("id"))
     
     if not current_maps.exists():
       return Response({"There is No Contest Found for the given Judge"}, status=status.HTTP_404_NOT_FOUND)
@@ -12,6 +12,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
 from ...models import MapContestToTeam, Contest, Teams, MapUserToRole
 from ...serializers import MapContestToTeamSerializer, ContestSerializer, TeamSerializer
+from ..fieldsets import narrow_queryset, requested_fields
 
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
@@ -29,6 +30,8 @@ def create_contest_team_mapping(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([AllowAny])
 def get_teams_by_contest_id(request, contest_id):
+    # Query: ?fields=<names> / ?exclude=<names> (optional, see views/fieldsets.py)
+    fieldset = requested_fields(request, TeamSerializer)
     try:
         # Ensure all team scores are up-to-date by running tabulation
         from ...views.tabulation import recompute_totals_and_ranks
@@ -38,7 +41,7 @@ def get_teams_by_contest_id(request, contest_id):
         mappings = MapContestToTeam.objects.filter(contestid=contest_id)
         team_ids = mappings.values_list("teamid", flat=True)
         teams = Teams.objects.filter(id__in=team_ids).order_by("team_rank")
-        serializer = TeamSerializer(teams, many=True)
+        serializer = TeamSerializer(narrow_queryset(teams, TeamSerializer, fieldset), many=True, **fieldset)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -48,7 +51,8 @@ def get_teams_by_contest_id(request, contest_id):
 @permission_classes([IsAuthenticated])
 def get_contest_id_by_team_id(request,team_id):
   try:
-    map = MapContestToTeam.objects.get(teamid=team_id)
+    # Contests being deleted in the background are skipped
+    map = MapContestToTeam.objects.get(teamid=team_id, contestid__in=Contest.objects.values("id"))
     contest_id=map.contestid
     contest=Contest.objects.get(id=contest_id)
     serializer = ContestSerializer(instance=contest)
@@ -1,3 +1,5 @@
+import asyncio
+
 from rest_framework import status
 from rest_framework.decorators import (
     api_view,
@@ -11,6 +13,10 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from ...models import MapScoresheetToTeamJudge, Scoresheet, MapContestToJudge, MapJudgeToCluster, MapClusterToTeam, MapContestToCluster
 from ...serializers import MapScoreSheetToTeamJudgeSerializer, ScoresheetSerializer
+from django.http import JsonResponse
+from ..async_api import alist, async_api_view
+from ..fieldsets import narrow_queryset, requested_fields
+from ..live import notify_progress
 
 
 @api_view(["POST"])
@@ -93,10 +99,27 @@ def score_sheet_by_judge_team(request, judge_id, team_id, sheetType):
         return Response({"error": "Scoresheet not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
+# Columns _sheet_total reads; always loaded, even for a sparse ?fields= request
+_TOTAL_FIELDS = [f"field{n}" for n in (1, 2, 3, 4, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15, 16, 17)]
+
+
+def _sheet_total(sheet_type, sheet):
+    """Sum of the scored fields shown next to each sheet in the judge dashboard."""
+    if sheet_type == 4:
+        fields = [1, 2, 3, 4, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15, 16, 17]
+    elif sheet_type in (5, 6):
+        fields = [1, 2, 3, 4, 5, 6, 7]
+    else:
+        fields = [1, 2, 3, 4, 5, 6, 7, 8]
+    return sum(getattr(sheet, f"field{n}") for n in fields)
+
+
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def score_sheets_by_judge(request, judge_id):
+    # Query: ?fields=<names> / ?exclude=<names> narrow each "scoresheet" (optional, see views/fieldsets.py)
+    fieldset = requested_fields(request, ScoresheetSerializer)
     try:
         # Fetch mappings for the given judge
         mappings = MapScoresheetToTeamJudge.objects.filter(judgeid=judge_id)
@@ -105,33 +128,19 @@ def score_sheets_by_judge(request, judge_id):
             # Return empty list instead of 404 to simplify client handling
             return Response({"ScoreSheets": []}, status=status.HTTP_200_OK)
 
+        sheets = narrow_queryset(
+            Scoresheet.objects.filter(id__in=mappings.values("scoresheetid")),
+            ScoresheetSerializer, fieldset, extra=_TOTAL_FIELDS,
+        )
+        sheets_by_id = {sheet.id: sheet for sheet in sheets}
+
         # Prepare data to return mappings with scoresheets
         results = []
         for mapping in mappings:
-            # Fetch the scoresheet by its ID
-            try:
-                score_sheet = Scoresheet.objects.get(id=mapping.scoresheetid)
-                serializer = ScoresheetSerializer(score_sheet).data
-                total_score = 0
-                if mapping.sheetType == 4:
-                    total_score = (serializer.get("field1") + serializer.get("field2") + serializer.get("field3") +
-                           serializer.get("field4") + serializer.get("field5") + serializer.get("field6") +
-                           serializer.get("field7") + serializer.get("field8") + serializer.get("field10") +
-                           serializer.get("field11") + serializer.get("field12") + serializer.get("field13") +
-                           serializer.get("field14") + serializer.get("field15") + serializer.get("field16") +
-                           serializer.get("field17"))
-                elif mapping.sheetType == 5:
-                    total_score = (serializer.get("field1") + serializer.get("field2") + serializer.get("field3") +
-                                   serializer.get("field4") + serializer.get("field5") + serializer.get("field6") +
-                                   serializer.get("field7"))
-                elif mapping.sheetType == 6:
-                    total_score = (serializer.get("field1") + serializer.get("field2") + serializer.get("field3") +
-                                   serializer.get("field4") + serializer.get("field5") + serializer.get("field6") +
-                                   serializer.get("field7"))
-                else:
-                    total_score = (serializer.get("field1")+serializer.get("field2")+serializer.get("field3")+
-                                  serializer.get("field4")+serializer.get("field5")+serializer.get("field6")+
-                                  serializer.get("field7")+serializer.get("field8"))
+            score_sheet = sheets_by_id.get(mapping.scoresheetid)
+            if score_sheet is not None:
+                serializer = ScoresheetSerializer(score_sheet, **fieldset).data
+                total_score = _sheet_total(mapping.sheetType, score_sheet)
                 results.append({
                     "mapping": {
                         "teamid": mapping.teamid,
@@ -142,7 +151,7 @@ def score_sheets_by_judge(request, judge_id):
                     "scoresheet": serializer,  # Serialize the scoresheet
                     "total": total_score
                 })
-            except Scoresheet.DoesNotExist:
+            else:
                 results.append({
                     "mapping": {
                         "teamid": mapping.teamid,
@@ -159,6 +168,38 @@ def score_sheets_by_judge(request, judge_id):
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@async_api_view(["GET"])
+async def score_sheets_by_judge_async(request, judge_id):
+    """Async version of score_sheets_by_judge for the ASGI app (same response)."""
+    fieldset = requested_fields(request, ScoresheetSerializer)
+    mappings = MapScoresheetToTeamJudge.objects.filter(judgeid=judge_id)
+    sheets = narrow_queryset(
+        Scoresheet.objects.filter(id__in=mappings.values('scoresheetid')),
+        ScoresheetSerializer, fieldset, extra=_TOTAL_FIELDS,
+    )
+    mapping_rows, sheets = await asyncio.gather(alist(mappings), alist(sheets))
+    sheets_by_id = {sheet.id: sheet for sheet in sheets}
+
+    results = []
+    for mapping in mapping_rows:
+        entry = {
+            "mapping": {
+                "teamid": mapping.teamid,
+                "judgeid": mapping.judgeid,
+                "scoresheetid": mapping.scoresheetid,
+                "sheetType": mapping.sheetType,
+            },
+            "scoresheet": None,
+        }
+        sheet = sheets_by_id.get(mapping.scoresheetid)
+        if sheet is not None:
+            entry["scoresheet"] = ScoresheetSerializer(sheet, **fieldset).data
+            entry["total"] = _sheet_total(mapping.sheetType, sheet)
+        results.append(entry)
+
+    return JsonResponse({"ScoreSheets": results})
+
+
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -324,6 +365,7 @@ def submit_all_penalty_sheets_for_judge(request):
             scoresheet.isSubmitted = True
             scoresheet.save()
 
+        notify_progress(penalty_mappings.values("teamid"))
         return Response(status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -13,8 +13,9 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 from ...auth.serializers import UserSerializer
-from ...models import MapUserToRole, Coach, Organizer, Judge, Admin
-from ...serializers import MapUserToRoleSerializer, CoachSerializer, OrganizerSerializer, JudgeSerializer, AdminSerializer
+from ...models import MapUserToRole, Admin
+from ...serializers import MapUserToRoleSerializer, AdminSerializer
+from ...auth.role_cache import get_cached_role_mapping, get_cached_role_profile
 from django.shortcuts import get_object_or_404
 
 #from rest_framework.response import Response
@@ -83,32 +84,15 @@ def delete_user_role_mapping(request, mapping_id):
     return Response({"detail": "Mapping deleted successfully."}, status=status.HTTP_200_OK)
 
 def get_role(user_id):
-    try:
-        mapping = MapUserToRole.objects.get(uuid=user_id)
-    except MapUserToRole.DoesNotExist:
+    # Served from the role cache; see auth/role_cache.py for invalidation
+    mapping = get_cached_role_mapping(user_id)
+    if mapping is None:
         # If no role mapping exists, this user has no assigned role
         # This could happen if role assignment failed during creation
         raise ValidationError(f"No role mapping found for user {user_id}. User may need role reassignment.")
 
-    if mapping.role == 1:
-        admin = Admin.objects.get(id=mapping.relatedid)
-        roleSerializer = AdminSerializer(instance=admin)
-        return {"user_type": mapping.role, "user": roleSerializer.data}
-
-    elif mapping.role == 2:
-        organizer = Organizer.objects.get(id=mapping.relatedid)
-        roleSerializer = OrganizerSerializer(instance=organizer)
-        return {"user_type": mapping.role, "user": roleSerializer.data}
-
-    elif mapping.role == 3:
-        judge = Judge.objects.get(id=mapping.relatedid)
-        roleSerializer = JudgeSerializer(instance=judge)
-        return {"user_type": mapping.role, "user": roleSerializer.data}
-
-    elif mapping.role == 4:
-        coach = Coach.objects.get(id=mapping.relatedid)
-        roleSerializer = CoachSerializer(instance=coach)
-        return {"user_type": mapping.role, "user": roleSerializer.data}
+    if mapping["role"] in (1, 2, 3, 4):
+        return {"user_type": mapping["role"], "user": get_cached_role_profile(mapping["role"], mapping["relatedid"])}
 
 def create_user_role_map(mapData):
     # Check for existing mapping with same user and role
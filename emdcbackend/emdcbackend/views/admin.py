@@ -1,3 +1,6 @@
+import os
+
+from django.conf import settings
 from rest_framework import status
 from rest_framework.decorators import (
     api_view,
@@ -16,6 +19,10 @@ from ..auth.views import create_user
 from .Maps.MapUserToRole import create_user_role_map
 from ..models import MapUserToRole
 from ..auth.views import User, delete_user_by_id
+from ..auth.role_cache import get_cached_role_mapping
+from ..db.postgresql.base import get_pool_stats
+from ..profiling import load_report
+from .pagination import list_response, search
 
 # get an admin by a certain id
 @api_view(["GET"])
@@ -31,9 +38,10 @@ def admin_by_id(request, admin_id):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def admins_get_all(request):
-  admins = Admin.objects.all()
-  serializer = AdminSerializer(admins, many=True)
-  return Response({"Admins":serializer.data}, status=status.HTTP_200_OK)
+  # Query: ?search=<name>&limit=<int>&cursor=<str> (optional, see views/pagination.py)
+  return list_response(request, Admin.objects.all(), AdminSerializer, "Admins", {
+    "search": search("first_name", "last_name"),
+  })
 
 # create an admin
 @api_view(["POST"])
@@ -141,4 +149,35 @@ def delete_admin(request, admin_id):
     except Exception as e:
         return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    
\ No newline at end of file
+
+# database connection pool metrics for this worker process (admin only)
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def db_pool_stats(request):
+    role_map = get_cached_role_mapping(request.user.id)
+    if not role_map or role_map["role"] != MapUserToRole.RoleEnum.ADMIN:
+        return Response({"error": "Only admins can view database pool stats."}, status=status.HTTP_403_FORBIDDEN)
+
+    db_settings = settings.DATABASES["default"]
+    return Response({
+        "pooled": bool(db_settings.get("OPTIONS", {}).get("pool")),
+        "conn_max_age": db_settings.get("CONN_MAX_AGE", 0),
+        "pid": os.getpid(),
+        "pools": get_pool_stats(),
+    }, status=status.HTTP_200_OK)
+
+
+# a request profile stored by ProfilerMiddleware (admin only)
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def request_profile(request, profile_id):
+    role_map = get_cached_role_mapping(request.user.id)
+    if not role_map or role_map["role"] != MapUserToRole.RoleEnum.ADMIN:
+        return Response({"error": "Only admins can view request profiles."}, status=status.HTTP_403_FORBIDDEN)
+
+    report = load_report(profile_id)
+    if report is None:
+        return Response({"error": "Profile not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(report, status=status.HTTP_200_OK)
@@ -1,10 +1,14 @@
+from django.db import transaction
+from django.db.models import Case, F, Value, When
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 
+from ..auth.role_cache import invalidate_role_profiles
 from ..models import (
+    AdvancementSnapshot,
     Teams,
     MapContestToTeam,
     MapClusterToTeam,
@@ -15,14 +19,266 @@ from ..models import (
     MapJudgeToCluster,
     Judge,
     MapScoresheetToTeamJudge,
+    Scoresheet,
+    ScoresheetEnum,
 )
+from .live import progress_feed
+from .scoresheets import JUDGE_SHEET_FLAGS, cluster_sheet_assignments, provision_sheets
 from .tabulation import recompute_totals_and_ranks, _ensure_requester_is_organizer_of_contest
 
+# Preliminary column -> live column it is saved from when a contest advances
+PRELIMINARY_SNAPSHOT = {
+    "preliminary_presentation_score": "presentation_score",
+    "preliminary_journal_score": "journal_score",
+    "preliminary_machinedesign_score": "machinedesign_score",
+    "preliminary_penalties_score": "penalties_score",
+    "preliminary_total_score": "total_score",
+}
+
+# Judge flags that grant preliminary sheets
+PRELIMINARY_SHEET_FLAGS = {
+    flag: sheet_type for flag, sheet_type in JUDGE_SHEET_FLAGS.items()
+    if sheet_type not in (ScoresheetEnum.REDESIGN, ScoresheetEnum.CHAMPIONSHIP)
+}
+
+
+class AdvancementError(Exception):
+    """A request the contest's current setup cannot satisfy (answered with 400)."""
+
+
+def _round_clusters(contest_id):
+    """
+    (championship cluster, redesign cluster, preliminary clusters) of a
+    contest; the round clusters may be None.
+    """
+    championship_cluster = None
+    redesign_cluster = None
+    preliminary_clusters = []
+    cluster_ids = MapContestToCluster.objects.filter(contestid=contest_id).values("clusterid")
+    for cluster in JudgeClusters.objects.filter(id__in=cluster_ids).order_by("id"):
+        if cluster.cluster_type == 'championship':
+            championship_cluster = cluster
+        elif cluster.cluster_type == 'redesign':
+            redesign_cluster = cluster
+        # Fallback: clusters created before cluster_type existed
+        elif 'championship' in cluster.cluster_name.lower() and not championship_cluster:
+            championship_cluster = cluster
+        elif 'redesign' in cluster.cluster_name.lower() and not redesign_cluster:
+            redesign_cluster = cluster
+        elif cluster.cluster_type in ('preliminary', None):
+            preliminary_clusters.append(cluster)
+    return championship_cluster, redesign_cluster, preliminary_clusters
+
+
+def _update_judges(judges, **flags):
+    changed = list(judges.values_list("id", flat=True))
+    if changed:
+        Judge.objects.filter(id__in=changed).update(**flags)
+        invalidate_role_profiles(MapUserToRole.RoleEnum.JUDGE, changed)
+
+
+def _set_judge_flag(cluster_id, flag):
+    """Turn a sheet flag on for a cluster's judge mappings and judges; returns the judge ids."""
+    judge_ids = list(MapJudgeToCluster.objects.filter(clusterid=cluster_id).values_list("judgeid", flat=True))
+    MapJudgeToCluster.objects.filter(clusterid=cluster_id).update(**{flag: True})
+    _update_judges(Judge.objects.filter(id__in=judge_ids, **{flag: False}), **{flag: True})
+    return judge_ids
+
+
+def _clear_judge_flag(cluster_id, flag):
+    """
+    Turn a sheet flag off for a cluster's judge mappings, and for its judges
+    unless another cluster (e.g. in another contest) still grants it.
+    """
+    judge_ids = MapJudgeToCluster.objects.filter(clusterid=cluster_id).values("judgeid")
+    MapJudgeToCluster.objects.filter(clusterid=cluster_id).update(**{flag: False})
+    still_granted = MapJudgeToCluster.objects.filter(**{flag: True}).values("judgeid")
+    _update_judges(
+        Judge.objects.filter(id__in=judge_ids, **{flag: True}).exclude(id__in=still_granted), **{flag: False}
+    )
+
+
+def _delete_sheets(mappings):
+    """Delete score sheet mappings and the sheets they point to."""
+    Scoresheet.objects.filter(id__in=list(mappings.values_list("scoresheetid", flat=True))).delete()
+    mappings.delete()
+
+
+# -----------------------
+# Advance / undo
+# -----------------------
+
+def _advance(contest_id, championship_team_ids):
+    """
+    Move the chosen teams into the championship cluster and everyone else
+    into the redesign cluster, saving their preliminary scores first, and
+    record the advancement for undo/redo. A fixed number of queries (bulk
+    UPDATEs and INSERTs), followed by the usual recompute of totals and
+    ranks. Call inside a transaction.
+    """
+    championship_cluster, redesign_cluster, preliminary_clusters = _round_clusters(contest_id)
+    if not championship_cluster:
+        raise AdvancementError("Championship cluster not found. Please create it first.")
+    if not redesign_cluster:
+        raise AdvancementError("Redesign cluster not found. Please create it first.")
+
+    contest_team_ids = list(
+        MapContestToTeam.objects.filter(contestid=contest_id).values_list("teamid", flat=True)
+    )
+    team_ids = set(Teams.objects.filter(id__in=contest_team_ids).values_list("id", flat=True))
+    championship_teams = sorted(team_ids.intersection(championship_team_ids))
+    redesign_teams = sorted(team_ids.difference(championship_teams))
+    advancing = When(id__in=championship_teams, then=Value(True))
+
+    AdvancementSnapshot.objects.update_or_create(contestid=contest_id, defaults={
+        "championship_team_ids": championship_teams,
+        "preliminary_memberships": [
+            list(row) for row in MapClusterToTeam.objects.filter(
+                clusterid__in=[cluster.id for cluster in preliminary_clusters], teamid__in=team_ids,
+            ).order_by("id").values_list("clusterid", "teamid")
+        ],
+        "is_advanced": True,
+    })
+
+    # 1. Save preliminary scores and reset the round columns in one UPDATE
+    Teams.objects.filter(id__in=team_ids).update(
+        **{saved: F(live) for saved, live in PRELIMINARY_SNAPSHOT.items()},
+        advanced_to_championship=Case(advancing, default=Value(False)),
+        championship_rank=None,
+        # Championship teams start from 0 in the championship round,
+        # the others in the redesign round
+        championship_score=Case(When(id__in=championship_teams, then=Value(0.0)), default=F("championship_score")),
+        redesign_score=Case(When(id__in=championship_teams, then=F("redesign_score")), default=Value(0.0)),
+        total_score=0.0,  # Calculated by championship/redesign tabulation
+    )
+
+    # 2. Activate the round clusters and refill their memberships
+    round_cluster_ids = [championship_cluster.id, redesign_cluster.id]
+    JudgeClusters.objects.filter(id__in=round_cluster_ids).update(is_active=True)
+    MapClusterToTeam.objects.filter(clusterid__in=round_cluster_ids).delete()
+    MapClusterToTeam.objects.bulk_create(
+        [MapClusterToTeam(clusterid=championship_cluster.id, teamid=team_id) for team_id in championship_teams]
+        + [MapClusterToTeam(clusterid=redesign_cluster.id, teamid=team_id) for team_id in redesign_teams]
+    )
+
+    # 3. Judges of each round cluster get its sheet flag, on both the
+    #    Judge and the MapJudgeToCluster row (the frontend checks the latter)
+    championship_judge_ids = _set_judge_flag(championship_cluster.id, "championship")
+    redesign_judge_ids = _set_judge_flag(redesign_cluster.id, "redesign")
+
+    # 4. Drop old championship and redesign sheets of this contest's teams
+    #    for every judge in either cluster (judges may have moved between
+    #    them), then provision fresh ones
+    round_judge_ids = set(championship_judge_ids) | set(redesign_judge_ids)
+    _delete_sheets(MapScoresheetToTeamJudge.objects.filter(
+        judgeid__in=round_judge_ids,
+        teamid__in=contest_team_ids,
+        sheetType__in=[ScoresheetEnum.REDESIGN, ScoresheetEnum.CHAMPIONSHIP],
+    ))
+    valid_judges = set(Judge.objects.filter(id__in=round_judge_ids).values_list("id", flat=True))
+    provision_sheets(
+        [(team_id, judge_id, ScoresheetEnum.CHAMPIONSHIP)
+         for judge_id in championship_judge_ids if judge_id in valid_judges
+         for team_id in championship_teams]
+        + [(team_id, judge_id, ScoresheetEnum.REDESIGN)
+           for judge_id in redesign_judge_ids if judge_id in valid_judges
+           for team_id in redesign_teams]
+    )
+
+    # Recompute totals and ranks for the new clusters
+    recompute_totals_and_ranks(contest_id)
+    progress_feed.notify(contest_id)
+    return championship_cluster, redesign_cluster, championship_teams, redesign_teams
+
+
+def _undo(contest_id):
+    """
+    Return a contest to its preliminary state: one UPDATE restores the
+    saved preliminary scores, the preliminary memberships recorded by
+    _advance are upserted in bulk and the round flags are reset in bulk.
+    Call inside a transaction.
+    """
+    championship_cluster, redesign_cluster, preliminary_clusters = _round_clusters(contest_id)
+    contest_team_ids = list(
+        MapContestToTeam.objects.filter(contestid=contest_id).values_list("teamid", flat=True)
+    )
+    round_clusters = [cluster for cluster in (championship_cluster, redesign_cluster) if cluster]
+
+    # 1. Deactivate the round clusters, empty them and drop their sheets
+    #    (only for this contest's teams; judges may serve other contests)
+    round_cluster_ids = [cluster.id for cluster in round_clusters]
+    JudgeClusters.objects.filter(id__in=round_cluster_ids).update(is_active=False)
+    MapClusterToTeam.objects.filter(clusterid__in=round_cluster_ids).delete()
+    for cluster, sheet_type in ((championship_cluster, ScoresheetEnum.CHAMPIONSHIP), (redesign_cluster, ScoresheetEnum.REDESIGN)):
+        if cluster:
+            _delete_sheets(MapScoresheetToTeamJudge.objects.filter(
+                judgeid__in=MapJudgeToCluster.objects.filter(clusterid=cluster.id).values("judgeid"),
+                teamid__in=contest_team_ids,
+                sheetType=sheet_type,
+            ))
+
+    # 2. Restore preliminary scores and reset the round columns in one UPDATE
+    Teams.objects.filter(id__in=contest_team_ids).update(
+        **{live: F(saved) for saved, live in PRELIMINARY_SNAPSHOT.items()},
+        redesign_score=0.0,
+        championship_score=0.0,
+        advanced_to_championship=False,
+        championship_rank=None,
+    )
+
+    # 3. Put teams back into their preliminary clusters
+    preliminary_ids = {cluster.id for cluster in preliminary_clusters}
+    current = set(MapClusterToTeam.objects.filter(clusterid__in=preliminary_ids).values_list("clusterid", "teamid"))
+    snapshot = AdvancementSnapshot.objects.filter(contestid=contest_id).first()
+    if snapshot is not None:
+        wanted = [(cluster_id, team_id) for cluster_id, team_id in snapshot.preliminary_memberships
+                  if cluster_id in preliminary_ids and team_id in contest_team_ids]
+    elif preliminary_clusters:
+        # Advanced before snapshots were recorded: teams without a
+        # preliminary cluster go to the first one
+        placed = {team_id for _, team_id in current}
+        wanted = [(preliminary_clusters[0].id, team_id) for team_id in contest_team_ids if team_id not in placed]
+    else:
+        wanted = []
+    restored = list(dict.fromkeys(wanted))
+    MapClusterToTeam.objects.bulk_create([
+        MapClusterToTeam(clusterid=cluster_id, teamid=team_id)
+        for cluster_id, team_id in restored if (cluster_id, team_id) not in current
+    ])
+
+    # Recreate preliminary sheets the restored teams are missing, for
+    # judges already in their clusters (per the judges' sheet flags)
+    provision_sheets(cluster_sheet_assignments(restored, PRELIMINARY_SHEET_FLAGS))
+
+    # 4. Reset the round flags of the round clusters' judges
+    if championship_cluster:
+        _clear_judge_flag(championship_cluster.id, "championship")
+    if redesign_cluster:
+        _clear_judge_flag(redesign_cluster.id, "redesign")
+
+    AdvancementSnapshot.objects.filter(contestid=contest_id).update(is_advanced=False)
+
+    # Recompute totals and ranks
+    try:
+        with transaction.atomic():
+            recompute_totals_and_ranks(contest_id)
+    except Exception:
+        # The scores will be recomputed later when needed
+        pass
+    progress_feed.notify(contest_id)
+    return championship_cluster, redesign_cluster, contest_team_ids
+
 
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def advance_to_championship(request):
+    """
+    Body: {
+        "contestid": <int>,
+        "championship_team_ids": [<int>, ...]
+    }
+    """
     contest_id = request.data.get("contestid")
     championship_team_ids = request.data.get("championship_team_ids", [])
 
@@ -36,181 +292,24 @@ def advance_to_championship(request):
         return Response({"ok": False, "message": "Organizer of this contest required."}, status=403)
 
     try:
-        contest_team_ids = list(
-            MapContestToTeam.objects.filter(contestid=contest_id).values_list("teamid", flat=True)
-        )
-        
-        Teams.objects.filter(id__in=contest_team_ids).update(
-            advanced_to_championship=False, 
-            championship_rank=None
-        )
-        
-        valid_championship_teams = [tid for tid in championship_team_ids if tid in contest_team_ids]
-        
-        if valid_championship_teams:
-            Teams.objects.filter(id__in=valid_championship_teams).update(advanced_to_championship=True)
-        
-        non_championship_teams = [tid for tid in contest_team_ids if tid not in valid_championship_teams]
-        
-        contest_clusters = MapContestToCluster.objects.filter(contestid=contest_id)
-        championship_cluster = None
-        redesign_cluster = None
-        
-        for cc in contest_clusters:
-            try:
-                cluster = JudgeClusters.objects.get(id=cc.clusterid)
-                
-                if cluster.cluster_type == 'championship':
-                    championship_cluster = cluster
-                elif cluster.cluster_type == 'redesign':
-                    redesign_cluster = cluster
-                elif 'championship' in cluster.cluster_name.lower() and not championship_cluster:
-                    championship_cluster = cluster
-                elif 'redesign' in cluster.cluster_name.lower() and not redesign_cluster:
-                    redesign_cluster = cluster
-            except JudgeClusters.DoesNotExist:
-                continue
-        
-        if not championship_cluster:
-            return Response({"ok": False, "message": "Championship cluster not found. Please create it first."}, status=400)
-        if not redesign_cluster:
-            return Response({"ok": False, "message": "Redesign cluster not found. Please create it first."}, status=400)
-        
-        championship_cluster.is_active = True
-        championship_cluster.save()
-            
-        redesign_cluster.is_active = True
-        redesign_cluster.save()
-        
-        MapClusterToTeam.objects.filter(clusterid=championship_cluster.id).delete()
-        MapClusterToTeam.objects.filter(clusterid=redesign_cluster.id).delete()
-        
-        championship_teams_data = []
-        redesign_teams_data = []
-        for team_id in valid_championship_teams:
-            try:
-                team = Teams.objects.get(id=team_id)
-                # Store preliminary results before advancing
-                team.preliminary_presentation_score = team.presentation_score
-                team.preliminary_journal_score = team.journal_score
-                team.preliminary_machinedesign_score = team.machinedesign_score
-                team.preliminary_penalties_score = team.penalties_score
-                team.preliminary_total_score = team.total_score
-                
-                # Championship round: only need journal from preliminary + championship score
-                team.championship_score = 0.0
-                team.total_score = 0.0  # Will be calculated by championship tabulation
-                
-                team.save()
-                
-                championship_teams_data.append(team)
-                MapClusterToTeam.objects.create(clusterid=championship_cluster.id, teamid=team.id)
-            except Teams.DoesNotExist:
-                continue
-        
-        for team_id in non_championship_teams:
-            try:
-                team = Teams.objects.get(id=team_id)
-                # Store preliminary results before advancing
-                team.preliminary_presentation_score = team.presentation_score
-                team.preliminary_journal_score = team.journal_score
-                team.preliminary_machinedesign_score = team.machinedesign_score
-                team.preliminary_penalties_score = team.penalties_score
-                team.preliminary_total_score = team.total_score
-                
-                # Redesign round: only need redesign score (all categories in one scoresheet)
-                
-                team.redesign_score = 0.0
-                team.total_score = 0.0  # Will be calculated by redesign tabulation
-                
-                team.save()
-                
-                redesign_teams_data.append(team)
-                MapClusterToTeam.objects.create(clusterid=redesign_cluster.id, teamid=team.id)
-            except Teams.DoesNotExist:
-                continue
-        
-        # 6. Update judge flags for championship/redesign clusters
-        
-        # Update judges in championship cluster to have championship=True
-        # IMPORTANT: Update both Judge model AND MapJudgeToCluster mapping
-        # The frontend checks MapJudgeToCluster.championship via sheet_flags
-        championship_judge_mappings = MapJudgeToCluster.objects.filter(clusterid=championship_cluster.id)
-        
-        for mapping in championship_judge_mappings:
-            try:
-                judge = Judge.objects.get(id=mapping.judgeid)
-                # Update Judge model
-                if not judge.championship:
-                    judge.championship = True
-                    judge.save()
-                # Update MapJudgeToCluster mapping (this is what the frontend checks)
-                if not mapping.championship:
-                    mapping.championship = True
-                    mapping.save()
-            except Judge.DoesNotExist:
-                continue
-        
-        redesign_judge_mappings = MapJudgeToCluster.objects.filter(clusterid=redesign_cluster.id)
-        
-        for mapping in redesign_judge_mappings:
-            try:
-                judge = Judge.objects.get(id=mapping.judgeid)
-                # Update Judge model
-                if not judge.redesign:
-                    judge.redesign = True
-                    judge.save()
-                # Update MapJudgeToCluster mapping 
-                if not mapping.redesign:
-                    mapping.redesign = True
-                    mapping.save()
-            except Judge.DoesNotExist:
-                continue
-        
-        # 7. Clear existing championship/redesign scoresheets to avoid duplicates
-        #    Scope to this contest's teams only, so judges in
-        #    multiple contests don't lose sheets from other contests.
-        #    
-        #    IMPORTANT: Delete BOTH types (6 and 7) for ALL judges in EITHER cluster.
-        #    This ensures we clean up old scoresheets when judges are moved between
-        #    championship and redesign clusters (e.g., judge moved from championship to redesign
-        #    will have their old championship sheets deleted).
-        
-        # Collect all judge IDs from both clusters
-        all_advanced_judge_ids = set()
-        championship_judge_ids = [mapping.judgeid for mapping in championship_judge_mappings]
-        redesign_judge_ids = [mapping.judgeid for mapping in redesign_judge_mappings]
-        all_advanced_judge_ids.update(championship_judge_ids)
-        all_advanced_judge_ids.update(redesign_judge_ids)
-        
-        if all_advanced_judge_ids:
-            # Delete BOTH championship (7) and redesign (6) sheets for ALL judges
-
-            MapScoresheetToTeamJudge.objects.filter(
-                judgeid__in=list(all_advanced_judge_ids),
-                teamid__in=contest_team_ids,
-                sheetType__in=[6, 7],  # Both redesign and championship
-            ).delete()
-        
-        from .scoresheets import create_scoresheets_for_judges_in_cluster
-        
-        create_scoresheets_for_judges_in_cluster(championship_cluster.id)
-        create_scoresheets_for_judges_in_cluster(redesign_cluster.id)
-        
-        # Recompute totals and ranks for the new clusters
-        recompute_totals_and_ranks(contest_id)
-        
+        with transaction.atomic():
+            championship_cluster, redesign_cluster, championship_teams, redesign_teams = _advance(
+                contest_id, championship_team_ids
+            )
+
         return Response({
             "ok": True,
             "message": "Championship advancement completed successfully",
             "data": {
                 "championship_cluster_id": championship_cluster.id,
                 "redesign_cluster_id": redesign_cluster.id,
-                "championship_teams_count": len(championship_teams_data),
-                "redesign_teams_count": len(redesign_teams_data)
+                "championship_teams_count": len(championship_teams),
+                "redesign_teams_count": len(redesign_teams)
             }
         }, status=200)
-        
+
+    except AdvancementError as e:
+        return Response({"ok": False, "message": str(e)}, status=400)
     except Exception as e:
         return Response({"ok": False, "message": f"Error during championship advancement: {str(e)}"}, status=500)
 
@@ -223,10 +322,10 @@ def undo_championship_advancement(request):
     Undo championship advancement and revert to preliminary state:
     1. Deactivate championship and redesign clusters
     2. Remove teams from championship/redesign clusters
-    3. Reset team scores and flags
-    4. Move teams back to original preliminary clusters
-    
-    Body: { 
+    3. Restore preliminary scores and reset team flags
+    4. Move teams back to their preliminary clusters
+
+    Body: {
         "contestid": <int>
     }
     """
@@ -240,179 +339,8 @@ def undo_championship_advancement(request):
         return Response({"ok": False, "message": "Organizer of this contest required."}, status=403)
 
     try:
-        # 1. Get all teams in contest
-        contest_team_ids = list(
-            MapContestToTeam.objects.filter(contestid=contest_id).values_list("teamid", flat=True)
-        )
-        
-        # 2. Find championship and redesign clusters
-        contest_clusters = MapContestToCluster.objects.filter(contestid=contest_id)
-        championship_cluster = None
-        redesign_cluster = None
-        
-        for cc in contest_clusters:
-            try:
-                cluster = JudgeClusters.objects.get(id=cc.clusterid)
-                # Use cluster_type field for robust detection
-                if cluster.cluster_type == 'championship':
-                    championship_cluster = cluster
-                elif cluster.cluster_type == 'redesign':
-                    redesign_cluster = cluster
-                # Fallback: check by name for existing clusters (transition period)
-                elif 'championship' in cluster.cluster_name.lower() and not championship_cluster:
-                    championship_cluster = cluster
-                elif 'redesign' in cluster.cluster_name.lower() and not redesign_cluster:
-                    redesign_cluster = cluster
-            except JudgeClusters.DoesNotExist:
-                continue
-        
-        # 3. Deactivate clusters
-        if championship_cluster:
-            championship_cluster.is_active = False
-            championship_cluster.save()
-            
-        if redesign_cluster:
-            redesign_cluster.is_active = False
-            redesign_cluster.save()
-        
-        # 4. Remove teams from championship/redesign clusters
-        if championship_cluster:
-            MapClusterToTeam.objects.filter(clusterid=championship_cluster.id).delete()
-            
-        if redesign_cluster:
-            MapClusterToTeam.objects.filter(clusterid=redesign_cluster.id).delete()
-        
-        # 4.5. Delete championship/redesign scoresheets ONLY for teams in this contest
-        # This ensures we don't delete scoresheets from other contests
-        if championship_cluster:
-            # Get all judges in championship cluster
-            championship_judges = MapJudgeToCluster.objects.filter(clusterid=championship_cluster.id)
-            championship_judge_ids = [m.judgeid for m in championship_judges]
-            if championship_judge_ids:
-                # Only delete championship scoresheets (type 7) for teams in this contest
-                MapScoresheetToTeamJudge.objects.filter(
-                    judgeid__in=championship_judge_ids,
-                    teamid__in=contest_team_ids,
-                    sheetType=7  # championship
-                ).delete()
-        
-        if redesign_cluster:
-            # Get all judges in redesign cluster
-            redesign_judges = MapJudgeToCluster.objects.filter(clusterid=redesign_cluster.id)
-            redesign_judge_ids = [m.judgeid for m in redesign_judges]
-            if redesign_judge_ids:
-                # Only delete redesign scoresheets (type 6) for teams in this contest
-                MapScoresheetToTeamJudge.objects.filter(
-                    judgeid__in=redesign_judge_ids,
-                    teamid__in=contest_team_ids,
-                    sheetType=6  # redesign
-                ).delete()
-        
-        # 5. Restore preliminary scores and reset team flags
-        for team_id in contest_team_ids:
-            try:
-                team = Teams.objects.get(id=team_id)
-                # Restore preliminary scores
-                team.presentation_score = team.preliminary_presentation_score
-                team.journal_score = team.preliminary_journal_score
-                team.machinedesign_score = team.preliminary_machinedesign_score
-                team.penalties_score = team.preliminary_penalties_score
-                team.total_score = team.preliminary_total_score
-                
-                # Reset championship/redesign scores
-                team.redesign_score = 0.0
-                team.championship_score = 0.0
-                team.advanced_to_championship = False
-                team.championship_rank = None
-                
-                team.save()
-            except Teams.DoesNotExist:
-                continue
-        
-        # 6. Move teams back to original preliminary clusters (if any exist)
-        preliminary_clusters = []
-        for cc in contest_clusters:
-            try:
-                cluster = JudgeClusters.objects.get(id=cc.clusterid)
-                cluster_type = getattr(cluster, 'cluster_type', None)
-                if cluster_type == 'preliminary' or cluster_type is None or cluster_type == 'NO_TYPE_FIELD':
-                    preliminary_clusters.append(cluster)
-            except JudgeClusters.DoesNotExist:
-                continue
-        
-        if preliminary_clusters:
-            # Assign teams to the first preliminary cluster found
-            main_cluster = preliminary_clusters[0]
-            for team_id in contest_team_ids:
-                # Check if mapping already exists to avoid duplicates
-                if not MapClusterToTeam.objects.filter(clusterid=main_cluster.id, teamid=team_id).exists():
-                    MapClusterToTeam.objects.create(clusterid=main_cluster.id, teamid=team_id)
-            
-            # Recreate preliminary scoresheets if they don't exist
-            #  Only creates scoresheets for judges who are already in preliminary clusters
-            # Judges who were ONLY in championship/redesign clusters will not get preliminary scoresheets
-            # and will see nothing on their dashboard 
-            try:
-                from .scoresheets import create_scoresheets_for_judges_in_cluster
-                created_sheets = create_scoresheets_for_judges_in_cluster(main_cluster.id)
-            except Exception as e:
-                # Log error but don't fail the entire operation
-                import traceback
-        
-        # 7. Reset judge championship/redesign flags for this contest's clusters
-      
-        
-        if championship_cluster:
-            # Reset championship flags for judges in this contest's championship cluster
-            championship_judge_mappings = MapJudgeToCluster.objects.filter(clusterid=championship_cluster.id)
-            for mapping in championship_judge_mappings:
-                mapping.championship = False
-                mapping.save()
-                
-                # Check if judge has any other championship assignments in other contests
-                # If not, reset the Judge model's championship flag
-                try:
-                    judge = Judge.objects.get(id=mapping.judgeid)
-                    other_championship_mappings = MapJudgeToCluster.objects.filter(
-                        judgeid=judge.id,
-                        championship=True
-                    ).exclude(clusterid=championship_cluster.id)
-                    
-                    if not other_championship_mappings.exists():
-                        judge.championship = False
-                        judge.save()
-                except Judge.DoesNotExist:
-                    continue
-        
-        if redesign_cluster:
-            # Reset redesign flags for judges in this contest's redesign cluster
-            redesign_judge_mappings = MapJudgeToCluster.objects.filter(clusterid=redesign_cluster.id)
-            for mapping in redesign_judge_mappings:
-                mapping.redesign = False
-                mapping.save()
-                
-                # Check if judge has any other redesign assignments in other contests
-                # If not, reset the Judge model's redesign flag
-                try:
-                    judge = Judge.objects.get(id=mapping.judgeid)
-                    other_redesign_mappings = MapJudgeToCluster.objects.filter(
-                        judgeid=judge.id,
-                        redesign=True
-                    ).exclude(clusterid=redesign_cluster.id)
-                    
-                    if not other_redesign_mappings.exists():
-                        judge.redesign = False
-                        judge.save()
-                except Judge.DoesNotExist:
-                    continue
-        
-        # 8. Recompute totals and ranks
-        try:
-            recompute_totals_and_ranks(contest_id)
-        except Exception as recompute_error:
-            # Don't fail the entire operation for recompute errors
-            # The scores will be recomputed later when needed
-            pass
+        with transaction.atomic():
+            championship_cluster, redesign_cluster, contest_team_ids = _undo(contest_id)
 
         return Response({
             "ok": True,
@@ -423,8 +351,55 @@ def undo_championship_advancement(request):
                 "redesign_cluster_deactivated": redesign_cluster is not None
             }
         }, status=200)
-        
+
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
         return Response({"ok": False, "message": f"Error undoing championship advancement: {str(e)}"}, status=500)
+
+
+@api_view(["POST"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def redo_championship_advancement(request):
+    """
+    Advance a contest again with the teams of its last (undone) advancement.
+
+    Body: {
+        "contestid": <int>
+    }
+    """
+    contest_id = request.data.get("contestid")
+
+    if not contest_id:
+        return Response({"ok": False, "message": "contestid is required"}, status=400)
+
+    # Security check
+    if not _ensure_requester_is_organizer_of_contest(request.user, contest_id):
+        return Response({"ok": False, "message": "Organizer of this contest required."}, status=403)
+
+    snapshot = AdvancementSnapshot.objects.filter(contestid=contest_id).first()
+    if snapshot is None:
+        return Response({"ok": False, "message": "This contest has no advancement to redo."}, status=404)
+    if snapshot.is_advanced:
+        return Response({"ok": False, "message": "This contest is already advanced."}, status=400)
+
+    try:
+        with transaction.atomic():
+            championship_cluster, redesign_cluster, championship_teams, redesign_teams = _advance(
+                contest_id, snapshot.championship_team_ids
+            )
+
+        return Response({
+            "ok": True,
+            "message": "Championship advancement redone successfully",
+            "data": {
+                "championship_cluster_id": championship_cluster.id,
+                "redesign_cluster_id": redesign_cluster.id,
+                "championship_teams_count": len(championship_teams),
+                "redesign_teams_count": len(redesign_teams)
+            }
+        }, status=200)
+
+    except AdvancementError as e:
+        return Response({"ok": False, "message": str(e)}, status=400)
+    except Exception as e:
+        return Response({"ok": False, "message": f"Error redoing championship advancement: {str(e)}"}, status=500)
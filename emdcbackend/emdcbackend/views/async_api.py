@@ -0,0 +1,47 @@
+"""
+Helpers for the async (ASGI) read endpoints.
+
+DRF's @api_view is sync-only, so under ASGI every DRF request holds a worker
+thread while it waits on the database. The async variants of the read-heavy
+endpoints are plain Django coroutine views wrapped with async_api_view(),
+which applies the same rules as the DRF views they mirror:
+  - session authentication, 403 when not logged in (authenticated=False
+    for endpoints that are public in their DRF version),
+  - 405 for other HTTP methods,
+  - {"detail": ...} with the exception's status for DRF APIExceptions
+    (e.g. 400 for ParseError) and status 500 on unexpected errors.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+
+
+@sync_to_async
+def _is_authenticated(request):
+    # request.user is resolved lazily from the session with sync ORM calls
+    return bool(request.user and request.user.is_authenticated)
+
+
+def async_api_view(http_method_names, authenticated=True):
+    def decorator(func):
+        @functools.wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+            if authenticated and not await _is_authenticated(request):
+                return JsonResponse({"detail": "Authentication credentials were not provided."}, status=403)
+            try:
+                return await func(request, *args, **kwargs)
+            except APIException as e:
+                return JsonResponse({"detail": e.detail}, status=e.status_code)
+            except Exception as e:
+                return JsonResponse({"detail": str(e)}, status=500)
+        return view
+    return decorator
+
+
+async def alist(queryset):
+    """Evaluate a queryset with the async ORM."""
+    return [obj async for obj in queryset]
@@ -12,6 +12,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 from ..models import Ballot
 from ..serializers import BallotSerializer
+from .pagination import boolean, exact, list_response
 
 # Ballot Views
 @api_view(["POST"])
@@ -31,10 +32,12 @@ def create_ballot(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_all_ballots(request):
+    # Query: ?contestid=<int>&isSubmitted=<bool>&limit=<int>&cursor=<str> (optional, see views/pagination.py)
     try:
-        ballots = Ballot.objects.all()
-        serializer = BallotSerializer(ballots, many=True)
-        return Response({"ballots": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(request, Ballot.objects.all(), BallotSerializer, "ballots", {
+            "contestid": exact("contestid"),
+            "isSubmitted": boolean("isSubmitted"),
+        })
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
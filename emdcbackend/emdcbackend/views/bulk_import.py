@@ -0,0 +1,705 @@
+"""
+Bulk roster imports for registration season.
+
+POST /api/team/bulkImport/ (and `manage.py import_teams`) takes one row per
+team -- team name, school, coach email and cluster -- as JSON or CSV:
+
+    team_name,school_name,coach_email,coach_first_name,coach_last_name,cluster
+    Rocketeers,Mankato East,pat@example.com,Pat,Lee,Cluster A
+
+Every row is validated before anything is written, so a bad file imports
+nothing. The rows are then created with a fixed number of bulk INSERTs,
+whatever their count: coaches are looked up by email in one query and
+shared by all rows with that email, teams and their coach/contest/cluster
+mappings are bulk-created, and score sheets are provisioned for the judges
+of each team's cluster. New coaches get the set-password email through the
+email outbox once the import commits.
+
+POST /api/judge/bulkImport/ (and `manage.py import_judges`) applies a judge
+roster the same way: one row per judge and cluster with that assignment's
+sheet flags,
+
+    email,first_name,last_name,cluster,presentation,journal,mdo,runpenalties,otherpenalties
+    sam@example.com,Sam,Ortiz,Cluster A,x,,x,,
+
+diffed against the judges' current cluster assignments and score sheets.
+"""
+import csv
+import io
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Lower
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAuthenticated
+
+from ..auth.password_utils import send_set_password_emails
+from ..auth.role_cache import invalidate_role_profiles
+from ..models import (
+    Coach,
+    Contest,
+    Judge,
+    JudgeClusters,
+    MapClusterToTeam,
+    MapCoachToTeam,
+    MapContestToCluster,
+    MapContestToJudge,
+    MapContestToTeam,
+    MapJudgeToCluster,
+    MapScoresheetToTeamJudge,
+    MapUserToRole,
+    Scoresheet,
+    Teams,
+)
+from .live import notify_progress, progress_feed
+from .scoresheets import JUDGE_SHEET_FLAGS, cluster_sheet_assignments, provision_sheets
+from .tabulation import is_admin_or_contest_organizer
+
+# Rows per INSERT
+IMPORT_BATCH_SIZE = 500
+
+# Accepted spellings of each column (lower case, spaces as underscores)
+TEAM_COLUMNS = {
+    "team_name": ("team_name", "team"),
+    "school_name": ("school_name", "school"),
+    "coach_email": ("coach_email", "email", "username"),
+    "coach_first_name": ("coach_first_name", "first_name"),
+    "coach_last_name": ("coach_last_name", "last_name"),
+    "cluster": ("cluster", "clusterid", "cluster_name"),
+}
+
+
+class RosterImportError(Exception):
+    """The rows cannot be imported; `errors` lists {"row", "field", "message"} dicts."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+    def describe(self):
+        return "\n".join(
+            f"row {error['row']}: {error['field'] or 'file'}: {error['message']}" if error["row"]
+            else f"{error['field'] or 'file'}: {error['message']}"
+            for error in self.errors
+        )
+
+
+# -----------------------
+# Parsing
+# -----------------------
+
+def parse_rows(content, fmt):
+    """Rows (dicts) of a "csv" or "json" document."""
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    if fmt == "json":
+        try:
+            rows = json.loads(content)
+        except ValueError as e:
+            raise RosterImportError([{"row": None, "field": None, "message": f"Invalid JSON: {e}"}])
+        if isinstance(rows, dict):
+            rows = rows.get("rows")
+        return rows
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(content)))
+    raise RosterImportError([{"row": None, "field": None, "message": f"Unsupported format {fmt!r}; use csv or json."}])
+
+
+def format_of(filename, content_type=""):
+    """ "csv" or "json" for an uploaded file, by extension or content type."""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension in ("csv", "json"):
+        return extension
+    return "json" if "json" in (content_type or "") else "csv"
+
+
+def normalize_rows(rows, columns):
+    """Map each row's keys onto `columns`, stripping values; None for missing ones."""
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise RosterImportError([{"row": None, "field": None, "message": "Rows must be a list of objects."}])
+    limit = getattr(settings, "IMPORT_MAX_ROWS", 5000)
+    if len(rows) > limit:
+        raise RosterImportError([{"row": None, "field": None, "message": f"At most {limit} rows per import."}])
+    if not rows:
+        raise RosterImportError([{"row": None, "field": None, "message": "Nothing to import."}])
+
+    normalized = []
+    for row in rows:
+        values = {str(key).strip().lower().replace(" ", "_"): value for key, value in row.items() if key}
+        out = {}
+        for column, aliases in columns.items():
+            value = next((values[alias] for alias in aliases if values.get(alias) not in (None, "")), None)
+            out[column] = str(value).strip() if value is not None else None
+        normalized.append(out)
+    return normalized
+
+
+# -----------------------
+# Validation
+# -----------------------
+
+def _contest_clusters(contest_id):
+    return list(JudgeClusters.objects.filter(
+        id__in=MapContestToCluster.objects.filter(contestid=contest_id).values("clusterid")
+    ).order_by("id"))
+
+
+def cluster_type(cluster):
+    """"preliminary", "championship" or "redesign"; by name for clusters without a type."""
+    if cluster.cluster_type:
+        return cluster.cluster_type
+    name = cluster.cluster_name.lower()
+    if "championship" in name:
+        return "championship"
+    if "redesign" in name:
+        return "redesign"
+    return "preliminary"
+
+
+def _cluster_lookup(clusters, preliminary_only=True):
+    """Resolve a row's cluster (id or name) among a contest's clusters."""
+    by_id = {str(cluster.id): cluster for cluster in clusters}
+    by_name = {}
+    for cluster in clusters:
+        by_name.setdefault(cluster.cluster_name.strip().lower(), cluster)
+
+    def lookup(value):
+        cluster = by_id.get(value) or by_name.get(value.lower())
+        if cluster is None:
+            return None, f"Cluster {value!r} is not part of this contest."
+        if preliminary_only and cluster_type(cluster) != "preliminary":
+            return None, f"Teams cannot be imported into the {cluster_type(cluster)} cluster."
+        return cluster, None
+    return lookup
+
+
+def _existing_accounts(emails):
+    """
+    {lower-cased email: (user id, role, relatedid)} of the users with these
+    emails (usernames), compared case-insensitively; one query.
+    """
+    roles = MapUserToRole.objects.filter(uuid=OuterRef("id"))
+    accounts = {}
+    for user_id, email, role, relatedid in User.objects.annotate(
+        email_lower=Lower("username"),
+        role=Subquery(roles.values("role")[:1]),
+        relatedid=Subquery(roles.values("relatedid")[:1]),
+    ).filter(email_lower__in=emails).order_by("id").values_list("id", "email_lower", "role", "relatedid"):
+        accounts.setdefault(email, (user_id, role, relatedid))
+    return accounts
+
+
+def validate_team_rows(contest_id, rows):
+    """
+    Check every row and resolve clusters and coaches. Raises RosterImportError
+    listing every problem; returns the plan that import_teams carries out.
+    """
+    if not Contest.objects.filter(id=contest_id).exists():
+        raise RosterImportError([{"row": None, "field": "contestid", "message": "Contest not found."}])
+    rows = normalize_rows(rows, TEAM_COLUMNS)
+
+    clusters = _contest_clusters(contest_id)
+    all_teams_cluster = next((cluster for cluster in clusters if cluster.cluster_name == "All Teams"), None)
+    lookup_cluster = _cluster_lookup(clusters)
+    existing_names = {
+        name.strip().lower() for name in Teams.objects.filter(
+            id__in=MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+        ).values_list("team_name", flat=True)
+    }
+    accounts = _existing_accounts({(row["coach_email"] or "").lower() for row in rows})
+
+    errors = []
+    seen_names = set()
+    for number, row in enumerate(rows, start=1):
+        def error(field, message):
+            errors.append({"row": number, "field": field, "message": message})
+
+        name = row["team_name"]
+        if not name:
+            error("team_name", "Team name is required.")
+        elif len(name) > Teams._meta.get_field("team_name").max_length:
+            error("team_name", "Team name is too long.")
+        elif name.lower() in existing_names:
+            error("team_name", f"Team {name!r} is already in this contest.")
+        elif name.lower() in seen_names:
+            error("team_name", f"Team {name!r} appears more than once.")
+        else:
+            seen_names.add(name.lower())
+
+        email = row["coach_email"]
+        try:
+            validate_email(email or "")
+        except DjangoValidationError:
+            error("coach_email", "Enter a valid email address.")
+        else:
+            account = accounts.get(email.lower())
+            if account and account[1] not in (None, MapUserToRole.RoleEnum.COACH):
+                error("coach_email", f"{email} is already registered with another role.")
+        for field in ("coach_first_name", "coach_last_name"):
+            if row[field] and len(row[field]) > Coach._meta.get_field(field[len("coach_"):]).max_length:
+                error(field, "Name is too long.")
+
+        if row["cluster"]:
+            row["cluster"], message = lookup_cluster(row["cluster"])
+            if message:
+                error("cluster", message)
+        else:
+            row["cluster"] = all_teams_cluster
+    if errors:
+        raise RosterImportError(errors)
+    return {"rows": rows, "accounts": accounts, "all_teams_cluster": all_teams_cluster}
+
+
+# -----------------------
+# Import
+# -----------------------
+
+def import_teams(contest_id, rows, dry_run=False):
+    """
+    Validate and create the teams of `rows` (dicts with TEAM_COLUMNS) in a
+    contest, with their coaches, mappings and score sheets. Raises
+    RosterImportError without writing anything when a row is invalid.
+    """
+    with transaction.atomic():
+        plan = validate_team_rows(contest_id, rows)
+        rows, accounts, all_teams_cluster = plan["rows"], plan["accounts"], plan["all_teams_cluster"]
+
+        # Coaches: one per email, reusing existing coach accounts
+        new_users = {}
+        coach_ids = {}
+        unmapped = {}
+        for row in rows:
+            email = row["coach_email"].lower()
+            if email in coach_ids or email in new_users or email in unmapped:
+                continue
+            account = accounts.get(email)
+            if account is None:
+                new_users[email] = row
+            elif account[1] is None:
+                unmapped[email] = row
+            else:
+                coach_ids[email] = account[2]
+
+        if dry_run:
+            transaction.set_rollback(True)
+            return {
+                "teams_created": len(rows),
+                "coaches_created": len(new_users) + len(unmapped),
+                "coaches_reused": len(coach_ids),
+                "emails_queued": len(new_users),
+                "sheets_created": 0,
+                "dry_run": True,
+            }
+
+        users = []
+        for email, row in new_users.items():
+            user = User(username=row["coach_email"])
+            user.set_unusable_password()
+            users.append(user)
+        users = User.objects.bulk_create(users, batch_size=IMPORT_BATCH_SIZE)
+        user_ids = {user.username.lower(): user.id for user in users}
+        user_ids.update({email: accounts[email][0] for email in unmapped})
+
+        to_coach = list(new_users.items()) + list(unmapped.items())
+        coaches = Coach.objects.bulk_create(
+            [Coach(first_name=row["coach_first_name"] or "", last_name=row["coach_last_name"] or "")
+             for _, row in to_coach],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        MapUserToRole.objects.bulk_create(
+            [MapUserToRole(uuid=user_ids[email], role=MapUserToRole.RoleEnum.COACH, relatedid=coach.id)
+             for (email, _), coach in zip(to_coach, coaches)],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        coach_ids.update({email: coach.id for (email, _), coach in zip(to_coach, coaches)})
+
+        # Teams and their mappings
+        teams = Teams.objects.bulk_create(
+            [Teams(team_name=row["team_name"], school_name=row["school_name"] or "MNSU") for row in rows],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        MapCoachToTeam.objects.bulk_create(
+            [MapCoachToTeam(teamid=team.id, coachid=coach_ids[row["coach_email"].lower()])
+             for row, team in zip(rows, teams)],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        MapContestToTeam.objects.bulk_create(
+            [MapContestToTeam(contestid=contest_id, teamid=team.id) for team in teams],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        memberships = [(row["cluster"].id, team.id) for row, team in zip(rows, teams) if row["cluster"]]
+        if all_teams_cluster:
+            memberships += [
+                (all_teams_cluster.id, team.id) for row, team in zip(rows, teams) if row["cluster"] != all_teams_cluster
+            ]
+        MapClusterToTeam.objects.bulk_create(
+            [MapClusterToTeam(clusterid=cluster_id, teamid=team_id) for cluster_id, team_id in memberships],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+
+        # Sheets for the judges of each team's cluster (see make_sheets_for_team)
+        sheets = provision_sheets(cluster_sheet_assignments(
+            (row["cluster"].id, team.id) for row, team in zip(rows, teams) if row["cluster"]
+        ))
+
+        send_set_password_emails(users, subject="Set your EMDC Coach account password")
+        notify_progress([team.id for team in teams])
+
+    print(f"[INFO] Imported {len(teams)} teams into contest {contest_id}; queued {len(users)} set-password emails")
+    return {
+        "teams_created": len(teams),
+        "coaches_created": len(coaches),
+        "coaches_reused": len(coach_ids) - len(coaches),
+        "emails_queued": len(users),
+        "sheets_created": len(sheets),
+        "dry_run": False,
+        "team_ids": [team.id for team in teams],
+    }
+
+
+# -----------------------
+# Judge roster
+# -----------------------
+
+# One row per judge and cluster; the sheet flags say which sheets the judge
+# scores in that cluster
+JUDGE_COLUMNS = {
+    "judge_email": ("judge_email", "email", "username"),
+    "first_name": ("first_name", "judge_first_name"),
+    "last_name": ("last_name", "judge_last_name"),
+    "phone_number": ("phone_number", "phone"),
+    "role": ("role", "judge_role"),
+    "cluster": ("cluster", "clusterid", "cluster_name"),
+    **{flag: (flag,) for flag in JUDGE_SHEET_FLAGS},
+}
+
+# Cluster types whose judges only score the sheet named after the round
+ROUND_CLUSTER_TYPES = ("championship", "redesign")
+
+JUDGE_ROLES = {role.label.lower(): role.value for role in Judge.JudgeRoleEnum}
+
+
+def _flag(value):
+    return (value or "").lower() in ("1", "true", "yes", "y", "x")
+
+
+def _judge_role(value):
+    if value in (None, ""):
+        return None
+    if value.isdigit() and int(value) in Judge.JudgeRoleEnum.values:
+        return int(value)
+    return JUDGE_ROLES.get(value.lower(), "invalid")
+
+
+def validate_judge_rows(contest_id, rows):
+    """
+    Check every roster row and resolve clusters and judges. Raises
+    RosterImportError listing every problem; returns the plan that
+    import_judges carries out.
+    """
+    if not Contest.objects.filter(id=contest_id).exists():
+        raise RosterImportError([{"row": None, "field": "contestid", "message": "Contest not found."}])
+    rows = normalize_rows(rows, JUDGE_COLUMNS)
+    lookup_cluster = _cluster_lookup(_contest_clusters(contest_id), preliminary_only=False)
+    accounts = _existing_accounts({(row["judge_email"] or "").lower() for row in rows})
+
+    errors = []
+    seen = set()
+    # New judges' details come from their first row that names them
+    profiles, unnamed = {}, {}
+    for number, row in enumerate(rows, start=1):
+        def error(field, message):
+            errors.append({"row": number, "field": field, "message": message})
+
+        email = row["judge_email"]
+        try:
+            validate_email(email or "")
+        except DjangoValidationError:
+            error("judge_email", "Enter a valid email address.")
+            email = None
+        else:
+            email = row["judge_email"] = email.lower()
+            account = accounts.get(email)
+            if account and account[1] not in (None, MapUserToRole.RoleEnum.JUDGE):
+                error("judge_email", f"{email} is already registered with another role.")
+            elif not (account and account[1]):
+                if row["first_name"] and row["last_name"]:
+                    profiles.setdefault(email, row)
+                else:
+                    unnamed.setdefault(email, number)
+        for field in ("first_name", "last_name", "phone_number"):
+            if row[field] and len(row[field]) > Judge._meta.get_field(field).max_length:
+                error(field, "Value is too long.")
+        row["role"] = _judge_role(row["role"])
+        if row["role"] == "invalid":
+            error("role", f"Role must be one of {', '.join(JUDGE_ROLES)}.")
+
+        flags = {flag: _flag(row.pop(flag)) for flag in JUDGE_SHEET_FLAGS}
+        cluster = None
+        if not row["cluster"]:
+            error("cluster", "Cluster is required.")
+        else:
+            cluster, message = lookup_cluster(row["cluster"])
+            if message:
+                error("cluster", message)
+        if cluster is not None:
+            kind = cluster_type(cluster)
+            if kind in ROUND_CLUSTER_TYPES:
+                # As in assign_judge_to_contest
+                if any(value for flag, value in flags.items() if flag != kind):
+                    error("cluster", f"{kind.capitalize()} clusters can only have {kind.capitalize()} scoresheets.")
+                flags = {flag: flag == kind for flag in JUDGE_SHEET_FLAGS}
+            elif flags["redesign"] or flags["championship"]:
+                error("cluster", "Preliminary clusters cannot have Redesign or Championship scoresheets.")
+            if email and (email, cluster.id) in seen:
+                error("cluster", f"{email} is listed for {cluster.cluster_name!r} more than once.")
+            seen.add((email, cluster.id))
+        row["cluster"], row["flags"], row["number"] = cluster, flags, number
+    errors.extend(
+        {"row": number, "field": "first_name", "message": "New judges need a first and last name."}
+        for email, number in unnamed.items() if email not in profiles
+    )
+    if errors:
+        raise RosterImportError(sorted(errors, key=lambda error: error["row"]))
+    return {"rows": rows, "accounts": accounts, "profiles": profiles}
+
+
+def _sync_judge_flags(judge_ids):
+    """
+    sync_judge_sheet_flags for many judges: each Judge flag becomes True if
+    any of the judge's cluster assignments has it. Two queries.
+    """
+    granted = {
+        row["judgeid"]: row for row in MapJudgeToCluster.objects.filter(judgeid__in=judge_ids).values("judgeid").annotate(
+            **{flag: Count("id", filter=Q(**{flag: True})) for flag in JUDGE_SHEET_FLAGS}
+        )
+    }
+    judges = list(Judge.objects.filter(id__in=judge_ids))
+    for judge in judges:
+        for flag in JUDGE_SHEET_FLAGS:
+            setattr(judge, flag, bool(granted.get(judge.id, {}).get(flag)))
+    Judge.objects.bulk_update(judges, list(JUDGE_SHEET_FLAGS), batch_size=IMPORT_BATCH_SIZE)
+    invalidate_role_profiles(MapUserToRole.RoleEnum.JUDGE, [judge.id for judge in judges])
+
+
+def import_judges(contest_id, rows, dry_run=False):
+    """
+    Apply a judge roster (rows with JUDGE_COLUMNS) to a contest in one
+    transaction. For every judge listed, the roster's clusters replace the
+    judge's assignments in this contest, except championship and redesign
+    assignments left out of it (as in edit_judge). Judges not listed are
+    not touched. Assignments and score sheets are diffed as sets against
+    what exists, so only the differences are written; submitted sheets are
+    never removed. Raises RosterImportError without writing anything when
+    a row is invalid.
+    """
+    with transaction.atomic():
+        plan = validate_judge_rows(contest_id, rows)
+        rows, accounts, profiles = plan["rows"], plan["accounts"], plan["profiles"]
+
+        # Judges: existing accounts by email, new ones created in bulk
+        judge_ids = {}
+        new_users = {}
+        unmapped = {}
+        for row in rows:
+            email = row["judge_email"]
+            if email in judge_ids or email in new_users or email in unmapped:
+                continue
+            account = accounts.get(email)
+            if account is None:
+                new_users[email] = profiles[email]
+            elif account[1] is None:
+                unmapped[email] = profiles[email]
+            else:
+                judge_ids[email] = account[2]
+
+        users = []
+        for email in new_users:
+            user = User(username=email)
+            user.set_unusable_password()  # Judges sign in with the shared judge password
+            users.append(user)
+        users = User.objects.bulk_create(users, batch_size=IMPORT_BATCH_SIZE)
+        user_ids = {user.username: user.id for user in users}
+        user_ids.update({email: accounts[email][0] for email in unmapped})
+        to_create = list(new_users.items()) + list(unmapped.items())
+        judges = Judge.objects.bulk_create(
+            [
+                Judge(first_name=row["first_name"], last_name=row["last_name"],
+                      phone_number=row["phone_number"] or "", role=row["role"], contestid=contest_id)
+                for _, row in to_create
+            ],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        MapUserToRole.objects.bulk_create(
+            [MapUserToRole(uuid=user_ids[email], role=MapUserToRole.RoleEnum.JUDGE, relatedid=judge.id)
+             for (email, _), judge in zip(to_create, judges)],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        judge_ids.update({email: judge.id for (email, _), judge in zip(to_create, judges)})
+        all_judge_ids = set(judge_ids.values())
+
+        in_contest = set(MapContestToJudge.objects.filter(
+            contestid=contest_id, judgeid__in=all_judge_ids
+        ).values_list("judgeid", flat=True))
+        MapContestToJudge.objects.bulk_create(
+            [MapContestToJudge(contestid=contest_id, judgeid=judge_id) for judge_id in all_judge_ids - in_contest],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+
+        # Assignments: roster vs. existing rows in this contest's clusters
+        wanted = {(judge_ids[row["judge_email"]], row["cluster"].id): row for row in rows}
+        clusters = {row["cluster"].id: row["cluster"] for row in rows}
+        contest_clusters = {cluster.id: cluster for cluster in _contest_clusters(contest_id)}
+        existing = {
+            (assignment.judgeid, assignment.clusterid): assignment
+            for assignment in MapJudgeToCluster.objects.filter(
+                judgeid__in=all_judge_ids, clusterid__in=contest_clusters
+            )
+        }
+        created, updated, removed, kept = [], [], [], []
+        for key, row in wanted.items():
+            assignment = existing.get(key)
+            if assignment is None:
+                created.append(MapJudgeToCluster(judgeid=key[0], clusterid=key[1], contestid=contest_id, **row["flags"]))
+            elif any(getattr(assignment, flag) != value for flag, value in row["flags"].items()):
+                for flag, value in row["flags"].items():
+                    setattr(assignment, flag, value)
+                updated.append(assignment)
+            else:
+                kept.append(assignment)
+        for key, assignment in existing.items():
+            if key in wanted:
+                continue
+            if assignment.championship or assignment.redesign:
+                kept.append(assignment)
+            else:
+                removed.append(assignment)
+
+        # A judge has at most one cluster of each type per contest
+        final = created + updated + kept
+        types = {}
+        errors = []
+        for assignment in final:
+            kind = cluster_type(contest_clusters.get(assignment.clusterid) or clusters[assignment.clusterid])
+            other = types.setdefault((assignment.judgeid, kind), assignment.clusterid)
+            if other != assignment.clusterid:
+                row = wanted.get((assignment.judgeid, assignment.clusterid)) or wanted.get((assignment.judgeid, other))
+                errors.append({
+                    "row": row["number"] if row else None, "field": "cluster",
+                    "message": f"{row['judge_email'] if row else assignment.judgeid} would be in more than one "
+                               f"{kind} cluster of this contest.",
+                })
+        if errors:
+            raise RosterImportError(errors)
+
+        MapJudgeToCluster.objects.bulk_create(created, batch_size=IMPORT_BATCH_SIZE)
+        MapJudgeToCluster.objects.bulk_update(updated, list(JUDGE_SHEET_FLAGS), batch_size=IMPORT_BATCH_SIZE)
+        MapJudgeToCluster.objects.filter(id__in=[assignment.id for assignment in removed]).delete()
+
+        # Sheets: what the final assignments grant vs. what the judges have
+        contest_team_ids = MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+        teams_by_cluster = {}
+        for cluster_id, team_id in MapClusterToTeam.objects.filter(
+            clusterid__in={assignment.clusterid for assignment in final}, teamid__in=contest_team_ids
+        ).values_list("clusterid", "teamid"):
+            teams_by_cluster.setdefault(cluster_id, []).append(team_id)
+        granted = {
+            (team_id, assignment.judgeid, sheet_type)
+            for assignment in final
+            for team_id in teams_by_cluster.get(assignment.clusterid, ())
+            for flag, sheet_type in JUDGE_SHEET_FLAGS.items()
+            if getattr(assignment, flag)
+        }
+        # Sheets no longer granted are removed unless already submitted
+        stale = MapScoresheetToTeamJudge.objects.filter(
+            judgeid__in=all_judge_ids, teamid__in=contest_team_ids
+        ).exclude(scoresheetid__in=Scoresheet.objects.filter(isSubmitted=True).values("id"))
+        stale = [
+            (mapping_id, scoresheet_id)
+            for mapping_id, scoresheet_id, *assignment in stale.values_list(
+                "id", "scoresheetid", "teamid", "judgeid", "sheetType"
+            )
+            if tuple(assignment) not in granted
+        ]
+        Scoresheet.objects.filter(id__in=[scoresheet_id for _, scoresheet_id in stale]).delete()
+        MapScoresheetToTeamJudge.objects.filter(id__in=[mapping_id for mapping_id, _ in stale]).delete()
+        sheets = provision_sheets(sorted(granted))
+
+        _sync_judge_flags(all_judge_ids)
+        progress_feed.notify(contest_id)
+
+        summary = {
+            "judges_created": len(judges),
+            "assignments_created": len(created),
+            "assignments_updated": len(updated),
+            "assignments_removed": len(removed),
+            "assignments_unchanged": len(kept),
+            "sheets_created": len(sheets),
+            "sheets_removed": len(stale),
+            "dry_run": dry_run,
+        }
+        if dry_run:
+            transaction.set_rollback(True)
+            return summary
+
+    print(f"[INFO] Applied judge roster to contest {contest_id}: {summary}")
+    return summary
+
+
+# -----------------------
+# Endpoint
+# -----------------------
+
+def request_rows(request):
+    """Rows of an import request: a "rows" list, or an uploaded "file" (CSV or JSON)."""
+    upload = request.FILES.get("file")
+    if upload is not None:
+        return parse_rows(upload.read(), format_of(upload.name, upload.content_type))
+    if "csv" in request.data:
+        return parse_rows(request.data["csv"], "csv")
+    return request.data.get("rows")
+
+
+def _run_import(request, importer):
+    contest_id = request.data.get("contestid")
+    try:
+        contest_id = int(contest_id)
+    except (TypeError, ValueError):
+        return Response({"errors": [{"row": None, "field": "contestid", "message": "contestid is required."}]},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not is_admin_or_contest_organizer(request.user, contest_id):
+        return Response({"error": "Only admins or organizers of this contest can import."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+    try:
+        summary = importer(contest_id, request_rows(request), dry_run=dry_run)
+    except RosterImportError as e:
+        return Response({"errors": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+# Body: {"contestid": <int>, "rows": [{...}, ...], "dry_run": <bool>}
+#   or multipart: contestid, file=<teams.csv|teams.json>, dry_run
+@api_view(["POST"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_import_teams(request):
+    return _run_import(request, import_teams)
+
+
+# Same body as bulk_import_teams, with judge roster rows
+@api_view(["POST"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_import_judges(request):
+    return _run_import(request, import_judges)
@@ -0,0 +1,211 @@
+# backend/emdcbackend/emdcbackend/views/clone.py
+"""
+Clone a contest for a new season.
+
+    POST /api/contest/clone/
+    {"contestid": 3, "name": "EMDC 2026", "date": "2026-04-18", "include_teams": false}
+
+The new contest gets a copy of every cluster of the source contest (names
+and types), the same organizers, and the same judges with their cluster
+assignments and sheet flags. Judges and organizers are shared with the
+source contest, not copied. With include_teams, every team is copied too
+(name and school, no scores), with its coaches and preliminary cluster
+memberships; teams reach the championship and redesign clusters only by
+advancing. Score sheets are provisioned in bulk at the end.
+
+Everything is written with bulk INSERTs in one transaction, in a fixed
+number of queries whatever the size of the contest. Rows are matched to
+their copies through an id remapping table (source id -> new id), which is
+also returned to the caller.
+"""
+from django.db import transaction
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import (
+    Contest,
+    JudgeClusters,
+    MapClusterToTeam,
+    MapCoachToTeam,
+    MapContestToCluster,
+    MapContestToJudge,
+    MapContestToOrganizer,
+    MapContestToTeam,
+    MapJudgeToCluster,
+    Teams,
+)
+from .advance import PRELIMINARY_SHEET_FLAGS
+from .bulk_import import IMPORT_BATCH_SIZE, cluster_type
+from .contest import create_contest_instance
+from .scoresheets import JUDGE_SHEET_FLAGS, cluster_sheet_assignments, provision_sheets
+from .tabulation import is_admin_or_contest_organizer
+
+
+def _copy_clusters(source_id, contest_id):
+    """Copy the source contest's clusters; returns {source cluster id: new cluster}."""
+    clusters = list(JudgeClusters.objects.filter(
+        id__in=MapContestToCluster.objects.filter(contestid=source_id).values("clusterid")
+    ).order_by("id"))
+    copies = JudgeClusters.objects.bulk_create(
+        [
+            JudgeClusters(
+                cluster_name=cluster.cluster_name,
+                cluster_type=cluster.cluster_type,
+                # A new contest has not advanced yet: its round clusters
+                # stay inactive until it does (like after an undo)
+                is_active=cluster.is_active and cluster_type(cluster) == "preliminary",
+            )
+            for cluster in clusters
+        ],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    MapContestToCluster.objects.bulk_create(
+        [MapContestToCluster(contestid=contest_id, clusterid=copy.id) for copy in copies],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    return {cluster.id: copy for cluster, copy in zip(clusters, copies)}
+
+
+def _copy_judge_assignments(source_id, contest_id, cluster_map):
+    """Map the source contest's judges to the new contest and its copied clusters."""
+    judge_ids = list(
+        MapContestToJudge.objects.filter(contestid=source_id).values_list("judgeid", flat=True).distinct()
+    )
+    MapContestToJudge.objects.bulk_create(
+        [MapContestToJudge(contestid=contest_id, judgeid=judge_id) for judge_id in sorted(judge_ids)],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    assignments = MapJudgeToCluster.objects.filter(clusterid__in=list(cluster_map)).order_by("id")
+    copies = MapJudgeToCluster.objects.bulk_create(
+        [
+            MapJudgeToCluster(
+                judgeid=assignment.judgeid,
+                clusterid=cluster_map[assignment.clusterid].id,
+                contestid=contest_id,
+                **{flag: getattr(assignment, flag) for flag in JUDGE_SHEET_FLAGS},
+            )
+            for assignment in assignments
+        ],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    return len(judge_ids), len(copies)
+
+
+def _copy_organizers(source_id, contest_id):
+    organizer_ids = sorted(set(
+        MapContestToOrganizer.objects.filter(contestid=source_id).values_list("organizerid", flat=True)
+    ))
+    MapContestToOrganizer.objects.bulk_create(
+        [MapContestToOrganizer(contestid=contest_id, organizerid=organizer_id) for organizer_id in organizer_ids],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    return len(organizer_ids)
+
+
+def _copy_teams(source_id, contest_id, cluster_map):
+    """
+    Copy the source contest's teams with their coaches and preliminary
+    cluster memberships; returns ({source team id: new team id}, new
+    preliminary (cluster id, team id) memberships).
+    """
+    teams = list(Teams.objects.filter(
+        id__in=MapContestToTeam.objects.filter(contestid=source_id).values("teamid")
+    ).order_by("id").only("team_name", "school_name"))
+    copies = Teams.objects.bulk_create(
+        [Teams(team_name=team.team_name, school_name=team.school_name) for team in teams],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    team_map = {team.id: copy.id for team, copy in zip(teams, copies)}
+
+    MapContestToTeam.objects.bulk_create(
+        [MapContestToTeam(contestid=contest_id, teamid=team_id) for team_id in team_map.values()],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    MapCoachToTeam.objects.bulk_create(
+        [
+            MapCoachToTeam(teamid=team_map[team_id], coachid=coach_id)
+            for team_id, coach_id in MapCoachToTeam.objects.filter(teamid__in=list(team_map))
+            .order_by("id").values_list("teamid", "coachid")
+        ],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    preliminary = [
+        cluster_id for cluster_id, copy in cluster_map.items() if cluster_type(copy) == "preliminary"
+    ]
+    memberships = [
+        (cluster_map[cluster_id].id, team_map[team_id])
+        for cluster_id, team_id in MapClusterToTeam.objects.filter(
+            clusterid__in=preliminary, teamid__in=list(team_map),
+        ).order_by("id").values_list("clusterid", "teamid")
+    ]
+    MapClusterToTeam.objects.bulk_create(
+        [MapClusterToTeam(clusterid=cluster_id, teamid=team_id) for cluster_id, team_id in memberships],
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    return team_map, memberships
+
+
+def clone_contest(source_id, *, name, date, include_teams=False):
+    """
+    Create a contest like `source_id` (see the module docstring). Returns a
+    summary with the new contest and the id remapping tables.
+    """
+    with transaction.atomic():
+        contest = create_contest_instance({"name": name, "date": date, "is_open": False, "is_tabulated": False})
+        contest_id = contest["id"]
+        cluster_map = _copy_clusters(source_id, contest_id)
+        judges, assignments = _copy_judge_assignments(source_id, contest_id, cluster_map)
+        organizers = _copy_organizers(source_id, contest_id)
+
+        team_map, sheets = {}, []
+        if include_teams:
+            team_map, memberships = _copy_teams(source_id, contest_id, cluster_map)
+            sheets = provision_sheets(cluster_sheet_assignments(memberships, PRELIMINARY_SHEET_FLAGS))
+
+    summary = {
+        "contest": contest,
+        "clusters_created": len(cluster_map),
+        "judges_assigned": judges,
+        "judge_assignments_created": assignments,
+        "organizers_assigned": organizers,
+        "teams_created": len(team_map),
+        "sheets_created": len(sheets),
+        "cluster_ids": {source: copy.id for source, copy in cluster_map.items()},
+        "team_ids": team_map,
+    }
+    print(f"[INFO] Cloned contest {source_id} into contest {contest_id}: "
+          f"{len(cluster_map)} clusters, {assignments} judge assignments, {len(team_map)} teams")
+    return summary
+
+
+# Body: {"contestid": <int>, "name": <str>, "date": <YYYY-MM-DD>, "include_teams": <bool>}
+# name defaults to "<source name> (copy)" and date to the source contest's date
+@api_view(["POST"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def clone_contest_view(request):
+    source_id = request.data.get("contestid")
+    if not source_id:
+        return Response({"error": "contestid is required."}, status=status.HTTP_400_BAD_REQUEST)
+    source = Contest.objects.filter(id=source_id).first()
+    if source is None:
+        return Response({"error": "Contest not found."}, status=status.HTTP_404_NOT_FOUND)
+    if not is_admin_or_contest_organizer(request.user, source.id):
+        return Response({"error": "Only admins or organizers of this contest can clone it."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    include_teams = str(request.data.get("include_teams", "")).lower() in ("1", "true", "yes")
+    try:
+        summary = clone_contest(
+            source.id,
+            name=request.data.get("name") or f"{source.name} (copy)",
+            date=request.data.get("date") or source.date,
+            include_teams=include_teams,
+        )
+    except ValidationError as e:
+        return Response({"errors": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_201_CREATED)
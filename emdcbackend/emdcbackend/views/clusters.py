@@ -13,7 +13,8 @@ from django.db import transaction
 from ..models import JudgeClusters
 from ..serializers import JudgeClustersSerializer
 from .Maps.MapClusterToContest import  map_cluster_to_contest
-from ..models import Teams, MapClusterToTeam
+from ..models import Teams, MapClusterToTeam, MapContestToCluster
+from .pagination import boolean, exact, in_contest, list_response, parse_str, search
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -26,9 +27,14 @@ def cluster_by_id(request, cluster_id):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def clusters_get_all(request):
-  clusters = JudgeClusters.objects.all()
-  serializer = JudgeClustersSerializer(clusters, many=True)
-  return Response({"Clusters":serializer.data}, status=status.HTTP_200_OK)
+  # Query: ?contestid=<int>&cluster_type=<str>&is_active=<bool>&search=<name>&limit=<int>&cursor=<str>
+  # (all optional, see views/pagination.py)
+  return list_response(request, JudgeClusters.objects.all(), JudgeClustersSerializer, "Clusters", {
+    "contestid": in_contest(MapContestToCluster, "clusterid"),
+    "cluster_type": exact("cluster_type", parse=parse_str),
+    "is_active": boolean("is_active"),
+    "search": search("cluster_name"),
+  })
 
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
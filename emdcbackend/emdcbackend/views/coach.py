@@ -8,6 +8,7 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
 from ..auth.views import create_user
@@ -16,7 +17,14 @@ from ..serializers import CoachSerializer
 from ..models import MapUserToRole
 from ..auth.views import User, delete_user
 from ..auth.password_utils import send_set_password_email
-from django.contrib.sessions.models import Session
+from ..auth.sessions import delete_user_sessions
+from ..models import MapCoachToTeam, MapContestToTeam
+from .pagination import list_response, parse_int, search
+
+
+def _coaches_in_contest(queryset, param, value):
+  team_ids = MapContestToTeam.objects.filter(contestid=parse_int(param, value)).values("teamid")
+  return queryset.filter(id__in=MapCoachToTeam.objects.filter(teamid__in=team_ids).values("coachid"))
 
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
@@ -30,9 +38,11 @@ def coach_by_id(request, coach_id):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def coach_get_all(request):
-  coaches = Coach.objects.all()
-  serializer = CoachSerializer(coaches, many=True)
-  return Response({"Coaches":serializer.data}, status=status.HTTP_200_OK)
+  # Query: ?contestid=<int>&search=<name>&limit=<int>&cursor=<str> (optional, see views/pagination.py)
+  return list_response(request, Coach.objects.all(), CoachSerializer, "Coaches", {
+    "contestid": _coaches_in_contest,
+    "search": search("first_name", "last_name"),
+  })
 
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
@@ -59,20 +69,6 @@ def edit_coach(request):
     serializer = CoachSerializer(instance=coach)
     return Response({"coach": serializer.data}, status=status.HTTP_200_OK)
 
-def _delete_user_sessions(user_id: int) -> None:
-    """
-    Proactively invalidate all active sessions for the given user id.
-    This ensures any existing session cookies become unusable immediately.
-    """
-    try:
-        for session in Session.objects.all():
-            data = session.get_decoded()
-            if str(data.get("_auth_user_id")) == str(user_id):
-                session.delete()
-    except Exception:
-        pass
-
-
 @api_view(["DELETE"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -83,7 +79,7 @@ def delete_coach(request, coach_id):
         user_id = coach_mapping.uuid
         
         # Invalidate all active sessions for this user before deleting user
-        _delete_user_sessions(user_id)
+        delete_user_sessions(user_id)
         
         coach.delete()
         coach_mapping.delete()
@@ -145,13 +141,14 @@ def create_user_and_coach(data):
     user_id = user_response.get("user", {}).get("id")
     if user_id:
         try:
-            user = User.objects.get(id=user_id)
-            print(f"[INFO] Sending set-password email to NEW coach: {user.username}")
-            send_set_password_email(user, subject="Set your EMDC Coach account password")
-            print(f"[SUCCESS] Set-password email sent successfully to: {user.username}")
+            # Savepoint: a failed outbox INSERT must not break the caller's transaction
+            with transaction.atomic():
+                user = User.objects.get(id=user_id)
+                print(f"[INFO] Queueing set-password email to NEW coach: {user.username}")
+                send_set_password_email(user, subject="Set your EMDC Coach account password")
         except Exception as e:
             # Log error but don't fail coach creation if email fails
-            print(f"[ERROR] Failed to send set-password email to coach {user.username}: {e}")
+            print(f"[ERROR] Failed to queue set-password email to coach user {user_id}: {e}")
     
     return user_response, coach_response
 
@@ -0,0 +1,87 @@
+"""
+Conditional GET for list endpoints.
+
+@versioned_etag(Model, ...) goes below the DRF decorators (or below
+async_api_view) so authentication still runs first. Before the view runs it
+reads the TableVersion counters of the given models (one query, see
+table_versions.py) and builds a weak ETag from them, the request path and
+query string, and the user. If the client's If-None-Match matches, it
+returns 304 without calling the view; otherwise the view's 200 response is
+tagged with the ETag.
+
+Responses are marked "Cache-Control: private, no-cache" so browsers keep
+them but always revalidate.
+"""
+import functools
+import hashlib
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..table_versions import get_versions
+
+# Bump when a response format changes so old ETags stop matching
+ETAG_SCHEMA = 1
+
+
+def compute_etag(request, tables):
+    user = getattr(request, "user", None)
+    user_id = user.id if user is not None and user.is_authenticated else None
+    raw = "|".join([
+        str(ETAG_SCHEMA),
+        request.get_full_path(),
+        str(user_id),
+        ",".join(f"{table}:{version}" for table, version in get_versions(tables)),
+    ])
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in parse_etags(header))
+
+
+def _tag(response, etag):
+    if response.status_code == status.HTTP_200_OK:
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def versioned_etag(*models):
+    tables = [model._meta.db_table for model in models]
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_view(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await func(request, *args, **kwargs)
+                etag = await sync_to_async(compute_etag)(request, tables)
+                if etag_matches(request, etag):
+                    response = HttpResponseNotModified()
+                    response["ETag"] = etag
+                    return response
+                return _tag(await func(request, *args, **kwargs), etag)
+            return async_view
+
+        @functools.wraps(func)
+        def view(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return func(request, *args, **kwargs)
+            etag = compute_etag(request, tables)
+            if etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            return _tag(func(request, *args, **kwargs), etag)
+        return view
+    return decorator
@@ -1,3 +1,5 @@
+import asyncio
+
 from rest_framework import status
 from rest_framework.decorators import (
     api_view,
@@ -10,11 +12,15 @@ from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.http import JsonResponse
 
-from ..models import Contest
+from ..deletion import deletion_summary, start_deletion
+from ..models import Contest, ContestDeletion, MapContestToOrganizer, Organizer
 from ..serializers import ContestSerializer
 from .clusters import make_cluster
 from .Maps.MapClusterToContest import map_cluster_to_contest
+from .async_api import alist, async_api_view
+from .conditional import versioned_etag
 
 
 @api_view(["GET"])
@@ -24,9 +30,8 @@ def contest_by_id(request, contest_id):
   return Response({"Contest": serializer.data}, status=status.HTTP_200_OK)
 
 @api_view(["GET"])
+@versioned_etag(Contest, MapContestToOrganizer, Organizer)
 def contest_get_all(request):
-  from ..models import MapContestToOrganizer, Organizer
-
   contests = Contest.objects.all()
 
   contest_organizer_mappings = {}
@@ -56,6 +61,34 @@ def contest_get_all(request):
 
   return Response({"Contests": contest_data}, status=status.HTTP_200_OK)
 
+@async_api_view(["GET"], authenticated=False)
+@versioned_etag(Contest, MapContestToOrganizer, Organizer)
+async def contest_get_all_async(request):
+  """Async version of contest_get_all for the ASGI app (same response)."""
+  contests, mappings, organizer_rows = await asyncio.gather(
+    alist(Contest.objects.all()),
+    alist(MapContestToOrganizer.objects.values('contestid', 'organizerid')),
+    alist(Organizer.objects.values('id', 'first_name', 'last_name')),
+  )
+
+  contest_organizer_mappings = {}
+  for mapping in mappings:
+    contest_organizer_mappings.setdefault(mapping['contestid'], []).append(mapping['organizerid'])
+
+  organizers = {org['id']: f"{org['first_name']} {org['last_name']}".strip()
+                for org in organizer_rows}
+
+  contest_data = []
+  for contest in contests:
+    contest_dict = ContestSerializer(instance=contest).data
+    contest_dict['organizers'] = [
+      organizers[org_id] for org_id in contest_organizer_mappings.get(contest.id, [])
+      if org_id in organizers
+    ]
+    contest_data.append(contest_dict)
+
+  return JsonResponse({"Contests": contest_data})
+
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -113,134 +146,51 @@ def edit_contest(request):
 def delete_contest(request, contest_id):
     """
     Delete a contest and ALL data exclusively tied to that contest.
-    
-    IMPORTANT: Only deletes data for this specific contest_id.
-    Does NOT delete data from other contests.
-    
-    Deletes:
-    1. All judge-contest mappings (MapContestToJudge)
-    2. All judge-cluster mappings for clusters in this contest (MapJudgeToCluster)
-    3. All team-contest mappings (MapContestToTeam)
-    4. All cluster-contest mappings (MapContestToCluster)
-    5. All cluster-team mappings for clusters in this contest (MapClusterToTeam)
-    6. All scoresheets for teams in this contest (MapScoresheetToTeamJudge + Scoresheet)
-    7. All organizer-contest mappings (MapContestToOrganizer)
-    8. Teams that ONLY exist in this contest (Teams)
-    9. Clusters that ONLY exist in this contest (JudgeClusters)
+
+    The contest disappears from every endpoint at once; its mappings, score
+    sheets, and the teams and clusters no other contest uses are then
+    removed in the background, in small chunks (see deletion.py). Poll
+    GET /api/contest/deletionStatus/<contest_id>/ for progress.
+
+    "deleted" keeps the counts the synchronous version returned (contest_id,
+    clusters_deleted, teams_deleted, judges_removed, scoresheets_deleted),
+    counted when the deletion is queued; "deletion" is the job's status.
     """
+    # A contest already being deleted is hidden from Contest.objects
+    contest = get_object_or_404(Contest.all_objects, id=contest_id)
     try:
-        with transaction.atomic():
-            contest = get_object_or_404(Contest, id=contest_id)
-            
-            from ..models import (
-                MapContestToJudge, MapContestToTeam, MapContestToOrganizer, MapContestToCluster,
-                MapJudgeToCluster, MapClusterToTeam, MapScoresheetToTeamJudge, Scoresheet,
-                Teams, JudgeClusters
-            )
-            
-            # Step 1: Get all clusters in this contest
-            cluster_ids = list(
-                MapContestToCluster.objects.filter(contestid=contest_id)
-                .values_list('clusterid', flat=True)
-            )
-            
-            # Step 2: Get all teams in this contest
-            team_ids = list(
-                MapContestToTeam.objects.filter(contestid=contest_id)
-                .values_list('teamid', flat=True)
-            )
-            
-            # Step 3: Get all judges in this contest 
-            judge_ids = list(
-                MapContestToJudge.objects.filter(contestid=contest_id)
-                .values_list('judgeid', flat=True)
-            )
-            
-            # Step 4: Delete scoresheets for teams in this contest ONLY
-            # Get scoresheet mappings for teams in this contest
-            scoresheet_ids = []
-            if team_ids:
-                scoresheet_mappings = MapScoresheetToTeamJudge.objects.filter(
-                    teamid__in=team_ids
-                )
-                # Get scoresheet IDs to delete
-                scoresheet_ids = list(scoresheet_mappings.values_list('scoresheetid', flat=True).distinct())
-                # Delete the mappings first
-                scoresheet_mappings.delete()
-                # Then delete the scoresheets themselves
-                if scoresheet_ids:
-                    Scoresheet.objects.filter(id__in=scoresheet_ids).delete()
-            
-            # Step 5: Delete judge-cluster mappings for clusters in this contest ONLY
-            # Only delete mappings where the cluster belongs to this contest
-            if cluster_ids:
-                MapJudgeToCluster.objects.filter(clusterid__in=cluster_ids).delete()
-            
-            # Step 6: Delete cluster-team mappings for clusters in this contest ONLY
-            # Only delete mappings where the cluster belongs to this contest
-            if cluster_ids:
-                MapClusterToTeam.objects.filter(clusterid__in=cluster_ids).delete()
-            
-            # Step 7: Delete teams that ONLY exist in this contest
-            # A team should only be deleted if it's not in any other contest
-            teams_deleted_count = 0
-            if team_ids:
-                for team_id in team_ids:
-                    # Check if team exists in any other contest
-                    other_contest_mappings = MapContestToTeam.objects.filter(
-                        teamid=team_id
-                    ).exclude(contestid=contest_id)
-                    
-                    # Only delete team if it's not in any other contest
-                    if not other_contest_mappings.exists():
-                        try:
-                            team = Teams.objects.get(id=team_id)
-                            team.delete()
-                            teams_deleted_count += 1
-                        except Teams.DoesNotExist:
-                            pass
-            
-            # Step 8: Delete clusters that ONLY exist in this contest
-            # A cluster should only be deleted if it's not in any other contest
-            clusters_deleted_count = 0
-            if cluster_ids:
-                for cluster_id in cluster_ids:
-                    # Check if cluster exists in any other contest
-                    other_contest_mappings = MapContestToCluster.objects.filter(
-                        clusterid=cluster_id
-                    ).exclude(contestid=contest_id)
-                    
-                    # Only delete cluster if it's not in any other contest
-                    if not other_contest_mappings.exists():
-                        try:
-                            cluster = JudgeClusters.objects.get(id=cluster_id)
-                            cluster.delete()
-                            clusters_deleted_count += 1
-                        except JudgeClusters.DoesNotExist:
-                            pass
-            
-            # Step 9: Delete all contest mappings 
-            MapContestToJudge.objects.filter(contestid=contest_id).delete()
-            MapContestToTeam.objects.filter(contestid=contest_id).delete()
-            MapContestToOrganizer.objects.filter(contestid=contest_id).delete()
-            MapContestToCluster.objects.filter(contestid=contest_id).delete()
-            
-            # Step 10: Finally, delete the contest itself
-            contest.delete()
-            
-            return Response({
-                "detail": "Contest and all associated data deleted successfully.",
-                "deleted": {
-                    "contest_id": contest_id,
-                    "clusters_deleted": clusters_deleted_count,
-                    "teams_deleted": teams_deleted_count,
-                    "judges_removed": len(judge_ids),
-                    "scoresheets_deleted": len(scoresheet_ids)
-                }
-            }, status=status.HTTP_200_OK)
-            
+        deleted = deletion_summary(contest.id)
+        job = start_deletion(contest, request.user.id)
     except Exception as e:
         return Response({
             "detail": f"Error deleting contest: {str(e)}"
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response({
+        "detail": "Contest deleted; its data is being removed in the background.",
+        "deleted": deleted,
+        "deletion": _deletion_status(job),
+    }, status=status.HTTP_200_OK)
+
+
+def _deletion_status(job):
+    return {
+        "contest_id": job.contestid,
+        "contest_name": job.contest_name,
+        "status": job.status,
+        "step": job.step,
+        "deleted": job.deleted,
+        "error": job.last_error or None,
+        "started_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def contest_deletion_status(request, contest_id):
+    """Progress of a background contest deletion: status, current step and rows deleted per step."""
+    job = get_object_or_404(ContestDeletion, contestid=contest_id)
+    return Response({"deletion": _deletion_status(job)}, status=status.HTTP_200_OK)
 
@@ -0,0 +1,280 @@
+# backend/emdcbackend/emdcbackend/views/export.py
+"""
+Streaming exports of contest results.
+
+    GET /api/export/results/<contest_id>/?format=csv&report=sheets
+    GET /api/export/results/<contest_id>/?format=xlsx
+
+Reports:
+    preliminary   every team with its preliminary scores, ranked contest-wide
+    championship  teams that advanced, ranked like championshipResults
+    redesign      teams in the redesign cluster, ranked by redesign score
+    sheets        one row per judge score sheet with every raw field
+
+A CSV file holds one report ("preliminary" unless ?report= says
+otherwise); an XLSX workbook holds the requested report, or all four as
+worksheets. Rows are read with server-side cursors
+(QuerySet.iterator(chunk_size=EXPORT_CHUNK_SIZE)) and written out as they
+arrive, so memory use does not grow with the contest. Stored totals and
+ranks are exported as they are: tabulate first for fresh ones.
+
+The export_results management command writes the same files.
+"""
+import csv
+import itertools
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+
+from ..models import (
+    Contest,
+    Judge,
+    MapClusterToTeam,
+    MapContestToCluster,
+    MapContestToTeam,
+    MapJudgeToCluster,
+    MapScoresheetToTeamJudge,
+    Scoresheet,
+    ScoresheetEnum,
+    Teams,
+)
+from ..xlsx import XLSX_CONTENT_TYPE, write_xlsx
+from .advance import _round_clusters
+from .tabulation import is_admin_or_contest_organizer
+
+SHEET_FIELDS = [f"field{n}" for n in range(1, 43)]
+
+PRELIMINARY_COLUMNS = [
+    "Rank", "Cluster", "Team ID", "Team", "School", "Presentation", "Journal", "Machine Design",
+    "Penalties", "Total", "Advanced", "Disqualified",
+]
+CHAMPIONSHIP_COLUMNS = [
+    "Rank", "Team ID", "Team", "School", "Journal (Preliminary)", "Presentation", "Machine Design",
+    "General Penalties", "Run Penalties", "Total Penalties", "Total",
+]
+REDESIGN_COLUMNS = ["Rank", "Team ID", "Team", "School", "Redesign Score", "Disqualified"]
+SHEET_COLUMNS = [
+    "Sheet ID", "Team ID", "Team", "Judge ID", "Judge", "Sheet Type", "Submitted",
+] + [f"Field {n}" for n in range(1, 43)]
+
+
+def _chunk_size():
+    return getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+
+
+def _contest_teams(contest_id):
+    return Teams.objects.filter(id__in=MapContestToTeam.objects.filter(contestid=contest_id).values("teamid"))
+
+
+# -----------------------
+# Reports
+# -----------------------
+
+def preliminary_rows(contest_id):
+    """
+    Every team of the contest with its preliminary_* scores, ranked by
+    preliminary total. Organizer-disqualified teams come last without a rank.
+    """
+    _, _, preliminary_clusters = _round_clusters(contest_id)
+    cluster_names = {
+        cluster.id: cluster.cluster_name for cluster in preliminary_clusters if cluster.cluster_name != "All Teams"
+    }
+    teams = _contest_teams(contest_id).annotate(
+        cluster_id=Subquery(
+            MapClusterToTeam.objects.filter(teamid=OuterRef("id"), clusterid__in=list(cluster_names))
+            .order_by("id").values("clusterid")[:1]
+        ),
+    ).order_by("organizer_disqualified", "-preliminary_total_score", "id").values_list(
+        "cluster_id", "id", "team_name", "school_name", "preliminary_presentation_score",
+        "preliminary_journal_score", "preliminary_machinedesign_score", "preliminary_total_score",
+        "advanced_to_championship", "organizer_disqualified",
+    )
+    rank = 0
+    for cluster_id, team_id, name, school, presentation, journal, machinedesign, total, advanced, disqualified \
+            in teams.iterator(chunk_size=_chunk_size()):
+        if not disqualified:
+            rank += 1
+        yield [
+            None if disqualified else rank, cluster_names.get(cluster_id), team_id, name, school,
+            presentation, journal, machinedesign,
+            # Run and other penalties together (the preliminary columns
+            # do not keep them apart once a contest has advanced)
+            round(presentation + journal + machinedesign - total, 2),
+            total, advanced, disqualified,
+        ]
+
+
+def championship_rows(contest_id):
+    """Teams that advanced to the championship, in championshipResults order."""
+    teams = _contest_teams(contest_id).filter(advanced_to_championship=True).order_by("-total_score", "id").values_list(
+        "id", "team_name", "school_name", "preliminary_journal_score", "championship_presentation_score",
+        "championship_machinedesign_score", "championship_general_penalties_score",
+        "championship_run_penalties_score", "championship_penalties_score", "total_score",
+    )
+    for rank, row in enumerate(teams.iterator(chunk_size=_chunk_size()), 1):
+        yield [rank, *row]
+
+
+def redesign_rows(contest_id):
+    """Teams in the contest's redesign cluster, ranked by redesign score like set_redesign_rank."""
+    _, redesign_cluster, _ = _round_clusters(contest_id)
+    if redesign_cluster is None:
+        return
+    teams = _contest_teams(contest_id).filter(
+        id__in=MapClusterToTeam.objects.filter(clusterid=redesign_cluster.id).values("teamid"),
+    ).order_by("organizer_disqualified", "-redesign_score", "id").values_list(
+        "id", "team_name", "school_name", "redesign_score", "organizer_disqualified",
+    )
+    rank = 0
+    for team_id, name, school, redesign_score, disqualified in teams.iterator(chunk_size=_chunk_size()):
+        if not disqualified:
+            rank += 1
+        yield [None if disqualified else rank, team_id, name, school, redesign_score, disqualified]
+
+
+def sheet_rows(contest_id):
+    """
+    One row per score sheet of the contest's teams, by team, sheet type and
+    judge. Like getMasterDetails, only judges still assigned to one of the
+    contest's clusters are included.
+
+    The mappings are read with a server-side cursor and their sheets
+    fetched by primary key one chunk at a time: two queries per chunk.
+    """
+    active_judges = MapJudgeToCluster.objects.filter(
+        clusterid__in=MapContestToCluster.objects.filter(contestid=contest_id).values("clusterid"),
+    ).values("judgeid")
+    judges = Judge.objects.filter(id=OuterRef("judgeid"))
+    mappings = MapScoresheetToTeamJudge.objects.filter(
+        teamid__in=MapContestToTeam.objects.filter(contestid=contest_id).values("teamid"),
+        judgeid__in=active_judges,
+    ).annotate(
+        team_name=Subquery(Teams.objects.filter(id=OuterRef("teamid")).values("team_name")[:1]),
+        judge_first_name=Subquery(judges.values("first_name")[:1]),
+        judge_last_name=Subquery(judges.values("last_name")[:1]),
+    ).order_by("teamid", "sheetType", "judgeid", "id").values_list(
+        "scoresheetid", "teamid", "team_name", "judgeid", "judge_first_name", "judge_last_name",
+    )
+
+    size = _chunk_size()
+    rows = mappings.iterator(chunk_size=size)
+    while chunk := list(itertools.islice(rows, size)):
+        sheets = Scoresheet.objects.only("sheetType", "isSubmitted", *SHEET_FIELDS).in_bulk(
+            [row[0] for row in chunk]
+        )
+        for sheet_id, team_id, team_name, judge_id, first_name, last_name in chunk:
+            sheet = sheets.get(sheet_id)
+            if sheet is None:
+                continue
+            yield [
+                sheet_id, team_id, team_name, judge_id, f"{first_name or ''} {last_name or ''}".strip(),
+                ScoresheetEnum(sheet.sheetType).label, sheet.isSubmitted,
+                *(getattr(sheet, field) for field in SHEET_FIELDS),
+            ]
+
+
+# report -> (worksheet name, columns, rows(contest_id))
+REPORTS = {
+    "preliminary": ("Preliminary", PRELIMINARY_COLUMNS, preliminary_rows),
+    "championship": ("Championship", CHAMPIONSHIP_COLUMNS, championship_rows),
+    "redesign": ("Redesign", REDESIGN_COLUMNS, redesign_rows),
+    "sheets": ("Score Sheets", SHEET_COLUMNS, sheet_rows),
+}
+FORMATS = ("csv", "xlsx")
+
+
+class _Echo:
+    """File-like object for csv.writer: write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def write_csv(columns, rows):
+    """Yield CSV as UTF-8 bytes, EXPORT_CHUNK_SIZE lines at a time."""
+    writer = csv.writer(_Echo())
+    # BOM so Excel opens the file as UTF-8
+    yield ("\ufeff" + writer.writerow(columns)).encode()
+    size = _chunk_size()
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield "".join(writer.writerow(row) for row in chunk).encode()
+
+
+def export(contest_id, fmt, reports):
+    """The bytes of an export, as an iterator. CSV takes exactly one report."""
+    if fmt == "csv":
+        (report,) = reports
+        _, columns, rows = REPORTS[report]
+        return write_csv(columns, rows(contest_id))
+    return write_xlsx((REPORTS[report][0], REPORTS[report][1], REPORTS[report][2](contest_id)) for report in reports)
+
+
+def export_filename(contest_id, fmt, reports):
+    name = reports[0] if len(reports) == 1 else "results"
+    return f"contest-{contest_id}-{name}.{fmt}"
+
+
+# -----------------------
+# Endpoint
+# -----------------------
+
+class _ExportRenderer(BaseRenderer):
+    """Lets DRF accept ?format=csv|xlsx; only error responses are rendered, as plain text."""
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = " ".join(str(value) for value in data.values())
+        return str(data).encode()
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class XLSXRenderer(_ExportRenderer):
+    media_type = XLSX_CONTENT_TYPE
+    format = "xlsx"
+    charset = None
+
+
+# Query: ?format=csv|xlsx (default csv) &report=preliminary|championship|redesign|sheets
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes([CSVRenderer, XLSXRenderer])
+def export_results(request, contest_id):
+    fmt = request.accepted_renderer.format
+    report = request.GET.get("report")
+    if report is not None and report not in REPORTS:
+        return Response({"error": f"report must be one of: {', '.join(REPORTS)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not Contest.objects.filter(id=contest_id).exists():
+        return Response({"error": "Contest not found."}, status=status.HTTP_404_NOT_FOUND)
+    if not is_admin_or_contest_organizer(request.user, contest_id):
+        return Response({"error": "Only admins or organizers of this contest can export results."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    if report:
+        reports = [report]
+    else:
+        reports = ["preliminary"] if fmt == "csv" else list(REPORTS)
+    response = StreamingHttpResponse(
+        export(contest_id, fmt, reports),
+        content_type="text/csv; charset=utf-8" if fmt == "csv" else XLSX_CONTENT_TYPE,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(contest_id, fmt, reports)}"'
+    response["Cache-Control"] = "no-store"
+    # Tell nginx not to buffer the download
+    response["X-Accel-Buffering"] = "no"
+    print(f"[INFO] Exporting {', '.join(reports)} of contest {contest_id} as {fmt} for user {request.user.id}")
+    return response
@@ -0,0 +1,50 @@
+"""
+Sparse fieldsets: ?fields=a,b,c or ?exclude=x,y on endpoints that return
+teams or score sheets.
+
+    fieldset = requested_fields(request, TeamSerializer)
+    teams = narrow_queryset(Teams.objects.filter(...), TeamSerializer, fieldset)
+    data = TeamSerializer(teams, many=True, **fieldset).data
+
+requested_fields() validates the names against the serializer (unknown
+names raise ParseError, a 400) and returns the serializer kwargs.
+narrow_queryset() loads only the columns the narrowed serializer reads with
+.only(), so the unused score columns are neither fetched nor serialized.
+Without either parameter both are no-ops and responses are unchanged.
+"""
+from rest_framework.exceptions import ParseError
+
+
+def _query_params(request):
+    # DRF Request or a plain Django HttpRequest (async views)
+    return getattr(request, "query_params", request.GET)
+
+
+def requested_fields(request, serializer_class):
+    params = _query_params(request)
+    fieldset = {}
+    available = None
+    for param in ("fields", "exclude"):
+        raw = params.get(param)
+        if not raw:
+            continue
+        names = [name.strip() for name in raw.split(",") if name.strip()]
+        if available is None:
+            available = set(serializer_class().fields)
+        unknown = sorted(set(names) - available)
+        if unknown:
+            raise ParseError(f"Unknown {param}: {', '.join(unknown)}")
+        fieldset[param] = names
+    return fieldset
+
+
+def narrow_queryset(queryset, serializer_class, fieldset, extra=()):
+    """
+    Restrict the query to the model columns the narrowed serializer reads,
+    plus `extra` columns the view itself needs.
+    """
+    if not fieldset:
+        return queryset
+    columns = {field.name for field in queryset.model._meta.concrete_fields}
+    sources = [field.source for field in serializer_class(**fieldset).fields.values()]
+    return queryset.only(*[name for name in sources if name in columns], *extra)
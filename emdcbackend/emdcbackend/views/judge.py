@@ -21,31 +21,19 @@ from ..models import (
     Teams, MapContestToJudge, MapUserToRole, JudgeClusters
 )
 from ..serializers import JudgeSerializer
+from .conditional import versioned_etag
+from .pagination import exact, in_contest, list_response, search
 from ..auth.serializers import UserSerializer
 
 
 from django.contrib.auth import get_user_model
 from ..auth.password_utils import send_set_password_email
 
-from django.contrib.sessions.models import Session
+from ..auth.sessions import delete_user_sessions
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 
-def _delete_user_sessions(user_id: int) -> None:
-    """
-    Proactively invalidate all active sessions for the given user id.
-    This ensures any existing session cookies become unusable immediately.
-    """
-    try:
-        for session in Session.objects.all():
-            data = session.get_decoded()
-            if str(data.get("_auth_user_id")) == str(user_id):
-                session.delete()
-    except Exception:
-        pass
-
-
 @api_view(["GET"])
 def judge_by_id(request, judge_id):
     judge = get_object_or_404(Judge, id=judge_id)
@@ -299,7 +287,7 @@ def edit_judge(request):
             sync_judge_sheet_flags(judge.id)
 
             if username_changed or role_changed:
-                _delete_user_sessions(user.id)
+                delete_user_sessions(user.id)
 
         serializer = JudgeSerializer(instance=judge)
 
@@ -330,7 +318,7 @@ def delete_judge(request, judge_id):
 
         # Invalidate all active sessions for this user before deleting user
         if user:
-            _delete_user_sessions(user.id)
+            delete_user_sessions(user.id)
 
         # delete associated user
         if user:
@@ -517,11 +505,18 @@ def sync_judge_sheet_flags(judge_id):
 
 
 @api_view(["GET"])
+@versioned_etag(Judge, MapContestToJudge)
 def get_all_judges(request):
-    """Get all judges"""
+    """
+    Get all judges
+    Query: ?contestid=<int>&role=<int>&search=<name>&limit=<int>&cursor=<str>
+    (all optional, see views/pagination.py)
+    """
     try:
-        judges = Judge.objects.all()
-        serializer = JudgeSerializer(judges, many=True)
-        return Response({"Judges": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(request, Judge.objects.all(), JudgeSerializer, "Judges", {
+            "contestid": in_contest(MapContestToJudge, "judgeid"),
+            "role": exact("role"),
+            "search": search("first_name", "last_name"),
+        })
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
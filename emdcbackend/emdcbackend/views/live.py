@@ -0,0 +1,288 @@
+"""
+Server-sent event streams for live dashboards (see broadcast.py).
+
+    GET /api/live/standings/<contest_id>/         (WSGI, one thread per viewer)
+    GET /api/async/live/standings/<contest_id>/   (ASGI, preferred for many viewers)
+    GET /api/live/progress/<contest_id>/           judging progress (and .../async/...)
+    GET /api/live/progress/<contest_id>/snapshot/  plain JSON, for reconnects and polling
+
+Each stream starts with a "snapshot" event holding every row, followed by
+"delta" events with only the rows that changed:
+
+    event: snapshot
+    data: {"rows": [{"id": 3, "team_name": "...", "total_score": 87.5, ...}, ...]}
+
+    event: delta
+    data: {"changed": [{"id": 3, ...}], "removed": []}
+
+A comment line is sent every LIVE_HEARTBEAT_SECONDS to keep proxies from
+closing the connection, and the stream ends after LIVE_STREAM_MAX_SECONDS;
+EventSource reconnects on its own and receives a fresh snapshot.
+
+A WSGI stream holds one of the worker's GUNICORN_THREADS request threads for
+as long as it is open, so each process serves at most LIVE_SYNC_STREAMS_PER_WORKER
+of them and answers further viewers with 503 and Retry-After. Dashboards
+with many viewers must use the /api/async/live/ URLs served by the ASGI app
+(SERVER_INTERFACE=asgi, see gunicorn.conf.py), where a stream costs no thread.
+"""
+import asyncio
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+
+from ..broadcast import Feed
+from ..models import Judge, MapContestToJudge, MapContestToTeam, MapScoresheetToTeamJudge, Scoresheet, Teams
+from .async_api import async_api_view
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF accept "Accept: text/event-stream"; errors become an "error" event."""
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event("error", data).encode()
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _stream_response(content):
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Tell nginx not to buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _timing():
+    return (
+        getattr(settings, "LIVE_HEARTBEAT_SECONDS", 15),
+        time.monotonic() + getattr(settings, "LIVE_STREAM_MAX_SECONDS", 600),
+    )
+
+
+def _subscribe(feed, key, loop=None):
+    sub = feed.subscribe(key, loop=loop)
+    # The stream may stay open for minutes without touching the database;
+    # do not hold a (pooled) connection for all that time.
+    if not connection.in_atomic_block:
+        connection.close()
+    return sub
+
+
+_sync_streams_lock = threading.Lock()
+_sync_streams = 0
+
+
+def _acquire_sync_stream():
+    global _sync_streams
+    with _sync_streams_lock:
+        if _sync_streams >= getattr(settings, "LIVE_SYNC_STREAMS_PER_WORKER", 2):
+            return False
+        _sync_streams += 1
+        return True
+
+
+def _release_sync_stream():
+    global _sync_streams
+    with _sync_streams_lock:
+        _sync_streams -= 1
+
+
+class _CountedStream:
+    """Iterates `content` and gives its slot back when the response is closed, even if never iterated."""
+
+    def __init__(self, content):
+        self.content = content
+        self.released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.content)
+
+    def close(self):
+        try:
+            self.content.close()
+        finally:
+            if not self.released:
+                self.released = True
+                _release_sync_stream()
+
+
+def _sync_stream_response(feed, key):
+    if not _acquire_sync_stream():
+        return Response(
+            {"detail": "Too many live streams on this server; use /api/async/live/ or retry later."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(getattr(settings, "LIVE_HEARTBEAT_SECONDS", 15))},
+        )
+    return _stream_response(_CountedStream(stream_feed(feed, key)))
+
+
+def stream_feed(feed, key):
+    """Sync generator of SSE text for one viewer of `feed`/`key`."""
+    heartbeat, deadline = _timing()
+    sub = _subscribe(feed, key)
+    try:
+        yield "retry: 3000\n\n"
+        # The snapshot queued by subscribe()
+        yield format_event(*sub.get(timeout=None))
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = sub.get(timeout=min(heartbeat, remaining))
+            yield format_event(*event) if event is not None else ": ping\n\n"
+    finally:
+        feed.unsubscribe(sub)
+
+
+async def astream_feed(feed, key):
+    """Async generator of SSE text for one viewer of `feed`/`key`."""
+    heartbeat, deadline = _timing()
+    sub = await sync_to_async(_subscribe)(feed, key, loop=asyncio.get_running_loop())
+    try:
+        yield "retry: 3000\n\n"
+        yield format_event(*await sub.get(timeout=None))
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = await sub.get(timeout=min(heartbeat, remaining))
+            yield format_event(*event) if event is not None else ": ping\n\n"
+    finally:
+        feed.unsubscribe(sub)
+
+
+# -----------------------
+# Standings
+# -----------------------
+
+STANDINGS_FIELDS = (
+    "id", "team_name", "school_name", "total_score", "team_rank", "cluster_rank",
+    "advanced_to_championship", "championship_rank", "championship_score", "redesign_score",
+    "judge_disqualified", "organizer_disqualified",
+)
+
+
+def contest_standings(contest_id):
+    team_ids = MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+    rows = Teams.objects.filter(id__in=team_ids).order_by("id").values(*STANDINGS_FIELDS)
+    return {row["id"]: row for row in rows}
+
+
+# notify(contest_id) is called by recompute_totals_and_ranks and set_advancers
+standings_feed = Feed("standings", contest_standings)
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes([EventStreamRenderer])
+def standings_stream(request, contest_id):
+    return _sync_stream_response(standings_feed, contest_id)
+
+
+@async_api_view(["GET"])
+async def standings_stream_async(request, contest_id):
+    """Async version of standings_stream for the ASGI app (same events)."""
+    return _stream_response(astream_feed(standings_feed, contest_id))
+
+
+# -----------------------
+# Judging progress
+# -----------------------
+
+def contest_progress(contest_id):
+    """
+    Submitted/total score sheet counts of a contest, as rows with ids
+    "judge:<id>", "team:<id>", "cell:<judge id>:<team id>" and "contest".
+    Sheets whose mapping points at a missing score sheet count as not submitted.
+    """
+    team_ids = MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+    submitted = Scoresheet.objects.filter(id=OuterRef("scoresheetid"), isSubmitted=True)
+    cells = list(
+        MapScoresheetToTeamJudge.objects.filter(teamid__in=team_ids)
+        .values("judgeid", "teamid")
+        .annotate(total=Count("id"), submitted=Count("id", filter=Q(Exists(submitted))))
+        .order_by("judgeid", "teamid")
+    )
+
+    judge_ids = MapContestToJudge.objects.filter(contestid=contest_id).values("judgeid")
+    judges = Judge.objects.filter(
+        Q(contestid=contest_id) | Q(id__in=judge_ids) | Q(id__in={cell["judgeid"] for cell in cells})
+    ).values("id", "first_name", "last_name")
+    rows = {
+        f"judge:{judge['id']}": {
+            "id": f"judge:{judge['id']}", "kind": "judge", "judge_id": judge["id"],
+            "name": f"{judge['first_name']} {judge['last_name']}", "submitted": 0, "total": 0,
+        }
+        for judge in judges.order_by("id")
+    }
+    for team in Teams.objects.filter(id__in=team_ids).order_by("id").values("id", "team_name"):
+        rows[f"team:{team['id']}"] = {
+            "id": f"team:{team['id']}", "kind": "team", "team_id": team["id"],
+            "team_name": team["team_name"], "submitted": 0, "total": 0,
+        }
+
+    contest = {"id": "contest", "kind": "contest", "submitted": 0, "total": 0}
+    for cell in cells:
+        judge_id, team_id = cell["judgeid"], cell["teamid"]
+        rows[f"cell:{judge_id}:{team_id}"] = {
+            "id": f"cell:{judge_id}:{team_id}", "kind": "cell", "judge_id": judge_id, "team_id": team_id,
+            "submitted": cell["submitted"], "total": cell["total"],
+        }
+        for row in (rows.get(f"judge:{judge_id}"), rows.get(f"team:{team_id}"), contest):
+            if row is not None:
+                row["submitted"] += cell["submitted"]
+                row["total"] += cell["total"]
+    contest["complete"] = contest["total"] > 0 and contest["submitted"] == contest["total"]
+    rows["contest"] = contest
+    return rows
+
+
+progress_feed = Feed("progress", contest_progress)
+
+
+def notify_progress(team_ids):
+    """Push judging progress for the contests of `team_ids` once the transaction commits."""
+    contest_ids = MapContestToTeam.objects.filter(teamid__in=team_ids).values_list("contestid", flat=True).distinct()
+    for contest_id in contest_ids:
+        progress_feed.notify(contest_id)
+
+
+def notify_progress_for_sheets(scoresheet_ids):
+    notify_progress(MapScoresheetToTeamJudge.objects.filter(scoresheetid__in=scoresheet_ids).values("teamid"))
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@renderer_classes([EventStreamRenderer])
+def progress_stream(request, contest_id):
+    return _sync_stream_response(progress_feed, contest_id)
+
+
+@async_api_view(["GET"])
+async def progress_stream_async(request, contest_id):
+    """Async version of progress_stream for the ASGI app (same events)."""
+    return _stream_response(astream_feed(progress_feed, contest_id))
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+def progress_snapshot(request, contest_id):
+    """The rows of a "snapshot" event as plain JSON."""
+    return Response({"rows": list(progress_feed.current(contest_id).values())})
@@ -0,0 +1,40 @@
+"""
+Prometheus scrape endpoint for the request metrics of this worker process
+(see emdcbackend/metrics.py).
+
+    GET /api/metrics/
+    Authorization: Bearer <METRICS_TOKEN>
+
+Admins can open it with their session as well.
+"""
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .. import metrics as request_metrics
+from ..auth.role_cache import get_cached_role_mapping
+from ..models import MapUserToRole
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _has_token(request):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def _is_admin(request):
+    if not request.user.is_authenticated:
+        return False
+    role_map = get_cached_role_mapping(request.user.id)
+    return bool(role_map) and role_map["role"] == MapUserToRole.RoleEnum.ADMIN
+
+
+@require_GET
+def metrics(request):
+    if not (_has_token(request) or _is_admin(request)):
+        return JsonResponse({"error": "Only admins or the metrics scraper can view metrics."}, status=403)
+    return HttpResponse(request_metrics.render(), content_type=CONTENT_TYPE)
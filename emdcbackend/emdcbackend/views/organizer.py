@@ -22,7 +22,9 @@ from ..auth.views import delete_user_by_id
 
 from django.contrib.auth import get_user_model
 from ..auth.password_utils import send_set_password_email
-from django.contrib.sessions.models import Session
+from ..auth.sessions import delete_user_sessions
+from .pagination import in_contest, list_response, search
+from .live import notify_progress
 
 # get organizer by id
 @api_view(["GET"])
@@ -142,20 +144,6 @@ def edit_organizer(request):
         return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def _delete_user_sessions(user_id: int) -> None:
-    """
-    Proactively invalidate all active sessions for the given user id.
-    This ensures any existing session cookies become unusable immediately.
-    """
-    try:
-        for session in Session.objects.all():
-            data = session.get_decoded()
-            if str(data.get("_auth_user_id")) == str(user_id):
-                session.delete()
-    except Exception:
-        pass
-
-
 @api_view(["DELETE"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -175,7 +163,7 @@ def delete_organizer(request, organizer_id):
                 organizer_mapping.delete()  # Delete the mapping
                 
                 # Invalidate all active sessions for this user before deleting user
-                _delete_user_sessions(user_id)
+                delete_user_sessions(user_id)
                 
                 # Delete the user associated with the organizer (if it exists)
                 try:
@@ -204,9 +192,11 @@ def delete_organizer(request, organizer_id):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_all_organizers(request):
-    organizers = Organizer.objects.all()
-    serializer = OrganizerSerializer(organizers, many=True)
-    return Response({"organizers": serializer.data}, status=status.HTTP_200_OK)
+    # Query: ?contestid=<int>&search=<name>&limit=<int>&cursor=<str> (optional, see views/pagination.py)
+    return list_response(request, Organizer.objects.all(), OrganizerSerializer, "organizers", {
+        "contestid": in_contest(MapContestToOrganizer, "organizerid"),
+        "search": search("first_name", "last_name"),
+    })
 
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
@@ -222,6 +212,7 @@ def organizer_disqualify_team(request):
             scoresheet = Scoresheet.objects.get(id=mapping.scoresheetid)
             scoresheet.isSubmitted = True
             scoresheet.save()
+        notify_progress([team.id])
     team.save()
     serializer = TeamSerializer(team)
     return Response({"team": serializer.data}, status=status.HTTP_200_OK)
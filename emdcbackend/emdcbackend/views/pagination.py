@@ -0,0 +1,134 @@
+"""
+Cursor pagination, contest scoping and filtering for the "get all" endpoints.
+
+list_response() takes the endpoint's base queryset and a dict of the query
+parameters it understands:
+
+    return list_response(request, Teams.objects.all(), TeamSerializer, "teams", {
+        "contestid": in_contest(MapContestToTeam, "teamid"),
+        "search": search("team_name", "school_name"),
+    })
+
+Without ?limit= or ?cursor= the whole (filtered) list is returned under the
+endpoint's usual key, exactly as before. With either parameter the list is
+paged by id (keyset, so later pages cost the same as the first) and the
+response gains "next"/"previous" links:
+
+    GET /api/team/getAllTeams/?contestid=3&limit=50
+    {"teams": [...50 teams...], "next": "...?cursor=cD0xNTI%3D&contestid=3&limit=50", "previous": null}
+
+Serializers with SparseFieldsMixin also accept ?fields= / ?exclude=
+(views/fieldsets.py).
+
+Bad parameters return 400, an unknown cursor 404, both as {"detail": ...}.
+"""
+from django.conf import settings
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from ..serializers import SparseFieldsMixin
+from .fieldsets import narrow_queryset, requested_fields
+
+
+class ListCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size_query_param = "limit"
+
+    def __init__(self):
+        self.page_size = getattr(settings, "LIST_PAGE_SIZE", 100)
+        self.max_page_size = getattr(settings, "LIST_MAX_PAGE_SIZE", 1000)
+
+
+# -----------------------
+# Filters
+# -----------------------
+
+def parse_int(param, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ParseError(f"{param} must be an integer.")
+
+
+def parse_str(param, value):
+    return value
+
+
+def parse_bool(param, value):
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise ParseError(f"{param} must be true or false.")
+
+
+def in_contest(map_model, id_field, contest_field="contestid"):
+    """Keep rows whose id appears in `map_model` for the given contest."""
+    def apply(queryset, param, value):
+        ids = map_model.objects.filter(**{contest_field: parse_int(param, value)}).values(id_field)
+        return queryset.filter(id__in=ids)
+    return apply
+
+
+def exact(field, parse=parse_int):
+    def apply(queryset, param, value):
+        return queryset.filter(**{field: parse(param, value)})
+    return apply
+
+
+def boolean(field):
+    return exact(field, parse=parse_bool)
+
+
+def search(*fields):
+    """Case-insensitive substring match on any of `fields`."""
+    def apply(queryset, param, value):
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}__icontains": value})
+        return queryset.filter(condition)
+    return apply
+
+
+def apply_filters(request, queryset, filters):
+    for param, apply in filters.items():
+        value = request.query_params.get(param)
+        if value not in (None, ""):
+            queryset = apply(queryset, param, value)
+    return queryset
+
+
+# -----------------------
+# Response
+# -----------------------
+
+def is_paginated(request):
+    return "limit" in request.query_params or "cursor" in request.query_params
+
+
+def list_response(request, queryset, serializer_class, key, filters=None):
+    try:
+        fieldset = {}
+        if issubclass(serializer_class, SparseFieldsMixin):
+            fieldset = requested_fields(request, serializer_class)
+        queryset = narrow_queryset(apply_filters(request, queryset, filters or {}), serializer_class, fieldset)
+        if not is_paginated(request):
+            # Compatibility mode: everything, streamed from the cursor in
+            # chunks instead of cached on the queryset
+            rows = queryset.order_by("id").iterator(chunk_size=getattr(settings, "LIST_CHUNK_SIZE", 2000))
+            return Response({key: serializer_class(rows, many=True, **fieldset).data}, status=status.HTTP_200_OK)
+
+        paginator = ListCursorPagination()
+        page = paginator.paginate_queryset(queryset, request)
+    except APIException as e:
+        return Response({"detail": e.detail}, status=e.status_code)
+
+    return Response({
+        key: serializer_class(page, many=True, **fieldset).data,
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link(),
+    }, status=status.HTTP_200_OK)
@@ -12,11 +12,16 @@ from rest_framework.exceptions import ValidationError
 from .Maps.MapScoreSheet import delete_score_sheet_mapping
 from ..models import Scoresheet, Teams, Judge, MapClusterToTeam, MapScoresheetToTeamJudge, MapJudgeToCluster, ScoresheetEnum, Contest, MapContestToTeam, MapContestToCluster
 from ..serializers import ScoresheetSerializer, MapScoreSheetToTeamJudgeSerializer
+from .fieldsets import narrow_queryset, requested_fields
+from .live import notify_progress_for_sheets
+from .. import background
 
 @api_view(["GET"])
 def scores_by_id(request, scores_id):
-    scores = get_object_or_404(Scoresheet, id=scores_id)
-    serializer = ScoresheetSerializer(instance=scores)
+    # Query: ?fields=<names> / ?exclude=<names> (optional, see views/fieldsets.py)
+    fieldset = requested_fields(request, ScoresheetSerializer)
+    scores = get_object_or_404(narrow_queryset(Scoresheet.objects.all(), ScoresheetSerializer, fieldset), id=scores_id)
+    serializer = ScoresheetSerializer(instance=scores, **fieldset)
     return Response({"ScoreSheet": serializer.data}, status=status.HTTP_200_OK)
 
 @api_view(["POST"])
@@ -35,6 +40,7 @@ def create_score_sheet(request):
 def edit_score_sheet(request):
     try:
         scores = get_object_or_404(Scoresheet, id=request.data["id"])
+        was_submitted = scores.isSubmitted
         scores.sheetType = request.data["sheetType"]
         scores.isSubmitted = request.data["isSubmitted"]
         
@@ -90,6 +96,8 @@ def edit_score_sheet(request):
                 scores.field16 = request.data.get("field16", 0)
                 scores.field17 = request.data.get("field17", 0)
         scores.save()
+        if scores.isSubmitted != was_submitted:
+            notify_progress_for_sheets([scores.id])
         
         # Trigger tabulation recalculation asynchronously for all scoresheet types when submitted
         if scores.isSubmitted:
@@ -101,7 +109,6 @@ def edit_score_sheet(request):
                     contest_mapping = MapContestToTeam.objects.filter(teamid=team_mapping.teamid).first()
                     if contest_mapping:
                         # Schedule tabulation asynchronously to avoid blocking the response
-                        import threading
                         from .tabulation import recompute_totals_and_ranks
                         
                         def async_tabulation():
@@ -110,8 +117,8 @@ def edit_score_sheet(request):
                             except Exception as e:
                                 pass
                         
-                        # Run tabulation in background thread
-                        threading.Thread(target=async_tabulation, daemon=True).start()
+                        # Run tabulation in a background thread the worker waits for on exit
+                        background.start(async_tabulation, name="tabulation")
             except Exception as tab_error:
                 # Don't fail the request if tabulation fails
                 pass
@@ -127,6 +134,7 @@ def edit_score_sheet(request):
 def update_scores(request):
     try:
         scores = get_object_or_404(Scoresheet, id=request.data["id"])
+        was_submitted = scores.isSubmitted
         
         # Update isSubmitted field if provided
         if "isSubmitted" in request.data:
@@ -216,6 +224,8 @@ def update_scores(request):
                 scores.field17 = request.data.get("field17") or 0
             
         scores.save()
+        if scores.isSubmitted != was_submitted:
+            notify_progress_for_sheets([scores.id])
         
         # Reload from database to verify save
         scores.refresh_from_db()
@@ -232,7 +242,6 @@ def update_scores(request):
                     contest_mapping = MapContestToTeam.objects.filter(teamid=team_mapping.teamid).first()
                     if contest_mapping:
                         # Schedule tabulation asynchronously to avoid blocking the response
-                        import threading
                         from .tabulation import recompute_totals_and_ranks
                         
                         def async_tabulation():
@@ -241,8 +250,8 @@ def update_scores(request):
                             except Exception as e:
                                 pass
                         
-                        # Run tabulation in background thread
-                        threading.Thread(target=async_tabulation, daemon=True).start()
+                        # Run tabulation in a background thread the worker waits for on exit
+                        background.start(async_tabulation, name="tabulation")
             except Exception as tab_error:
                 # Don't fail the request if tabulation fails
                 pass
@@ -411,6 +420,97 @@ def create_base_score_sheet_Championship():
     else:
         raise ValidationError(serializer.errors)
 
+# Rows per INSERT when provisioning sheets in bulk
+SHEET_BATCH_SIZE = 1000
+
+
+def base_sheet_values(sheet_type):
+    """Field values of a new, empty sheet, as the create_base_score_sheet* helpers save them."""
+    if sheet_type == ScoresheetEnum.RUNPENALTIES:
+        numbers, comments = [i for i in range(1, 18) if i != 9], [9]
+    elif sheet_type in (ScoresheetEnum.OTHERPENALTIES, ScoresheetEnum.REDESIGN):
+        numbers, comments = range(1, 8), [9]
+    elif sheet_type == ScoresheetEnum.CHAMPIONSHIP:
+        numbers, comments = [i for i in range(1, 43) if i not in (9, 18)], [9, 18]
+    else:
+        numbers, comments = range(1, 9), [9]
+    values = {"sheetType": sheet_type, "isSubmitted": False}
+    values.update({f"field{i}": 0.0 for i in numbers})
+    values.update({f"field{i}": "" for i in comments})
+    return values
+
+
+def provision_sheets(assignments):
+    """
+    Create empty score sheets for (team_id, judge_id, sheet_type) assignments
+    with bulk INSERTs, skipping sheets the judge already has for that team.
+    Returns the created sheets like create_sheets_for_teams_in_cluster.
+    """
+    wanted = list(dict.fromkeys(assignments))
+    if not wanted:
+        return []
+    existing = set(
+        MapScoresheetToTeamJudge.objects.filter(
+            teamid__in={team_id for team_id, _, _ in wanted},
+            judgeid__in={judge_id for _, judge_id, _ in wanted},
+        ).values_list("teamid", "judgeid", "sheetType")
+    )
+    wanted = [assignment for assignment in wanted if assignment not in existing]
+    sheets = Scoresheet.objects.bulk_create(
+        [Scoresheet(**base_sheet_values(sheet_type)) for _, _, sheet_type in wanted],
+        batch_size=SHEET_BATCH_SIZE,
+    )
+    MapScoresheetToTeamJudge.objects.bulk_create(
+        [
+            MapScoresheetToTeamJudge(teamid=team_id, judgeid=judge_id, scoresheetid=sheet.id, sheetType=sheet_type)
+            for (team_id, judge_id, sheet_type), sheet in zip(wanted, sheets)
+        ],
+        batch_size=SHEET_BATCH_SIZE,
+    )
+    return [
+        {"team_id": team_id, "judge_id": judge_id, "scoresheet_id": sheet.id, "sheetType": sheet_type}
+        for (team_id, judge_id, sheet_type), sheet in zip(wanted, sheets)
+    ]
+
+
+# Judge flag -> sheet type it grants (as in make_sheets_for_team)
+JUDGE_SHEET_FLAGS = {
+    "presentation": ScoresheetEnum.PRESENTATION,
+    "journal": ScoresheetEnum.JOURNAL,
+    "mdo": ScoresheetEnum.MACHINEDESIGN,
+    "runpenalties": ScoresheetEnum.RUNPENALTIES,
+    "otherpenalties": ScoresheetEnum.OTHERPENALTIES,
+    "redesign": ScoresheetEnum.REDESIGN,
+    "championship": ScoresheetEnum.CHAMPIONSHIP,
+}
+
+
+def cluster_sheet_assignments(memberships, flags=JUDGE_SHEET_FLAGS):
+    """
+    (team_id, judge_id, sheet_type) for every judge of each (cluster_id,
+    team_id) membership, one per sheet type the judge's flags grant among
+    `flags`; input for provision_sheets. Two queries.
+    """
+    memberships = list(memberships)
+    judges_by_cluster = {}
+    for cluster_id, judge_id in MapJudgeToCluster.objects.filter(
+        clusterid__in={cluster_id for cluster_id, _ in memberships}
+    ).values_list("clusterid", "judgeid"):
+        judges_by_cluster.setdefault(cluster_id, []).append(judge_id)
+    judge_flags = {
+        judge["id"]: judge for judge in Judge.objects.filter(
+            id__in={judge_id for judge_ids in judges_by_cluster.values() for judge_id in judge_ids}
+        ).values("id", *flags)
+    }
+    return [
+        (team_id, judge_id, sheet_type)
+        for cluster_id, team_id in memberships
+        for judge_id in judges_by_cluster.get(cluster_id, ())
+        if judge_id in judge_flags
+        for flag, sheet_type in flags.items()
+        if judge_flags[judge_id][flag]
+    ]
+
 def create_sheets_for_teams_in_cluster(judge_id, cluster_id, presentation, journal, mdo, runpenalties, otherpenalties, redesign, championship):
     try:
         # Fetch all mappings for the teams in the cluster
@@ -1576,18 +1676,15 @@ def multi_team_general_penalties(request, judge_id, contest_id):
         judge_clusters = MapJudgeToCluster.objects.filter(
             judgeid=judge_id
         ).values_list('clusterid', flat=True)
-        print(f"DEBUG: judge_clusters={list(judge_clusters)}")
 
         # Get clusters in this contest
         contest_clusters = MapContestToCluster.objects.filter(
             contestid=contest_id
         ).values_list('clusterid', flat=True)
-        print(f"DEBUG: contest_clusters={list(contest_clusters)}")
 
         # Get clusters that are both assigned to this judge AND in this contest
         common_clusters = set(judge_clusters) & set(contest_clusters)
         cluster_ids = list(common_clusters)
-        print(f"DEBUG: common_clusters={cluster_ids}")
         
         team_mappings = MapClusterToTeam.objects.filter(clusterid__in=cluster_ids)
         
@@ -1732,18 +1829,15 @@ def multi_team_run_penalties(request, judge_id, contest_id):
         judge_clusters = MapJudgeToCluster.objects.filter(
             judgeid=judge_id
         ).values_list('clusterid', flat=True)
-        print(f"DEBUG: judge_clusters={list(judge_clusters)}")
 
         # Get clusters in this contest
         contest_clusters = MapContestToCluster.objects.filter(
             contestid=contest_id
         ).values_list('clusterid', flat=True)
-        print(f"DEBUG: contest_clusters={list(contest_clusters)}")
 
         # Get clusters that are both assigned to this judge AND in this contest
         common_clusters = set(judge_clusters) & set(contest_clusters)
         cluster_ids = list(common_clusters)
-        print(f"DEBUG: common_clusters={cluster_ids}")
         
         team_mappings = MapClusterToTeam.objects.filter(clusterid__in=cluster_ids)
         
@@ -4,7 +4,9 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.hashers import make_password
 from django.db import transaction
-from ..models import RoleSharedPassword, MapUserToRole
+from ..models import RoleSharedPassword
+from ..auth.role_cache import get_cached_role_mapping
+from ..auth.shared_password_cache import invalidate_shared_password
 
 @api_view(["POST"])
 @authentication_classes([SessionAuthentication])
@@ -19,12 +21,11 @@ def set_shared_password(request):
       }
     """
     # Check if user is an admin (role = 1)
-    try:
-        user_role_mapping = MapUserToRole.objects.get(uuid=request.user.id)
-        if user_role_mapping.role != 1:  # 1 = ADMIN
-            return Response({"error": "Only admins can set shared passwords."}, status=403)
-    except MapUserToRole.DoesNotExist:
+    user_role_mapping = get_cached_role_mapping(request.user.id)
+    if user_role_mapping is None:
         return Response({"error": "User role not found."}, status=403)
+    if user_role_mapping["role"] != 1:  # 1 = ADMIN
+        return Response({"error": "Only admins can set shared passwords."}, status=403)
     
     role = request.data.get("role")
     password = request.data.get("password")
@@ -94,7 +95,10 @@ def set_shared_password(request):
                 "error": "Password was not set correctly. Please try again.",
                 "detail": "Please contact support."
             }, status=500)
-    
+
+    # Drop remembered logins for the old password right away
+    invalidate_shared_password(role)
+
     return Response({
         "success": True,
         "role": role,
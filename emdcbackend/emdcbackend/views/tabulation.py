@@ -1,3 +1,5 @@
+import asyncio
+
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.exceptions import ValidationError
@@ -5,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
+from django.http import JsonResponse
 
 from ..models import (
     Teams,
@@ -20,6 +23,10 @@ from ..models import (
     MapJudgeToCluster,
     Judge,
 )
+from ..auth.role_cache import get_cached_role_mapping
+from .async_api import alist, async_api_view
+from .conditional import versioned_etag
+from .live import standings_feed
 
 # ---------- Shared Helpers ----------
 
@@ -328,16 +335,22 @@ def set_championship_rank(contest_id):
 
 def _ensure_requester_is_organizer_of_contest(user, contest_id: int):
     """Allow only organizers mapped to this contest."""
-    organizer_ids_for_user = list(
-        MapUserToRole.objects.filter(
-            uuid=user.id, role=MapUserToRole.RoleEnum.ORGANIZER
-        ).values_list("relatedid", flat=True)
-    )
+    role_map = get_cached_role_mapping(user.id)
+    if not role_map or role_map["role"] != MapUserToRole.RoleEnum.ORGANIZER:
+        return False
     return MapContestToOrganizer.objects.filter(
-        contestid=contest_id, organizerid__in=organizer_ids_for_user
+        contestid=contest_id, organizerid=role_map["relatedid"]
     ).exists()
 
 
+def is_admin_or_contest_organizer(user, contest_id):
+    """Admins, or organizers mapped to this contest."""
+    role_map = get_cached_role_mapping(user.id)
+    if role_map and role_map["role"] == MapUserToRole.RoleEnum.ADMIN:
+        return True
+    return _ensure_requester_is_organizer_of_contest(user, contest_id)
+
+
 def recompute_totals_and_ranks(contest_id: int):
     """Recompute all teams' totals for a contest, then reapply cluster & contest ranks."""
     contest_team_ids = MapContestToTeam.objects.filter(contestid=contest_id)
@@ -363,6 +376,9 @@ def recompute_totals_and_ranks(contest_id: int):
     # Set redesign rankings for redesign teams only
     set_redesign_rank(contest_id)
 
+    # Push the new standings to live viewers once this commits
+    standings_feed.notify(contest_id)
+
 
 # ---------- Endpoints ----------
 
@@ -408,24 +424,62 @@ def preliminary_results(request):
             except Teams.DoesNotExist:
                 continue
 
-        ordered = sort_by_score_with_id_fallback(cluster_teams, "total_score")
-        response_clusters.append({
-            "cluster_id": cm.clusterid,
-            "teams": [
-                {
-                    "team_id": t.id,
-                    "team_name": t.team_name,
-                    "total": float(t.total_score or 0.0),
-                    "cluster_rank": int(t.cluster_rank) if t.cluster_rank else None,
-                    "advanced": bool(t.advanced_to_championship),
-                }
-                for t in ordered
-            ]
-        })
+        response_clusters.append(_preliminary_cluster(cm.clusterid, cluster_teams))
 
     return Response({"ok": True, "message": "Preliminary standings computed.", "data": response_clusters}, status=status.HTTP_200_OK)
 
 
+def _preliminary_cluster(cluster_id, cluster_teams):
+    ordered = sort_by_score_with_id_fallback(cluster_teams, "total_score")
+    return {
+        "cluster_id": cluster_id,
+        "teams": [
+            {
+                "team_id": t.id,
+                "team_name": t.team_name,
+                "total": float(t.total_score or 0.0),
+                "cluster_rank": int(t.cluster_rank) if t.cluster_rank else None,
+                "advanced": bool(t.advanced_to_championship),
+            }
+            for t in ordered
+        ]
+    }
+
+
+@async_api_view(["GET"])
+@versioned_etag(MapContestToCluster, MapClusterToTeam, Teams)
+async def preliminary_results_async(request):
+    """
+    Read-only preliminary standings for the ASGI app.
+    Same response as preliminary_results, but returns the stored totals and
+    ranks instead of recomputing them (use the PUT endpoint for that).
+    Query: ?contestid=<int>
+    """
+    contest_id = request.GET.get("contestid")
+    if not contest_id:
+        return JsonResponse({"ok": False, "message": "contestid is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    cluster_maps = MapContestToCluster.objects.filter(contestid=contest_id)
+    team_maps = MapClusterToTeam.objects.filter(clusterid__in=cluster_maps.values("clusterid"))
+    clusters, memberships, teams = await asyncio.gather(
+        alist(cluster_maps),
+        alist(team_maps.values("clusterid", "teamid")),
+        alist(Teams.objects.filter(id__in=team_maps.values("teamid"))),
+    )
+
+    teams_by_id = {t.id: t for t in teams}
+    teams_by_cluster = {}
+    for m in memberships:
+        if m["teamid"] in teams_by_id:
+            teams_by_cluster.setdefault(m["clusterid"], []).append(teams_by_id[m["teamid"]])
+
+    response_clusters = [
+        _preliminary_cluster(cm.clusterid, teams_by_cluster.get(cm.clusterid, []))
+        for cm in clusters
+    ]
+    return JsonResponse({"ok": True, "message": "Preliminary standings.", "data": response_clusters})
+
+
 @api_view(["PUT"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
@@ -461,6 +515,7 @@ def set_advancers(request):
     # set selected advancers (intersection safety)
     valid_selection = [tid for tid in team_ids if tid in contest_team_ids]
     Teams.objects.filter(id__in=valid_selection).update(advanced_to_championship=True)
+    standings_feed.notify(contest_id)
 
     # Return summary
     advancers = list(
@@ -474,6 +529,7 @@ def set_advancers(request):
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
+@versioned_etag(MapContestToTeam, Teams)
 def list_advancers(request):
     """
     Convenience endpoint to list current advancers for a contest.
@@ -511,25 +567,43 @@ def championship_results(request):
         advanced_to_championship=True
     ).order_by('-total_score', 'id')
 
-    results = []
-    for i, team in enumerate(championship_teams, 1):
-        results.append({
-            "id": team.id,
-            "team_name": team.team_name,
-            "school": getattr(team, 'school', '') or getattr(team, 'school_name', ''),
-            "team_rank": i,
-            "journal_score": float(team.preliminary_journal_score or 0.0),  # From preliminary
-            "presentation_score": float(team.championship_presentation_score or 0.0),  # From championship
-            "machinedesign_score": float(team.championship_machinedesign_score or 0.0),  # From championship
-            "penalties_score": float(team.championship_penalties_score or 0.0),  # From championship (total)
-            "championship_general_penalties_score": float(team.championship_general_penalties_score or 0.0),  # General penalties
-            "championship_run_penalties_score": float(team.championship_run_penalties_score or 0.0),  # Run penalties
-            "total_score": float(team.total_score or 0.0),  # Combined
-            "is_championship": True
-        })
-    
+    results = [_championship_row(i, team) for i, team in enumerate(championship_teams, 1)]
+
     return Response({"ok": True, "data": results}, status=200)
 
+
+def _championship_row(rank, team):
+    return {
+        "id": team.id,
+        "team_name": team.team_name,
+        "school": getattr(team, 'school', '') or getattr(team, 'school_name', ''),
+        "team_rank": rank,
+        "journal_score": float(team.preliminary_journal_score or 0.0),  # From preliminary
+        "presentation_score": float(team.championship_presentation_score or 0.0),  # From championship
+        "machinedesign_score": float(team.championship_machinedesign_score or 0.0),  # From championship
+        "penalties_score": float(team.championship_penalties_score or 0.0),  # From championship (total)
+        "championship_general_penalties_score": float(team.championship_general_penalties_score or 0.0),  # General penalties
+        "championship_run_penalties_score": float(team.championship_run_penalties_score or 0.0),  # Run penalties
+        "total_score": float(team.total_score or 0.0),  # Combined
+        "is_championship": True
+    }
+
+
+@async_api_view(["GET"])
+@versioned_etag(MapContestToTeam, Teams)
+async def championship_results_async(request):
+    """ Async version of championship_results for the ASGI app (same response). Query: ?contestid=<int> """
+    contest_id = request.GET.get("contestid")
+    if not contest_id:
+        return JsonResponse({"ok": False, "message": "contestid is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    team_ids = MapContestToTeam.objects.filter(contestid=contest_id).values("teamid")
+    championship_teams = await alist(
+        Teams.objects.filter(id__in=team_ids, advanced_to_championship=True).order_by('-total_score', 'id')
+    )
+    results = [_championship_row(i, team) for i, team in enumerate(championship_teams, 1)]
+    return JsonResponse({"ok": True, "data": results})
+
 @api_view(["PUT"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
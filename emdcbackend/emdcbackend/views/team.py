@@ -22,12 +22,17 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from .conditional import versioned_etag
+from .pagination import boolean, in_contest, list_response, search
+from .fieldsets import narrow_queryset, requested_fields
 
 # Get team by ID
 @api_view(["GET"])
 def team_by_id(request, team_id):
-    team = get_object_or_404(Teams, id=team_id)
-    serializer = TeamSerializer(instance=team)
+    # Query: ?fields=<names> / ?exclude=<names> (optional, see views/fieldsets.py)
+    fieldset = requested_fields(request, TeamSerializer)
+    team = get_object_or_404(narrow_queryset(Teams.objects.all(), TeamSerializer, fieldset), id=team_id)
+    serializer = TeamSerializer(instance=team, **fieldset)
     return Response({"Team": serializer.data}, status=status.HTTP_200_OK)
 
 
@@ -525,11 +530,18 @@ def is_team_disqualified(request):
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
+@versioned_etag(Teams, MapContestToTeam)
 def get_all_teams(request):
+    """
+    Query: ?contestid=<int>&search=<name>&advanced=<bool>&limit=<int>&cursor=<str>
+    &fields=<names>&exclude=<names> (all optional, see views/pagination.py)
+    """
     try:
-        teams = Teams.objects.all()
-        serializer = TeamSerializer(teams, many=True)
-        return Response({"teams": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(request, Teams.objects.all(), TeamSerializer, "teams", {
+            "contestid": in_contest(MapContestToTeam, "teamid"),
+            "search": search("team_name", "school_name"),
+            "advanced": boolean("advanced_to_championship"),
+        })
 
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
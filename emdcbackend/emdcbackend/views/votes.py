@@ -10,8 +10,14 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
-from ..models import Votes
+from ..models import Ballot, MapBallotToVote, Votes
 from ..serializers import VotesSerializer
+from .pagination import exact, list_response, parse_int
+
+
+def _votes_in_contest(queryset, param, value):
+    ballot_ids = Ballot.objects.filter(contestid=parse_int(param, value)).values("id")
+    return queryset.filter(id__in=MapBallotToVote.objects.filter(ballotid__in=ballot_ids).values("voteid"))
 
 # Votes Views
 @api_view(["POST"])
@@ -31,9 +37,11 @@ def create_vote(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def get_all_votes(request):
+    # Query: ?contestid=<int>&votedteamid=<int>&limit=<int>&cursor=<str> (optional, see views/pagination.py)
     try:
-        votes = Votes.objects.all()
-        serializer = VotesSerializer(votes, many=True)
-        return Response({"votes": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(request, Votes.objects.all(), VotesSerializer, "votes", {
+            "contestid": _votes_in_contest,
+            "votedteamid": exact("votedteamid"),
+        })
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
@@ -0,0 +1,192 @@
+# backend/emdcbackend/emdcbackend/xlsx.py
+"""
+A small streaming XLSX writer for exports (views/export.py).
+
+write_xlsx(sheets) yields the bytes of a workbook while it is being built.
+Every worksheet is written to the zip archive one row at a time, and the
+compressed output is passed on as soon as zipfile produces it. Rows can
+therefore come straight from a database cursor without the workbook ever
+being held in memory:
+
+    sheets = [("Championship", ["Rank", "Team", "Total"], rows), ...]
+    StreamingHttpResponse(write_xlsx(sheets), content_type=XLSX_CONTENT_TYPE)
+
+Only what the exports need is supported: text (inline strings, no shared
+string table), numbers, booleans and blank cells, with a bold, frozen
+header row.
+"""
+import math
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Characters XML 1.0 does not allow
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+# Characters Excel does not allow in sheet names
+_ILLEGAL_SHEET_NAME = re.compile(r"[\[\]:*?/\\]")
+MAX_SHEET_NAME = 31
+MAX_CELL_TEXT = 32767
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_STYLES = (
+    _XML_DECLARATION
+    + f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_START = (
+    _XML_DECLARATION
+    + f'<worksheet xmlns="{_MAIN_NS}">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+# Cell style ids (cellXfs above)
+_HEADER_STYLE = 1
+
+
+class _Sink:
+    """Write-only file object for ZipFile; drain() returns what was written since the last call."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def sheet_names(names):
+    """Valid, unique worksheet names for `names`, in order."""
+    result = []
+    for name in names:
+        base = _ILLEGAL_SHEET_NAME.sub(" ", str(name)).strip("' ")[:MAX_SHEET_NAME] or "Sheet"
+        candidate, n = base, 1
+        while candidate.lower() in (existing.lower() for existing in result):
+            n += 1
+            suffix = f" ({n})"
+            candidate = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+        result.append(candidate)
+    return result
+
+
+def _text(value):
+    return escape(_ILLEGAL_XML.sub("", value)[:MAX_CELL_TEXT])
+
+
+def _cell(value, style=None):
+    s = f' s="{style}"' if style else ""
+    if value is None or value == "":
+        return f"<c{s}/>"
+    if isinstance(value, bool):
+        return f'<c t="b"{s}><v>{int(value)}</v></c>'
+    if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+        return f"<c{s}><v>{value!r}</v></c>"
+    return f'<c t="inlineStr"{s}><is><t xml:space="preserve">{_text(str(value))}</t></is></c>'
+
+
+def _row(values, style=None):
+    return "<row>" + "".join(_cell(value, style) for value in values) + "</row>"
+
+
+def _content_types(count):
+    overrides = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for n in range(1, count + 1)
+    )
+    return (
+        _XML_DECLARATION
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        + overrides + '</Types>'
+    )
+
+
+def _package_rels():
+    return (
+        _XML_DECLARATION
+        + f'<Relationships xmlns="{_PACKAGE_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+
+
+def _workbook(names):
+    sheets = "".join(
+        f'<sheet name={quoteattr(_ILLEGAL_XML.sub("", name))} sheetId="{n}" r:id="rId{n}"/>'
+        for n, name in enumerate(names, 1)
+    )
+    return _XML_DECLARATION + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheets}</sheets></workbook>'
+
+
+def _workbook_rels(count):
+    rels = "".join(
+        f'<Relationship Id="rId{n}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{n}.xml"/>'
+        for n in range(1, count + 1)
+    )
+    rels += f'<Relationship Id="rId{count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+    return _XML_DECLARATION + f'<Relationships xmlns="{_PACKAGE_REL_NS}">{rels}</Relationships>'
+
+
+def write_xlsx(sheets):
+    """
+    Yield the bytes of a workbook with one worksheet per
+    (name, header, rows) in `sheets`. `rows` may be any iterable and is only
+    consumed while its worksheet is written.
+    """
+    sheets = list(sheets)
+    names = sheet_names(name for name, _, _ in sheets)
+    sink = _Sink()
+    # The sink cannot seek, so zipfile writes sizes in data descriptors
+    # after each entry instead of going back to the local headers
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _content_types(len(sheets)))
+        archive.writestr("_rels/.rels", _package_rels())
+        archive.writestr("xl/workbook.xml", _workbook(names))
+        archive.writestr("xl/_rels/workbook.xml.rels", _workbook_rels(len(sheets)))
+        archive.writestr("xl/styles.xml", _STYLES)
+        yield sink.drain()
+
+        for n, (_, header, rows) in enumerate(sheets, 1):
+            with archive.open(f"xl/worksheets/sheet{n}.xml", "w") as sheet:
+                sheet.write((_SHEET_START + _row(header, _HEADER_STYLE)).encode())
+                for values in rows:
+                    sheet.write(_row(values).encode())
+                    data = sink.drain()
+                    if data:
+                        yield data
+                sheet.write(_SHEET_END.encode())
+            yield sink.drain()
+    # The central directory, written on close
+    yield sink.drain()
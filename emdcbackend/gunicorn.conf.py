@@ -0,0 +1,154 @@
+# backend/emdcbackend/gunicorn.conf.py
+"""
+Production server settings for gunicorn (loaded automatically when gunicorn
+is started from this directory, see the Dockerfile CMD).
+
+Everything can be tuned from the environment:
+  PORT                      port to bind (default: 7004)
+  SERVER_INTERFACE          "wsgi" (default) or "asgi" (uvicorn workers; use
+                            it to serve live dashboards, /api/async/live/)
+  WEB_CONCURRENCY           worker processes (default: 2 * CPUs + 1, at most
+                            8, and fewer if DB_CONNECTION_BUDGET needs it)
+  DB_CONNECTION_BUDGET      database connections this server may open in
+                            total; size it below Postgres max_connections,
+                            leaving room for other servers and admin tools
+                            (default: unset)
+  GUNICORN_THREADS          threads per WSGI worker (default: 4)
+  GUNICORN_TIMEOUT          seconds before a silent worker is killed (default: 120)
+  GUNICORN_GRACEFUL_TIMEOUT seconds to finish in-flight requests on shutdown/reload (default: 90)
+  GUNICORN_KEEPALIVE        seconds to hold idle keep-alive connections (default: 5)
+  GUNICORN_MAX_REQUESTS     recycle a worker after this many requests, 0 = never (default: 1000)
+  GUNICORN_MAX_REQUESTS_JITTER  random spread so workers do not recycle together (default: 100)
+  GUNICORN_PRELOAD          import the app once before forking (default: 0)
+  METRICS_MULTIPROC_DIR     where workers share request metrics (default: a
+                            fresh temporary directory, emptied on start)
+
+On SIGTERM (docker stop) or SIGHUP (reload) gunicorn stops accepting new
+connections and gives running requests, such as a long tabulation PUT,
+GUNICORN_GRACEFUL_TIMEOUT seconds to finish. Each worker then waits, within
+the same limit, for its background threads (emdcbackend/background.py). Give the container at least that
+long to stop (docker stop -t / stop_grace_period).
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7004')}"
+
+threads = _env_int("GUNICORN_THREADS", 4)
+
+
+def _cpus():
+    # CPUs this process may run on; cpu_count() reports every CPU of the host
+    # even when a container is limited to a few of them
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return multiprocessing.cpu_count()
+
+
+def _connections_per_worker():
+    # A pooled worker opens up to DB_POOL_MAX_SIZE connections; otherwise each
+    # request thread keeps its own persistent connection, plus one for
+    # background work (emdcbackend/background.py)
+    if os.getenv("DB_POOL", "").lower() in ("1", "true", "yes"):
+        return _env_int("DB_POOL_MAX_SIZE", 10)
+    return threads + 1
+
+
+def _default_workers():
+    count = min(_cpus() * 2 + 1, 8)
+    budget = os.getenv("DB_CONNECTION_BUDGET")
+    if budget:
+        count = min(count, int(budget) // _connections_per_worker())
+    return max(count, 1)
+
+
+workers = _env_int("WEB_CONCURRENCY", _default_workers())
+
+if os.getenv("SERVER_INTERFACE", "wsgi").lower() == "asgi":
+    wsgi_app = "emdcbackend.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "emdcbackend.wsgi:application"
+    worker_class = "gthread" if threads > 1 else "sync"
+
+timeout = _env_int("GUNICORN_TIMEOUT", 120)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 90)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+preload_app = os.getenv("GUNICORN_PRELOAD", "0").lower() in ("1", "true", "yes")
+
+# Every worker writes its request metrics here so /api/metrics/ reports the
+# totals of all workers, whichever one answers the scrape
+os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "emdc-metrics"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Counts of a previous run must not be added to this one
+    directory = os.environ["METRICS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    # Imported here, not in child_exit: that runs from the SIGCHLD handler
+    # and can interrupt itself while the import is in progress
+    import emdcbackend.metrics  # noqa: F401
+
+
+def pre_fork(server, worker):
+    # With preload_app the master may have opened database connections while
+    # importing; close them before forking so no socket is shared by workers.
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    from emdcbackend.db.postgresql.base import close_pools
+    connections.close_all()
+    # Pool maintenance threads do not survive fork; workers open their own
+    close_pools()
+
+
+def post_worker_init(worker):
+    # Pick up contest deletions that a previous worker handed back on exit
+    # or left behind when it died
+    from django.db import connections
+    from emdcbackend.deletion import resume_deletions
+    try:
+        resume_deletions()
+    except Exception as e:
+        worker.log.error("Resuming contest deletions failed: %s", e)
+    finally:
+        # This thread serves no requests; do not keep its connection open
+        connections.close_all()
+
+
+def worker_exit(server, worker):
+    # Let background work of this worker finish (tabulations started by
+    # submitted score sheets, the email outbox sender, the contest deleter)
+    # so a shutdown or recycle does not cut it off halfway.
+    background = sys.modules.get("emdcbackend.background")
+    if background is not None:
+        left = background.drain(graceful_timeout)
+        if left:
+            server.log.warning("Worker %s exiting with unfinished background threads: %s",
+                               worker.pid, ", ".join(thread.name for thread in left))
+
+    # Last request metrics since the previous flush
+    metrics = sys.modules.get("emdcbackend.metrics")
+    if metrics is not None:
+        metrics.flush()
+
+
+def child_exit(server, worker):
+    # Runs in the master: keep the exited worker's counts in the archive
+    sys.modules["emdcbackend.metrics"].mark_process_dead(worker.pid, os.environ["METRICS_MULTIPROC_DIR"])